@@ -16,7 +16,7 @@ from collections import Counter
 from core.repositories import base_repository as crud
 from core.helpers import nlp_helpers as nlp_utils
 from core.helpers import metric_helpers
-from core.helpers.cache_helpers import cache_result, CACHE_TIMEOUTS
+from core.helpers.cache_helpers import cache_result, tracker_tags, CACHE_TIMEOUTS
 
 # Dependencies removed: pandas, numpy, matplotlib, seaborn
 # Serverless-friendly pure Python implementation
@@ -30,7 +30,7 @@ _matplotlib_available = False
 # CORE METRICS
 # ====================================================================
 
-@cache_result(timeout=CACHE_TIMEOUTS['completion_rate'], key_prefix='completion_rate')
+@cache_result(timeout=CACHE_TIMEOUTS['completion_rate'], key_prefix='completion_rate', tags=tracker_tags, local=True)
 def compute_completion_rate(tracker_id: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict:
     """
     Computes completion rate using pandas aggregations.
@@ -46,10 +46,10 @@ def compute_completion_rate(tracker_id: str, start_date: Optional[date] = None,
             'computed_at': datetime
         }
     """
-    # Use optimized query that prefetches tasks
-    instances = crud.get_tracker_instances_with_tasks(tracker_id, start_date, end_date)
+    # Materialized per-day stats: cost scales with days, not tasks
+    rollups = crud.get_daily_rollups(tracker_id, start_date, end_date)
     
-    if not instances:
+    if not rollups:
         return {
             'metric_name': 'completion_rate',
             'value': 0.0,
@@ -64,27 +64,20 @@ def compute_completion_rate(tracker_id: str, start_date: Optional[date] = None,
     total_completed = 0
     total_scheduled = 0
 
-    for inst in instances:
-        inst_date = inst.period_start or inst.tracking_date
-        if isinstance(inst_date, str):
-            inst_date = date.fromisoformat(inst_date)
-        
-        tasks = inst.tasks.all()
-        if not tasks:
+    for day in rollups:
+        if not day.total:
             continue
         
-        total = len(tasks)
-        completed = sum(1 for t in tasks if t.status == 'DONE')
-        rate = (completed / total) * 100 if total > 0 else 0.0
+        rate = (day.done / day.total) * 100
         
         # Accumulate totals
-        total_scheduled += total
-        total_completed += completed
+        total_scheduled += day.total
+        total_completed += day.done
 
         data.append({
-            'date': inst_date,
-            'total': total,
-            'completed': completed,
+            'date': day.date,
+            'total': day.total,
+            'completed': day.done,
             'rate': rate
         })
     
@@ -103,7 +96,7 @@ def compute_completion_rate(tracker_id: str, start_date: Optional[date] = None,
         'computed_at': datetime.now()
     }
 
-@cache_result(timeout=CACHE_TIMEOUTS['streaks'], key_prefix='streaks')
+@cache_result(timeout=CACHE_TIMEOUTS['streaks'], key_prefix='streaks', tags=tracker_tags, local=True)
 def detect_streaks(tracker_id: str, task_template_id: Optional[str] = None) -> Dict:
     """
     Detects current and longest streaks using NumPy run-length encoding.
@@ -117,28 +110,17 @@ def detect_streaks(tracker_id: str, task_template_id: Optional[str] = None) -> D
             'computed_at': datetime
         }
     """
-    # Use optimized prefetch query
-    instances = crud.get_tracker_instances_with_tasks(tracker_id)
-    
     # Build date-indexed completion series
-    completion_data = {}
-    
-    for inst in instances:
-        inst_date = inst.period_start or inst.tracking_date
-        if isinstance(inst_date, str):
-            inst_date = date.fromisoformat(inst_date)
-        
-        # Tasks already prefetched
-        tasks = inst.tasks.all()
-        
-        # Filter by template if specified
-        if task_template_id:
-            tasks = [t for t in tasks if str(t.template_id) == str(task_template_id)]
-        
-        if tasks:
-            # Day is completed if any task is DONE
-            completed = any(t.status == 'DONE' for t in tasks)
-            completion_data[inst_date] = completed
+    if task_template_id:
+        # Template-level streaks need per-task status; fetch flat tuples only
+        completion_data = crud.get_template_completion_days(tracker_id, task_template_id)
+    else:
+        # Day is completed if any task is DONE
+        completion_data = {
+            day.date: day.done > 0
+            for day in crud.get_daily_rollups(tracker_id)
+            if day.total
+        }
     
     if not completion_data:
         return {
@@ -168,7 +150,7 @@ def detect_streaks(tracker_id: str, task_template_id: Optional[str] = None) -> D
         'computed_at': datetime.now()
     }
 
-@cache_result(timeout=CACHE_TIMEOUTS['consistency'], key_prefix='consistency')
+@cache_result(timeout=CACHE_TIMEOUTS['consistency'], key_prefix='consistency', tags=tracker_tags, local=True)
 def compute_consistency_score(tracker_id: str, window_days: int = 7) -> Dict:
     """
     Computes consistency score using rolling window analysis.
@@ -183,20 +165,11 @@ def compute_consistency_score(tracker_id: str, window_days: int = 7) -> Dict:
             'computed_at': datetime
         }
     """
-    # Use optimized prefetch query
-    instances = crud.get_tracker_instances_with_tasks(tracker_id)
-    
-    # Build completion series
-    completion_data = {}
-    for inst in instances:
-        inst_date = inst.period_start or inst.tracking_date
-        if isinstance(inst_date, str):
-            inst_date = date.fromisoformat(inst_date)
-        
-        # Tasks already prefetched
-        tasks = inst.tasks.all()
-        completed = any(t.status == 'DONE' for t in tasks) if tasks else False
-        completion_data[inst_date] = completed
+    # Build completion series from materialized per-day stats
+    completion_data = {
+        day.date: day.done > 0
+        for day in crud.get_daily_rollups(tracker_id)
+    }
     
     if not completion_data:
         return {
@@ -242,7 +215,7 @@ def compute_consistency_score(tracker_id: str, window_days: int = 7) -> Dict:
         'computed_at': datetime.now()
     }
 
-@cache_result(timeout=CACHE_TIMEOUTS['tracker_stats'], key_prefix='balance')
+@cache_result(timeout=CACHE_TIMEOUTS['tracker_stats'], key_prefix='balance', tags=tracker_tags, local=True)
 def compute_balance_score(tracker_id: str) -> Dict:
     """
     Computes balance score using category distribution entropy.
@@ -325,7 +298,7 @@ def compute_balance_score(tracker_id: str) -> Dict:
         'computed_at': datetime.now()
     }
 
-@cache_result(timeout=CACHE_TIMEOUTS['analytics'], key_prefix='effort')
+@cache_result(timeout=CACHE_TIMEOUTS['analytics'], key_prefix='effort', tags=tracker_tags, local=True)
 def compute_effort_index(tracker_id: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict:
     """
     Computes effort index combining task difficulty and duration.
@@ -378,10 +351,13 @@ def analyze_notes_sentiment(tracker_id: str, start_date: Optional[date] = None,
     """
     Analyzes sentiment of notes using VADER.
     
+    Reads the sentiment_score stored with each note when it was written
+    (see NoteAnalysisService); notes not analyzed yet are scored here.
+    
     Returns:
         {
             'metric_name': 'sentiment_analysis',
-            'daily_mood': [...],
+            'daily_mood': [{'date': str, 'compound': float}, ...],
             'average_mood': float,
             'raw_inputs': {...},
             'formula': str,
@@ -412,13 +388,12 @@ def analyze_notes_sentiment(tracker_id: str, start_date: Optional[date] = None,
         if end_date and note_date > end_date:
             continue
         
-        sentiment = nlp_utils.compute_sentiment(note.get('content', ''))
+        compound = note.get('sentiment_score')
+        if compound is None:
+            compound = nlp_utils.compute_sentiment(note.get('content', ''))['compound']
         daily_sentiments.append({
             'date': str(note_date),
-            'compound': sentiment['compound'],
-            'pos': sentiment['pos'],
-            'neu': sentiment['neu'],
-            'neg': sentiment['neg']
+            'compound': compound
         })
     
     avg_mood = statistics.mean([s['compound'] for s in daily_sentiments]) if daily_sentiments else 0.0
@@ -436,6 +411,9 @@ def extract_keywords_from_notes(tracker_id: str, top_n: int = 10) -> Dict:
     """
     Extracts top keywords from all notes using frequency analysis.
     
+    Sums the keyword counts stored with each analyzed note (each note
+    keeps its top keywords); notes not analyzed yet are tokenized here.
+    
     Returns:
         {
             'metric_name': 'keyword_extraction',
@@ -456,15 +434,26 @@ def extract_keywords_from_notes(tracker_id: str, top_n: int = 10) -> Dict:
             'computed_at': datetime.now()
         }
     
-    # Concatenate all note content
-    combined_text = ' '.join(note.get('content', '') for note in all_notes)
+    counts = Counter()
+    pending = []
+    for note in all_notes:
+        if note.get('sentiment_score') is None:
+            pending.append(note.get('content', ''))
+        else:
+            counts.update({word: count for word, count in note.get('keywords') or []})
     
-    keywords = nlp_utils.extract_keywords(combined_text, top_n)
+    # Concatenate the content of notes without stored keywords
+    combined_text = ' '.join(pending)
+    if combined_text.strip():
+        counts.update(dict(nlp_utils.extract_keywords(combined_text, top_n)))
     
     return {
         'metric_name': 'keyword_extraction',
-        'keywords': keywords,
-        'raw_inputs': {'note_count': len(all_notes), 'total_chars': len(combined_text)},
+        'keywords': counts.most_common(top_n),
+        'raw_inputs': {
+            'note_count': len(all_notes),
+            'total_chars': sum(len(note.get('content', '')) for note in all_notes)
+        },
         'formula': 'Token frequency analysis after stopword removal',
         'computed_at': datetime.now()
     }
@@ -562,7 +551,7 @@ def generate_streak_timeline(tracker_id):
     # Matplotlib not available on serverless
     return None
 
-@cache_result(timeout=CACHE_TIMEOUTS['tracker_stats'], key_prefix='tracker_stats')
+@cache_result(timeout=CACHE_TIMEOUTS['tracker_stats'], key_prefix='tracker_stats', tags=tracker_tags, local=True)
 def compute_tracker_stats(tracker_id):
     """
     Computes comprehensive statistics for a tracker.
@@ -0,0 +1,346 @@
+"""
+Full-account export.
+
+Streams every entity a user owns - trackers, task templates, tracker
+instances, task instances (with their notes), day notes, goals, tags,
+template tags, goal mappings and entity relations - as JSON Lines, CSV or
+XLSX, in flat memory however much history the account has.
+
+Rows are read with keyset scans: each page is the next `chunk_size` rows
+after the last primary key seen, read through iterator(), so neither the
+database driver nor Python ever holds more than one page. Writers consume
+the rows one at a time, and the text formats report a cursor after each
+row so background export jobs can resume where they stopped:
+
+- jsonl: one JSON object per line, tagged with its entity "type"; the
+  first line describes the export.
+- csv: one section per entity (header row, rows, blank line).
+- xlsx: one sheet per entity, written by xlsxwriter in constant_memory
+  mode to a temporary file that is streamed back and deleted.
+"""
+import csv
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from typing import Callable, Dict, Generator, List, NamedTuple, Tuple, Union
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from core.models import (
+    DayNote, EntityRelation, Goal, GoalTaskMapping, Tag, TaskInstance,
+    TaskTemplate, TaskTemplateTag, TrackerDefinition, TrackerInstance
+)
+
+EXPORT_VERSION = 1
+
+# Rows per keyset page
+EXPORT_CHUNK_SIZE = 1000
+
+# Bytes per chunk when streaming a finished file
+FILE_CHUNK_SIZE = 64 * 1024
+
+# Longest text XLSX accepts in a cell
+XLSX_MAX_CELL = 32767
+
+
+class ExportEntity(NamedTuple):
+    name: str                                   # Entity "type" / section / sheet name
+    queryset: Callable[[int], QuerySet]         # The user's rows
+    key: str                                    # Unique, ordered keyset column
+    fields: Tuple[str, ...]                     # Exported columns
+
+
+EXPORT_ENTITIES: List[ExportEntity] = [
+    ExportEntity(
+        'trackers',
+        lambda user_id: TrackerDefinition.objects.filter(user_id=user_id, deleted_at__isnull=True),
+        'tracker_id',
+        ('tracker_id', 'name', 'description', 'time_mode', 'status', 'target_points',
+         'goal_period', 'goal_start_day', 'created_at', 'updated_at'),
+    ),
+    ExportEntity(
+        'templates',
+        lambda user_id: TaskTemplate.objects.filter(
+            tracker__user_id=user_id, tracker__deleted_at__isnull=True, deleted_at__isnull=True
+        ),
+        'template_id',
+        ('template_id', 'tracker_id', 'description', 'category', 'weight', 'points',
+         'time_of_day', 'is_recurring', 'include_in_goal', 'created_at'),
+    ),
+    ExportEntity(
+        'instances',
+        lambda user_id: TrackerInstance.objects.filter(
+            tracker__user_id=user_id, tracker__deleted_at__isnull=True, deleted_at__isnull=True
+        ),
+        'instance_id',
+        ('instance_id', 'tracker_id', 'tracking_date', 'period_start', 'period_end',
+         'status', 'created_at'),
+    ),
+    ExportEntity(
+        'tasks',
+        lambda user_id: TaskInstance.objects.filter(
+            tracker_instance__tracker__user_id=user_id,
+            tracker_instance__tracker__deleted_at__isnull=True,
+            tracker_instance__deleted_at__isnull=True,
+            deleted_at__isnull=True
+        ),
+        'task_instance_id',
+        ('task_instance_id', 'tracker_instance_id', 'template_id', 'status', 'notes',
+         'snapshot_description', 'snapshot_points', 'snapshot_weight',
+         'completed_at', 'first_completed_at', 'created_at', 'updated_at'),
+    ),
+    ExportEntity(
+        'notes',
+        lambda user_id: DayNote.objects.filter(
+            tracker__user_id=user_id, tracker__deleted_at__isnull=True, deleted_at__isnull=True
+        ),
+        'note_id',
+        ('note_id', 'tracker_id', 'date', 'content', 'sentiment_score', 'keywords',
+         'created_at', 'updated_at'),
+    ),
+    ExportEntity(
+        'goals',
+        lambda user_id: Goal.objects.filter(user_id=user_id, deleted_at__isnull=True),
+        'goal_id',
+        ('goal_id', 'tracker_id', 'title', 'description', 'icon', 'goal_type', 'target_date',
+         'target_value', 'current_value', 'unit', 'status', 'priority', 'progress',
+         'created_at', 'updated_at'),
+    ),
+    ExportEntity(
+        'tags',
+        lambda user_id: Tag.objects.filter(user_id=user_id),
+        'tag_id',
+        ('tag_id', 'name', 'color', 'icon', 'created_at'),
+    ),
+    ExportEntity(
+        'template_tags',
+        lambda user_id: TaskTemplateTag.objects.filter(tag__user_id=user_id),
+        'id',
+        ('template_id', 'tag_id', 'created_at'),
+    ),
+    ExportEntity(
+        'goal_mappings',
+        lambda user_id: GoalTaskMapping.objects.filter(goal__user_id=user_id),
+        'id',
+        ('goal_id', 'template_id', 'contribution_weight', 'notes', 'created_at'),
+    ),
+    ExportEntity(
+        'relations',
+        lambda user_id: EntityRelation.objects.filter(user_id=user_id),
+        'relation_id',
+        ('relation_id', 'from_entity_type', 'from_entity_id', 'to_entity_type',
+         'to_entity_id', 'relation_type', 'metadata', 'created_at'),
+    ),
+]
+
+EXPORT_FORMATS = {
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'csv': ('text/csv', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+
+def keyset_scan(queryset: QuerySet, key: Union[str, Tuple[str, ...]], fields: Tuple[str, ...],
+                chunk_size: int = EXPORT_CHUNK_SIZE, after=None) -> Generator[Tuple, None, None]:
+    """
+    Yield (key value, row of `fields`) for every row, ordered by `key`,
+    one page at a time, starting after the key value `after`.
+
+    Each page is a fresh `key > last` query, so memory stays bounded even
+    on drivers that buffer whole result sets. `key` may be a tuple of
+    columns that is unique as a whole; its values are then lists.
+    """
+    columns = (key,) if isinstance(key, str) else tuple(key)
+    width = len(columns)
+    last = after
+    while True:
+        page = queryset.order_by(*columns)
+        if last is not None:
+            page = page.filter(_after(columns, [last] if width == 1 else last))
+        count = 0
+        for row in page.values_list(*columns, *fields)[:chunk_size].iterator(chunk_size=chunk_size):
+            last = row[0] if width == 1 else list(row[:width])
+            count += 1
+            yield last, row[width:]
+        if count < chunk_size:
+            return
+
+
+def _after(columns: Tuple[str, ...], values) -> Q:
+    """Rows that sort after `values` in `columns` order."""
+    condition = Q()
+    for index in range(len(columns)):
+        equal = dict(zip(columns[:index], values[:index]))
+        condition |= Q(**equal, **{f'{columns[index]}__gt': values[index]})
+    return condition
+
+
+def keyset_rows(queryset: QuerySet, key: str, fields: Tuple[str, ...],
+                chunk_size: int = EXPORT_CHUNK_SIZE) -> Generator[Tuple, None, None]:
+    """Rows of `fields` in `key` order, read with keyset_scan."""
+    for _, row in keyset_scan(queryset, key, fields, chunk_size):
+        yield row
+
+
+def _cell(value):
+    """A value as plain text for CSV and XLSX."""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def export_header(user) -> Dict:
+    return {
+        'type': 'export',
+        'version': EXPORT_VERSION,
+        'exported_at': timezone.now().isoformat(),
+        'user_id': user.id,
+        'username': user.username,
+        'entities': [entity.name for entity in EXPORT_ENTITIES],
+    }
+
+
+def _csv_line(values) -> str:
+    buffer = StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def account_pieces(user, format: str, cursor: Dict = None,
+                   chunk_size: int = EXPORT_CHUNK_SIZE) -> Generator[Tuple[Dict, str], None, None]:
+    """
+    The account as JSON Lines or CSV text, one row at a time.
+
+    Yields (cursor, text); passing a yielded cursor back in resumes right
+    after that piece. A cursor is {'entity': index into EXPORT_ENTITIES,
+    'after': last key written}, with 'after' None when only the entity's
+    CSV header (or the JSON Lines export header) has been written.
+    """
+    encoder = DjangoJSONEncoder()
+    if cursor is None and format == 'jsonl':
+        cursor = {'entity': 0, 'after': None}
+        yield cursor, encoder.encode(export_header(user)) + '\n'
+    start, after = (cursor['entity'], cursor['after']) if cursor else (0, None)
+
+    for index in range(start, len(EXPORT_ENTITIES)):
+        entity = EXPORT_ENTITIES[index]
+        resuming = cursor is not None and index == start
+        if format == 'csv' and not resuming:
+            header = _csv_line(['type', *entity.fields])
+            yield {'entity': index, 'after': None}, ('\r\n' if index else '') + header
+
+        rows = keyset_scan(
+            entity.queryset(user.id), entity.key, entity.fields, chunk_size,
+            after=after if resuming else None
+        )
+        for key, row in rows:
+            if format == 'csv':
+                text = _csv_line([entity.name] + [_cell(value) for value in row])
+            else:
+                record = {'type': entity.name}
+                record.update(zip(entity.fields, row))
+                text = encoder.encode(record) + '\n'
+            yield {'entity': index, 'after': key}, text
+
+
+def stream_jsonl(user, chunk_size: int = EXPORT_CHUNK_SIZE) -> Generator[str, None, None]:
+    """The account as JSON Lines, one entity per line."""
+    for _, text in account_pieces(user, 'jsonl', chunk_size=chunk_size):
+        yield text
+
+
+def stream_csv(user, chunk_size: int = EXPORT_CHUNK_SIZE) -> Generator[str, None, None]:
+    """The account as CSV: one section per entity, separated by blank lines."""
+    for _, text in account_pieces(user, 'csv', chunk_size=chunk_size):
+        yield text
+
+
+def account_row_count(user_id: int) -> int:
+    """Rows an account export writes, for progress reporting."""
+    return sum(entity.queryset(user_id).count() for entity in EXPORT_ENTITIES)
+
+
+def write_xlsx(user, path: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> None:
+    """Write the account to an XLSX file, one sheet per entity."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'strings_to_numbers': False,
+                                          'strings_to_formulas': False, 'strings_to_urls': False})
+    header_format = workbook.add_format({'bold': True})
+    try:
+        for entity in EXPORT_ENTITIES:
+            sheet = workbook.add_worksheet(entity.name)
+            sheet.write_row(0, 0, entity.fields, header_format)
+            rows = keyset_rows(entity.queryset(user.id), entity.key, entity.fields, chunk_size)
+            for row_index, row in enumerate(rows, start=1):
+                values = [_cell(value) for value in row]
+                sheet.write_row(row_index, 0, [
+                    value[:XLSX_MAX_CELL] if isinstance(value, str) else value for value in values
+                ])
+    finally:
+        workbook.close()
+
+
+def stream_file(path: str, chunk_size: int = FILE_CHUNK_SIZE, delete: bool = False) -> Generator[bytes, None, None]:
+    """Yield a file's bytes in chunks, optionally removing it afterwards."""
+    try:
+        with open(path, 'rb') as handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if delete:
+            os.remove(path)
+
+
+def stream_xlsx(user, chunk_size: int = EXPORT_CHUNK_SIZE) -> Generator[bytes, None, None]:
+    """The account as XLSX, built on disk and streamed back."""
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    try:
+        write_xlsx(user, path, chunk_size)
+    except Exception:
+        os.remove(path)
+        raise
+    yield from stream_file(path, delete=True)
+
+
+STREAMS = {
+    'jsonl': stream_jsonl,
+    'csv': stream_csv,
+    'xlsx': stream_xlsx,
+}
+
+
+def stream_account_export(user, format: str = 'jsonl', chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Stream a user's whole account.
+
+    Args:
+        user: Account owner
+        format: 'jsonl', 'csv' or 'xlsx'
+        chunk_size: Rows per keyset page
+
+    Returns:
+        (chunk generator, content type, file extension)
+
+    Raises:
+        ValueError: Unsupported format
+    """
+    if format not in STREAMS:
+        raise ValueError(f"Unsupported format: {format}")
+    content_type, extension = EXPORT_FORMATS[format]
+    return STREAMS[format](user, chunk_size), content_type, extension
@@ -0,0 +1,538 @@
+"""
+Streaming account import.
+
+Reads an uploaded export incrementally and writes it a batch at a time:
+
+- jsonl: the full-account export (core.exports.account_exporter), one
+  record per line tagged with its entity "type"
+- json: the legacy {"trackers": [{..., "tasks": [...]}]} layout; the
+  trackers array is decoded one tracker at a time
+
+Records are buffered per entity and validated in batches. Imported rows
+get fresh IDs (so an export can be restored next to the data it came
+from, or into another account) and references are rewritten to the new
+IDs; parents are always flushed before their children. Each batch is
+written with bulk_create in its own transaction, audit history included,
+and the side effects post_save signals would have run (change log,
+search index, rollups, dashboard snapshots, typeahead and relation
+caches) run once per batch or once per import instead of once per row.
+Notes exported without a sentiment score are analyzed before insert.
+
+Invalid records and failed batches are reported without stopping the
+import. A document that turns out to be unreadable partway through stops
+the import; the records read before that point are still written, and
+the report carries the file error. A dry run validates and maps
+everything but writes nothing.
+"""
+import codecs
+import json
+import logging
+import uuid
+from collections import Counter
+from typing import Dict, Generator, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from simple_history.utils import bulk_create_with_history
+
+from core.exports.account_exporter import EXPORT_ENTITIES, EXPORT_VERSION
+from core.models import (
+    DayNote, EntityRelation, Goal, GoalTaskMapping, Tag, TaskInstance,
+    TaskTemplate, TaskTemplateTag, TrackerDefinition, TrackerInstance
+)
+
+logger = logging.getLogger(__name__)
+
+# Records per validated / inserted batch
+IMPORT_BATCH_SIZE = 500
+
+# Record errors listed per batch (the rest are only counted)
+MAX_BATCH_ERRORS = 50
+
+# Bytes read from the upload at a time when decoding JSON
+READ_CHUNK_SIZE = 64 * 1024
+
+# Timestamps are set by the database on import
+AUTO_FIELDS = ('created_at', 'updated_at')
+
+
+class ImportFileError(ValueError):
+    """The upload cannot be read as an export at all."""
+
+
+class ImportEntity(NamedTuple):
+    name: str                       # Record "type", as written by the exporter
+    model: type
+    key: Optional[str]              # Record ID column, remapped on import
+    refs: Dict[str, str]            # Reference column -> entity it points to
+    owned: bool                     # Has a user column set to the importer
+    fields: Tuple[str, ...]         # Copied columns
+
+
+def _entity(name: str, model, refs: Dict[str, str] = None, owned: bool = False) -> ImportEntity:
+    """Import spec for an exported entity; columns follow EXPORT_ENTITIES."""
+    refs = refs or {}
+    export = next(entity for entity in EXPORT_ENTITIES if entity.name == name)
+    key = export.key if export.key in export.fields else None
+    fields = tuple(
+        field for field in export.fields
+        if field != key and field not in refs and field not in AUTO_FIELDS
+    )
+    return ImportEntity(name, model, key, refs, owned, fields)
+
+
+# In dependency order: every entity's references come earlier in the list
+IMPORT_ENTITIES: List[ImportEntity] = [
+    _entity('trackers', TrackerDefinition, owned=True),
+    _entity('templates', TaskTemplate, {'tracker_id': 'trackers'}),
+    _entity('instances', TrackerInstance, {'tracker_id': 'trackers'}),
+    _entity('tasks', TaskInstance, {'tracker_instance_id': 'instances', 'template_id': 'templates'}),
+    _entity('notes', DayNote, {'tracker_id': 'trackers'}),
+    _entity('goals', Goal, {'tracker_id': 'trackers'}, owned=True),
+    _entity('tags', Tag, owned=True),
+    _entity('template_tags', TaskTemplateTag, {'template_id': 'templates', 'tag_id': 'tags'}),
+    _entity('goal_mappings', GoalTaskMapping, {'goal_id': 'goals', 'template_id': 'templates'}),
+    _entity('relations', EntityRelation, owned=True),
+]
+
+IMPORT_ENTITY_NAMES = {entity.name: entity for entity in IMPORT_ENTITIES}
+
+# EntityRelation entity types and the entity their IDs belong to
+RELATION_ENTITIES = {
+    'task': 'tasks',
+    'template': 'templates',
+    'tracker': 'trackers',
+    'note': 'notes',
+    'goal': 'goals',
+}
+
+# Change log and search index types of imported entities
+CHANGE_TYPES = {
+    'trackers': 'tracker', 'templates': 'template', 'tasks': 'task',
+    'notes': 'day_note', 'goals': 'goal', 'tags': 'tag',
+}
+SEARCH_TYPES = {
+    'trackers': 'tracker', 'templates': 'template', 'goals': 'goal',
+    'tags': 'tag', 'notes': 'note',
+}
+
+
+# ============================================================================
+# READERS
+# ============================================================================
+
+def read_jsonl(lines: Iterable) -> Generator[Tuple[str, Optional[Dict], Optional[str]], None, None]:
+    """
+    Records of a JSON Lines upload.
+
+    Yields (location, record, error); error is set for lines that are not
+    a JSON object.
+    """
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield f'line {number}', None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield f'line {number}', None, 'Expected a JSON object'
+            continue
+        yield f'line {number}', record, None
+
+
+class _JSONStream:
+    """Decodes JSON values one at a time from a stream of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        if self.eof:
+            return False
+        # Drop what has been consumed before growing the buffer
+        self.buffer, self.pos = self.buffer[self.pos:], 0
+        try:
+            self.buffer += self.text_decoder.decode(next(self.chunks))
+        except StopIteration:
+            self.buffer += self.text_decoder.decode(b'', final=True)
+            self.eof = True
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at the end)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number running to the end of the buffer may continue
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self._more()
+
+
+def read_json(chunks: Iterable[bytes], key: str = 'trackers') -> Generator[Tuple[str, Dict], None, None]:
+    """
+    Items of the top-level `key` array of a JSON object, decoded one at a
+    time so the document is never held in memory.
+
+    Yields (location, item).
+
+    Raises:
+        ImportFileError: Malformed JSON, or no `key` array
+    """
+    stream = _JSONStream(chunks)
+    try:
+        stream.expect('{')
+        while stream.peek() != '}':
+            name = stream.value()
+            stream.expect(':')
+            if name == key and stream.peek() == '[':
+                stream.expect('[')
+                index = 0
+                while stream.peek() != ']':
+                    item = stream.value()
+                    yield f'{key}[{index}]', item
+                    index += 1
+                    if stream.peek() == ',':
+                        stream.expect(',')
+                return
+            stream.value()  # Another top-level member: skip it
+            if stream.peek() == ',':
+                stream.expect(',')
+    except (ValueError, UnicodeDecodeError):
+        raise ImportFileError('Invalid JSON file')
+    raise ImportFileError(f'Invalid export format: missing {key} data')
+
+
+def legacy_records(items: Iterable[Tuple[str, Dict]]) -> Generator[Tuple[str, Dict], None, None]:
+    """Account records for legacy {"trackers": [{..., "tasks": [...]}]} items."""
+    for location, tracker in items:
+        if not isinstance(tracker, dict):
+            yield location, {'type': 'trackers'}
+            continue
+        tracker_id = f'legacy-{location}'
+        yield location, {
+            'type': 'trackers',
+            'tracker_id': tracker_id,
+            'name': tracker.get('name', ''),
+            'description': tracker.get('description', ''),
+            'time_mode': tracker.get('time_mode', 'daily'),
+            'status': 'active',
+        }
+        for index, task in enumerate(tracker.get('tasks') or []):
+            task = task if isinstance(task, dict) else {}
+            yield f'{location}.tasks[{index}]', {
+                'type': 'templates',
+                'tracker_id': tracker_id,
+                'description': task.get('description', ''),
+                'category': task.get('category', ''),
+                'weight': task.get('weight', 1),
+                'time_of_day': task.get('time_of_day', 'anytime'),
+            }
+
+
+# ============================================================================
+# IMPORTER
+# ============================================================================
+
+class AccountImporter:
+    """
+    Validates, maps and writes account records in batches.
+
+    Usage:
+        importer = AccountImporter(user, dry_run=False)
+        for location, record in records:
+            importer.add(location, record)
+        report = importer.finish()
+    """
+
+    def __init__(self, user, dry_run: bool = False, batch_size: int = IMPORT_BATCH_SIZE):
+        self.user = user
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.id_map: Dict[str, Dict[str, str]] = {entity.name: {} for entity in IMPORT_ENTITIES}
+        self.pending: Dict[str, List[Tuple[str, Dict]]] = {entity.name: [] for entity in IMPORT_ENTITIES}
+        self.seen = set()
+        self.existing_tags: Optional[Dict[str, str]] = None
+        self.written = {name: [] for name in ('trackers', 'goals', 'relations')}
+        self.report = {
+            'dry_run': dry_run,
+            'imported': Counter(),
+            'rejected': Counter(),
+            'batches': [],
+            'errors': [],
+            'file_error': None,
+        }
+
+    def reject(self, location: str, message: str) -> None:
+        """Record a record that could not be read or typed."""
+        self.report['rejected']['unreadable'] += 1
+        if len(self.report['errors']) < MAX_BATCH_ERRORS:
+            self.report['errors'].append({'record': location, 'errors': [message]})
+
+    def fail(self, message: str) -> None:
+        """Record that the rest of the document could not be read."""
+        self.report['file_error'] = message
+
+    def add(self, location: str, record: Dict) -> None:
+        """Queue one record, flushing its batch (and its parents') when full."""
+        kind = record.get('type')
+        if kind == 'export':
+            if record.get('version', EXPORT_VERSION) > EXPORT_VERSION:
+                raise ImportFileError(f"Unsupported export version {record.get('version')}")
+            return
+        if kind not in IMPORT_ENTITY_NAMES:
+            self.reject(location, f"Unknown record type: {kind!r}")
+            return
+        self.pending[kind].append((location, record))
+        if len(self.pending[kind]) >= self.batch_size:
+            self._flush_through(kind)
+
+    def finish(self) -> Dict:
+        """Write everything still pending and return the report."""
+        self._flush_through(IMPORT_ENTITIES[-1].name)
+        if not self.dry_run:
+            self._after_import()
+        report = dict(self.report)
+        report['imported'] = {name: count for name, count in report['imported'].items() if count}
+        report['rejected'] = dict(report['rejected'])
+        return report
+
+    def _flush_through(self, name: str) -> None:
+        # Parents first, so every reference in the batch is already mapped
+        for entity in IMPORT_ENTITIES:
+            if self.pending[entity.name]:
+                self._flush(entity)
+            if entity.name == name:
+                return
+
+    def _flush(self, entity: ImportEntity) -> None:
+        records, self.pending[entity.name] = self.pending[entity.name], []
+        batch = {
+            'batch': len(self.report['batches']) + 1,
+            'entity': entity.name,
+            'records': len(records),
+            'imported': 0,
+            'errors': [],
+        }
+        self.report['batches'].append(batch)
+
+        objs, mapped = [], []
+        for location, record in records:
+            try:
+                obj = self._build(entity, record)
+            except ValidationError as e:
+                self.report['rejected'][entity.name] += 1
+                if len(batch['errors']) < MAX_BATCH_ERRORS:
+                    batch['errors'].append({
+                        'record': location,
+                        'errors': e.message_dict if hasattr(e, 'error_dict') else e.messages,
+                    })
+                continue
+            if obj is None:
+                continue  # Matched an existing row
+            objs.append(obj)
+            if entity.key and record.get(entity.key) is not None:
+                old_id = str(record[entity.key])
+                self.id_map[entity.name][old_id] = obj.pk
+                mapped.append(old_id)
+        rejected = len(records) - len(objs)
+
+        if objs and not self.dry_run:
+            if entity.model is DayNote:
+                self._analyze_notes(objs)
+            try:
+                with transaction.atomic():
+                    if hasattr(entity.model, 'history'):
+                        bulk_create_with_history(objs, entity.model, batch_size=self.batch_size)
+                    else:
+                        entity.model.objects.bulk_create(objs, batch_size=self.batch_size)
+                    self._after_batch(entity, objs)
+            except DatabaseError as e:
+                # Children of this batch will be rejected as unmapped
+                for old_id in mapped:
+                    self.id_map[entity.name].pop(old_id, None)
+                self.report['rejected'][entity.name] += len(objs)
+                batch['error'] = f"Batch not written: {e}"
+                return
+
+        batch['imported'] = len(objs)
+        self.report['imported'][entity.name] += len(objs)
+        if rejected > len(batch['errors']):
+            batch['more_errors'] = rejected - len(batch['errors'])
+
+    def _build(self, entity: ImportEntity, record: Dict):
+        """
+        An unsaved model instance for a record, with a fresh ID and
+        remapped references.
+
+        Raises:
+            ValidationError: Invalid values or unknown references
+        """
+        values = {field: record[field] for field in entity.fields if field in record}
+        for column, parent in entity.refs.items():
+            old_id = record.get(column)
+            if old_id is None and entity.model._meta.get_field(column[:-3]).null:
+                values[column] = None
+                continue
+            new_id = self.id_map[parent].get(str(old_id))
+            if new_id is None:
+                raise ValidationError({column: [f"Unknown {parent} reference: {old_id}"]})
+            values[column] = new_id
+
+        if entity.name == 'relations':
+            for side in ('from', 'to'):
+                parent = RELATION_ENTITIES.get(values.get(f'{side}_entity_type'))
+                new_id = self.id_map[parent].get(str(values.get(f'{side}_entity_id'))) if parent else None
+                if new_id is None:
+                    raise ValidationError({f'{side}_entity_id': ['Unknown or unsupported related entity']})
+                values[f'{side}_entity_id'] = new_id
+
+        try:
+            obj = entity.model(**values)
+        except (TypeError, ValueError) as e:
+            raise ValidationError(str(e))
+        if entity.owned:
+            obj.user_id = self.user.id
+        if entity.key:
+            setattr(obj, entity.key, str(uuid.uuid4()))
+        obj.clean_fields(exclude=[column[:-3] for column in entity.refs] + ['user'])
+
+        if entity.name == 'tags':
+            existing = self._existing_tag(obj.name)
+            if existing:
+                # Tags are unique per user: reuse the one already there
+                if record.get('tag_id') is not None:
+                    self.id_map['tags'][str(record['tag_id'])] = existing
+                return None
+
+        for unique in entity.model._meta.unique_together:
+            signature = (entity.name, *(
+                getattr(obj, entity.model._meta.get_field(field).attname) for field in unique
+            ))
+            if signature in self.seen:
+                raise ValidationError(f"Duplicate {', '.join(unique)} in this import")
+            self.seen.add(signature)
+        return obj
+
+    def _existing_tag(self, name: str) -> Optional[str]:
+        if self.existing_tags is None:
+            self.existing_tags = dict(Tag.objects.filter(user=self.user).values_list('name', 'tag_id'))
+        return self.existing_tags.get(name)
+
+    def _analyze_notes(self, notes: List[DayNote]) -> None:
+        """Score notes exported without an analysis (bulk_create skips the save signal)."""
+        from core.services.note_analysis_service import NoteAnalysisService
+
+        unscored = [note for note in notes if note.sentiment_score is None]
+        if not unscored:
+            return
+        try:
+            NoteAnalysisService.analyze_notes(unscored)
+        except Exception as e:
+            # Left null for the backfill_note_analysis command
+            logger.warning(f"Imported notes not analyzed: {e}")
+
+    def _after_batch(self, entity: ImportEntity, objs: List) -> None:
+        """Per-batch side effects bulk_create skipped (inside the batch's transaction)."""
+        from core.services.change_service import ChangeService
+        from core.services.rollup_service import RollupService
+        from core.services.search_index_service import SearchIndexService
+
+        user_id = self.user.id
+        ids = [obj.pk for obj in objs]
+        if entity.name in CHANGE_TYPES:
+            ChangeService.record(user_id, CHANGE_TYPES[entity.name], ids, 'create')
+        else:
+            ChangeService.bump(user_id)
+        if entity.name in SEARCH_TYPES:
+            SearchIndexService.queue(user_id, SEARCH_TYPES[entity.name], ids)
+        if entity.name == 'tasks':
+            SearchIndexService.queue(user_id, 'task_note', [obj.pk for obj in objs if obj.notes])
+            RollupService.refresh_instances({obj.tracker_instance_id for obj in objs})
+        if entity.name in self.written:
+            self.written[entity.name].extend(ids)
+
+    def _after_import(self) -> None:
+        """Side effects run once per import."""
+        from core.helpers.cache_helpers import invalidate_tracker_cache
+        from core.integrations.job_queue import JobQueue
+        from core.services.dashboard_snapshot_service import JOB_KIND, tracker_job_key, user_job_key
+        from core.services.relation_graph_service import RelationGraphService
+        from core.services.suggestion_service import SuggestionService
+
+        user_id = self.user.id
+        keys = [user_job_key(user_id, tracker_job_key(t)) for t in self.written['trackers']]
+        if self.written['goals']:
+            keys.append(user_job_key(user_id, 'goals_progress'))
+        JobQueue.enqueue(JOB_KIND, keys)
+        for tracker_id in self.written['trackers']:
+            invalidate_tracker_cache(tracker_id, user_id)
+        if any(self.report['imported'][name] for name in ('trackers', 'templates', 'tags')):
+            SuggestionService.invalidate(user_id)
+        if self.written['relations']:
+            RelationGraphService.invalidate(user_id)
+
+
+def import_account(user, upload, format: str = 'jsonl', dry_run: bool = False,
+                   batch_size: int = IMPORT_BATCH_SIZE) -> Dict:
+    """
+    Import an uploaded export into a user's account.
+
+    Args:
+        user: Account to import into
+        upload: Uploaded file (anything with chunks() and line iteration)
+        format: 'jsonl' (account export) or 'json' (legacy trackers export)
+        dry_run: Validate and report without writing
+        batch_size: Records per batch
+
+    Returns:
+        {'dry_run', 'imported': {entity: count}, 'rejected': {entity: count},
+         'batches': [{'batch', 'entity', 'records', 'imported', 'errors'}],
+         'errors': unreadable records,
+         'file_error': Why reading stopped early (unreadable JSON document
+                       or unsupported export version), else None}
+    """
+    importer = AccountImporter(user, dry_run=dry_run, batch_size=batch_size)
+    try:
+        if format == 'json':
+            for location, record in legacy_records(read_json(upload.chunks(READ_CHUNK_SIZE))):
+                importer.add(location, record)
+        else:
+            for location, record, error in read_jsonl(upload):
+                if error:
+                    importer.reject(location, error)
+                else:
+                    importer.add(location, record)
+    except ImportFileError as e:
+        # Earlier batches are already committed; report them with the error
+        importer.fail(str(e))
+    return importer.finish()
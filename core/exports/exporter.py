@@ -85,6 +85,78 @@ def stream_tracker_export(tracker_id: str, batch_size: int = 1000) -> Generator:
         )
 
 
+TRACKER_EXPORT_COLUMNS = ['Date', 'Description', 'Category', 'Status', 'Points']
+
+
+def tracker_export_pieces(tracker, format: str = 'csv', start_date=None, end_date=None,
+                          cursor: Optional[Dict] = None, batch_size: int = 1000) -> Generator:
+    """
+    A tracker's tasks as CSV or JSON text, one task at a time.
+
+    Same content as the /tracker/<id>/export/ download. Yields
+    (cursor, text); passing a yielded cursor back in resumes right after
+    that piece. A cursor is {'after': [date, task id] of the last task
+    written, or None for the header; 'done': True after the closing text}.
+
+    Args:
+        tracker: TrackerDefinition to export
+        format: 'csv' or 'json'
+        start_date / end_date: Optional tracking date bounds (inclusive)
+        cursor: Resume point from an earlier run
+        batch_size: Rows per keyset page
+    """
+    import json
+    from core.models import TaskInstance
+    from core.exports.account_exporter import keyset_scan
+
+    if cursor and cursor.get('done'):
+        return
+    after = cursor['after'] if cursor else None
+    if cursor is None:
+        if format == 'csv':
+            buffer = StringIO()
+            csv.writer(buffer).writerow(TRACKER_EXPORT_COLUMNS)
+            header = buffer.getvalue()
+        else:
+            header = '{"tracker": %s, "tasks": [' % json.dumps(
+                {'name': tracker.name, 'description': tracker.description}
+            )
+        yield {'after': None}, header
+
+    queryset = TaskInstance.objects.filter(
+        tracker_instance__tracker=tracker,
+        deleted_at__isnull=True
+    )
+    if start_date:
+        queryset = queryset.filter(tracker_instance__tracking_date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(tracker_instance__tracking_date__lte=end_date)
+
+    rows = keyset_scan(
+        queryset,
+        ('tracker_instance__tracking_date', 'task_instance_id'),
+        ('snapshot_description', 'template__description', 'template__category', 'status', 'snapshot_points'),
+        batch_size,
+        after=after
+    )
+    for key, (snapshot, description, category, status, points) in rows:
+        values = [str(key[0]), snapshot or description or '', 'N/A' if category is None else category,
+                  status, points or 0]
+        if format == 'csv':
+            buffer = StringIO()
+            csv.writer(buffer).writerow(values)
+            text = buffer.getvalue()
+        else:
+            text = (', ' if after is not None else '') + json.dumps(
+                dict(zip(('date', 'description', 'category', 'status', 'points'), values))
+            )
+        after = key
+        yield {'after': key}, text
+
+    if format != 'csv':
+        yield {'after': after, 'done': True}, ']}'
+
+
 def generate_behavior_summary(tracker_id: str, output_path: str) -> str:
     """
     Generates a comprehensive Excel report with multiple sheets and charts.
@@ -4,5 +4,6 @@ Helpers package for Tracker Pro.
 Helper functions for specific domains:
 - metric_helpers: Metric calculations
 - nlp_helpers: NLP and text processing
+- lexicon_sentiment: Built-in sentiment engine (word lists in sentiment_lexicon)
 - data_helpers: Data transformations
 """
@@ -1,12 +1,26 @@
 """
 Caching utilities for Tracker Pro.
 Implements Django's cache framework with smart invalidation patterns.
+
+Invalidation uses generation counters rather than key deletes: every
+cached entry tagged with a tracker or user embeds that scope's current
+generation in its key, so bumping the generation orphans all derived
+entries at once (they age out via TTL). This works on every backend,
+including locmem and file-based caches that cannot delete by pattern.
+
+Hot results can opt into a per-process LRU tier (`local=True`) that sits
+in front of the shared cache, so repeated reads within a request or
+worker skip the network round trip and unpickling.
 """
+from collections import OrderedDict
+from django.conf import settings
 from django.core.cache import cache
 from functools import wraps
 import hashlib
 import json
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +71,172 @@ def make_cache_key(prefix, *args, **kwargs):
     return key_string
 
 
-def cache_result(timeout=300, key_prefix='default'):
+# ============================================================================
+# IN-PROCESS LRU TIER
+# ============================================================================
+
+LOCAL_CACHE_DEFAULTS = {
+    'MAX_ENTRIES': 512,     # LRU bound per process
+    'TTL': 30,              # Upper bound on entry age (seconds)
+    'GENERATION_TTL': 1,    # How long other processes' bumps may go unseen
+}
+
+
+def get_local_cache_setting(name):
+    return getattr(settings, 'LOCAL_CACHE', {}).get(name, LOCAL_CACHE_DEFAULTS[name])
+
+
+class LocalLRUCache:
+    """
+    Bounded, thread-safe, per-process LRU with per-entry TTL.
+    
+    Values are stored by reference (no pickling), so callers must treat
+    returned results as read-only.
+    """
+    
+    def __init__(self, max_entries=None):
+        self._max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @property
+    def max_entries(self):
+        return self._max_entries or get_local_cache_setting('MAX_ENTRIES')
+    
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self):
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            }
+
+
+local_cache = LocalLRUCache()
+
+
+# ============================================================================
+# GENERATION COUNTERS
+# ============================================================================
+
+def tracker_tag(tracker_id):
+    """Invalidation tag for everything derived from one tracker."""
+    return f"tracker:{tracker_id}"
+
+
+def user_tag(user_id):
+    """Invalidation tag for everything derived from one user's data."""
+    return f"user:{user_id}"
+
+
+def tracker_tags(*args, **kwargs):
+    """Tag resolver for functions whose first argument is a tracker ID."""
+    tracker_id = kwargs.get('tracker_id', args[0] if args else None)
+    return [tracker_tag(tracker_id)] if tracker_id else []
+
+
+def _generation_key(tag):
+    return f"gen:{tag}"
+
+
+def _new_generation():
+    # Seeded from the clock so an evicted counter never restarts at a
+    # value that old entries were stored under
+    return time.time_ns() // 1000
+
+
+def get_generations(tags, local=False):
+    """
+    Current generation for each tag, in one cache round trip.
+    
+    Tags that have never been bumped are initialised on first read. With
+    `local`, generations are also memoised in the LRU tier for
+    LOCAL_CACHE['GENERATION_TTL'] seconds.
+    """
+    keys = [_generation_key(tag) for tag in tags]
+    
+    found = {}
+    if local:
+        for key in keys:
+            generation = local_cache.get(key)
+            if generation is not None:
+                found[key] = generation
+    
+    missing = [key for key in keys if key not in found]
+    if missing:
+        found.update(cache.get_many(missing))
+    
+    generations = []
+    for key in keys:
+        generation = found.get(key)
+        if generation is None:
+            generation = _new_generation()
+            if not cache.add(key, generation, None):
+                generation = cache.get(key, generation)
+        if local and key in missing:
+            local_cache.set(key, generation, get_local_cache_setting('GENERATION_TTL'))
+        generations.append(generation)
+    return generations
+
+
+def bump_generation(tag):
+    """Invalidate every entry tagged with `tag` in O(1)."""
+    key = _generation_key(tag)
+    local_cache.delete(key)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter missing or evicted; start a fresh one
+        cache.set(key, _new_generation(), None)
+
+
+def versioned_key(key, tags, local=False):
+    """Append the tags' current generations to a cache key."""
+    if not tags:
+        return key
+    generations = get_generations(tags, local=local)
+    return f"{key}@{'.'.join(str(g) for g in generations)}"
+
+
+def cache_result(timeout=300, key_prefix='default', tags=None, local=False):
     """
     Decorator to cache function results using Django's cache framework.
     
@@ -70,21 +249,44 @@ def cache_result(timeout=300, key_prefix='default'):
     Args:
         timeout: Cache timeout in seconds (default: 5 minutes)
         key_prefix: Prefix for cache key
+        tags: Optional callable taking the function's arguments and returning
+            invalidation tags (e.g. tracker_tags); entries are dropped when
+            any tag's generation is bumped
+        local: Also keep results in the per-process LRU tier (results must
+            be treated as read-only)
         
     Returns:
         Decorated function
     """
     def decorator(func):
+        def build_key(*args, **kwargs):
+            cache_key = make_cache_key(key_prefix, *args, **kwargs)
+            if tags is not None:
+                cache_key = versioned_key(cache_key, tags(*args, **kwargs), local=local)
+            return cache_key
+        
+        def local_ttl():
+            return min(timeout, get_local_cache_setting('TTL'))
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Generate cache key
-            cache_key = make_cache_key(key_prefix, *args, **kwargs)
+            cache_key = build_key(*args, **kwargs)
+            
+            # Try the in-process tier first
+            if local:
+                result = local_cache.get(cache_key)
+                if result is not None:
+                    logger.debug(f"Local cache HIT: {cache_key}")
+                    return result
             
             # Try to get from cache
             result = cache.get(cache_key)
             
             if result is not None:
                 logger.debug(f"Cache HIT: {cache_key}")
+                if local:
+                    local_cache.set(cache_key, result, local_ttl())
                 return result
             
             # Cache miss - compute result
@@ -93,57 +295,78 @@ def cache_result(timeout=300, key_prefix='default'):
             
             # Store in cache
             cache.set(cache_key, result, timeout)
+            if local:
+                local_cache.set(cache_key, result, local_ttl())
             
             return result
         
+        def invalidate(*args, **kwargs):
+            cache_key = build_key(*args, **kwargs)
+            local_cache.delete(cache_key)
+            cache.delete(cache_key)
+        
         # Add cache invalidation method to function
-        wrapper.invalidate = lambda *args, **kwargs: cache.delete(
-            make_cache_key(key_prefix, *args, **kwargs)
-        )
+        wrapper.invalidate = invalidate
         
         return wrapper
     return decorator
 
 
-def invalidate_tracker_cache(tracker_id):
+def invalidate_tracker_cache(tracker_id, user_id=None):
     """
     Invalidate all cached data for a specific tracker.
     Call this when tracker data is modified.
     
+    Bumps the tracker's generation (analytics, grids) and its owner's
+    generation (dashboard, heatmap), so every derived entry is dropped
+    regardless of the arguments it was cached under.
+    
     Args:
         tracker_id: Tracker ID to invalidate
+        user_id: Owner of the tracker (looked up when omitted)
     """
-    # Delete all tracker-related cache keys
-    patterns = [
-        f'tracker_stats:{tracker_id}',
-        f'completion_rate:{tracker_id}',
-        f'streaks:{tracker_id}',
-        f'consistency:{tracker_id}',
-        f'balance:{tracker_id}',
-        f'analytics:{tracker_id}',
-        f'grid_data:{tracker_id}',
-    ]
-    
-    deleted_count = 0
-    for pattern in patterns:
-        # Django's cache.delete() with wildcards depends on backend
-        # For simple implementation, delete exact keys
-        try:
-            cache.delete(pattern)
-            deleted_count += 1
-        except Exception as e:
-            logger.warning(f"Failed to delete cache key {pattern}: {e}")
-    
-    logger.info(f"Invalidated {deleted_count} cache entries for tracker {tracker_id}")
-
-
-def invalidate_dashboard_cache():
+    try:
+        bump_generation(tracker_tag(tracker_id))
+        
+        if user_id is None:
+            from core.models import TrackerDefinition
+            user_id = TrackerDefinition.objects.filter(
+                tracker_id=tracker_id
+            ).values_list('user_id', flat=True).first()
+        if user_id is not None:
+            bump_generation(user_tag(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate cache for tracker {tracker_id}: {e}")
+        return
+    
+    logger.debug(f"Invalidated cache generation for tracker {tracker_id}")
+
+
+def invalidate_user_cache(user_id):
+    """
+    Invalidate every user-scoped cached entry (dashboard, heatmap).
+    
+    Args:
+        user_id: User whose derived data changed
+    """
+    try:
+        bump_generation(user_tag(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate cache for user {user_id}: {e}")
+
+
+def invalidate_dashboard_cache(user_id=None):
     """
     Invalidate dashboard-wide cached data.
     Call this when any tracker data changes.
+    
+    Args:
+        user_id: Also drop this user's dashboard entries
     """
     cache.delete('dashboard_stats')
     cache.delete('all_trackers')
+    if user_id is not None:
+        invalidate_user_cache(user_id)
     logger.info("Invalidated dashboard cache")
 
 
@@ -152,6 +375,7 @@ def invalidate_all_caches():
     Clear all application caches.
     Use sparingly - typically only for maintenance or debugging.
     """
+    local_cache.clear()
     try:
         cache.clear()
         logger.info("Cleared all caches")
@@ -164,7 +388,8 @@ def cache_tracker_stats(func):
     """Cache tracker statistics for 5 minutes"""
     return cache_result(
         timeout=CACHE_TIMEOUTS['tracker_stats'],
-        key_prefix=f'tracker_stats:{func.__name__}'
+        key_prefix=f'tracker_stats:{func.__name__}',
+        tags=tracker_tags
     )(func)
 
 
@@ -172,7 +397,9 @@ def cache_analytics(func):
     """Cache analytics results for 10 minutes"""
     return cache_result(
         timeout=CACHE_TIMEOUTS['analytics'],
-        key_prefix=f'analytics:{func.__name__}'
+        key_prefix=f'analytics:{func.__name__}',
+        tags=tracker_tags,
+        local=True
     )(func)
 
 
@@ -218,44 +445,39 @@ class CacheInvalidator:
 
 def get_user_content_hash(user):
     """
-    Generate a hash based on the latest modification timestamp of user data.
-    Used for ETag generation.
-    """
-    from django.db.models import Max
-    from core.models import TrackerDefinition, TaskInstance
-    
-    # Get latest timestamps from key models
-    timestamps = []
+    ETag for a user's data, derived from their change sequence.
     
-    try:
-        t1 = TrackerDefinition.objects.filter(user=user).aggregate(m=Max('updated_at'))['m']
-        timestamps.append(t1)
-        
-        t2 = TaskInstance.objects.filter(tracker_instance__tracker__user=user).aggregate(m=Max('updated_at'))['m']
-        timestamps.append(t2)
-    except Exception:
-        pass
-    
-    # Filter out None and get max
-    valid_ts = [t for t in timestamps if t]
+    The sequence is bumped by every write to user-owned data (including
+    notes, goals, tags and deletions), so this costs one primary-key lookup.
+    """
+    from core.services.change_service import ChangeService
     
-    if not valid_ts:
-        # Fallback if no data or error
-        return f"empty-{user.id}"
-        
-    latest = max(valid_ts)
-    return hashlib.md5(f"{user.id}:{latest.isoformat()}".encode()).hexdigest()
+    return f"seq-{user.id}-{ChangeService.current(user.id)}"
 
 
-def check_etag(func):
+def check_etag(func=None, *, etag_func=None):
     """
     Decorator for Conditional GET support using ETags.
     
-    If data hasn't changed (based on user's max updated_at), returns 304.
+    If data hasn't changed (based on the user's change sequence), returns 304.
     Otherwise returns 200 with new ETag.
+    
+    Args:
+        etag_func: Optional callable(request) returning the ETag, or None
+                   to skip conditional handling for that request
+    
+    Usage:
+        @check_etag
+        def view(request): ...
+        
+        @check_etag(etag_func=snapshot_etag)
+        def view(request): ...
     """
     from django.http import HttpResponseNotModified
     
+    if func is None:
+        return lambda f: check_etag(f, etag_func=etag_func)
+    
     @wraps(func)
     def wrapper(request, *args, **kwargs):
         # Only apply to GET requests
@@ -263,7 +485,9 @@ def check_etag(func):
             return func(request, *args, **kwargs)
             
         # Calculate current ETag
-        etag = get_user_content_hash(request.user)
+        etag = etag_func(request) if etag_func else get_user_content_hash(request.user)
+        if etag is None:
+            return func(request, *args, **kwargs)
         
         # Check If-None-Match header
         # Handle weak/strong ETag format differences if needed, but for now exact match
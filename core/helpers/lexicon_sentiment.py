@@ -0,0 +1,149 @@
+"""
+Built-in sentiment and keyword engine.
+
+Applies VADER's scoring rules (negation, boosters, capitalization, "but"
+and punctuation emphasis) to the bundled word lists in
+core.helpers.sentiment_lexicon. It needs no downloads or third-party
+packages, imports in milliseconds and scores short notes in tens of
+microseconds, so it is the default engine for nlp_helpers; NLTK's VADER
+is an optional accuracy mode (settings.NLP_ENGINE = 'nltk').
+
+Scores have VADER's shape ({'compound', 'pos', 'neu', 'neg'}) so callers
+work the same with either engine.
+"""
+import math
+import re
+from functools import lru_cache
+from typing import Dict, List
+
+from core.helpers.sentiment_lexicon import BOOSTERS, LEXICON, NEGATIONS
+
+# Words, keeping inner apostrophes ("didn't")
+WORD_RE = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z]+)*")
+
+# Scoring constants, as in VADER
+NEGATION_SCALAR = -0.74
+CAPS_INCREMENT = 0.733
+EXCLAMATION_INCREMENT = 0.292
+MAX_EXCLAMATIONS = 4
+QUESTION_INCREMENT = 0.18
+MAX_QUESTION_EMPHASIS = 0.96
+NORMALIZATION_ALPHA = 15
+
+# Words before a sentiment word that can negate or boost it, and how much
+# a booster's effect fades with each word of distance
+NEGATION_WINDOW = 3
+BOOSTER_DECAY = (1.0, 0.95, 0.9)
+
+# Sentiment before "but" is damped and sentiment after it amplified
+BUT_BEFORE = 0.5
+BUT_AFTER = 1.5
+
+# Inflections matched to a listed stem: (suffix, replacement)
+SUFFIX_RULES = (
+    ('ies', 'y'), ('ied', 'y'), ('iest', 'y'), ('ier', 'y'),
+    ('ing', ''), ('ing', 'e'), ('ed', ''), ('ed', 'e'), ('es', ''), ('s', ''),
+)
+
+NEUTRAL = {'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens."""
+    return WORD_RE.findall(text.replace('’', "'").lower())
+
+
+@lru_cache(maxsize=65536)
+def valence(word: str) -> float:
+    """Valence of a lowercased word (0.0 if unknown), matching inflections through their stem."""
+    score = LEXICON.get(word)
+    if score is not None:
+        return score
+    for suffix, replacement in SUFFIX_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            score = LEXICON.get(word[:-len(suffix)] + replacement)
+            if score is not None:
+                return score
+    return 0.0
+
+
+def _is_negation(word: str) -> bool:
+    return word in NEGATIONS or word.endswith("n't")
+
+
+def _emphasis(text: str) -> float:
+    """Intensity added by exclamation and question marks."""
+    emphasis = min(text.count('!'), MAX_EXCLAMATIONS) * EXCLAMATION_INCREMENT
+    questions = text.count('?')
+    if questions > 1:
+        emphasis += min(questions * QUESTION_INCREMENT, MAX_QUESTION_EMPHASIS)
+    return emphasis
+
+
+class LexiconAnalyzer:
+    """Drop-in for NLTK's SentimentIntensityAnalyzer over the bundled lexicon."""
+
+    def polarity_scores(self, text: str) -> Dict[str, float]:
+        raw = WORD_RE.findall(text.replace('’', "'"))
+        if not raw:
+            return dict(NEUTRAL)
+        words = [w.lower() for w in raw]
+
+        # Capitals only add emphasis when the rest of the text is not shouting
+        shouted = [len(w) > 1 and w.isupper() for w in raw]
+        caps_emphasis = any(shouted) and not all(shouted)
+
+        sentiments = []
+        for i, word in enumerate(words):
+            score = valence(word)
+            if not score or word in BOOSTERS or (word == 'kind' and words[i + 1:i + 2] == ['of']):
+                sentiments.append(0.0)
+                continue
+            sign = 1 if score > 0 else -1
+            if caps_emphasis and shouted[i]:
+                score += sign * CAPS_INCREMENT
+
+            for distance in range(1, min(NEGATION_WINDOW, i) + 1):
+                before = words[i - distance]
+                boost = BOOSTERS.get(before)
+                if boost:
+                    if caps_emphasis and shouted[i - distance]:
+                        boost += CAPS_INCREMENT if boost > 0 else -CAPS_INCREMENT
+                    score += sign * boost * BOOSTER_DECAY[distance - 1]
+                elif _is_negation(before):
+                    score *= NEGATION_SCALAR
+            sentiments.append(score)
+
+        if 'but' in words:
+            pivot = words.index('but')
+            sentiments = [
+                s * BUT_BEFORE if i < pivot else s * BUT_AFTER if i > pivot else s
+                for i, s in enumerate(sentiments)
+            ]
+
+        return self._scores(sentiments, _emphasis(text))
+
+    @staticmethod
+    def _scores(sentiments: List[float], emphasis: float) -> Dict[str, float]:
+        total = sum(sentiments)
+        if total > 0:
+            total += emphasis
+        elif total < 0:
+            total -= emphasis
+        compound = max(-1.0, min(1.0, total / math.sqrt(total * total + NORMALIZATION_ALPHA)))
+
+        pos_sum = sum(s + 1 for s in sentiments if s > 0)
+        neg_sum = sum(s - 1 for s in sentiments if s < 0)
+        neu_count = sum(1 for s in sentiments if s == 0)
+        if pos_sum > -neg_sum:
+            pos_sum += emphasis
+        elif pos_sum < -neg_sum:
+            neg_sum -= emphasis
+
+        denominator = pos_sum - neg_sum + neu_count
+        return {
+            'neg': round(-neg_sum / denominator, 3),
+            'neu': round(neu_count / denominator, 3),
+            'pos': round(pos_sum / denominator, 3),
+            'compound': round(compound, 4),
+        }
@@ -1,17 +1,33 @@
 """
 NLP utilities for text analysis on tracker notes.
-Uses classical NLP techniques (NLTK) for sentiment, keywords, and pattern extraction.
+Uses classical NLP techniques for sentiment, keywords, and pattern extraction.
+
+Sentiment and tokenizing run on the built-in lexicon engine
+(core.helpers.lexicon_sentiment) by default. Setting NLP_ENGINE = 'nltk'
+switches to NLTK's VADER and tokenizer as an accuracy mode; it falls back
+to the built-in engine when NLTK or its data is unavailable.
 """
 import re
 import logging
 from collections import Counter
 from typing import List, Dict, Tuple
 
+from django.conf import settings
+
+from core.helpers import lexicon_sentiment
+from core.helpers.sentiment_lexicon import STOPWORDS
+
 logger = logging.getLogger(__name__)
 
 # Lazy import NLTK to avoid startup overhead
 _nltk_initialized = False
 
+# Shared VADER analyzer; building one loads the whole lexicon
+_sentiment_analyzer = None
+
+# Shared built-in analyzer (stateless)
+_lexicon_analyzer = lexicon_sentiment.LexiconAnalyzer()
+
 def _ensure_nltk():
     """Ensures NLTK is initialized and required data is downloaded."""
     global _nltk_initialized
@@ -33,6 +49,17 @@ def _ensure_nltk():
         logger.error(f"Failed to initialize NLTK: {e}")
         raise
 
+def _use_nltk() -> bool:
+    """Whether the NLTK accuracy mode is enabled and NLTK is usable."""
+    if getattr(settings, 'NLP_ENGINE', 'lexicon') != 'nltk':
+        return False
+    try:
+        _ensure_nltk()
+        return True
+    except Exception as e:
+        logger.warning(f"NLTK unavailable, using the built-in NLP engine: {e}")
+        return False
+
 def preprocess_text(text: str) -> str:
     """
     Normalizes text: lowercase, strip whitespace.
@@ -43,28 +70,50 @@ def preprocess_text(text: str) -> str:
 
 def tokenize(text: str) -> List[str]:
     """
-    Tokenizes text into words using NLTK.
+    Tokenizes text into words (NLTK's tokenizer in NLTK mode).
     """
-    _ensure_nltk()
-    import nltk
-    
     text = preprocess_text(text)
-    tokens = nltk.word_tokenize(text)
-    return tokens
+    if not _use_nltk():
+        return lexicon_sentiment.tokenize(text)
+    
+    import nltk
+    return nltk.word_tokenize(text)
 
 def remove_stopwords(tokens: List[str]) -> List[str]:
     """
     Removes common stopwords from token list.
     """
-    _ensure_nltk()
-    from nltk.corpus import stopwords
-    
-    stop_words = set(stopwords.words('english'))
+    if _use_nltk():
+        from nltk.corpus import stopwords
+        stop_words = set(stopwords.words('english'))
+    else:
+        stop_words = STOPWORDS
     return [t for t in tokens if t.lower() not in stop_words and len(t) > 2]
 
+def _vader_analyzer():
+    """The shared VADER analyzer, created on first use."""
+    global _sentiment_analyzer
+    if _sentiment_analyzer is None:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        _sentiment_analyzer = SentimentIntensityAnalyzer()
+    return _sentiment_analyzer
+
+def get_sentiment_analyzer():
+    """
+    Returns the process-wide sentiment analyzer for the configured engine:
+    VADER in NLTK mode, otherwise the built-in lexicon analyzer. Both
+    provide polarity_scores(text).
+    """
+    if _use_nltk():
+        try:
+            return _vader_analyzer()
+        except Exception as e:
+            logger.warning(f"VADER unavailable, using the built-in NLP engine: {e}")
+    return _lexicon_analyzer
+
 def compute_sentiment(text: str) -> Dict[str, float]:
     """
-    Computes sentiment using VADER (Valence Aware Dictionary and sEntiment Reasoner).
+    Computes VADER (Valence Aware Dictionary and sEntiment Reasoner) sentiment.
     
     Returns:
         {
@@ -74,12 +123,16 @@ def compute_sentiment(text: str) -> Dict[str, float]:
             'neg': float (0 to 1, negative)
         }
     
-    Falls back to neutral sentiment if NLTK unavailable.
-    Results are cached for 1 hour.
+    Uses the built-in lexicon engine unless NLP_ENGINE is 'nltk', and
+    falls back to it if NLTK fails. NLTK results are cached for 1 hour.
     """
     if not text or not text.strip():
         return {'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0}
     
+    if not _use_nltk():
+        # Scoring is cheaper than a cache round trip
+        return _lexicon_analyzer.polarity_scores(text)
+    
     # Check cache first
     from django.core.cache import cache
     import hashlib
@@ -91,23 +144,16 @@ def compute_sentiment(text: str) -> Dict[str, float]:
     if cached is not None:
         return cached
     
-    # Try NLTK VADER
     try:
-        _ensure_nltk()
-        from nltk.sentiment.vader import SentimentIntensityAnalyzer
-        
-        sia = SentimentIntensityAnalyzer()
-        scores = sia.polarity_scores(text)
+        scores = _vader_analyzer().polarity_scores(text)
         
         # Cache for 1 hour
         cache.set(cache_key, scores, 3600)
         return scores
         
     except Exception as e:
-        # Fallback: return neutral sentiment
-        logger.warning(f"NLTK sentiment analysis failed: {e}, returning neutral")
-        neutral = {'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0}
-        return neutral
+        logger.warning(f"NLTK sentiment analysis failed: {e}, using the built-in engine")
+        return _lexicon_analyzer.polarity_scores(text)
 
 
 # Alias for backwards compatibility
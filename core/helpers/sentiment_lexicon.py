@@ -0,0 +1,171 @@
+"""
+Bundled word lists for the built-in sentiment and keyword engine
+(core.helpers.lexicon_sentiment).
+
+Valences use the VADER scale, -4 (most negative) to +4 (most positive),
+and cover general evaluative words plus the vocabulary of journaling and
+habit tracking (energy, sleep, mood, productivity). Inflected forms not
+listed here are matched through their stem at lookup time.
+
+Everything is a literal constant, so the tables are unmarshalled from
+the compiled module on import with no parsing or I/O.
+"""
+
+LEXICON = {
+    # Feelings and mood
+    'happy': 2.7, 'happier': 2.6, 'happiest': 3.2, 'happily': 2.6, 'happiness': 2.6,
+    'unhappy': -1.8, 'glad': 2.0, 'joy': 2.8, 'joyful': 2.9, 'delighted': 3.0,
+    'cheerful': 2.5, 'content': 1.5, 'contented': 1.8, 'calm': 1.3, 'peaceful': 2.2,
+    'relaxed': 2.2, 'relaxing': 2.1, 'relax': 1.9, 'relief': 1.6, 'relieved': 1.9,
+    'grateful': 2.3, 'gratitude': 2.3, 'thankful': 2.4, 'thanks': 1.9, 'blessed': 2.9,
+    'love': 3.2, 'loved': 2.9, 'lovely': 2.8, 'loving': 2.9, 'adore': 2.6,
+    'excited': 2.2, 'exciting': 2.2, 'excitement': 2.2, 'thrilled': 2.8, 'eager': 1.5,
+    'hopeful': 1.9, 'hope': 1.9, 'optimistic': 2.0, 'confident': 2.2, 'proud': 2.1,
+    'pride': 1.4, 'inspired': 2.2, 'inspiring': 2.3, 'motivated': 1.9, 'motivating': 1.9,
+    'determined': 1.4, 'energized': 2.0, 'energetic': 1.9, 'refreshed': 1.9, 'rested': 1.5,
+    'fun': 2.3, 'funny': 1.9, 'enjoy': 2.2, 'enjoyed': 2.3, 'enjoyable': 1.9,
+    'amused': 1.6, 'laugh': 2.6, 'laughed': 2.0, 'smile': 1.5, 'smiled': 1.7,
+    'comfortable': 1.5, 'comfort': 1.5, 'safe': 1.9, 'secure': 1.4, 'satisfied': 1.8,
+    'satisfying': 2.0, 'fulfilled': 1.8, 'fulfilling': 1.9, 'free': 2.3, 'alive': 1.6,
+    'sad': -2.1, 'sadder': -2.4, 'saddest': -3.0, 'sadly': -1.7, 'sadness': -1.9,
+    'unhappiness': -2.1, 'depressed': -2.3, 'depressing': -1.6, 'depression': -2.7, 'miserable': -2.2,
+    'gloomy': -1.9, 'down': -0.8, 'lonely': -1.5, 'loneliness': -1.8, 'alone': -1.0,
+    'angry': -2.3, 'anger': -2.7, 'mad': -2.2, 'furious': -2.7, 'annoyed': -1.6,
+    'annoying': -1.8, 'irritated': -2.0, 'irritable': -2.1, 'frustrated': -2.4, 'frustrating': -1.9,
+    'frustration': -2.1, 'upset': -1.6, 'hate': -2.7, 'hated': -3.2, 'hateful': -2.7,
+    'anxious': -1.0, 'anxiety': -0.7, 'worried': -1.2, 'worry': -1.9, 'worrying': -1.4,
+    'nervous': -1.1, 'scared': -2.2, 'afraid': -2.0, 'fear': -2.2, 'panic': -2.3,
+    'stressed': -1.4, 'stress': -1.8, 'stressful': -2.3, 'overwhelmed': -1.5, 'overwhelming': -1.4,
+    'tense': -1.4, 'restless': -1.1, 'guilty': -1.8, 'guilt': -1.1, 'ashamed': -2.1,
+    'embarrassed': -1.5, 'regret': -1.8, 'disappointed': -1.9, 'disappointing': -2.2, 'disappointment': -2.3,
+    'hopeless': -2.0, 'helpless': -2.0, 'hurt': -2.4, 'hurting': -2.0, 'crying': -2.1,
+    'cry': -2.1, 'cried': -1.6, 'tears': -0.9, 'heartbroken': -3.3, 'grief': -2.2,
+    'bored': -1.1, 'boring': -1.3, 'boredom': -1.3, 'jealous': -2.0, 'bitter': -1.8,
+    'moody': -1.5, 'grumpy': -1.4, 'cranky': -1.4, 'numb': -1.1, 'empty': -0.8,
+
+    # Energy, health and sleep
+    'tired': -1.9, 'exhausted': -1.5, 'exhausting': -1.5, 'exhaustion': -1.8, 'fatigue': -1.5,
+    'fatigued': -1.7, 'sleepy': -0.6, 'drained': -1.5, 'weary': -1.1, 'lethargic': -1.4,
+    'sluggish': -1.2, 'groggy': -1.1, 'insomnia': -1.8, 'sleepless': -1.6, 'nightmare': -2.5,
+    'sick': -2.3, 'ill': -1.8, 'illness': -1.8, 'pain': -2.3, 'painful': -2.4,
+    'ache': -1.6, 'aching': -1.6, 'sore': -1.5, 'headache': -1.8, 'migraine': -2.0,
+    'injury': -2.2, 'injured': -1.7, 'hungover': -1.6, 'nauseous': -1.7, 'fever': -1.3,
+    'healthy': 1.7, 'health': 1.2, 'fit': 1.5, 'fitter': 1.6, 'strong': 2.3,
+    'stronger': 1.6, 'strength': 2.2, 'energy': 1.1, 'vibrant': 2.1, 'recovered': 1.2,
+    'recovery': 1.4, 'heal': 1.4, 'healed': 1.4, 'nourishing': 1.4, 'weak': -1.9,
+    'weaker': -1.9, 'unhealthy': -2.4, 'overslept': -0.8, 'restful': 1.7, 'restorative': 1.5,
+
+    # Progress, effort and habits
+    'success': 2.7, 'successful': 2.8, 'successfully': 2.2, 'succeed': 2.2, 'succeeded': 1.8,
+    'achieve': 1.9, 'achieved': 1.8, 'achievement': 2.1, 'accomplish': 1.8, 'accomplished': 1.9,
+    'accomplishment': 2.1, 'win': 2.8, 'won': 2.7, 'winning': 2.4, 'victory': 2.8,
+    'progress': 1.8, 'improve': 1.9, 'improved': 2.1, 'improvement': 2.0, 'improving': 1.8,
+    'productive': 1.8, 'productivity': 1.4, 'efficient': 1.8, 'focused': 1.6, 'focus': 1.1,
+    'consistent': 1.4, 'consistency': 1.3, 'disciplined': 1.4, 'discipline': 0.9, 'organized': 1.2,
+    'finished': 1.1, 'completed': 1.2, 'complete': 1.1, 'done': 0.8, 'nailed': 2.0,
+    'crushed': 1.2, 'streak': 1.0, 'milestone': 1.7, 'breakthrough': 2.4,
+    'easy': 1.9, 'easier': 1.8, 'easily': 1.4, 'smooth': 1.5, 'smoothly': 1.6,
+    'fail': -2.5, 'failed': -2.3, 'failing': -2.3, 'failure': -2.3, 'lose': -1.7,
+    'lost': -1.3, 'losing': -1.6, 'loss': -1.3, 'behind': -0.8, 'late': -0.9,
+    'missed': -1.2, 'miss': -0.6, 'skipped': -0.9, 'skip': -0.5, 'forgot': -1.2,
+    'forget': -0.9, 'procrastinated': -1.5, 'procrastinating': -1.5, 'procrastination': -1.6, 'lazy': -1.5,
+    'unproductive': -1.6, 'distracted': -1.4, 'distraction': -1.1, 'unfocused': -1.2, 'struggle': -1.5,
+    'struggled': -1.5, 'struggling': -1.7, 'hard': -0.4, 'harder': -0.6, 'difficult': -1.5,
+    'difficulty': -1.4, 'problem': -1.7, 'problems': -1.7, 'mistake': -1.4, 'mistakes': -1.5,
+    'setback': -1.6, 'stuck': -1.5, 'slacked': -1.3, 'relapse': -2.0, 'relapsed': -2.0,
+    'quit': -1.1, 'broke': -1.3, 'broken': -1.9, 'ruined': -2.4,
+
+    # General evaluation
+    'good': 1.9, 'better': 1.9, 'best': 3.2, 'great': 3.1, 'greater': 2.0,
+    'greatest': 3.2, 'nice': 1.8, 'fine': 0.8, 'okay': 0.9, 'ok': 1.2,
+    'well': 1.1, 'awesome': 3.1, 'amazing': 2.8, 'excellent': 2.7, 'fantastic': 2.6,
+    'wonderful': 2.7, 'brilliant': 2.8, 'perfect': 2.7, 'perfectly': 3.2, 'superb': 3.1,
+    'terrific': 2.1, 'outstanding': 3.0, 'incredible': 2.5, 'beautiful': 2.9, 'beautifully': 2.7,
+    'pleasant': 2.3, 'pleased': 1.9, 'positive': 2.6, 'glorious': 3.2,
+    'cool': 1.3, 'solid': 0.6, 'impressive': 2.3, 'impressed': 2.1, 'helpful': 1.8,
+    'useful': 1.9, 'valuable': 2.1, 'worth': 0.9, 'worthwhile': 1.9, 'right': 0.6,
+    'correct': 1.3, 'clear': 1.6, 'clean': 1.7, 'fresh': 1.3, 'bright': 1.9,
+    'kind': 2.4, 'friendly': 2.2, 'warm': 0.9, 'support': 1.7, 'supportive': 1.2,
+    'supported': 1.3, 'care': 2.2, 'caring': 2.2, 'generous': 2.3, 'patient': 1.6,
+    'bad': -2.5, 'worse': -2.1, 'worst': -3.1, 'terrible': -2.1, 'horrible': -2.5,
+    'awful': -2.0, 'dreadful': -2.7, 'poor': -2.1, 'poorly': -1.8, 'crappy': -2.5,
+    'crap': -1.6, 'sucks': -1.5, 'sucked': -2.0, 'negative': -2.7, 'wrong': -2.1,
+    'useless': -1.8, 'pointless': -1.7, 'mess': -1.5, 'messy': -1.5, 'chaos': -2.7,
+    'chaotic': -2.2, 'disaster': -3.1, 'catastrophe': -3.4, 'tragic': -3.4, 'ugly': -2.3,
+    'dirty': -1.9, 'unpleasant': -2.1, 'uncomfortable': -1.6, 'rough': -0.7, 'tough': -0.5,
+    'harsh': -1.9, 'rude': -2.0, 'cruel': -2.8, 'unfair': -2.1,
+    'toxic': -2.9, 'conflict': -1.3, 'argument': -1.5, 'argued': -1.3, 'fight': -1.6,
+    'fought': -1.3, 'yelled': -1.9, 'blame': -1.4, 'blamed': -2.1, 'criticized': -1.5,
+    'rejected': -1.8, 'rejection': -2.5, 'ignored': -1.1, 'abandoned': -2.1, 'betrayed': -3.2,
+    'trouble': -1.7, 'danger': -2.4, 'dangerous': -2.1, 'risk': -1.1, 'threat': -2.4,
+    'crisis': -3.1, 'damage': -2.2, 'damaged': -1.9, 'destroyed': -3.0,
+    'unlucky': -1.9, 'lucky': 1.8, 'luck': 2.0, 'fortunate': 1.9, 'unfortunately': -1.5,
+    'unfortunate': -2.0, 'wish': 1.7, 'wished': 1.2,
+    'like': 1.5, 'liked': 1.8, 'dislike': -1.6, 'disliked': -1.7, 'prefer': 0.8,
+    'agree': 1.5, 'disagree': -1.6, 'yes': 1.7, 'nope': -0.5,
+    'celebrate': 2.7, 'celebrated': 2.7, 'celebration': 2.7, 'party': 1.7, 'holiday': 1.7,
+    'vacation': 1.9, 'weekend': 0.6, 'gift': 1.9, 'reward': 2.1, 'rewarding': 2.4,
+    'friend': 2.2, 'friends': 2.1, 'family': 1.2, 'together': 1.1, 'welcome': 2.0,
+    'interesting': 1.7, 'interested': 1.7, 'curious': 1.3, 'learned': 0.9, 'learning': 1.1,
+    'creative': 1.9, 'creativity': 1.6, 'wise': 1.8, 'smart': 1.7, 'clever': 1.9,
+    'stupid': -2.4, 'dumb': -2.3, 'foolish': -1.1, 'idiot': -2.3, 'silly': 0.1,
+    'busy': -0.1, 'hectic': -1.4, 'rushed': -1.3, 'rushing': -0.9, 'delayed': -0.7,
+    'cancelled': -1.0, 'canceled': -1.0, 'postponed': -0.6, 'wasted': -2.2, 'waste': -1.8,
+    'boost': 1.7, 'boosted': 1.5, 'thrive': 2.3, 'thriving': 2.2, 'flourish': 2.4,
+    'peace': 2.5, 'harmony': 2.1, 'balance': 1.0, 'balanced': 1.2, 'grounded': 1.0,
+    'mindful': 1.2, 'gentle': 1.8, 'soothing': 1.9, 'cozy': 1.9,
+    'tasty': 2.1, 'delicious': 2.7, 'yummy': 2.4, 'gross': -2.1, 'disgusting': -2.4,
+    'sunny': 1.8, 'rainy': -0.2, 'cold': -0.3, 'freezing': -0.9,
+    'cancel': -1.0, 'doubt': -1.5, 'doubtful': -1.4, 'unsure': -1.0, 'confused': -1.3,
+    'confusing': -0.9, 'sorry': -0.3, 'apologized': 0.4, 'forgive': 1.1,
+    'forgiven': 1.6, 'courage': 2.2, 'brave': 2.4, 'calmer': 1.5,
+    'awkward': -0.6, 'shy': -0.1, 'insecure': -1.8, 'lonelier': -1.8, 'worthless': -1.9,
+    'enough': 0.6, 'plenty': 1.2, 'lack': -1.1, 'lacking': -1.5, 'missing': -1.2,
+}
+
+# Words that scale the valence of the sentiment word after them
+BOOSTERS = {
+    'absolutely': 0.293, 'amazingly': 0.293, 'completely': 0.293, 'considerably': 0.293,
+    'deeply': 0.293, 'enormously': 0.293, 'entirely': 0.293, 'especially': 0.293,
+    'exceptionally': 0.293, 'extremely': 0.293, 'fully': 0.293, 'greatly': 0.293,
+    'hella': 0.293, 'highly': 0.293, 'hugely': 0.293, 'incredibly': 0.293,
+    'intensely': 0.293, 'majorly': 0.293, 'more': 0.293, 'most': 0.293,
+    'particularly': 0.293, 'purely': 0.293, 'quite': 0.293, 'really': 0.293,
+    'remarkably': 0.293, 'so': 0.293, 'substantially': 0.293, 'super': 0.293,
+    'thoroughly': 0.293, 'totally': 0.293, 'tremendously': 0.293, 'truly': 0.293,
+    'unbelievably': 0.293, 'utterly': 0.293, 'very': 0.293, 'way': 0.293,
+    'almost': -0.293, 'barely': -0.293, 'hardly': -0.293, 'kinda': -0.293,
+    'less': -0.293, 'little': -0.293, 'marginally': -0.293, 'occasionally': -0.293,
+    'partly': -0.293, 'scarcely': -0.293, 'slightly': -0.293, 'somewhat': -0.293,
+    'sorta': -0.293,
+}
+
+# Words that flip the valence of a sentiment word up to three words later
+NEGATIONS = frozenset({
+    'not', 'no', 'never', 'none', 'nobody', 'nothing', 'nowhere', 'neither', 'nor',
+    'cannot', 'cant', "can't", 'dont', "don't", 'doesnt', "doesn't", 'didnt', "didn't",
+    'isnt', "isn't", 'arent', "aren't", 'wasnt', "wasn't", 'werent', "weren't",
+    'wont', "won't", 'wouldnt', "wouldn't", 'shouldnt', "shouldn't", 'couldnt', "couldn't",
+    'havent', "haven't", 'hasnt', "hasn't", 'hadnt', "hadn't", 'aint', "ain't",
+    'without', 'rarely', 'seldom', 'despite',
+})
+
+# Common English words left out of keyword extraction
+STOPWORDS = frozenset({
+    'a', 'about', 'above', 'after', 'again', 'against', 'all', 'also', 'am', 'an',
+    'and', 'any', 'are', 'around', 'as', 'at', 'be', 'because', 'been', 'before',
+    'being', 'below', 'between', 'both', 'but', 'by', 'can', 'could', 'did', 'do',
+    'does', 'doing', 'done', 'down', 'during', 'each', 'even', 'ever', 'every', 'few',
+    'for', 'from', 'further', 'get', 'got', 'had', 'has', 'have', 'having', 'he',
+    'her', 'here', 'hers', 'herself', 'him', 'himself', 'his', 'how', 'i', 'if',
+    'in', 'into', 'is', 'it', 'its', 'itself', 'just', 'let', 'me', 'more',
+    'most', 'much', 'must', 'my', 'myself', 'no', 'nor', 'not', 'now', 'of',
+    'off', 'on', 'once', 'only', 'or', 'other', 'our', 'ours', 'ourselves', 'out',
+    'over', 'own', 'really', 'same', 'she', 'should', 'so', 'some', 'still', 'such',
+    'than', 'that', 'the', 'their', 'theirs', 'them', 'themselves', 'then', 'there', 'these',
+    'they', 'this', 'those', 'through', 'to', 'today', 'too', 'under', 'until', 'up',
+    'us', 'very', 'was', 'we', 'were', 'what', 'when', 'where', 'which', 'while',
+    'who', 'whom', 'why', 'will', 'with', 'would', 'yet', 'you', 'your', 'yours',
+    'yourself', 'yourselves', 'bit', 'lot', 'lots', 'thing', 'things', 'went', 'feel',
+    'felt', 'day', 'made', 'make', 'maybe', 'since', 'though', 'yesterday', 'tomorrow',
+})
@@ -0,0 +1,110 @@
+"""
+Chunked artifact storage for Tracker Pro.
+
+Background exports (core.services.export_job_service) write their files
+as numbered parts, the way multipart uploads work on object storage:
+each part is stored whole or not at all, parts can be discarded from a
+given index on to roll back an interrupted upload, and any byte range of
+the assembled artifact can be read back without assembling it.
+
+LocalArtifactStorage keeps parts as files under a directory on local
+disk, standing in for an object store:
+
+    <root>/<artifact key>/part-00000
+    <root>/<artifact key>/part-00001
+    ...
+
+Configure via settings.EXPORT_JOBS:
+    STORAGE_DIR - root directory (default: MEDIA_ROOT/exports)
+"""
+import os
+import shutil
+from typing import Generator, List
+
+from django.conf import settings
+
+PART_PREFIX = 'part-'
+
+# Bytes per read when streaming a range back
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class LocalArtifactStorage:
+    """Numbered artifact parts in a local directory."""
+
+    def __init__(self, root: str = None):
+        self.root = (
+            root
+            or getattr(settings, 'EXPORT_JOBS', {}).get('STORAGE_DIR')
+            or os.path.join(settings.MEDIA_ROOT, 'exports')
+        )
+
+    def _dir(self, key: str) -> str:
+        if not key or os.sep in key or key.startswith('.'):
+            raise ValueError(f"Invalid artifact key: {key!r}")
+        return os.path.join(self.root, key)
+
+    def _part_path(self, key: str, index: int) -> str:
+        return os.path.join(self._dir(key), f"{PART_PREFIX}{index:05d}")
+
+    def write_part(self, key: str, index: int, data: bytes) -> int:
+        """
+        Store one part atomically (replacing any earlier copy).
+
+        Returns:
+            Bytes written
+        """
+        path = self._part_path(key, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, path)
+        return len(data)
+
+    def part_sizes(self, key: str, parts: int) -> List[int]:
+        """Sizes of the first `parts` parts."""
+        return [os.path.getsize(self._part_path(key, index)) for index in range(parts)]
+
+    def discard_from(self, key: str, index: int) -> None:
+        """Remove every part numbered `index` or higher (and stray temp files)."""
+        directory = self._dir(key)
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            number = name[len(PART_PREFIX):].split('.')[0]
+            if name.endswith('.tmp') or (number.isdigit() and int(number) >= index):
+                os.remove(os.path.join(directory, name))
+
+    def read_range(self, key: str, parts: int, start: int, end: int,
+                   chunk_size: int = READ_CHUNK_SIZE) -> Generator[bytes, None, None]:
+        """
+        Yield bytes `start`..`end` (inclusive) of the artifact made of the
+        first `parts` parts.
+        """
+        offset = 0
+        for index, size in enumerate(self.part_sizes(key, parts)):
+            part_start, part_end = offset, offset + size - 1
+            offset += size
+            if part_end < start:
+                continue
+            if part_start > end:
+                break
+            with open(self._part_path(key, index), 'rb') as handle:
+                handle.seek(max(start - part_start, 0))
+                remaining = min(end, part_end) - max(start, part_start) + 1
+                while remaining > 0:
+                    data = handle.read(min(chunk_size, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    yield data
+
+    def delete(self, key: str) -> None:
+        shutil.rmtree(self._dir(key), ignore_errors=True)
+
+
+def get_storage() -> LocalArtifactStorage:
+    return LocalArtifactStorage()
@@ -0,0 +1,293 @@
+"""
+Side-effect job queue for Tracker Pro.
+
+Moves non-critical work (goal progress, streak notifications) out of the
+request cycle:
+- Jobs are persisted to SideEffectJob inside the caller's transaction
+- Repeated events for the same (kind, key) coalesce into one pending row
+- After commit, a small thread pool drains the queue in batches
+- Failed jobs back off exponentially before they can be claimed again
+- The scheduler re-drains periodically so nothing is lost on restart;
+  batches whose worker stopped heartbeating are handed back to the queue
+
+Configure via settings.SIDE_EFFECT_QUEUE:
+    WORKERS       - drain threads (default: 2)
+    BATCH_SIZE    - jobs claimed per drain pass (default: 100)
+    MAX_ATTEMPTS  - attempts before a job is marked failed (default: 3)
+    RETRY_BACKOFF - seconds before the first retry, doubled per attempt (default: 5)
+    HEARTBEAT     - seconds between heartbeats of a running batch (default: 30)
+    STALE_AFTER   - seconds without a heartbeat before a batch is requeued (default: 300)
+    EAGER         - drain inline after commit instead of in a thread (default: False)
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from core.models import SideEffectJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WORKERS': 2,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 5,
+    'HEARTBEAT': 30,
+    'STALE_AFTER': 300,
+    'EAGER': False,
+}
+
+# Longest wait between retries, whatever the attempt count
+MAX_RETRY_DELAY = 3600
+
+_handlers: Dict[str, Callable] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_inflight = 0
+
+
+def get_setting(name: str):
+    return getattr(settings, 'SIDE_EFFECT_QUEUE', {}).get(name, DEFAULTS[name])
+
+
+def register(kind: str):
+    """
+    Decorator registering the handler for a job kind.
+
+    Handlers are called as handler(key, payload) from a worker thread.
+
+    Usage:
+        @register('goal_progress')
+        def run_goal_progress(goal_id, payload):
+            ...
+    """
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+class JobQueue:
+    """Enqueue, drain and inspect deferred side-effect jobs."""
+
+    @staticmethod
+    def enqueue(kind: str, keys: Iterable[str], payload: dict = None) -> None:
+        """
+        Queue one job per key, coalescing with jobs still pending.
+
+        Issues a single INSERT; the drain is scheduled for after the
+        surrounding transaction commits.
+        """
+        now = timezone.now()
+        jobs = [
+            SideEffectJob(
+                kind=kind,
+                key=str(key),
+                dedupe_key=f"{kind}:{key}",
+                payload=payload or {},
+                enqueued_at=now,
+            )
+            for key in dict.fromkeys(keys)
+        ]
+        if not jobs:
+            return
+
+        SideEffectJob.objects.bulk_create(jobs, ignore_conflicts=True)
+        transaction.on_commit(JobQueue.schedule_drain)
+
+    @staticmethod
+    def schedule_drain() -> None:
+        """Start a drain pass in the worker pool (or inline when EAGER)."""
+        global _executor, _inflight
+
+        if get_setting('EAGER'):
+            JobQueue.drain()
+            return
+
+        workers = get_setting('WORKERS')
+        with _executor_lock:
+            if _inflight >= workers:
+                return  # Running passes will pick up the new jobs
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='side-effects')
+            _inflight += 1
+        _executor.submit(JobQueue._worker)
+
+    @staticmethod
+    def _worker() -> None:
+        global _inflight
+        try:
+            close_old_connections()
+            while JobQueue.drain():
+                pass
+        except Exception as e:
+            logger.error(f"Side-effect worker crashed: {e}")
+        finally:
+            with _executor_lock:
+                _inflight -= 1
+            connection.close()
+
+    @staticmethod
+    def retry_delay(attempts: int) -> timedelta:
+        """Backoff before a job that has failed `attempts` times runs again."""
+        base = get_setting('RETRY_BACKOFF')
+        return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), MAX_RETRY_DELAY))
+
+    @staticmethod
+    def _claim(batch_size: int, token: uuid.UUID) -> list:
+        """Atomically move up to batch_size due pending jobs to running under `token`."""
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                SideEffectJob.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', available_at__lte=now)
+                .order_by('enqueued_at')[:batch_size]
+            )
+            if jobs:
+                SideEffectJob.objects.filter(job_id__in=[j.job_id for j in jobs]).update(
+                    status='running',
+                    dedupe_key=None,
+                    claim_token=token,
+                    attempts=F('attempts') + 1,
+                    updated_at=now,
+                )
+        return jobs
+
+    @staticmethod
+    def _heartbeat(token: uuid.UUID) -> None:
+        """Mark the rest of a claimed batch as still being worked on."""
+        SideEffectJob.objects.filter(claim_token=token, status='running').update(
+            updated_at=timezone.now()
+        )
+
+    @staticmethod
+    def drain(batch_size: int = None) -> int:
+        """
+        Run one batch of due pending jobs.
+
+        Results are written only while the batch still holds its claim
+        token, so a batch that was requeued as stale cannot overwrite or
+        delete the jobs another worker has since claimed.
+
+        Returns:
+            Number of jobs processed (0 when nothing is due)
+        """
+        token = uuid.uuid4()
+        jobs = JobQueue._claim(batch_size or get_setting('BATCH_SIZE'), token)
+        if not jobs:
+            return 0
+
+        max_attempts = get_setting('MAX_ATTEMPTS')
+        heartbeat = get_setting('HEARTBEAT')
+        last_beat = time.monotonic()
+        done = []
+
+        for job in jobs:
+            if time.monotonic() - last_beat >= heartbeat:
+                JobQueue._heartbeat(token)
+                last_beat = time.monotonic()
+
+            handler = _handlers.get(job.kind)
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler registered for '{job.kind}'")
+                handler(job.key, job.payload)
+                done.append(job.job_id)
+            except Exception as e:
+                logger.error(f"Side-effect job {job.kind}:{job.key} failed: {e}")
+                attempts = job.attempts + 1
+                now = timezone.now()
+                SideEffectJob.objects.filter(job_id=job.job_id, claim_token=token).update(
+                    status='failed' if attempts >= max_attempts else 'pending',
+                    claim_token=None,
+                    available_at=now + JobQueue.retry_delay(attempts),
+                    last_error=str(e)[:2000],
+                    updated_at=now,
+                )
+
+        if done:
+            SideEffectJob.objects.filter(job_id__in=done, claim_token=token).delete()
+        return len(jobs)
+
+    @staticmethod
+    def drain_all() -> int:
+        """Requeue stuck jobs, then drain until the queue is empty."""
+        JobQueue.requeue_stale()
+        processed = 0
+        while True:
+            batch = JobQueue.drain()
+            if not batch:
+                return processed
+            processed += batch
+
+    @staticmethod
+    def requeue_stale(older_than: timedelta = None) -> int:
+        """
+        Hand back jobs whose batch stopped heartbeating (e.g. worker killed
+        mid-batch).
+
+        Their claim token is cleared so the lost worker can no longer
+        complete them. Jobs that already used MAX_ATTEMPTS are marked
+        failed instead of being retried.
+
+        Returns:
+            Number of jobs returned to pending
+        """
+        if older_than is None:
+            older_than = timedelta(seconds=get_setting('STALE_AFTER'))
+        now = timezone.now()
+        stale = SideEffectJob.objects.filter(status='running', updated_at__lt=now - older_than)
+
+        stale.filter(attempts__gte=get_setting('MAX_ATTEMPTS')).update(
+            status='failed',
+            claim_token=None,
+            last_error='Worker stopped before finishing the job',
+            updated_at=now,
+        )
+        return stale.update(
+            status='pending',
+            claim_token=None,
+            available_at=now,
+            updated_at=now,
+        )
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        Queue depth and lag metrics.
+
+        Returns:
+            {
+                'depth': pending jobs,
+                'running': claimed jobs,
+                'failed': jobs that exhausted retries,
+                'lag_seconds': age of the oldest pending job
+            }
+        """
+        counts = dict.fromkeys(['pending', 'running', 'failed'], 0)
+        oldest = None
+
+        rows = SideEffectJob.objects.values('status').annotate(
+            count=Count('job_id'),
+            oldest=Min('enqueued_at')
+        ).order_by()
+        for row in rows:
+            counts[row['status']] = row['count']
+            if row['status'] == 'pending':
+                oldest = row['oldest']
+
+        return {
+            'depth': counts['pending'],
+            'running': counts['running'],
+            'failed': counts['failed'],
+            'lag_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0.0,
+        }
@@ -6,6 +6,8 @@ Handles periodic background tasks using APScheduler:
 - Data integrity checks
 - Nightly analytics precomputation
 - Scheduled maintenance tasks
+- Side-effect queue sweeps
+- Background export sweeps
 
 Author: Tracker Pro Team 
 """
@@ -128,6 +130,22 @@ def run_integrity_locked():
     return svc.run_integrity_check()
 
 
+@with_lock('side_effect_drain', lock_timeout=300)
+def drain_side_effects_locked():
+    """Drain side-effect jobs missed by post-commit workers (e.g. after a restart)."""
+    from core.integrations.job_queue import JobQueue
+    
+    return JobQueue.drain_all()
+
+
+@with_lock('export_job_sweep', lock_timeout=300)
+def sweep_export_jobs_locked():
+    """Resume interrupted export jobs and remove expired artifacts."""
+    from core.services.export_job_service import ExportJobService
+    
+    return ExportJobService.sweep()
+
+
 def start_scheduler():
     """
     Start the background scheduler for automated tasks.
@@ -136,6 +154,8 @@ def start_scheduler():
         - Tracker instance checks every hour
         - Data integrity checks daily at midnight
         - Analytics precomputation daily at 2 AM
+        - Side-effect queue sweep every minute
+        - Export job sweep every minute
     """
     scheduler = BackgroundScheduler()
     
@@ -171,8 +191,28 @@ def start_scheduler():
         misfire_grace_time=3600  # 1 hour grace period
     )
     
+    # Sweep the side-effect queue every minute with locking
+    scheduler.add_job(
+        drain_side_effects_locked,
+        'interval',
+        minutes=1,
+        id='side_effect_drain',
+        replace_existing=True,
+        misfire_grace_time=60
+    )
+    
+    # Resume stalled exports and prune expired artifacts every minute with locking
+    scheduler.add_job(
+        sweep_export_jobs_locked,
+        'interval',
+        minutes=1,
+        id='export_job_sweep',
+        replace_existing=True,
+        misfire_grace_time=60
+    )
+    
     scheduler.start()
-    logger.info("⏰ Scheduler started with 3 locked jobs: hourly checks, nightly integrity, nightly analytics")
+    logger.info("⏰ Scheduler started with 5 locked jobs: hourly checks, nightly integrity, nightly analytics, side-effect drain, export sweep")
     print("⏰ Scheduler started!")
     
     atexit.register(lambda: scheduler.shutdown())
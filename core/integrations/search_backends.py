@@ -0,0 +1,290 @@
+"""
+Search backends for Tracker Pro.
+
+The search index (core.services.search_index_service) turns entities into
+documents - a rendered result payload plus the text to index - and hands
+them to a backend, which stores them and answers ranked queries:
+
+- LocalIndexBackend: an inverted index kept in SearchPosting rows and
+  ranked with BM25. Works on every database; a query is one range scan
+  of the (user, term) index.
+- FullTextBackend: the database's native FULLTEXT index over
+  SearchDocument.body, ranked by the database (MySQL only; created by
+  migration 0010). Falls back to the local index elsewhere. Note that
+  MySQL ignores words shorter than innodb_ft_min_token_size and its
+  stopwords.
+
+Configure via settings.SEARCH_INDEX:
+    BACKEND - 'local', 'fulltext', or a dotted path to a SearchBackend
+              subclass (default: 'local')
+
+Switching backends needs `python manage.py rebuild_search_index`.
+"""
+import logging
+import math
+import re
+from collections import Counter, namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from core.models import SearchDocument, SearchPosting
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'local',
+}
+
+# Longest indexed term; longer words are truncated
+MAX_TERM_LENGTH = 64
+
+# Final query words shorter than this match exactly rather than as a prefix
+MIN_PREFIX_LENGTH = 2
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Weight of a word that only completes the typed prefix ("run" -> "running")
+PREFIX_WEIGHT = 0.8
+
+# Most documents a database-ranked query returns
+FULLTEXT_CANDIDATES = 200
+
+WRITE_BATCH_SIZE = 1000
+
+TOKEN_RE = re.compile(r'\w+')
+
+IndexDocument = namedtuple('IndexDocument', ['doc_key', 'entity_type', 'tracker_id', 'body', 'payload'])
+
+
+def get_setting(name: str):
+    return getattr(settings, 'SEARCH_INDEX', {}).get(name, DEFAULTS[name])
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of a text, in order."""
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_RE.findall((text or '').lower())]
+
+
+def parse_query(query: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Split a typed query into exact terms and a trailing prefix.
+
+    The last word is still being typed unless the query ends in a space,
+    so it matches any indexed word it starts.
+
+    Returns:
+        (terms, prefix or None)
+    """
+    terms = tokenize(query)
+    prefix = None
+    if terms and not query[-1:].isspace() and len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        prefix = terms.pop()
+    terms = list(dict.fromkeys(term for term in terms if term != prefix))
+    return terms, prefix
+
+
+def bm25(tf: int, df: int, length: int, documents: int, avg_length: float) -> float:
+    """BM25 weight of one term in one document."""
+    idf = math.log(1 + (documents - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (avg_length or 1))
+    return idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+
+class SearchBackend:
+    """
+    Stores index documents and answers ranked queries.
+
+    Subclasses implement search() and may hook index_rows() to maintain
+    their own structures alongside SearchDocument.
+    """
+
+    name = 'base'
+
+    def available(self) -> bool:
+        return True
+
+    def write(self, user_id: int, documents: List[IndexDocument]) -> int:
+        """
+        Upsert documents, skipping any whose stored copy is unchanged.
+
+        Returns:
+            Number of documents written
+        """
+        if not documents:
+            return 0
+
+        existing = {
+            row.doc_key: row
+            for row in SearchDocument.objects.filter(
+                user_id=user_id, doc_key__in=[doc.doc_key for doc in documents]
+            )
+        }
+        created, updated = [], []
+        for doc in documents:
+            row = existing.get(doc.doc_key)
+            if row is None:
+                row = SearchDocument(user_id=user_id, doc_key=doc.doc_key)
+                created.append(row)
+            elif (row.body, row.payload, row.tracker_id) == (doc.body, doc.payload, doc.tracker_id):
+                continue
+            else:
+                updated.append(row)
+            row.entity_type = doc.entity_type
+            row.tracker_id = doc.tracker_id
+            row.body = doc.body
+            row.length = len(tokenize(doc.body))
+            row.payload = doc.payload
+
+        if created:
+            SearchDocument.objects.bulk_create(created, batch_size=WRITE_BATCH_SIZE)
+            # Not every backend sets primary keys on bulk_create
+            ids = dict(SearchDocument.objects.filter(
+                user_id=user_id, doc_key__in=[row.doc_key for row in created]
+            ).values_list('doc_key', 'id'))
+            for row in created:
+                row.id = ids[row.doc_key]
+        if updated:
+            SearchDocument.objects.bulk_update(
+                updated, ['entity_type', 'tracker', 'body', 'length', 'payload'],
+                batch_size=WRITE_BATCH_SIZE
+            )
+
+        self.index_rows(user_id, created, updated)
+        return len(created) + len(updated)
+
+    def index_rows(self, user_id: int, created: List[SearchDocument], updated: List[SearchDocument]) -> None:
+        """Hook run after documents are written."""
+
+    def delete(self, user_id: int, doc_keys: Iterable[str]) -> int:
+        """Remove documents (and anything indexed from them)."""
+        doc_keys = list(doc_keys)
+        if not doc_keys:
+            return 0
+        count, _ = SearchDocument.objects.filter(user_id=user_id, doc_key__in=doc_keys).delete()
+        return count
+
+    def search(self, user_id: int, terms: List[str], prefix: Optional[str], stats: Dict) -> List[Tuple[float, Dict]]:
+        """
+        Documents matching every term (and the prefix), best first.
+
+        Args:
+            user_id: Owner of the index
+            terms: Words that must appear
+            prefix: Start of a word that must appear, or None
+            stats: {'documents': int, 'avg_length': float} for the user's index
+
+        Returns:
+            [(score, {'doc_key', 'entity_type', 'payload'})]
+        """
+        raise NotImplementedError
+
+
+class LocalIndexBackend(SearchBackend):
+    """Inverted index in SearchPosting rows, ranked with BM25."""
+
+    name = 'local'
+
+    def index_rows(self, user_id, created, updated):
+        if updated:
+            SearchPosting.objects.filter(document_id__in=[row.id for row in updated]).delete()
+        SearchPosting.objects.bulk_create(
+            [
+                SearchPosting(document_id=row.id, user_id=user_id, term=term, tf=tf)
+                for row in created + updated
+                for term, tf in Counter(tokenize(row.body)).items()
+            ],
+            batch_size=WRITE_BATCH_SIZE
+        )
+
+    def search(self, user_id, terms, prefix, stats):
+        match = Q(term__in=terms) if terms else Q()
+        if prefix:
+            match |= Q(term__startswith=prefix)
+        if not match:
+            return []
+
+        postings = list(
+            SearchPosting.objects.filter(match, user_id=user_id).values_list(
+                'term', 'tf', 'document_id', 'document__length',
+                'document__doc_key', 'document__entity_type', 'document__payload'
+            )
+        )
+        # Every posting of a matched term is fetched, so df is exact
+        df = Counter(posting[0] for posting in postings)
+        documents = max(stats['documents'], 1)
+
+        # document -> {query slot: best weight}; the prefix is slot None
+        slots: Dict[int, Dict] = {}
+        rows = {}
+        for term, tf, doc_id, length, doc_key, entity_type, payload in postings:
+            weight = bm25(tf, df[term], length, documents, stats['avg_length'])
+            matched = slots.setdefault(doc_id, {})
+            if term in terms:
+                matched[term] = weight
+            if prefix and term.startswith(prefix):
+                weight *= 1.0 if term == prefix else PREFIX_WEIGHT
+                matched[None] = max(matched.get(None, 0.0), weight)
+            rows[doc_id] = {'doc_key': doc_key, 'entity_type': entity_type, 'payload': payload}
+
+        required = len(terms) + (1 if prefix else 0)
+        hits = [
+            (sum(matched.values()), rows[doc_id])
+            for doc_id, matched in slots.items()
+            if len(matched) == required
+        ]
+        hits.sort(key=lambda hit: (-hit[0], hit[1]['doc_key']))
+        return hits
+
+
+class FullTextBackend(SearchBackend):
+    """The database's FULLTEXT index over SearchDocument.body (MySQL)."""
+
+    name = 'fulltext'
+
+    def available(self):
+        return connection.vendor == 'mysql'
+
+    def search(self, user_id, terms, prefix, stats):
+        words = [f'+{term}' for term in terms]
+        if prefix:
+            words.append(f'+{prefix}*')
+        if not words:
+            return []
+
+        rows = SearchDocument.objects.filter(user_id=user_id).annotate(
+            score=RawSQL('MATCH (body) AGAINST (%s IN BOOLEAN MODE)', (' '.join(words),))
+        ).filter(score__gt=0).order_by('-score').values_list(
+            'score', 'doc_key', 'entity_type', 'payload'
+        )[:FULLTEXT_CANDIDATES]
+
+        return [
+            (float(score), {'doc_key': doc_key, 'entity_type': entity_type, 'payload': payload})
+            for score, doc_key, entity_type, payload in rows
+        ]
+
+
+BACKENDS = {
+    'local': LocalIndexBackend,
+    'fulltext': FullTextBackend,
+}
+
+_warned = set()
+
+
+def get_backend() -> SearchBackend:
+    """The configured backend, or the local index when it cannot run here."""
+    name = get_setting('BACKEND')
+    backend = (BACKENDS.get(name) or import_string(name))()
+    if not backend.available():
+        if name not in _warned:
+            _warned.add(name)
+            logger.warning(f"Search backend '{name}' is unavailable on {connection.vendor}; using the local index")
+        backend = LocalIndexBackend()
+    return backend
@@ -0,0 +1,38 @@
+"""
+Score day notes and extract their keywords in batches.
+
+Fills in notes written before note analysis existed, or whose analysis
+failed when they were saved. Notes that already have a sentiment score are skipped
+unless --rescore is given.
+
+Usage:
+    python manage.py backfill_note_analysis
+    python manage.py backfill_note_analysis --user <user_id> --batch-size 1000
+    python manage.py backfill_note_analysis --rescore
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import DayNote
+from core.services.note_analysis_service import BACKFILL_BATCH_SIZE, NoteAnalysisService
+
+
+class Command(BaseCommand):
+    help = 'Store sentiment scores and keywords for day notes that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only analyze this user\'s notes')
+        parser.add_argument('--batch-size', type=int, default=BACKFILL_BATCH_SIZE,
+                            help='Notes analyzed and written per batch')
+        parser.add_argument('--rescore', action='store_true',
+                            help='Re-analyze notes that already have a score')
+
+    def handle(self, *args, **options):
+        notes = DayNote.objects.all()
+        if options.get('user'):
+            notes = notes.filter(tracker__user_id=options['user'])
+
+        count = NoteAnalysisService.backfill(
+            notes, batch_size=options['batch_size'], rescore=options['rescore']
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Analyzed {count} notes"))
@@ -0,0 +1,29 @@
+"""
+Drain the side-effect job queue.
+
+Usage:
+    python manage.py drain_side_effects
+    python manage.py drain_side_effects --stats
+"""
+from django.core.management.base import BaseCommand
+
+from core.integrations.job_queue import JobQueue
+
+
+class Command(BaseCommand):
+    help = 'Run pending SideEffectJob rows (goal progress, streak checks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true', help='Only print queue depth and lag')
+
+    def handle(self, *args, **options):
+        if options.get('stats'):
+            stats = JobQueue.stats()
+            self.stdout.write(
+                f"depth={stats['depth']} running={stats['running']} "
+                f"failed={stats['failed']} lag={stats['lag_seconds']}s"
+            )
+            return
+
+        processed = JobQueue.drain_all()
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} side-effect jobs"))
@@ -0,0 +1,25 @@
+"""
+Prune old change log entries.
+
+Clients whose cursor falls in the pruned range are told to do a full sync.
+
+Usage:
+    python manage.py prune_change_log
+    python manage.py prune_change_log --days 30
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.services.change_service import ChangeService
+
+
+class Command(BaseCommand):
+    help = 'Delete ChangeLogEntry rows older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Entries to keep, in days (default 90)')
+
+    def handle(self, *args, **options):
+        deleted = ChangeService.prune(timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} change log entries"))
@@ -0,0 +1,37 @@
+"""
+Rebuild materialized daily tracker rollups.
+
+Usage:
+    python manage.py rebuild_rollups
+    python manage.py rebuild_rollups --tracker <tracker_id>
+    python manage.py rebuild_rollups --user <user_id>
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import TrackerDefinition
+from core.services.rollup_service import RollupService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyTrackerRollup rows from task history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tracker', help='Only rebuild this tracker')
+        parser.add_argument('--user', type=int, help='Only rebuild trackers owned by this user')
+
+    def handle(self, *args, **options):
+        trackers = TrackerDefinition.objects.all()
+        if options.get('tracker'):
+            trackers = trackers.filter(tracker_id=options['tracker'])
+        if options.get('user'):
+            trackers = trackers.filter(user_id=options['user'])
+
+        tracker_count = 0
+        row_count = 0
+        for tracker_id in trackers.values_list('tracker_id', flat=True).iterator():
+            row_count += RollupService.rebuild_tracker(tracker_id)
+            tracker_count += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {row_count} rollup rows across {tracker_count} trackers"
+        ))
@@ -0,0 +1,35 @@
+"""
+Rebuild per-user search indexes.
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --user <user_id>
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from core.integrations.search_backends import get_backend
+from core.services.search_index_service import SearchIndexService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search index documents from trackers, tasks, goals, tags and notes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only rebuild this user')
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options.get('user'):
+            users = users.filter(pk=options['user'])
+
+        user_count = 0
+        document_count = 0
+        for user_id in users.values_list('pk', flat=True).iterator():
+            document_count += SearchIndexService.rebuild_user(user_id, force=True)
+            user_count += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rewrote {document_count} search documents for {user_count} users "
+            f"({get_backend().name} backend)"
+        ))
@@ -0,0 +1,38 @@
+"""
+Rebuild persisted tracker streak state from daily rollups.
+
+Usage:
+    python manage.py rebuild_streaks
+    python manage.py rebuild_streaks --tracker <tracker_id>
+    python manage.py rebuild_streaks --user <user_id>
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import TrackerDefinition
+from core.services.streak_service import StreakService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild TrackerStreak state for backfills or after threshold changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tracker', help='Only rebuild this tracker')
+        parser.add_argument('--user', type=int, help='Only rebuild trackers owned by this user')
+
+    def handle(self, *args, **options):
+        trackers = TrackerDefinition.objects.filter(deleted_at__isnull=True)
+        if options.get('tracker'):
+            trackers = trackers.filter(tracker_id=options['tracker'])
+        if options.get('user'):
+            trackers = trackers.filter(user_id=options['user'])
+
+        # Resolve each user's threshold once
+        thresholds = {}
+        count = 0
+        for tracker_id, user_id in trackers.values_list('tracker_id', 'user_id').iterator():
+            if user_id not in thresholds:
+                thresholds[user_id] = StreakService.get_threshold(user_id)
+            StreakService.rebuild_state(tracker_id, thresholds[user_id])
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt streak state for {count} trackers"))
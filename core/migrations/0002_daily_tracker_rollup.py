@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Populate rollups from existing history, matching RollupService: one row
+    per live tracker instance (zeros for days without tasks), filled in
+    from a single GROUP BY over their tasks.
+    """
+    TrackerInstance = apps.get_model('core', 'TrackerInstance')
+    TaskInstance = apps.get_model('core', 'TaskInstance')
+    DailyTrackerRollup = apps.get_model('core', 'DailyTrackerRollup')
+
+    fields = ['total', 'done', 'missed', 'skipped', 'points_earned', 'points_possible']
+    merged = {}
+    days = TrackerInstance.objects.filter(deleted_at__isnull=True).values_list(
+        'tracker_id', 'period_start', 'tracking_date'
+    )
+    for tracker_id, period_start, tracking_date in days.iterator(chunk_size=2000):
+        merged.setdefault((tracker_id, period_start or tracking_date), dict.fromkeys(fields, 0))
+
+    rows = TaskInstance.objects.filter(
+        deleted_at__isnull=True,
+        tracker_instance__deleted_at__isnull=True,
+    ).values(
+        'tracker_instance__tracker_id',
+        'tracker_instance__period_start',
+        'tracker_instance__tracking_date',
+    ).annotate(
+        total=Count('task_instance_id'),
+        done=Count('task_instance_id', filter=Q(status='DONE')),
+        missed=Count('task_instance_id', filter=Q(status='MISSED')),
+        skipped=Count('task_instance_id', filter=Q(status='SKIPPED')),
+        points_earned=Sum('template__points', filter=Q(status='DONE')),
+        points_possible=Sum('template__points'),
+    ).order_by()
+
+    for row in rows.iterator(chunk_size=2000):
+        key = (
+            row['tracker_instance__tracker_id'],
+            row['tracker_instance__period_start'] or row['tracker_instance__tracking_date'],
+        )
+        day = merged.setdefault(key, dict.fromkeys(fields, 0))
+        for field in fields:
+            day[field] += row[field] or 0
+
+    DailyTrackerRollup.objects.bulk_create(
+        [DailyTrackerRollup(tracker_id=k[0], date=k[1], **v) for k, v in merged.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTrackerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.IntegerField(default=0)),
+                ('done', models.IntegerField(default=0)),
+                ('missed', models.IntegerField(default=0)),
+                ('skipped', models.IntegerField(default=0)),
+                ('points_earned', models.IntegerField(default=0)),
+                ('points_possible', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tracker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='core.trackerdefinition')),
+            ],
+            options={
+                'db_table': 'daily_tracker_rollups',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['tracker', '-date'], name='rollup_recent')],
+                'unique_together': {('tracker', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_daily_tracker_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackerStreak',
+            fields=[
+                ('tracker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='streak_state', serialize=False, to='core.trackerdefinition')),
+                ('current_streak', models.IntegerField(default=0)),
+                ('longest_streak', models.IntegerField(default=0)),
+                ('last_qualifying_date', models.DateField(blank=True, null=True)),
+                ('threshold', models.IntegerField(default=80)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'tracker_streaks',
+            },
+        ),
+    ]
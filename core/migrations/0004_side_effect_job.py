@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_tracker_streak'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SideEffectJob',
+            fields=[
+                ('job_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=50)),
+                ('key', models.CharField(max_length=100)),
+                ('dedupe_key', models.CharField(blank=True, max_length=160, null=True, unique=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('enqueued_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'side_effect_jobs',
+                'ordering': ['enqueued_at'],
+                'indexes': [models.Index(fields=['status', 'enqueued_at'], name='job_queue_order')],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:44
+
+import time
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_pruned_through(apps, schema_editor):
+    """
+    The log starts empty, so all existing history predates it. Mark every
+    existing user's log as pruned through their current sequence so old
+    cursors (and cursor 0) get reset_required instead of a partial pull.
+    """
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserChangeSequence = apps.get_model('core', 'UserChangeSequence')
+
+    UserChangeSequence.objects.update(pruned_through=F('value'))
+
+    # Clock-seeded, as ChangeService.bump does for new rows
+    seed = time.time_ns() // 1000
+    missing = User.objects.exclude(
+        pk__in=UserChangeSequence.objects.values('user_id')
+    ).values_list('pk', flat=True)
+    UserChangeSequence.objects.bulk_create(
+        [UserChangeSequence(user_id=pk, value=seed, pruned_through=seed) for pk in missing.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_user_change_sequence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userchangesequence',
+            name='pruned_through',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('entry_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('seq', models.BigIntegerField()),
+                ('entity_type', models.CharField(max_length=20)),
+                ('entity_id', models.CharField(max_length=64)),
+                ('op', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='change_log', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'change_log',
+                'indexes': [models.Index(fields=['created_at'], name='change_log_created_a94786_idx')],
+                'unique_together': {('user', 'seq')},
+            },
+        ),
+        migrations.RunPython(seed_pruned_through, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sideeffectjob',
+            name='available_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='sideeffectjob',
+            name='claim_token',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_side_effect_job_retry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sideeffectjob',
+            index=models.Index(fields=['kind', 'key'], name='job_queue_lookup'),
+        ),
+    ]
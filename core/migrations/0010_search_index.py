@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def add_fulltext_index(apps, schema_editor):
+    """Native FULLTEXT index for the 'fulltext' search backend (MySQL only)."""
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('CREATE FULLTEXT INDEX search_body_fulltext ON search_documents (body)')
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('DROP INDEX search_body_fulltext ON search_documents')
+
+
+def queue_index_builds(apps, schema_editor):
+    """
+    Queue one index build per user; the side-effect queue fills the index
+    after deploy, and a user's first search runs their build inline.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    SideEffectJob = apps.get_model('core', 'SideEffectJob')
+
+    now = timezone.now()
+    jobs = (
+        SideEffectJob(
+            kind='search_index',
+            key=f"{user_id}:user",
+            dedupe_key=f"search_index:{user_id}:user",
+            payload={},
+            enqueued_at=now,
+            available_at=now,
+        )
+        for user_id in User.objects.values_list('pk', flat=True).iterator(chunk_size=2000)
+    )
+    SideEffectJob.objects.bulk_create(jobs, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_side_effect_job_lookup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('doc_key', models.CharField(max_length=64)),
+                ('entity_type', models.CharField(max_length=20)),
+                ('body', models.TextField(blank=True, default='')),
+                ('length', models.IntegerField(default=0)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tracker', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='core.trackerdefinition')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'search_documents',
+                'unique_together': {('user', 'doc_key')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('term', models.CharField(max_length=64)),
+                ('tf', models.IntegerField(default=1)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='core.searchdocument')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'search_postings',
+                'indexes': [models.Index(fields=['user', 'term'], name='search_term_lookup')],
+            },
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(queue_index_builds, migrations.RunPython.noop),
+    ]
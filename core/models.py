@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 from simple_history.models import HistoricalRecords
@@ -256,6 +257,15 @@ class TaskInstance(SoftDeleteModel):
     def __str__(self):
         return f"{self.template.description} - {self.status}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status and notes so signals can detect changes without re-reading the row
+        loaded = dict(zip(field_names, values))
+        instance._loaded_status = loaded.get('status')
+        instance._loaded_notes = loaded.get('notes')
+        return instance
+    
     def save(self, *args, **kwargs):
         if not self.pk:  # New instance
             if self.template:
@@ -313,6 +323,13 @@ class DayNote(SoftDeleteModel):
     
     def __str__(self):
         return f"Note for {self.tracker.name} on {self.date}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored content so note analysis only reruns on edits
+        instance._loaded_content = dict(zip(field_names, values)).get('content')
+        return instance
 
 
 # ============================================================================
@@ -679,16 +696,324 @@ class SearchHistory(models.Model):
     
     @classmethod
     def get_recent_searches(cls, user, limit=5):
-        """Get user's most recent distinct searches."""
-        return cls.objects.filter(user=user).values('query').annotate(
-            latest=models.Max('created_at')
-        ).order_by('-latest')[:limit]
+        """Get user's most recent distinct searches (from the suggestion index)."""
+        from datetime import datetime, timezone as dt_timezone
+        from core.services.suggestion_service import SuggestionService
+        return [
+            {'query': entry.text, 'latest': datetime.fromtimestamp(entry.last_used, tz=dt_timezone.utc)}
+            for entry in SuggestionService.recent(user.id, limit)
+        ]
     
     @classmethod
     def get_popular_searches(cls, user, limit=5):
-        """Get user's most frequently used searches."""
-        from django.db.models import Count
-        return cls.objects.filter(user=user).values('query').annotate(
-            count=Count('search_id')
-        ).order_by('-count')[:limit]
+        """Get user's most frequently used searches (from the suggestion index)."""
+        from core.services.suggestion_service import SuggestionService
+        return [
+            {'query': entry.text, 'count': entry.count}
+            for entry in SuggestionService.popular(user.id, limit=limit)
+        ]
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable entity in a user's search index.
+    
+    Maintained by core.services.search_index_service from entity writes.
+    `payload` is the ready-to-render search result, so queries never go
+    back to the source tables; `body` is the indexed text.
+    """
+    
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='search_documents')
+    doc_key = models.CharField(max_length=64)  # "<entity_type>:<entity_id>"
+    entity_type = models.CharField(max_length=20)
+    tracker = models.ForeignKey(
+        TrackerDefinition, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='search_documents'
+    )
+    body = models.TextField(blank=True, default='')
+    length = models.IntegerField(default=0)  # Token count, for BM25 length normalisation
+    payload = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'search_documents'
+        unique_together = [['user', 'doc_key']]
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.doc_key}"
+
+
+class SearchPosting(models.Model):
+    """
+    Inverted index entry: a term and its frequency in one SearchDocument.
+    
+    `user` is denormalised so a query is one range scan of (user, term).
+    """
+    
+    id = models.BigAutoField(primary_key=True)
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='postings')
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='+')
+    term = models.CharField(max_length=64)
+    tf = models.IntegerField(default=1)
+    
+    class Meta:
+        db_table = 'search_postings'
+        indexes = [
+            models.Index(fields=['user', 'term'], name='search_term_lookup'),
+        ]
+    
+    def __str__(self):
+        return f"{self.term} -> {self.document_id} ({self.tf})"
+
 
+# ============================================================================
+# MATERIALIZED ANALYTICS
+# ============================================================================
+
+class DailyTrackerRollup(models.Model):
+    """
+    Materialized per-day completion stats for a tracker.
+    
+    One row per (tracker, date), kept in sync with TaskInstance writes by
+    RollupService so analytics cost scales with days instead of tasks.
+    Soft-deleted instances and tasks are excluded.
+    """
+    
+    tracker = models.ForeignKey(TrackerDefinition, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+    total = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    missed = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    points_earned = models.IntegerField(default=0)
+    points_possible = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'daily_tracker_rollups'
+        unique_together = [['tracker', 'date']]
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['tracker', '-date'], name='rollup_recent'),
+        ]
+    
+    def __str__(self):
+        return f"{self.tracker_id} - {self.date} ({self.done}/{self.total})"
+    
+    @property
+    def completion_rate(self):
+        """Completion percentage for the day (0-100)."""
+        return (self.done / self.total) * 100 if self.total > 0 else 0.0
+
+
+class TrackerStreak(models.Model):
+    """
+    Persisted streak state for a tracker.
+    
+    A day qualifies when its completion percentage reaches `threshold`.
+    `current_streak` is the length of the run of consecutive qualifying days
+    ending at `last_qualifying_date`; StreakService advances it in O(1) as
+    new days qualify and rebuilds from rollups when history is edited.
+    """
+    
+    tracker = models.OneToOneField(TrackerDefinition, on_delete=models.CASCADE, primary_key=True, related_name='streak_state')
+    current_streak = models.IntegerField(default=0)
+    longest_streak = models.IntegerField(default=0)
+    last_qualifying_date = models.DateField(null=True, blank=True)
+    threshold = models.IntegerField(default=80)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'tracker_streaks'
+    
+    def __str__(self):
+        return f"{self.tracker_id}: {self.current_streak} (best {self.longest_streak})"
+
+
+class DashboardSnapshot(models.Model):
+    """
+    Precomputed dashboard document for a user.
+    
+    `data` holds the sections of today's dashboard so read endpoints can
+    serve it without aggregation queries. DashboardSnapshotService patches
+    the affected sections after each write and bumps `version`, which also
+    serves as the dashboard ETag. Snapshots from an earlier day are rebuilt
+    on read.
+    """
+    
+    user = models.OneToOneField('auth.User', on_delete=models.CASCADE, primary_key=True, related_name='dashboard_snapshot')
+    snapshot_date = models.DateField()
+    version = models.BigIntegerField(default=0)
+    data = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'dashboard_snapshots'
+    
+    def __str__(self):
+        return f"{self.user_id} @ {self.snapshot_date} (v{self.version})"
+
+
+class UserChangeSequence(models.Model):
+    """
+    Monotonic per-user change counter.
+    
+    Bumped inside the transaction of every write to user-owned data (see
+    core.signals.change_signals), so reading it is a single primary-key
+    lookup that changes whenever any of the user's data does.
+    """
+    
+    user = models.OneToOneField('auth.User', on_delete=models.CASCADE, primary_key=True, related_name='change_sequence')
+    value = models.BigIntegerField(default=0)
+    pruned_through = models.BigIntegerField(default=0)  # Highest seq removed from the change log
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'user_change_sequences'
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.value}"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Append-only record of a change to a user's synced data.
+    
+    `seq` is taken from the user's UserChangeSequence while its row is
+    locked, so a user's entries become visible in seq order and sync
+    clients can page through them with a seq cursor without gaps.
+    """
+    
+    OP_CHOICES = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+    
+    entry_id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='change_log')
+    seq = models.BigIntegerField()
+    entity_type = models.CharField(max_length=20)
+    entity_id = models.CharField(max_length=64)
+    op = models.CharField(max_length=10, choices=OP_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'change_log'
+        unique_together = [['user', 'seq']]
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id}#{self.seq} {self.op} {self.entity_type}:{self.entity_id}"
+
+
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+class SideEffectJob(models.Model):
+    """
+    Durable queue entry for work deferred out of the request cycle.
+    
+    Rows are written in the same transaction as the change that produced
+    them and drained by core.integrations.job_queue after commit.
+    `dedupe_key` is set while a job is pending so repeated events for the
+    same (kind, key) coalesce into one row; it is cleared once claimed.
+    A claimed batch shares a `claim_token` and heartbeats `updated_at`;
+    failed jobs wait until `available_at` before they are claimed again.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    ]
+    
+    job_id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=50)
+    key = models.CharField(max_length=100)
+    dedupe_key = models.CharField(max_length=160, unique=True, null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    claim_token = models.UUIDField(null=True, blank=True)
+    enqueued_at = models.DateTimeField(default=timezone.now)
+    available_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'side_effect_jobs'
+        ordering = ['enqueued_at']
+        indexes = [
+            models.Index(fields=['status', 'enqueued_at'], name='job_queue_order'),
+            models.Index(fields=['kind', 'key'], name='job_queue_lookup'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind}:{self.key} ({self.status})"
+
+
+class ExportJob(models.Model):
+    """
+    A background export and its artifact.
+    
+    Run by core.services.export_job_service in a worker pool. The artifact
+    is written in numbered chunks to artifact storage; `chunks_committed`
+    and `cursor` advance together after each chunk is stored, so an
+    interrupted job resumes after its last committed chunk. A running job
+    holds a `claim_token` and heartbeats `updated_at`.
+    """
+    
+    KIND_CHOICES = [
+        ('account', 'Full account'),
+        ('tracker', 'Single tracker'),
+        ('month', 'Month summary'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    job_id = models.CharField(max_length=36, primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='export_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    format = models.CharField(max_length=10)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    
+    # Progress
+    rows_total = models.BigIntegerField(null=True, blank=True)
+    rows_written = models.BigIntegerField(default=0)
+    bytes_written = models.BigIntegerField(default=0)
+    chunks_committed = models.IntegerField(default=0)
+    cursor = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    filename = models.CharField(max_length=255, blank=True, default='')
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    claim_token = models.UUIDField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'export_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='export_job_user'),
+            models.Index(fields=['status', 'updated_at'], name='export_job_status'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} export {self.job_id} ({self.status})"
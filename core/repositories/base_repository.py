@@ -3,7 +3,8 @@ CRUD operations using Django ORM.
 Migrated from Excel-based storage to MySQL database.
 Function signatures remain the same for backward compatibility.
 """
-from core.models import TrackerDefinition, TaskTemplate, TrackerInstance, TaskInstance, DayNote
+from core.models import TrackerDefinition, TaskTemplate, TrackerInstance, TaskInstance, DayNote, DailyTrackerRollup, UserPreferences
+from core.utils.request_cache import request_memoize
 from django.db.models import Q, Prefetch
 from django.utils import timezone
 import uuid
@@ -41,6 +42,7 @@ def get_all_tracker_definitions():
         return []
 
 
+@request_memoize
 def get_tracker_by_id(tracker_id):
     """Get a specific tracker by ID"""
     try:
@@ -53,6 +55,27 @@ def get_tracker_by_id(tracker_id):
         return None
 
 
+@request_memoize
+def get_user_tracker(tracker_id, user_id):
+    """
+    Get a tracker owned by a user (memoized per request).
+    
+    Raises:
+        TrackerDefinition.DoesNotExist: If the user has no such tracker
+    """
+    return TrackerDefinition.objects.get(tracker_id=tracker_id, user_id=user_id)
+
+
+# =============================================================================
+# USER PREFERENCES
+# =============================================================================
+
+@request_memoize
+def get_user_preferences(user_id):
+    """Get a user's preferences row, or None if not created yet (memoized per request)"""
+    return UserPreferences.objects.filter(user_id=user_id).first()
+
+
 # =============================================================================
 # TASK TEMPLATES
 # =============================================================================
@@ -76,6 +99,7 @@ def create_task_template(data):
         raise
 
 
+@request_memoize
 def get_task_templates_for_tracker(tracker_id):
     """Get all task templates for a tracker"""
     try:
@@ -409,6 +433,7 @@ def model_to_dict_with_relations(instance):
 # OPTIMIZED QUERY FUNCTIONS (Phase 1: Performance)
 # =============================================================================
 
+@request_memoize
 def get_tracker_instances_with_tasks(tracker_id, start_date=None, end_date=None):
     """
     Optimized fetch of tracker instances with all related tasks and templates.
@@ -447,6 +472,73 @@ def get_tracker_instances_with_tasks(tracker_id, start_date=None, end_date=None)
         return []
 
 
+@request_memoize
+def get_daily_rollups(tracker_id, start_date=None, end_date=None):
+    """
+    Fetch materialized per-day stats for a tracker (one row per day).
+    
+    Args:
+        tracker_id: Tracker ID
+        start_date: Optional start date filter
+        end_date: Optional end date filter
+        
+    Returns:
+        QuerySet of DailyTrackerRollup rows, newest first
+    """
+    try:
+        # Imported lazily: the services package imports this module
+        from core.services.rollup_service import RollupService
+        RollupService.apply_pending([tracker_id])
+        rollups = DailyTrackerRollup.objects.filter(tracker_id=tracker_id)
+        
+        if start_date:
+            if isinstance(start_date, str):
+                start_date = date.fromisoformat(start_date)
+            rollups = rollups.filter(date__gte=start_date)
+        
+        if end_date:
+            if isinstance(end_date, str):
+                end_date = date.fromisoformat(end_date)
+            rollups = rollups.filter(date__lte=end_date)
+        
+        return rollups.order_by('-date')
+    
+    except Exception as e:
+        logger.error(f"Error fetching daily rollups: {e}")
+        return []
+
+
+def get_template_completion_days(tracker_id, template_id):
+    """
+    Per-day completion flags for a single template, without hydrating models.
+    
+    Args:
+        tracker_id: Tracker ID
+        template_id: Task template ID
+        
+    Returns:
+        {date: bool} - True if any of the template's tasks was DONE that day
+    """
+    try:
+        rows = TaskInstance.objects.filter(
+            tracker_instance__tracker_id=tracker_id,
+            tracker_instance__deleted_at__isnull=True,
+            template_id=template_id,
+            deleted_at__isnull=True
+        ).values_list('tracker_instance__period_start', 'tracker_instance__tracking_date', 'status')
+        
+        completion = {}
+        for period_start, tracking_date, status in rows:
+            day = period_start or tracking_date
+            completion[day] = completion.get(day, False) or status == 'DONE'
+        return completion
+    
+    except Exception as e:
+        logger.error(f"Error fetching template completion days: {e}")
+        return {}
+
+
+@request_memoize
 def get_tracker_with_templates(tracker_id):
     """
     Get tracker with all templates in one optimized query.
@@ -469,6 +561,54 @@ def get_tracker_with_templates(tracker_id):
         return None
 
 
+def get_grid_columns(tracker_id, start_date, end_date):
+    """
+    Flat rows for a tracker's grid over a date range, without hydrating models.
+    
+    Args:
+        tracker_id: Tracker ID
+        start_date: First day of the range
+        end_date: Last day of the range (inclusive)
+        
+    Returns:
+        {
+            'tracker': tracker values dict (None if not found),
+            'templates': live template values dicts, heaviest first,
+            'cells': [(template_id, period_start, status, task_instance_id, notes), ...]
+        }
+    """
+    try:
+        tracker = TrackerDefinition.objects.filter(tracker_id=tracker_id).values(
+            'tracker_id', 'name', 'description', 'time_mode', 'status'
+        ).first()
+        if tracker is None:
+            return {'tracker': None, 'templates': [], 'cells': []}
+        
+        templates = list(
+            TaskTemplate.objects.filter(
+                tracker_id=tracker_id,
+                deleted_at__isnull=True
+            ).order_by('-weight', 'created_at').values(
+                'template_id', 'description', 'category', 'time_of_day',
+                'weight', 'points', 'include_in_goal', 'is_recurring'
+            )
+        )
+        cells = TaskInstance.objects.filter(
+            tracker_instance__tracker_id=tracker_id,
+            tracker_instance__deleted_at__isnull=True,
+            tracker_instance__period_start__range=(start_date, end_date),
+            deleted_at__isnull=True
+        ).values_list(
+            'template_id', 'tracker_instance__period_start', 'status', 'task_instance_id', 'notes'
+        )
+        
+        return {'tracker': tracker, 'templates': templates, 'cells': list(cells)}
+    
+    except Exception as e:
+        logger.error(f"Error fetching grid columns: {e}")
+        return {'tracker': None, 'templates': [], 'cells': []}
+
+
 def get_day_grid_data(tracker_id, dates_list):
     """
     Optimized query for building day grids (monthly, weekly, custom range views).
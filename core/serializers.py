@@ -230,7 +230,7 @@ class BulkStatusUpdateSerializer(serializers.Serializer):
     STATUS_CHOICES = TaskStatusUpdateSerializer.STATUS_CHOICES
     
     task_ids = serializers.ListField(
-        child=serializers.CharField(max_length=36),
+        child=serializers.CharField(max_length=128),  # Virtual task IDs run past 36
         required=True,
         min_length=1,
         help_text="List of task IDs to update"
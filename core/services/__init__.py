@@ -31,6 +31,7 @@ Utility Services:
 - forecast_service: Trend analysis and predictions
 - grid_builder_service: Calendar grid generation
 - points_service: Points and gamification
+- rollup_service: Materialized daily tracker stats for analytics
 - view_service: View data preparation
 """
 
@@ -50,6 +51,7 @@ from .entity_relation_service import EntityRelationService
 from .sync_service import SyncService
 from .export_service import ExportService
 from .forecast_service import ForecastService
+from .rollup_service import RollupService
 
 # V2.0 Services
 from .knowledge_graph_service import KnowledgeGraphService
@@ -84,4 +86,5 @@ __all__ = [
     # Utilities
     'ExportService',
     'ForecastService',
+    'RollupService',
 ]
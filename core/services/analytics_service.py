@@ -10,6 +10,7 @@ from core.models import (
     TrackerDefinition, TrackerInstance, TaskInstance,
     TaskTemplate, Goal
 )
+from core.services.heatmap_service import HeatmapService, activity_level
 
 class AnalyticsService:
     """Generate analytics and insights."""
@@ -151,53 +152,17 @@ class AnalyticsService:
     def get_heatmap_data(user_id: int, year: int = None) -> list[dict]:
         """Get completion heatmap data for calendar visualization."""
         year = year or date.today().year
-        start_date = date(year, 1, 1)
-        end_date = date(year, 12, 31)
-        
-        instances = TrackerInstance.objects.filter(
-            tracker__user_id=user_id,
-            tracking_date__range=(start_date, end_date),
-            deleted_at__isnull=True
-        ).prefetch_related('tasks')
-        
-        # Aggregate by date
-        date_stats = defaultdict(lambda: {'total': 0, 'done': 0})
-        
-        for instance in instances:
-            tasks = instance.tasks.filter(deleted_at__isnull=True)
-            date_key = instance.tracking_date.isoformat()
-            
-            # Optimization: could use annotation but loop is fine for now
-            t_count = tasks.count()
-            d_count = tasks.filter(status='DONE').count()
-            
-            date_stats[date_key]['total'] += t_count
-            date_stats[date_key]['done'] += d_count
+        heatmap = HeatmapService.get(user_id, date(year, 1, 1), date(year, 12, 31))
         
         return [
-            {
-                'date': d,
-                'count': stats['done'],
-                'level': AnalyticsService._get_activity_level(stats['done'], stats['total'])
-            }
-            for d, stats in sorted(date_stats.items())
+            {'date': day['date'], 'count': day['count'], 'level': day['level']}
+            for day in heatmap['days']
         ]
     
     @staticmethod
     def _get_activity_level(done: int, total: int) -> int:
         """Get 0-4 activity level for heatmap."""
-        if total == 0:
-            return 0
-        rate = done / total
-        if rate >= 0.9:
-            return 4
-        elif rate >= 0.7:
-            return 3
-        elif rate >= 0.5:
-            return 2
-        elif rate > 0:
-            return 1
-        return 0
+        return activity_level(done, total)
     
     @staticmethod
     def get_most_missed_tasks(user_id: int, limit: int = 5) -> list[dict]:
@@ -0,0 +1,172 @@
+"""
+Change Service
+
+Tracks a monotonic per-user change sequence (UserChangeSequence) and the
+change log built on it:
+- Every write to user-owned data bumps the owner's sequence in the same
+  transaction (model signals in core.signals.change_signals; bulk paths
+  that bypass signals call ChangeService directly)
+- Writes to synced entities also append ChangeLogEntry rows numbered from
+  that sequence, which sync clients page through by cursor
+- Reading the current value is one primary-key lookup, cheap enough to
+  compute an ETag on every conditional GET
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Iterable, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from core.helpers.cache_helpers import LocalLRUCache
+from core.models import (
+    ChangeLogEntry, Goal, TaskTemplate, TrackerDefinition, TrackerInstance,
+    UserChangeSequence
+)
+
+logger = logging.getLogger(__name__)
+
+# Ownership never changes, so parent -> user lookups can be held for long
+OWNER_CACHE_TTL = 3600
+_owner_cache = LocalLRUCache(max_entries=4096)
+
+# (attribute on the written row, how to find the owning user from its value)
+OWNER_LOOKUPS = (
+    ('tracker_id', lambda pk: TrackerDefinition.objects.filter(tracker_id=pk).values_list('user_id', flat=True).first()),
+    ('tracker_instance_id', lambda pk: TrackerInstance.objects.filter(instance_id=pk).values_list('tracker__user_id', flat=True).first()),
+    ('template_id', lambda pk: TaskTemplate.objects.filter(template_id=pk).values_list('tracker__user_id', flat=True).first()),
+    ('goal_id', lambda pk: Goal.objects.filter(goal_id=pk).values_list('user_id', flat=True).first()),
+)
+
+
+class ChangeService:
+    """Per-user change sequence."""
+
+    @staticmethod
+    def owner_id(instance) -> Optional[int]:
+        """
+        The user who owns a model instance, or None if it cannot be resolved.
+
+        Rows with a user FK answer directly; child rows are resolved through
+        their tracker, day, template or goal (cached per process).
+        """
+        user_id = getattr(instance, 'user_id', None)
+        if user_id is not None:
+            return user_id
+
+        for attr, lookup in OWNER_LOOKUPS:
+            pk = getattr(instance, attr, None)
+            if pk is None:
+                continue
+            key = f"owner:{attr}:{pk}"
+            user_id = _owner_cache.get(key)
+            if user_id is None:
+                user_id = lookup(pk)
+                if user_id is not None:
+                    _owner_cache.set(key, user_id, OWNER_CACHE_TTL)
+            return user_id
+        return None
+
+    @staticmethod
+    def bump(user_id: int, count: int = 1) -> None:
+        """
+        Advance a user's change sequence by `count` (one UPDATE in the
+        common case). The row stays locked until the transaction ends.
+        """
+        if not user_id:
+            return
+
+        if UserChangeSequence.objects.filter(user_id=user_id).update(
+            value=F('value') + count, updated_at=timezone.now()
+        ):
+            return
+
+        try:
+            with transaction.atomic():
+                # Clock-seeded so a recreated row never reissues an old value
+                UserChangeSequence.objects.create(
+                    user_id=user_id, value=time.time_ns() // 1000 + count - 1
+                )
+        except IntegrityError:
+            # Created concurrently
+            UserChangeSequence.objects.filter(user_id=user_id).update(
+                value=F('value') + count, updated_at=timezone.now()
+            )
+
+    @staticmethod
+    def record(user_id: int, entity_type: str, entity_ids: Iterable, op: str) -> None:
+        """
+        Bump the sequence and append one change log entry per entity.
+
+        Entries take consecutive seqs ending at the new sequence value.
+        Three queries however many entities are recorded.
+        """
+        entity_ids = [str(pk) for pk in dict.fromkeys(entity_ids)]
+        if not user_id or not entity_ids:
+            return
+
+        with transaction.atomic():
+            ChangeService.bump(user_id, len(entity_ids))
+            last = ChangeService.current(user_id)
+            first = last - len(entity_ids) + 1
+            ChangeLogEntry.objects.bulk_create([
+                ChangeLogEntry(
+                    user_id=user_id,
+                    seq=first + offset,
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    op=op,
+                )
+                for offset, entity_id in enumerate(entity_ids)
+            ])
+
+    @staticmethod
+    def entries_since(user_id: int, cursor: int, limit: int) -> List[ChangeLogEntry]:
+        """Up to `limit` log entries after `cursor`, oldest first."""
+        return list(
+            ChangeLogEntry.objects.filter(user_id=user_id, seq__gt=cursor).order_by('seq')[:limit]
+        )
+
+    @staticmethod
+    def pruned_through(user_id: int) -> int:
+        """Highest seq no longer in the log (cursors below it must resync)."""
+        return UserChangeSequence.objects.filter(
+            user_id=user_id
+        ).values_list('pruned_through', flat=True).first() or 0
+
+    @staticmethod
+    def prune(older_than: timedelta) -> int:
+        """
+        Drop log entries older than `older_than`, remembering per user how
+        far the log was truncated.
+
+        Returns:
+            Number of entries deleted
+        """
+        cutoff = timezone.now() - older_than
+        deleted = 0
+
+        rows = ChangeLogEntry.objects.filter(
+            created_at__lt=cutoff
+        ).values('user_id').annotate(max_seq=Max('seq')).order_by()
+        for row in rows:
+            with transaction.atomic():
+                UserChangeSequence.objects.filter(
+                    user_id=row['user_id'],
+                    pruned_through__lt=row['max_seq']
+                ).update(pruned_through=row['max_seq'])
+                count, _ = ChangeLogEntry.objects.filter(
+                    user_id=row['user_id'],
+                    seq__lte=row['max_seq']
+                ).delete()
+            deleted += count
+        return deleted
+
+    @staticmethod
+    def current(user_id: int) -> int:
+        """A user's current change sequence (0 before their first write)."""
+        return UserChangeSequence.objects.filter(
+            user_id=user_id
+        ).values_list('value', flat=True).first() or 0
@@ -10,12 +10,13 @@ Provides all data needed for the main dashboard view including:
 - Quick stats
 """
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from django.db.models import Sum, Count, Avg, Q, F
 from django.utils import timezone
 from django.contrib.auth.models import User
 import pytz
 
+from core.repositories import base_repository as crud
 from core.models import (
     TrackerDefinition, TaskTemplate, TaskInstance, 
     TrackerInstance, UserPreferences, Goal, Notification,
@@ -42,13 +43,17 @@ class DashboardService:
         self.user = user
         self._user_timezone = self._get_user_timezone()
         self.target_date = target_date or self._get_today_in_user_tz()
+        self._today = {}
+        self._trackers = {}
     
     def _get_user_timezone(self) -> pytz.timezone:
         """Get user's timezone from preferences."""
+        prefs = crud.get_user_preferences(self.user.id)
+        if prefs is None:
+            return pytz.UTC
         try:
-            prefs = UserPreferences.objects.get(user=self.user)
             return pytz.timezone(prefs.timezone)
-        except (UserPreferences.DoesNotExist, pytz.UnknownTimeZoneError):
+        except pytz.UnknownTimeZoneError:
             return pytz.UTC
     
     def _get_today_in_user_tz(self) -> date:
@@ -89,143 +94,219 @@ class DashboardService:
         else:
             return "Good night"
     
-    def get_trackers_summary(self) -> List[Dict]:
+    def _load_today(self, tracker_ids: Optional[List[str]] = None) -> Dict:
         """
-        Get summary of all active trackers for today.
+        Fetch today's tracker instances and their tasks in two queries.
         
-        Returns list of tracker summaries with tasks and progress.
+        Shared by get_trackers_summary and get_today_stats so the whole
+        dashboard reads the day once, however many trackers the user has.
+        Passing tracker_ids loads just those trackers. With virtual
+        instances on, active trackers with no instance for the day get
+        unsaved ones holding virtual TODO tasks.
+        
+        Returns:
+            {
+                'instances': {tracker_id: TrackerInstance},
+                'tasks': {instance_id: [TaskInstance, ...]} (heaviest first)
+            }
         """
-        trackers = TrackerDefinition.objects.filter(
-            user=self.user,
-            status='active',
+        memo_key = tuple(sorted(tracker_ids)) if tracker_ids is not None else None
+        if memo_key in self._today:
+            return self._today[memo_key]
+        
+        instance_qs = TrackerInstance.objects.filter(
+            tracker__user=self.user,
+            period_start__lte=self.target_date,
+            period_end__gte=self.target_date
+        )
+        if tracker_ids is not None:
+            instance_qs = instance_qs.filter(tracker_id__in=tracker_ids)
+        
+        instances = {}
+        for instance in instance_qs.order_by('-period_start'):
+            # Overlapping periods are a data error; prefer the latest one
+            instances.setdefault(instance.tracker_id, instance)
+        
+        tasks = {instance.instance_id: [] for instance in instances.values()}
+        for task in TaskInstance.objects.filter(
+            tracker_instance_id__in=list(tasks),
             deleted_at__isnull=True
-        ).prefetch_related('templates').order_by('-created_at')
-        
-        summaries = []
-        for tracker in trackers:
-            # Get today's tracker instance if exists
-            try:
-                tracker_instance = TrackerInstance.objects.get(
-                    tracker=tracker,
-                    period_start__lte=self.target_date,
-                    period_end__gte=self.target_date
-                )
-                
-                # Get tasks for this instance
-                tasks = TaskInstance.objects.filter(
-                    tracker_instance=tracker_instance,
-                    deleted_at__isnull=True
-                ).select_related('template').order_by('-template__weight')
-                
-                total_tasks = tasks.count()
-                completed_tasks = tasks.filter(status='DONE').count()
-                
-                # Calculate points
-                total_points = 0
-                earned_points = 0
-                for task in tasks:
-                    if hasattr(task.template, 'points'):
-                        if getattr(task.template, 'include_in_goal', True):
-                            total_points += task.template.points
-                            if task.status == 'DONE':
-                                earned_points += task.template.points
-                
-                task_list = [{
-                    'task_id': str(task.task_instance_id),
-                    'template_id': str(task.template.template_id),
-                    'description': task.template.description,
-                    'status': task.status,
-                    'is_completed': task.status == 'DONE',
-                    'points': getattr(task.template, 'points', 1),
-                    'include_in_goal': getattr(task.template, 'include_in_goal', True),
-                    'time_of_day': task.template.time_of_day,
-                    'notes': task.notes or '',
-                } for task in tasks]
-                
-            except TrackerInstance.DoesNotExist:
-                total_tasks = 0
-                completed_tasks = 0
-                total_points = 0
-                earned_points = 0
-                task_list = []
+        ).select_related('template').order_by('-template__weight'):
+            tasks[task.tracker_instance_id].append(task)
+        
+        # instance_service imports the snapshot service, which imports this module
+        from core.services.instance_service import InstanceService, virtual_instances_enabled
+        if virtual_instances_enabled():
+            untracked = [
+                tracker for tracker in self._active_trackers(tracker_ids)
+                if tracker.tracker_id not in instances
+            ]
+            for tracker_id, (instance, virtual_tasks) in InstanceService.virtual_periods(
+                untracked, self.target_date
+            ).items():
+                instances[tracker_id] = instance
+                tasks[instance.instance_id] = virtual_tasks
+        
+        self._today[memo_key] = {'instances': instances, 'tasks': tasks}
+        return self._today[memo_key]
+    
+    def _active_trackers(self, tracker_ids: Optional[List[str]] = None) -> List[TrackerDefinition]:
+        """The user's active trackers, newest first, read once per service."""
+        memo_key = tuple(sorted(tracker_ids)) if tracker_ids is not None else None
+        if memo_key not in self._trackers:
+            trackers = TrackerDefinition.objects.filter(
+                user=self.user,
+                status='active',
+                deleted_at__isnull=True
+            ).order_by('-created_at')
+            if tracker_ids is not None:
+                trackers = trackers.filter(tracker_id__in=tracker_ids)
+            self._trackers[memo_key] = list(trackers)
+        return self._trackers[memo_key]
+    
+    @staticmethod
+    def _tasks_for(today: Dict, tracker_id: str) -> List[TaskInstance]:
+        """Today's tasks for one tracker from a _load_today result."""
+        instance = today['instances'].get(tracker_id)
+        return today['tasks'][instance.instance_id] if instance else []
+    
+    @staticmethod
+    def _count_tasks(tasks: List[TaskInstance]) -> Dict:
+        """Status counts and goal points for a list of tasks."""
+        counts = {
+            'total': 0, 'done': 0, 'in_progress': 0, 'todo': 0, 'missed': 0,
+            'total_points': 0, 'earned_points': 0,
+        }
+        statuses = {'DONE': 'done', 'IN_PROGRESS': 'in_progress', 'TODO': 'todo', 'MISSED': 'missed'}
+        
+        for task in tasks:
+            counts['total'] += 1
+            if task.status in statuses:
+                counts[statuses[task.status]] += 1
+            
+            # Points calculation
+            if task.template.include_in_goal:
+                counts['total_points'] += task.template.points
+                if task.status == 'DONE':
+                    counts['earned_points'] += task.template.points
+        
+        return counts
+    
+    def _summarize_tracker(self, tracker: TrackerDefinition, tasks: List[TaskInstance]) -> Dict:
+        """Summarize one tracker's day: progress, points and task list."""
+        counts = self._count_tasks(tasks)
+        total_tasks = counts['total']
+        completed_tasks = counts['done']
+        total_points = counts['total_points']
+        earned_points = counts['earned_points']
+        
+        task_list = []
+        for task in tasks:
+            template = task.template
+            task_list.append({
+                'task_id': str(task.task_instance_id),
+                'template_id': str(template.template_id),
+                'description': template.description,
+                'status': task.status,
+                'is_completed': task.status == 'DONE',
+                'points': template.points,
+                'include_in_goal': template.include_in_goal,
+                'time_of_day': template.time_of_day,
+                'notes': task.notes or '',
+            })
+        
+        # Calculate completion percentage
+        completion_pct = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        
+        # Calculate points progress
+        target_points = getattr(tracker, 'target_points', 0)
+        points_progress = (earned_points / target_points * 100) if target_points > 0 else 0
+        
+        return {
+            'tracker_id': str(tracker.tracker_id),
+            'name': tracker.name,
+            'description': tracker.description,
+            'time_mode': tracker.time_mode,
+            'status': tracker.status,
             
-            # Calculate completion percentage
-            completion_pct = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+            # Task stats
+            'total_tasks': total_tasks,
+            'completed_tasks': completed_tasks,
+            'completion_percentage': round(completion_pct, 1),
             
-            # Calculate points progress
-            target_points = getattr(tracker, 'target_points', 0)
-            points_progress = (earned_points / target_points * 100) if target_points > 0 else 0
+            # Point-based goal
+            'target_points': target_points,
+            'current_points': earned_points,
+            'total_possible_points': total_points,
+            'points_progress': round(points_progress, 1),
+            'goal_period': getattr(tracker, 'goal_period', 'daily'),
+            'goal_met': earned_points >= target_points if target_points > 0 else False,
             
-            summaries.append({
-                'tracker_id': str(tracker.tracker_id),
-                'name': tracker.name,
-                'description': tracker.description,
-                'time_mode': tracker.time_mode,
-                'status': tracker.status,
-                
-                # Task stats
-                'total_tasks': total_tasks,
-                'completed_tasks': completed_tasks,
-                'completion_percentage': round(completion_pct, 1),
-                
-                # Point-based goal
-                'target_points': target_points,
-                'current_points': earned_points,
-                'total_possible_points': total_points,
-                'points_progress': round(points_progress, 1),
-                'goal_period': getattr(tracker, 'goal_period', 'daily'),
-                'goal_met': earned_points >= target_points if target_points > 0 else False,
-                
-                # Tasks
-                'tasks': task_list,
-            })
+            # Tasks
+            'tasks': task_list,
+        }
+    
+    def get_trackers_summary(self, tracker_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Get summary of all active trackers for today.
         
-        return summaries
+        Args:
+            tracker_ids: Limit the summary to these trackers
+        
+        Returns list of tracker summaries with tasks and progress.
+        """
+        today = self._load_today(tracker_ids)
+        
+        return [
+            self._summarize_tracker(tracker, self._tasks_for(today, tracker.tracker_id))
+            for tracker in self._active_trackers(tracker_ids)
+        ]
     
-    def get_today_stats(self) -> Dict:
+    def get_tracker_counts(self, tracker_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
         """
-        Get aggregated stats for today.
+        Today's task counts and points per tracker, for every tracker
+        (active or not) that has an instance covering the day.
         """
-        # Get all task instances for today
-        tasks_today = TaskInstance.objects.filter(
-            tracker_instance__tracker__user=self.user,
-            tracker_instance__period_start__lte=self.target_date,
-            tracker_instance__period_end__gte=self.target_date,
-            deleted_at__isnull=True
-        ).select_related('template')
-        
-        total = tasks_today.count()
-        done = tasks_today.filter(status='DONE').count()
-        in_progress = tasks_today.filter(status='IN_PROGRESS').count()
-        todo = tasks_today.filter(status='TODO').count()
-        missed = tasks_today.filter(status='MISSED').count()
-        
-        # Points calculation
-        total_points = 0
-        earned_points = 0
-        for task in tasks_today:
-            points = getattr(task.template, 'points', 1)
-            include = getattr(task.template, 'include_in_goal', True)
-            if include:
-                total_points += points
-                if task.status == 'DONE':
-                    earned_points += points
+        today = self._load_today(tracker_ids)
+        return {
+            tracker_id: self._count_tasks(self._tasks_for(today, tracker_id))
+            for tracker_id in today['instances']
+        }
+    
+    def stats_from_counts(self, counts: Iterable[Dict]) -> Dict:
+        """Combine per-tracker get_tracker_counts entries into today's stats."""
+        totals = {}
+        for entry in counts:
+            for field, value in entry.items():
+                totals[field] = totals.get(field, 0) + value
         
+        total = totals.get('total', 0)
+        done = totals.get('done', 0)
+        total_points = totals.get('total_points', 0)
+        earned_points = totals.get('earned_points', 0)
         completion_rate = (done / total * 100) if total > 0 else 0
         
         return {
             'date': self.target_date.isoformat(),
             'total_tasks': total,
             'completed': done,
-            'in_progress': in_progress,
-            'todo': todo,
-            'missed': missed,
+            'in_progress': totals.get('in_progress', 0),
+            'todo': totals.get('todo', 0),
+            'missed': totals.get('missed', 0),
             'completion_rate': round(completion_rate, 1),
             'total_points': total_points,
             'earned_points': earned_points,
             'points_percentage': round((earned_points / total_points * 100) if total_points > 0 else 0, 1),
         }
     
+    def get_today_stats(self) -> Dict:
+        """
+        Get aggregated stats for today.
+        
+        Computed in one pass over the tasks loaded by _load_today.
+        """
+        return self.stats_from_counts(self.get_tracker_counts().values())
+    
     def get_goals_progress(self) -> List[Dict]:
         """
         Get progress for all active goals.
@@ -0,0 +1,277 @@
+"""
+Dashboard Snapshot Service
+
+Keeps a precomputed dashboard per user (DashboardSnapshot) so the
+dashboard endpoints read one row instead of re-aggregating on every poll:
+- Writes to a user's tasks, trackers, goals, notes and notifications queue
+  a 'dashboard_snapshot' job (see core.signals.dashboard_signals)
+- The job patches only the affected trackers and sections and bumps the
+  snapshot version, which doubles as the ETag
+- Reads first apply any of the user's patches still queued or still being
+  run by a worker, so clients always see their own writes
+- A snapshot from a previous day is rebuilt in full
+"""
+import logging
+import time
+from typing import Dict, Iterable, Optional
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import DashboardSnapshot, SideEffectJob, TrackerDefinition
+from core.services.dashboard_service import DashboardService
+from core.utils.request_cache import request_memoize
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND = 'dashboard_snapshot'
+
+# Sections rebuilt by calling the matching DashboardService method
+SECTION_BUILDERS = {
+    'goals_progress': DashboardService.get_goals_progress,
+    'streaks': DashboardService.get_streaks,
+    'week': DashboardService.get_week_overview,
+    'recent_activity': DashboardService.get_recent_activity,
+    'notifications_count': DashboardService.get_unread_notifications_count,
+    'quick_actions': DashboardService.get_quick_actions,
+}
+
+# Sections that depend on task state, refreshed whenever a tracker's day changes
+TASK_SECTIONS = ('streaks', 'week', 'recent_activity', 'quick_actions')
+
+
+def tracker_job_key(tracker_id) -> str:
+    """Job key for a change to a tracker's day (tasks, instance, note)."""
+    return f"tracker:{tracker_id}"
+
+
+def user_job_key(user_id, part: str) -> str:
+    """Job key for a user-level change: a section name or 'tracker:<id>'."""
+    return f"user:{user_id}:{part}"
+
+
+class DashboardSnapshotService:
+    """Build, patch and serve per-user dashboard snapshots."""
+
+    @staticmethod
+    def build(service: DashboardService) -> Dict:
+        """Compute every snapshot section from scratch."""
+        data = {
+            'date': service.target_date.isoformat(),
+            'known_trackers': [
+                str(t) for t in TrackerDefinition.objects.filter(
+                    user=service.user
+                ).values_list('tracker_id', flat=True)
+            ],
+            'day_counts': service.get_tracker_counts(),
+            'trackers': service.get_trackers_summary(),
+        }
+        data['today_stats'] = service.stats_from_counts(data['day_counts'].values())
+        for section, builder in SECTION_BUILDERS.items():
+            data[section] = builder(service)
+        return data
+
+    @staticmethod
+    def _save(snapshot: DashboardSnapshot, service: DashboardService, data: Dict) -> DashboardSnapshot:
+        snapshot.data = data
+        snapshot.snapshot_date = service.target_date
+        snapshot.version += 1
+        snapshot.save()
+        return snapshot
+
+    @staticmethod
+    def rebuild(user: User, service: Optional[DashboardService] = None) -> DashboardSnapshot:
+        """Recompute a user's snapshot in full and bump its version."""
+        service = service or DashboardService(user)
+        started = timezone.now()
+        data = DashboardSnapshotService.build(service)
+
+        # Patches queued before the build are already reflected in it
+        DashboardSnapshotService._user_jobs(user.id, data['known_trackers']).filter(
+            status='pending',
+            enqueued_at__lte=started
+        ).delete()
+
+        with transaction.atomic():
+            # Clock-seeded so a recreated row never reissues an old ETag
+            snapshot, _ = DashboardSnapshot.objects.select_for_update().get_or_create(
+                user=user,
+                defaults={'snapshot_date': service.target_date, 'version': time.time_ns() // 1000}
+            )
+            return DashboardSnapshotService._save(snapshot, service, data)
+
+    @staticmethod
+    def _patch_trackers(service: DashboardService, data: Dict, tracker_ids: Iterable[str]) -> None:
+        """Recompute the summary and day counts of the given trackers in place."""
+        active_ids = [
+            str(t) for t in TrackerDefinition.objects.filter(
+                user=service.user,
+                status='active',
+                deleted_at__isnull=True
+            ).order_by('-created_at').values_list('tracker_id', flat=True)
+        ]
+        summaries = {s['tracker_id']: s for s in data['trackers']}
+
+        # Also fill in any active tracker the snapshot has not seen yet
+        stale = {str(t) for t in tracker_ids} | (set(active_ids) - set(summaries))
+
+        for tracker_id in stale:
+            summaries.pop(tracker_id, None)
+            data['day_counts'].pop(tracker_id, None)
+        for summary in service.get_trackers_summary(list(stale)):
+            summaries[summary['tracker_id']] = summary
+        data['day_counts'].update(service.get_tracker_counts(list(stale)))
+
+        data['trackers'] = [summaries[t] for t in active_ids if t in summaries]
+        data['today_stats'] = service.stats_from_counts(data['day_counts'].values())
+        data['known_trackers'] = [
+            str(t) for t in TrackerDefinition.objects.filter(
+                user=service.user
+            ).values_list('tracker_id', flat=True)
+        ]
+
+    @staticmethod
+    def patch(user_id: int, tracker_ids: Iterable[str] = (), sections: Iterable[str] = ()) -> Optional[DashboardSnapshot]:
+        """
+        Apply a change to a user's snapshot.
+
+        Args:
+            user_id: Snapshot owner
+            tracker_ids: Trackers whose day changed (also refreshes TASK_SECTIONS)
+            sections: Other SECTION_BUILDERS keys to refresh
+
+        Returns:
+            The updated snapshot, or None if the user has none yet
+            (it is built on first read).
+        """
+        tracker_ids = set(tracker_ids)
+        sections = set(sections)
+        if tracker_ids:
+            sections.update(TASK_SECTIONS)
+
+        with transaction.atomic():
+            snapshot = DashboardSnapshot.objects.select_for_update().select_related(
+                'user'
+            ).filter(user_id=user_id).first()
+            if snapshot is None:
+                return None
+
+            service = DashboardService(snapshot.user)
+            if service.target_date != snapshot.snapshot_date:
+                # Day rolled over since the last write
+                return DashboardSnapshotService._save(
+                    snapshot, service, DashboardSnapshotService.build(service)
+                )
+
+            data = snapshot.data
+            if tracker_ids:
+                DashboardSnapshotService._patch_trackers(service, data, tracker_ids)
+            for section in sections:
+                data[section] = SECTION_BUILDERS[section](service)
+
+            return DashboardSnapshotService._save(snapshot, service, data)
+
+    @staticmethod
+    def apply_job_keys(keys: Iterable[str]) -> None:
+        """Group queued job keys by user and patch each snapshot once."""
+        changes = {}  # user_id -> (tracker_ids, sections)
+        owner_lookups = set()
+
+        for key in keys:
+            scope, _, rest = key.partition(':')
+            if scope == 'tracker':
+                owner_lookups.add(rest)
+                continue
+            user_id, _, part = rest.partition(':')
+            tracker_ids, sections = changes.setdefault(int(user_id), (set(), set()))
+            if part.startswith('tracker:'):
+                tracker_ids.add(part.partition(':')[2])
+                sections.add('goals_progress')  # Goals show their tracker's name
+            elif part in SECTION_BUILDERS:
+                sections.add(part)
+            else:
+                logger.warning(f"Unknown dashboard snapshot job key: {key}")
+
+        if owner_lookups:
+            owners = TrackerDefinition.objects.filter(
+                tracker_id__in=owner_lookups
+            ).values_list('tracker_id', 'user_id')
+            for tracker_id, user_id in owners:
+                changes.setdefault(user_id, (set(), set()))[0].add(str(tracker_id))
+
+        for user_id, (tracker_ids, sections) in changes.items():
+            DashboardSnapshotService.patch(user_id, tracker_ids, sections)
+
+    @staticmethod
+    def _user_jobs(user_id: int, tracker_ids: Iterable[str]):
+        """This user's snapshot jobs, whatever their status."""
+        return SideEffectJob.objects.filter(kind=JOB_KIND).filter(
+            Q(key__in=[tracker_job_key(t) for t in tracker_ids]) |
+            Q(key__startswith=user_job_key(user_id, ''))
+        )
+
+    @staticmethod
+    @request_memoize
+    def get(user: User) -> DashboardSnapshot:
+        """
+        Return the user's up-to-date snapshot.
+
+        Costs three indexed lookups (preferences, snapshot, outstanding
+        patches) when nothing changed since the last read.
+
+        Outstanding patches are the user's pending jobs plus jobs a worker
+        claimed after the snapshot was last saved: the worker may not have
+        written them yet, so they are applied here too.
+        """
+        service = DashboardService(user)
+        snapshot = DashboardSnapshot.objects.filter(user=user).first()
+        if snapshot is None or snapshot.snapshot_date != service.target_date:
+            return DashboardSnapshotService.rebuild(user, service)
+
+        outstanding = list(
+            DashboardSnapshotService._user_jobs(
+                user.id, snapshot.data.get('known_trackers', [])
+            ).filter(
+                Q(status='pending') |
+                Q(status='running', updated_at__gte=snapshot.updated_at)
+            ).values_list('job_id', 'key', 'status')
+        )
+        if outstanding:
+            # Claim pending ones here; a worker holding a running one just patches twice
+            SideEffectJob.objects.filter(
+                job_id__in=[job_id for job_id, _, status in outstanding if status == 'pending'],
+                status='pending'
+            ).delete()
+            DashboardSnapshotService.apply_job_keys([key for _, key, _ in outstanding])
+            snapshot = DashboardSnapshot.objects.get(user=user)
+
+        return snapshot
+
+    @staticmethod
+    def get_dashboard(user: User) -> Dict:
+        """The full dashboard payload, as DashboardService.get_full_dashboard."""
+        data = DashboardSnapshotService.get(user).data
+        return {
+            'date': data['date'],
+            'greeting': DashboardService(user)._get_greeting(),
+            'trackers': data['trackers'],
+            'today_stats': data['today_stats'],
+            'goals_progress': data['goals_progress'],
+            'streaks': data['streaks'],
+            'recent_activity': data['recent_activity'],
+            'notifications_count': data['notifications_count'],
+            'quick_actions': data['quick_actions'],
+        }
+
+
+def snapshot_etag(request) -> Optional[str]:
+    """
+    ETag for check_etag on snapshot-backed dashboard endpoints.
+
+    Requests for an explicit date are computed live and get no ETag.
+    """
+    if request.GET.get('date'):
+        return None
+    return f"dash-{DashboardSnapshotService.get(request.user).version}"
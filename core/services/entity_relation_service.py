@@ -10,6 +10,7 @@ from typing import List, Dict, Optional, Set
 from django.db import transaction
 from django.db.models import Q
 from core.models import EntityRelation, TaskInstance, TaskTemplate
+from core.services.relation_graph_service import RelationGraphService, node_key
 import logging
 
 logger = logging.getLogger(__name__)
@@ -70,7 +71,7 @@ class EntityRelationService:
         # Check for circular dependencies
         if relation_type == EntityRelationService.DEPENDS_ON:
             if EntityRelationService._would_create_cycle(
-                source_type, source_id, target_type, target_id
+                source_type, source_id, target_type, target_id, user_id
             ):
                 logger.warning(f"Circular dependency detected: {source_id} -> {target_id}")
                 return None
@@ -92,41 +93,28 @@ class EntityRelationService:
         source_type: str,
         source_id: str,
         target_type: str,
-        target_id: str
+        target_id: str,
+        user_id: Optional[int] = None
     ) -> bool:
         """
         Check if creating a depends_on relation would create a cycle.
         
         If A depends_on B, and B depends_on A, that's a cycle.
-        This checks transitively.
+        This checks transitively, against the owner's relation index.
         """
-        # Get all entities that target depends on (transitively)
-        visited: Set[str] = set()
-        to_check = [(target_type, target_id)]
+        source = node_key(source_type, source_id)
+        target = node_key(target_type, target_id)
+        if source == target:
+            return True
         
-        while to_check:
-            check_type, check_id = to_check.pop()
-            key = f"{check_type}:{check_id}"
-            
-            if key in visited:
-                continue
-            visited.add(key)
-            
-            # If we find the source in the dependency chain, it's a cycle
-            if check_type == source_type and check_id == source_id:
-                return True
-            
-            # Get what this entity depends on
-            dependencies = EntityRelation.objects.filter(
-                from_entity_type=check_type,
-                from_entity_id=check_id,
-                relation_type=EntityRelationService.DEPENDS_ON
-            ).values_list('to_entity_type', 'to_entity_id')
-            
-            for dep_type, dep_id in dependencies:
-                to_check.append((dep_type, dep_id))
+        if user_id is None:
+            user_id = RelationGraphService.owner_of(target_type, target_id)
+        if user_id is None:
+            return False
         
-        return False
+        # Skip the per-process tier: a stale index could let a cycle through
+        graph = RelationGraphService.get(user_id, local=False)
+        return graph.reaches(target, source, EntityRelationService.DEPENDS_ON)
     
     @staticmethod
     def get_dependencies(
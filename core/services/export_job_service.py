@@ -0,0 +1,423 @@
+"""
+Export Job Service - Background exports with resumable chunked artifacts
+
+Large exports run in a worker pool instead of tying up the request
+thread. Each job writes its artifact as numbered parts to artifact
+storage (core.integrations.artifact_storage):
+- Pieces of the export are buffered until CHUNK_BYTES, then stored as the
+  next part; the job row's chunks_committed, cursor and progress advance
+  only after the part is stored
+- A job interrupted mid-way (worker killed, deploy) is requeued once it
+  stops heartbeating and resumes after its last committed part, with any
+  part written past it discarded. Exports that cannot resume from a
+  cursor (XLSX, month summaries) start over instead
+- Only the worker holding the job's claim token can record progress, so a
+  worker presumed dead cannot overwrite the run that replaced it
+- Finished artifacts are served with HTTP range support and removed once
+  they expire
+
+Configure via settings.EXPORT_JOBS:
+    WORKERS      - export threads (default: 2)
+    CHUNK_BYTES  - bytes per stored part (default: 1 MiB)
+    STORAGE_DIR  - artifact root (default: MEDIA_ROOT/exports)
+    HEARTBEAT    - seconds between heartbeats of a running job (default: 30)
+    STALE_AFTER  - seconds without a heartbeat before a job is requeued (default: 120)
+    MAX_ATTEMPTS - runs before an interrupted job is marked failed (default: 3)
+    TTL_HOURS    - hours a finished artifact is kept (default: 24)
+    EAGER        - run inline after commit instead of in a thread (default: False)
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Generator, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.exceptions import TrackerNotFoundError, ValidationError
+from core.integrations.artifact_storage import get_storage
+from core.models import ExportJob, TaskInstance, TrackerDefinition
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WORKERS': 2,
+    'CHUNK_BYTES': 1024 * 1024,
+    'STORAGE_DIR': None,
+    'HEARTBEAT': 30,
+    'STALE_AFTER': 120,
+    'MAX_ATTEMPTS': 3,
+    'TTL_HOURS': 24,
+    'EAGER': False,
+}
+
+# Formats accepted per job kind
+EXPORT_JOB_FORMATS = {
+    'account': ('jsonl', 'csv', 'xlsx'),
+    'tracker': ('csv', 'json'),
+    'month': ('json', 'csv', 'xlsx'),
+}
+
+TRACKER_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_setting(name: str):
+    return getattr(settings, 'EXPORT_JOBS', {}).get(name, DEFAULTS[name])
+
+
+class ClaimLost(Exception):
+    """The job was requeued or finished by another worker mid-run."""
+
+
+class ExportJobService:
+    """Create, run and serve background export jobs."""
+
+    # ------------------------------------------------------------------
+    # Creating jobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def create(user, kind: str, format: str, params: Dict = None) -> ExportJob:
+        """
+        Queue an export; it starts after the surrounding transaction commits.
+
+        Args:
+            user: Job owner
+            kind: 'account', 'tracker' or 'month'
+            format: One of EXPORT_JOB_FORMATS[kind]
+            params: tracker: {'tracker_id', 'start', 'end'};
+                    month: {'year', 'month', 'tracker_id'}
+
+        Raises:
+            ValidationError: Unknown kind, format or bad params
+            TrackerNotFoundError: tracker_id is not one of the user's trackers
+        """
+        if kind not in EXPORT_JOB_FORMATS:
+            raise ValidationError('kind', f"must be one of {', '.join(EXPORT_JOB_FORMATS)}")
+        if format not in EXPORT_JOB_FORMATS[kind]:
+            raise ValidationError('format', f"must be one of {', '.join(EXPORT_JOB_FORMATS[kind])}")
+        params = {key: value for key, value in (params or {}).items() if value not in (None, '')}
+
+        rows_total = None
+        if kind == 'account':
+            from core.exports.account_exporter import account_row_count
+            rows_total = account_row_count(user.id)
+        elif kind == 'tracker':
+            rows_total = ExportJobService._tracker_tasks(user, params).count()
+        else:
+            try:
+                params['year'], params['month'] = int(params['year']), int(params['month'])
+            except (KeyError, TypeError, ValueError):
+                raise ValidationError('month', 'year and month must be integers')
+            if not 1 <= params['month'] <= 12:
+                raise ValidationError('month', 'must be between 1 and 12')
+
+        job = ExportJob.objects.create(
+            user=user, kind=kind, format=format, params=params, rows_total=rows_total
+        )
+        job_id = str(job.job_id)
+        transaction.on_commit(lambda: ExportJobService.schedule(job_id))
+        return job
+
+    @staticmethod
+    def _tracker(user, params: Dict) -> TrackerDefinition:
+        tracker_id = params.get('tracker_id')
+        try:
+            return TrackerDefinition.objects.get(tracker_id=tracker_id, user=user)
+        except TrackerDefinition.DoesNotExist:
+            raise TrackerNotFoundError(tracker_id)
+
+    @staticmethod
+    def _tracker_tasks(user, params: Dict):
+        tasks = TaskInstance.objects.filter(
+            tracker_instance__tracker=ExportJobService._tracker(user, params),
+            deleted_at__isnull=True
+        )
+        if params.get('start'):
+            tasks = tasks.filter(tracker_instance__tracking_date__gte=params['start'])
+        if params.get('end'):
+            tasks = tasks.filter(tracker_instance__tracking_date__lte=params['end'])
+        return tasks
+
+    # ------------------------------------------------------------------
+    # Running jobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def schedule(job_id: str) -> None:
+        """Run a job in the worker pool (or inline when EAGER)."""
+        global _executor
+
+        if get_setting('EAGER'):
+            ExportJobService.run(job_id)
+            return
+
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_setting('WORKERS'), thread_name_prefix='exports'
+                )
+        _executor.submit(ExportJobService._worker, job_id)
+
+    @staticmethod
+    def _worker(job_id: str) -> None:
+        try:
+            close_old_connections()
+            ExportJobService.run(job_id)
+        except Exception as e:
+            logger.error(f"Export worker crashed on job {job_id}: {e}")
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _claim(job_id: str, token: uuid.UUID) -> bool:
+        """Atomically move a queued job to running under `token`."""
+        now = timezone.now()
+        return bool(ExportJob.objects.filter(job_id=job_id, status='queued').update(
+            status='running',
+            claim_token=token,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            updated_at=now,
+        ))
+
+    @staticmethod
+    def run(job_id: str) -> bool:
+        """
+        Run (or resume) a queued job to completion.
+
+        Returns:
+            True if this call finished the job
+        """
+        token = uuid.uuid4()
+        if not ExportJobService._claim(job_id, token):
+            return False  # Already taken, finished or gone
+
+        job = ExportJob.objects.select_related('user').get(job_id=job_id)
+        try:
+            ExportJobService._write(job, token)
+            return True
+        except ClaimLost:
+            logger.warning(f"Export job {job_id} was taken over by another worker")
+        except Exception as e:
+            logger.error(f"Export job {job_id} failed: {e}")
+            now = timezone.now()
+            ExportJob.objects.filter(job_id=job_id, claim_token=token).update(
+                status='failed',
+                claim_token=None,
+                error=str(e)[:2000],
+                finished_at=now,
+                expires_at=now + timedelta(hours=get_setting('TTL_HOURS')),
+                updated_at=now,
+            )
+        return False
+
+    @staticmethod
+    def _write(job: ExportJob, token: uuid.UUID) -> None:
+        storage = get_storage()
+        pieces, content_type, filename = ExportJobService._source(job)
+
+        cursor = job.cursor
+        chunks, size, rows = job.chunks_committed, job.bytes_written, job.rows_written
+        if cursor is None and chunks:
+            # Parts of a source that cannot resume: start over
+            chunks, size, rows = 0, 0, 0
+        storage.discard_from(job.job_id, chunks)
+
+        chunk_bytes = get_setting('CHUNK_BYTES')
+        heartbeat = get_setting('HEARTBEAT')
+        last_beat = time.monotonic()
+        buffer, buffered = [], 0
+
+        def commit():
+            nonlocal chunks, size, buffer, buffered, last_beat
+            size += storage.write_part(job.job_id, chunks, b''.join(buffer))
+            chunks += 1
+            buffer, buffered = [], 0
+            ExportJobService._record(job.job_id, token, chunks_committed=chunks,
+                                     bytes_written=size, rows_written=rows, cursor=cursor)
+            last_beat = time.monotonic()
+
+        for piece_cursor, data in pieces(cursor):
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            buffer.append(data)
+            buffered += len(data)
+            cursor = piece_cursor
+            if cursor is not None and cursor.get('after') is not None and not cursor.get('done'):
+                rows += 1
+            if buffered >= chunk_bytes:
+                commit()
+            elif time.monotonic() - last_beat >= heartbeat:
+                ExportJobService._record(job.job_id, token)
+                last_beat = time.monotonic()
+        if buffer:
+            commit()
+
+        now = timezone.now()
+        ExportJobService._record(
+            job.job_id, token,
+            status='completed',
+            claim_token=None,
+            rows_written=job.rows_total if cursor is None and job.rows_total is not None else rows,
+            content_type=content_type,
+            filename=filename,
+            finished_at=now,
+            expires_at=now + timedelta(hours=get_setting('TTL_HOURS')),
+        )
+
+    @staticmethod
+    def _record(job_id: str, token: uuid.UUID, **fields) -> None:
+        """Update a job this worker still holds; doubles as its heartbeat."""
+        updated = ExportJob.objects.filter(job_id=job_id, claim_token=token).update(
+            updated_at=timezone.now(), **fields
+        )
+        if not updated:
+            raise ClaimLost(job_id)
+
+    @staticmethod
+    def _source(job: ExportJob) -> Tuple:
+        """
+        (pieces(cursor), content type, filename) for a job.
+
+        pieces yields (cursor, text or bytes); sources that cannot resume
+        yield a None cursor.
+        """
+        stamp = job.created_at.strftime('%Y%m%d')
+
+        if job.kind == 'account':
+            from core.exports.account_exporter import EXPORT_FORMATS, account_pieces, stream_xlsx
+            content_type, extension = EXPORT_FORMATS[job.format]
+            if job.format == 'xlsx':
+                pieces = lambda cursor: ((None, chunk) for chunk in stream_xlsx(job.user))
+            else:
+                pieces = lambda cursor: account_pieces(job.user, job.format, cursor)
+            return pieces, content_type, f"tracker_export_{stamp}.{extension}"
+
+        if job.kind == 'tracker':
+            from core.exports.exporter import tracker_export_pieces
+            tracker = ExportJobService._tracker(job.user, job.params)
+            pieces = lambda cursor: tracker_export_pieces(
+                tracker, job.format, job.params.get('start'), job.params.get('end'), cursor
+            )
+            return pieces, TRACKER_CONTENT_TYPES[job.format], f"{tracker.name}_export.{job.format}"
+
+        from core.services.export_service import ExportService
+        response = ExportService(job.user).export_month(
+            job.params['year'], job.params['month'], job.format, job.params.get('tracker_id')
+        )
+        if response.status_code != 200:
+            raise ValueError(response.content.decode('utf-8', 'replace')[:500])
+        disposition = response.get('Content-Disposition', '')
+        filename = disposition.split('filename=')[-1].strip('"') if 'filename=' in disposition else (
+            f"export_{job.params['year']}_{job.params['month']:02d}.{job.format}"
+        )
+        return (lambda cursor: iter([(None, response.content)])), response['Content-Type'], filename
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def requeue_stale(older_than: timedelta = None) -> int:
+        """
+        Hand back running jobs that stopped heartbeating so they resume.
+
+        Their claim token is cleared so the lost worker can no longer
+        record progress. Jobs that already ran MAX_ATTEMPTS times are
+        marked failed instead.
+
+        Returns:
+            Number of jobs returned to the queue
+        """
+        if older_than is None:
+            older_than = timedelta(seconds=get_setting('STALE_AFTER'))
+        now = timezone.now()
+        stale = ExportJob.objects.filter(status='running', updated_at__lt=now - older_than)
+
+        stale.filter(attempts__gte=get_setting('MAX_ATTEMPTS')).update(
+            status='failed',
+            claim_token=None,
+            error='Worker stopped before finishing the export',
+            finished_at=now,
+            expires_at=now + timedelta(hours=get_setting('TTL_HOURS')),
+            updated_at=now,
+        )
+        return stale.update(status='queued', claim_token=None, updated_at=now)
+
+    @staticmethod
+    def prune_expired() -> int:
+        """Delete expired jobs and their artifacts."""
+        storage = get_storage()
+        expired = list(ExportJob.objects.filter(
+            expires_at__lt=timezone.now(), status__in=['completed', 'failed']
+        ).values_list('job_id', flat=True))
+        for job_id in expired:
+            storage.delete(job_id)
+        ExportJob.objects.filter(job_id__in=expired).delete()
+        return len(expired)
+
+    @staticmethod
+    def sweep() -> Dict:
+        """
+        Requeue stale jobs, restart queued jobs whose worker never picked
+        them up (e.g. after a restart) and prune expired artifacts.
+        """
+        requeued = ExportJobService.requeue_stale()
+        idle = timezone.now() - timedelta(seconds=get_setting('STALE_AFTER'))
+        waiting = list(ExportJob.objects.filter(
+            status='queued', updated_at__lt=idle
+        ).values_list('job_id', flat=True))
+        # Requeued jobs have just been touched; start them too
+        if requeued:
+            waiting += list(ExportJob.objects.filter(
+                status='queued', updated_at__gte=idle
+            ).values_list('job_id', flat=True))
+        for job_id in dict.fromkeys(waiting):
+            ExportJobService.schedule(job_id)
+        return {'requeued': requeued, 'started': len(waiting), 'pruned': ExportJobService.prune_expired()}
+
+    # ------------------------------------------------------------------
+    # Serving jobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def to_dict(job: ExportJob) -> Dict:
+        if job.status == 'completed':
+            progress = 100.0
+        elif job.rows_total:
+            progress = round(min(job.rows_written / job.rows_total, 1.0) * 100, 1)
+        else:
+            progress = None
+        return {
+            'job_id': str(job.job_id),
+            'kind': job.kind,
+            'format': job.format,
+            'status': job.status,
+            'progress': progress,
+            'rows_written': job.rows_written,
+            'rows_total': job.rows_total,
+            'bytes_written': job.bytes_written,
+            'filename': job.filename,
+            'error': job.error or None,
+            'created_at': job.created_at.isoformat(),
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+            'expires_at': job.expires_at.isoformat() if job.expires_at else None,
+            'download_url': f"/api/v1/exports/{job.job_id}/download/" if job.status == 'completed' else None,
+        }
+
+    @staticmethod
+    def read(job: ExportJob, start: int, end: int) -> Generator[bytes, None, None]:
+        """Bytes `start`..`end` (inclusive) of a completed job's artifact."""
+        return get_storage().read_range(job.job_id, job.chunks_committed, start, end)
@@ -6,6 +6,7 @@ import json
 import csv
 from io import StringIO, BytesIO
 from datetime import datetime, timedelta
+from django.db.models import Count, Q
 from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 from core.models import TrackerDefinition, TrackerInstance, TaskInstance, TaskTemplate, UserPreferences
@@ -62,15 +63,26 @@ class ExportService:
         if tracker_id:
             tasks = tasks.filter(tracker_instance__tracker__tracker_id=tracker_id)
         
-        # Aggregate by day
+        # Aggregate by day in one grouped query
+        per_day = {
+            row['tracker_instance__tracking_date']: row
+            for row in tasks.values('tracker_instance__tracking_date').annotate(
+                total=Count('task_instance_id'),
+                completed=Count('task_instance_id', filter=Q(status='DONE'))
+            ).order_by()
+        }
+        
         daily_data = []
         current_date = start_date
+        all_tasks = all_completed = 0
         
         while current_date <= end_date:
-            day_tasks = tasks.filter(tracker_instance__tracking_date=current_date)
-            total = day_tasks.count()
-            completed = day_tasks.filter(status='DONE').count()
+            day = per_day.get(current_date, {})
+            total = day.get('total', 0)
+            completed = day.get('completed', 0)
             rate = (completed / total * 100) if total > 0 else 0
+            all_tasks += total
+            all_completed += completed
             
             daily_data.append({
                 'date': current_date.isoformat(),
@@ -83,8 +95,6 @@ class ExportService:
             current_date += timedelta(days=1)
         
         # Overall stats
-        all_tasks = tasks.count()
-        all_completed = tasks.filter(status='DONE').count()
         overall_rate = (all_completed / all_tasks * 100) if all_tasks > 0 else 0
         
         return {
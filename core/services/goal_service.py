@@ -8,6 +8,9 @@ from django.db import transaction
 from django.db.models import Sum, Count, Q, F
 from core.models import Goal, GoalTaskMapping, TaskInstance, Notification
 
+# Goals whose progress follows task writes
+ACTIVE_GOAL_STATUSES = ('active', 'paused')
+
 class GoalService:
     """Manage goal progress calculations and updates."""
     
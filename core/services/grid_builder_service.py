@@ -4,9 +4,17 @@ Grid Builder Service
 Consolidates duplicated grid-building logic from time views.
 Reduces 520 lines of duplicated code to ~200 lines of reusable service.
 """
+from array import array
 from datetime import date, timedelta
 from typing import List, Dict, Optional
 from core.repositories import base_repository as crud
+from core.services.instance_service import virtual_instances_enabled, virtual_task_id
+
+# Grid cell status codes; 0 marks a day with no task
+GRID_STATUSES = (None, 'TODO', 'IN_PROGRESS', 'DONE', 'MISSED', 'SKIPPED', 'BLOCKED')
+STATUS_CODES = {status: code for code, status in enumerate(GRID_STATUSES) if status}
+TODO_CODE = STATUS_CODES['TODO']
+DONE_CODE = STATUS_CODES['DONE']
 
 
 class GridBuilderService:
@@ -33,6 +41,10 @@ class GridBuilderService:
         """
         Unified grid builder for all time views.
         
+        Reads flat (template, day, status) rows, packs them into
+        templates x dates arrays and derives the grid, totals and stats
+        from those arrays in one pass (see _fill_columns).
+        
         Args:
             dates: List of dates to include in grid
             layout: 'date' (rows=templates, cols=dates) or 'task' (rows=dates, cols=templates)
@@ -42,14 +54,14 @@ class GridBuilderService:
                 'tracker': tracker dict,
                 'templates': list of templates,
                 'grid': grid data structure,
+                'totals': {'rows': [per template], 'columns': [per date]},
                 'stats': calculated statistics,
                 'dates': processed dates list
             }
         """
-        # Fetch all data efficiently using optimized queries
-        data = crud.get_day_grid_data(self.tracker_id, dates)
+        data = crud.get_grid_columns(self.tracker_id, min(dates), max(dates)) if dates else None
         
-        tracker = data['tracker']
+        tracker = data['tracker'] if data else None
         if not tracker:
             return {
                 'tracker': None,
@@ -60,28 +72,146 @@ class GridBuilderService:
             }
         
         templates = data['templates']
-        instances_map = data['instances_map']
-        
-        # Build grid based on layout
-        if layout == 'date':
-            grid = self._build_date_grid(templates, instances_map, dates)
-        elif layout == 'task':
-            grid = self._build_task_grid(templates, instances_map, dates)
+        columns = self._fill_columns(templates, data['cells'], dates)
+        
+        # Untouched days of daily trackers have no rows; their cells carry virtual IDs
+        if tracker.get('time_mode', 'daily') == 'daily' and virtual_instances_enabled():
+            tracker_id = str(tracker['tracker_id'])
+            day_has_rows = columns['column_total']
+            for i, template in enumerate(templates):
+                if not template.get('is_recurring', True):
+                    continue
+                for j, current_date in enumerate(dates):
+                    if not day_has_rows[j]:
+                        columns['task_ids'][i * len(dates) + j] = virtual_task_id(
+                            tracker_id, current_date, template['template_id']
+                        )
+        
+        if layout == 'task':
+            grid = self._build_task_grid(templates, dates, columns)
         else:
-            grid = self._build_date_grid(templates, instances_map, dates)
-        
-        # Calculate statistics
-        stats = self._calculate_grid_stats(grid, layout)
+            grid = self._build_date_grid(templates, dates, columns)
         
         return {
             'tracker': tracker,
             'templates': templates,
             'grid': grid,
-            'stats': stats,
+            'totals': {
+                'rows': [
+                    {'template_id': template['template_id'], 'done': columns['row_done'][i],
+                     'total': columns['row_total'][i], 'points': columns['row_points'][i]}
+                    for i, template in enumerate(templates)
+                ],
+                'columns': [
+                    {'date': current_date, 'done': columns['column_done'][j],
+                     'total': columns['column_total'][j], 'points': columns['column_points'][j]}
+                    for j, current_date in enumerate(dates)
+                ],
+            },
+            'stats': columns['stats'],
             'dates': dates
         }
     
-    def _build_date_grid(self, templates: List[Dict], instances_map: Dict, dates: List[date]) -> List[Dict]:
+    @staticmethod
+    def _fill_columns(templates: List[Dict], cells: List[tuple], dates: List[date]) -> Dict:
+        """
+        Pack grid rows into flat templates x dates arrays in a single pass.
+        
+        Cell (i, j) of template i and date j lives at index i * len(dates) + j.
+        Status codes index GRID_STATUSES (0 = no task that day); the first
+        task of a template per day wins, as in the old nested lookup.
+        
+        Returns:
+            {
+                'statuses': bytearray of status codes,
+                'task_ids': [task ID or None],
+                'notes': {index: notes} (non-empty only),
+                'row_done' / 'row_total' / 'row_points': arrays per template,
+                'column_done' / 'column_total' / 'column_points': arrays per date,
+                'stats': grid statistics
+            }
+        """
+        width = len(dates)
+        row_of = {str(template['template_id']): i for i, template in enumerate(templates)}
+        column_of = {current_date: j for j, current_date in enumerate(dates)}
+        points = [template.get('points') or 0 for template in templates]
+        
+        statuses = bytearray(len(templates) * width)
+        task_ids = [None] * len(statuses)
+        notes = {}
+        row_done, row_total, row_points = (array('i', [0]) * len(templates) for _ in range(3))
+        column_done, column_total, column_points = (array('i', [0]) * width for _ in range(3))
+        status_counts = array('i', [0]) * len(GRID_STATUSES)
+        
+        for template_id, period_start, status, task_id, note in cells:
+            i = row_of.get(str(template_id))
+            j = column_of.get(period_start)
+            if i is None or j is None:
+                continue
+            index = i * width + j
+            if statuses[index]:
+                continue
+            
+            code = STATUS_CODES.get(status, TODO_CODE)
+            statuses[index] = code
+            task_ids[index] = str(task_id)
+            if note:
+                notes[index] = note
+            
+            status_counts[code] += 1
+            row_total[i] += 1
+            column_total[j] += 1
+            if code == DONE_CODE:
+                row_done[i] += 1
+                column_done[j] += 1
+                row_points[i] += points[i]
+                column_points[j] += points[i]
+        
+        total = sum(status_counts)
+        done = status_counts[DONE_CODE]
+        return {
+            'statuses': statuses,
+            'task_ids': task_ids,
+            'notes': notes,
+            'row_done': row_done,
+            'row_total': row_total,
+            'row_points': row_points,
+            'column_done': column_done,
+            'column_total': column_total,
+            'column_points': column_points,
+            'stats': {
+                'total_tasks': total,
+                'done_tasks': done,
+                'in_progress_tasks': status_counts[STATUS_CODES['IN_PROGRESS']],
+                # Skipped and blocked tasks count as to-do, as before
+                'todo_tasks': total - done - status_counts[STATUS_CODES['IN_PROGRESS']]
+                              - status_counts[STATUS_CODES['MISSED']],
+                'missed_tasks': status_counts[STATUS_CODES['MISSED']],
+                'completion_rate': round(done / total * 100, 1) if total else 0.0
+            }
+        }
+    
+    @staticmethod
+    def _cell(template: Dict, index: int, columns: Dict) -> Dict:
+        """Serialize one grid cell straight from the column arrays."""
+        code = columns['statuses'][index]
+        status = GRID_STATUSES[code] or 'TODO'
+        notes = columns['notes'].get(index, '')
+        task_id = columns['task_ids'][index]
+        return {
+            'task': {
+                'task_instance_id': task_id,
+                'template_id': template['template_id'],
+                'status': status,
+                'notes': notes
+            } if code else None,
+            'task_id': task_id,
+            'status': status,
+            'is_done': code == DONE_CODE,
+            'notes': notes
+        }
+    
+    def _build_date_grid(self, templates: List[Dict], dates: List[date], columns: Dict) -> List[Dict]:
         """
         Build grid with templates as rows and dates as columns.
         Used by: monthly_tracker, week_view, custom_range_view
@@ -91,7 +221,7 @@ class GridBuilderService:
                 {
                     'template': template_dict,
                     'days': [
-                        {'date': date, 'task': task_dict, 'status': str, ...},
+                        {'date': date, 'task': task_dict, 'task_id': str, 'status': str, ...},
                         ...
                     ]
                 },
@@ -99,43 +229,25 @@ class GridBuilderService:
             ]
         """
         today = date.today()
-        grid = []
+        width = len(dates)
         
-        for template in templates:
-            row = {
+        return [
+            {
                 'template': template,
-                'days': []
+                'days': [
+                    {
+                        'date': current_date,
+                        'day': current_date.day,
+                        'is_today': current_date == today,
+                        **self._cell(template, i * width + j, columns)
+                    }
+                    for j, current_date in enumerate(dates)
+                ]
             }
-            
-            for current_date in dates:
-                date_str = current_date.isoformat()
-                
-                # O(1) lookup from pre-built map
-                inst = instances_map.get(date_str)
-                task = None
-                
-                if inst and 'tasks' in inst:
-                    # Find matching task from prefetched tasks
-                    task = next(
-                        (t for t in inst['tasks'] if t.get('template_id') == template['template_id']),
-                        None
-                    )
-                
-                row['days'].append({
-                    'date': current_date,
-                    'day': current_date.day,
-                    'task': task,
-                    'status': task.get('status', 'TODO') if task else 'TODO',
-                    'is_done': task and task.get('status') == 'DONE',
-                    'is_today': current_date == today,
-                    'notes': task.get('notes', '') if task else ''
-                })
-            
-            grid.append(row)
-        
-        return grid
+            for i, template in enumerate(templates)
+        ]
     
-    def _build_task_grid(self, templates: List[Dict], instances_map: Dict, dates: List[date]) -> List[Dict]:
+    def _build_task_grid(self, templates: List[Dict], dates: List[date], columns: Dict) -> List[Dict]:
         """
         Build grid with dates as rows and templates as columns.
         Alternative layout - could be used for different visualizations.
@@ -145,7 +257,7 @@ class GridBuilderService:
                 {
                     'date': date,
                     'tasks': [
-                        {'template': template_dict, 'task': task_dict, 'status': str, ...},
+                        {'template': template_dict, 'task': task_dict, 'task_id': str, 'status': str, ...},
                         ...
                     ]
                 },
@@ -153,107 +265,20 @@ class GridBuilderService:
             ]
         """
         today = date.today()
-        grid = []
+        width = len(dates)
         
-        for current_date in dates:
-            date_str = current_date.isoformat()
-            inst = instances_map.get(date_str)
-            
-            row = {
+        return [
+            {
                 'date': current_date,
                 'day': current_date.day,
                 'is_today': current_date == today,
-                'tasks': []
-            }
-            
-            for template in templates:
-                task = None
-                
-                if inst and 'tasks' in inst:
-                    task = next(
-                        (t for t in inst['tasks'] if t.get('template_id') == template['template_id']),
-                        None
-                    )
-                
-                row['tasks'].append({
-                    'template': template,
-                    'task': task,
-                    'status': task.get('status', 'TODO') if task else 'TODO',
-                    'is_done': task and task.get('status') == 'DONE',
-                    'notes': task.get('notes', '') if task else ''
-                })
-            
-            grid.append(row)
-        
-        return grid
-    
-    def _calculate_grid_stats(self, grid: List[Dict], layout: str) -> Dict:
-        """
-        Calculate statistics for the grid.
-        
-        Args:
-            grid: Grid data structure
-            layout: Grid layout type
-            
-        Returns:
-            {
-                'total_tasks': int,
-                'done_tasks': int,
-                'in_progress_tasks': int,
-                'todo_tasks': int,
-                'missed_tasks': int,
-                'completion_rate': float
+                'tasks': [
+                    {'template': template, **self._cell(template, i * width + j, columns)}
+                    for i, template in enumerate(templates)
+                ]
             }
-        """
-        total_tasks = 0
-        done_tasks = 0
-        in_progress_tasks = 0
-        todo_tasks = 0
-        missed_tasks = 0
-        
-        if layout == 'date':
-            # Grid format: rows=templates, cols=days
-            for row in grid:
-                for day in row.get('days', []):
-                    task = day.get('task')
-                    if task:
-                        total_tasks += 1
-                        status = task.get('status', 'TODO')
-                        if status == 'DONE':
-                            done_tasks += 1
-                        elif status == 'IN_PROGRESS':
-                            in_progress_tasks += 1
-                        elif status == 'MISSED':
-                            missed_tasks += 1
-                        else:
-                            todo_tasks += 1
-        elif layout == 'task':
-            # Grid format: rows=dates, cols=tasks
-            for row in grid:
-                for task_item in row.get('tasks', []):
-                    task = task_item.get('task')
-                    if task:
-                        total_tasks += 1
-                        status = task.get('status', 'TODO')
-                        if status == 'DONE':
-                            done_tasks += 1
-                        elif status == 'IN_PROGRESS':
-                            in_progress_tasks += 1
-                        elif status == 'MISSED':
-                            missed_tasks += 1
-                        else:
-                            todo_tasks += 1
-        
-        completion_rate = (done_tasks / total_tasks * 100) if total_tasks > 0 else 0.0
-        
-        return {
-            'total_tasks': total_tasks,
-            'done_tasks': done_tasks,
-            'in_progress_tasks': in_progress_tasks,
-            'todo_tasks': todo_tasks,
-            'missed_tasks': missed_tasks,
-            'completion_rate': round(completion_rate, 1)
-        }
+            for j, current_date in enumerate(dates)
+        ]
     
     def build_monthly_grid(self, year: int, month: int) -> Dict:
         """
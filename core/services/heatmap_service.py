@@ -0,0 +1,222 @@
+"""
+Heatmap Service
+
+One backend for every completion heatmap (the 12-week dashboard strip,
+yearly calendars, per-tracker views). Windows of any length are served
+from DailyTrackerRollup, which RollupService keeps current on writes, in
+a single indexed range scan summed per day.
+
+Results are cached under their ETag, which embeds the user's change
+sequence: any write to the user's data moves it, so cached heatmaps are
+never stale and never dropped just because the day rolled over.
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Sum
+
+from core.models import DailyTrackerRollup, TrackerDefinition
+from core.services.change_service import ChangeService
+from core.services.rollup_service import RollupService
+
+DEFAULT_WEEKS = 12
+
+# Longest window served, in days (about five years)
+MAX_WINDOW_DAYS = 366 * 5
+
+# Cached heatmaps are keyed by ETag, so this only bounds memory use
+HEATMAP_CACHE_TTL = 3600
+
+
+def activity_level(done: int, total: int) -> int:
+    """0-4 activity level for a heatmap cell."""
+    if total == 0:
+        return 0
+    rate = done / total
+    if rate >= 0.9:
+        return 4
+    elif rate >= 0.7:
+        return 3
+    elif rate >= 0.5:
+        return 2
+    elif rate > 0:
+        return 1
+    return 0
+
+
+class HeatmapService:
+    """Serve completion heatmaps from daily rollups."""
+
+    @staticmethod
+    def window(
+        weeks: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        today: Optional[date] = None
+    ) -> tuple:
+        """
+        Resolve a heatmap window to (start, end).
+
+        An explicit start/end wins; otherwise the window covers the last
+        `weeks` full weeks plus the current one, starting on a Sunday.
+
+        Raises:
+            ValueError: If the window is empty or longer than MAX_WINDOW_DAYS
+        """
+        today = today or date.today()
+        if start is None:
+            end = end or today
+            weeks = DEFAULT_WEEKS if weeks is None else weeks
+            days_since_sunday = (end.weekday() + 1) % 7
+            start = end - timedelta(days=weeks * 7 + days_since_sunday)
+        end = end or today
+
+        if end < start:
+            raise ValueError("Heatmap window ends before it starts")
+        if (end - start).days >= MAX_WINDOW_DAYS:
+            raise ValueError(f"Heatmap window is limited to {MAX_WINDOW_DAYS} days")
+        return start, end
+
+    @staticmethod
+    def etag(user_id: int, start: date, end: date, tracker_id: Optional[str] = None) -> str:
+        """ETag of a heatmap window; moves with every write to the user's data."""
+        return (
+            f"heat-{user_id}-{ChangeService.current(user_id)}-"
+            f"{tracker_id or 'all'}-{start.isoformat()}-{end.isoformat()}"
+        )
+
+    @staticmethod
+    def daily_counts(
+        user_id: int,
+        start: date,
+        end: date,
+        tracker_id: Optional[str] = None
+    ) -> Dict[date, Dict]:
+        """
+        Done and total tasks per day over the user's live trackers.
+
+        Returns:
+            {date: {'done': int, 'total': int}} for days with rollup rows
+        """
+        trackers = TrackerDefinition.objects.filter(user_id=user_id, deleted_at__isnull=True)
+        if tracker_id:
+            trackers = trackers.filter(tracker_id=tracker_id)
+        tracker_ids = list(trackers.values_list('tracker_id', flat=True))
+        if not tracker_ids:
+            return {}
+
+        RollupService.apply_pending(tracker_ids)
+        rows = DailyTrackerRollup.objects.filter(
+            tracker_id__in=tracker_ids,
+            date__range=(start, end)
+        ).values('date').annotate(done=Sum('done'), total=Sum('total')).order_by()
+
+        return {row['date']: {'done': row['done'], 'total': row['total']} for row in rows}
+
+    @staticmethod
+    def get(
+        user_id: int,
+        start: date,
+        end: date,
+        tracker_id: Optional[str] = None,
+        etag: Optional[str] = None
+    ) -> Dict:
+        """
+        Heatmap of a window, cached under its ETag.
+
+        Args:
+            user_id: Owner of the trackers
+            start: First day of the window
+            end: Last day of the window (inclusive)
+            tracker_id: Limit to one tracker (default: all live trackers)
+            etag: The window's ETag if the caller already computed it
+
+        Returns:
+            {
+                'start': ISO date, 'end': ISO date,
+                'days': [{'date', 'count', 'total', 'rate', 'level'}] (tracked days),
+                'weeks': [[cell x 7], ...] Sunday-first columns, padded with
+                         {'date': None, 'level': 0, 'count': 0},
+                'etag': str
+            }
+        """
+        etag = etag or HeatmapService.etag(user_id, start, end, tracker_id)
+        cache_key = f"heatmap:{etag}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        counts = HeatmapService.daily_counts(user_id, start, end, tracker_id)
+        result = {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'days': [
+                HeatmapService._cell(day, counts[day]['done'], counts[day]['total'])
+                for day in sorted(counts)
+            ],
+            'weeks': HeatmapService._weeks(start, end, counts),
+            'etag': etag,
+        }
+        cache.set(cache_key, result, HEATMAP_CACHE_TTL)
+        return result
+
+    @staticmethod
+    def _cell(day: date, done: int, total: int) -> Dict:
+        return {
+            'date': day.isoformat(),
+            'count': done,
+            'total': total,
+            'rate': int(done / total * 100) if total else 0,
+            'level': activity_level(done, total),
+        }
+
+    @staticmethod
+    def _weeks(start: date, end: date, counts: Dict[date, Dict]) -> List[List[Dict]]:
+        """Lay the window out as Sunday-first weeks of seven cells."""
+        empty = {'date': None, 'level': 0, 'count': 0}
+        current = start - timedelta(days=(start.weekday() + 1) % 7)
+        weeks = []
+        while current <= end:
+            week = []
+            for _ in range(7):
+                if current < start or current > end:
+                    week.append(empty)
+                else:
+                    stats = counts.get(current, {'done': 0, 'total': 0})
+                    week.append(HeatmapService._cell(current, stats['done'], stats['total']))
+                current += timedelta(days=1)
+            weeks.append(week)
+        return weeks
+
+
+def request_window(params) -> Tuple[date, date, Optional[str]]:
+    """
+    (start, end, tracker_id) from heatmap query params.
+
+    Accepts start/end (ISO dates), weeks, or year; with none of them the
+    window is the current calendar year.
+
+    Raises:
+        ValueError: If a parameter is malformed or the window is invalid
+    """
+    tracker_id = params.get('tracker_id') or None
+    if params.get('start') or params.get('end'):
+        start = date.fromisoformat(params['start']) if params.get('start') else None
+        end = date.fromisoformat(params['end']) if params.get('end') else None
+        if start is None:
+            raise ValueError("Heatmap windows need a start date")
+        return HeatmapService.window(start=start, end=end) + (tracker_id,)
+    if params.get('weeks'):
+        return HeatmapService.window(weeks=int(params['weeks'])) + (tracker_id,)
+    year = int(params.get('year') or date.today().year)
+    return date(year, 1, 1), date(year, 12, 31), tracker_id
+
+
+def heatmap_etag(request) -> Optional[str]:
+    """ETag for check_etag on the heatmap endpoint; malformed requests get none."""
+    try:
+        start, end, tracker_id = request_window(request.GET)
+    except ValueError:
+        return None
+    return HeatmapService.etag(request.user.id, start, end, tracker_id)
@@ -3,18 +3,62 @@ Instance Service (ORM-Based)
 
 Manages TrackerInstance and TaskInstance creation with proper ORM usage.
 Handles all time modes: daily, weekly, monthly.
+
+Ranges (backfills, challenges, the hourly sweep) go through
+materialize_range, which inserts whole batches of periods at once.
+
+With settings.VIRTUAL_INSTANCES on, periods nobody has touched have no
+rows: readers show "virtual" TODO tasks built from the current templates
+(virtual_periods), and the period is materialized on its first write
+(resolve_task_ids).
 """
 import uuid
 from datetime import date, timedelta
 from calendar import monthrange
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
+from django.conf import settings
 from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
-from core.models import TrackerDefinition, TrackerInstance, TaskInstance, TaskTemplate
+from core.models import (
+    TrackerDefinition, TrackerInstance, TaskInstance, TaskTemplate, UserPreferences
+)
+from core.integrations.job_queue import JobQueue
+from core.services.rollup_service import RollupService
+from core.services.change_service import ChangeService
+from core.services.dashboard_snapshot_service import JOB_KIND as SNAPSHOT_JOB_KIND, tracker_job_key
 from core.utils import time_utils
 
+# Periods inserted per materialize_range batch
+MATERIALIZE_BATCH_SIZE = 500
+
+# Prefix of the IDs of tasks that have no row yet
+VIRTUAL_TASK_PREFIX = 'v:'
+
+
+def virtual_instances_enabled() -> bool:
+    """Whether untouched periods are served virtually instead of generated."""
+    return getattr(settings, 'VIRTUAL_INSTANCES', False)
+
+
+def virtual_task_id(tracker_id: str, period_start: date, template_id: str) -> str:
+    """ID of a template's task in a period that has not been materialized."""
+    return f"{VIRTUAL_TASK_PREFIX}{tracker_id}:{period_start.isoformat()}:{template_id}"
+
+
+def parse_virtual_task_id(task_id) -> Optional[Tuple[str, date, str]]:
+    """(tracker_id, period_start, template_id) of a virtual task ID, else None."""
+    task_id = str(task_id)
+    if not task_id.startswith(VIRTUAL_TASK_PREFIX):
+        return None
+    try:
+        tracker_id, period_start, template_id = task_id[len(VIRTUAL_TASK_PREFIX):].split(':')
+        return tracker_id, date.fromisoformat(period_start), template_id
+    except ValueError:
+        return None
+
+
 class InstanceService:
     """
     Core service for generating and managing tracker instances.
@@ -62,6 +106,11 @@ class InstanceService:
                 
                 if task_instances:
                     TaskInstance.objects.bulk_create(task_instances)
+                    RollupService.refresh_instances([instance.instance_id])
+                    ChangeService.record(
+                        tracker.user_id, 'task',
+                        [t.task_instance_id for t in task_instances], 'create'
+                    )
             
             return instance, created
 
@@ -106,6 +155,11 @@ class InstanceService:
                 
                 if task_instances:
                     TaskInstance.objects.bulk_create(task_instances)
+                    RollupService.refresh_instances([instance.instance_id])
+                    ChangeService.record(
+                        tracker.user_id, 'task',
+                        [t.task_instance_id for t in task_instances], 'create'
+                    )
             
             return instance, created
 
@@ -148,6 +202,11 @@ class InstanceService:
                 
                 if task_instances:
                     TaskInstance.objects.bulk_create(task_instances)
+                    RollupService.refresh_instances([instance.instance_id])
+                    ChangeService.record(
+                        tracker.user_id, 'task',
+                        [t.task_instance_id for t in task_instances], 'create'
+                    )
             
             return instance, created
 
@@ -161,14 +220,17 @@ class InstanceService:
         """Create a multi-day challenge with optional goal tracking."""
         from core.models import Goal, GoalTaskMapping
         
-        instances = []
         end_date = start_date + timedelta(days=duration_days - 1)
         
         with transaction.atomic():
-            for day_offset in range(duration_days):
-                current_date = start_date + timedelta(days=day_offset)
-                instance, _ = InstanceService.create_daily_instance(tracker, current_date)
-                instances.append(instance)
+            # Challenges count days whatever the tracker's own time mode
+            InstanceService.materialize_range([tracker], start_date, end_date, time_mode='daily')
+            instances = list(
+                TrackerInstance.objects.filter(
+                    tracker=tracker,
+                    tracking_date__range=(start_date, end_date)
+                ).order_by('tracking_date')
+            )
             
             if goal_title:
                 goal = Goal.objects.create(
@@ -182,12 +244,14 @@ class InstanceService:
                 )
                 
                 templates = tracker.templates.filter(deleted_at__isnull=True)
-                for template in templates:
-                    GoalTaskMapping.objects.create(
+                GoalTaskMapping.objects.bulk_create([
+                    GoalTaskMapping(
                         goal=goal,
                         template=template,
                         contribution_weight=1.0
                     )
+                    for template in templates
+                ])
         
         return instances
 
@@ -235,29 +299,268 @@ class InstanceService:
     ) -> List[TrackerInstance]:
         """
         Fill in missing instances for a date range.
-        Optionally mark all tasks as MISSED.
+        Optionally mark all tasks of past periods as MISSED.
+        """
+        return InstanceService.materialize_range([tracker], start_date, end_date, mark_missed)
+
+    @staticmethod
+    def materialize_range(
+        trackers: Iterable[TrackerDefinition],
+        start_date: date,
+        end_date: date,
+        mark_missed: bool = False,
+        time_mode: Optional[str] = None
+    ) -> List[TrackerInstance]:
+        """
+        Create every missing instance of the given trackers in a date range.
+        
+        Each tracker gets one instance per day, week (starting on its
+        owner's week_start) or month overlapping the range, according to
+        its time mode. Periods are handled in batches of
+        MATERIALIZE_BATCH_SIZE: each batch looks up existing periods and
+        templates once and inserts instances and tasks with bulk_create.
+        
+        Args:
+            trackers: Trackers to fill (any iterable, e.g. a queryset)
+            start_date: First day of the range
+            end_date: Last day of the range (inclusive)
+            mark_missed: Create tasks of periods ended before today as MISSED
+            time_mode: Use this mode instead of each tracker's own
+            
+        Returns:
+            Created instances; periods that already exist are skipped
         """
-        existing_dates = set(
-            TrackerInstance.objects.filter(
+        created = []
+        week_starts = {}
+        pending = []
+        
+        for tracker in trackers:
+            mode = time_mode or tracker.time_mode
+            if mode == 'weekly' and tracker.user_id not in week_starts:
+                week_starts[tracker.user_id] = UserPreferences.objects.filter(
+                    user_id=tracker.user_id
+                ).values_list('week_start', flat=True).first() or 0
+            
+            for period in time_utils.iter_periods(
+                mode, start_date, end_date, week_starts.get(tracker.user_id, 0)
+            ):
+                pending.append((tracker, mode) + period)
+                if len(pending) >= MATERIALIZE_BATCH_SIZE:
+                    created += InstanceService._materialize_batch(pending, mark_missed)
+                    pending = []
+        
+        if pending:
+            created += InstanceService._materialize_batch(pending, mark_missed)
+        return created
+
+    @staticmethod
+    def virtual_periods(
+        trackers: Iterable[TrackerDefinition],
+        target_date: date
+    ) -> Dict[str, Tuple[TrackerInstance, List[TaskInstance]]]:
+        """
+        Unsaved instances and TODO tasks for the periods covering a date.
+        
+        Tasks come from the trackers' current templates (recurring ones
+        only for daily trackers, as materialize_range does) and carry
+        virtual task IDs, which resolve_task_ids turns into rows on the
+        first write. Pass trackers that have no instance for the period.
+        
+        Args:
+            trackers: Trackers to synthesize periods for
+            target_date: Day the periods must cover
+            
+        Returns:
+            {tracker_id: (instance, [task, ...] heaviest first)}
+        """
+        trackers = list(trackers)
+        if not trackers:
+            return {}
+        
+        week_starts = {}
+        templates = {str(tracker.tracker_id): [] for tracker in trackers}
+        for template in TaskTemplate.objects.filter(
+            tracker_id__in=list(templates),
+            deleted_at__isnull=True
+        ).order_by('-weight'):
+            templates[str(template.tracker_id)].append(template)
+        
+        periods = {}
+        for tracker in trackers:
+            if tracker.time_mode == 'weekly' and tracker.user_id not in week_starts:
+                week_starts[tracker.user_id] = UserPreferences.objects.filter(
+                    user_id=tracker.user_id
+                ).values_list('week_start', flat=True).first() or 0
+            period_start, period_end = next(time_utils.iter_periods(
+                tracker.time_mode, target_date, target_date, week_starts.get(tracker.user_id, 0)
+            ))
+            
+            tracker_id = str(tracker.tracker_id)
+            instance = TrackerInstance(
+                instance_id=f"{VIRTUAL_TASK_PREFIX}{tracker_id}:{period_start.isoformat()}",
                 tracker=tracker,
-                tracking_date__range=(start_date, end_date)
-            ).values_list('tracking_date', flat=True)
+                tracking_date=period_start,
+                period_start=period_start,
+                period_end=period_end,
+                status='active'
+            )
+            periods[tracker_id] = (instance, [
+                TaskInstance(
+                    task_instance_id=virtual_task_id(tracker_id, period_start, template.template_id),
+                    tracker_instance=instance,
+                    template=template,
+                    status='TODO',
+                    snapshot_description=template.description,
+                    snapshot_points=template.points,
+                    snapshot_weight=template.weight
+                )
+                for template in templates[tracker_id]
+                if tracker.time_mode != 'daily' or template.is_recurring
+            ])
+        return periods
+    
+    @staticmethod
+    def resolve_task_ids(task_ids: Iterable, user=None) -> Dict[str, str]:
+        """
+        Map task IDs to real ones, materializing the periods of virtual IDs.
+        
+        Real IDs map to themselves. A virtual ID maps to its template's
+        task once its period exists; IDs of deleted or (given user)
+        someone else's trackers are left out, so lookups report them
+        missing.
+        
+        Args:
+            task_ids: Task instance IDs, real or virtual
+            user: Only materialize this user's trackers
+            
+        Returns:
+            {given_id: task_instance_id}
+        """
+        resolved = {}
+        virtual = {}
+        for task_id in task_ids:
+            parsed = parse_virtual_task_id(task_id)
+            if parsed is None:
+                resolved[str(task_id)] = str(task_id)
+            else:
+                virtual[str(task_id)] = parsed
+        if not virtual:
+            return resolved
+        
+        trackers = TrackerDefinition.objects.filter(
+            tracker_id__in={tracker_id for tracker_id, _, _ in virtual.values()},
+            deleted_at__isnull=True
         )
+        if user is not None:
+            trackers = trackers.filter(user=user)
+        trackers = {str(tracker.tracker_id): tracker for tracker in trackers}
         
-        instances = []
-        current = start_date
+        with transaction.atomic():
+            for tracker_id, period_start in {
+                (tracker_id, period_start) for tracker_id, period_start, _ in virtual.values()
+                if tracker_id in trackers
+            }:
+                InstanceService.materialize_range([trackers[tracker_id]], period_start, period_start)
+            
+            found = {
+                (str(tracker_id), tracking_date, str(template_id)): str(task_id)
+                for tracker_id, tracking_date, template_id, task_id in TaskInstance.objects.filter(
+                    tracker_instance__tracker_id__in=list(trackers),
+                    tracker_instance__tracking_date__in={period_start for _, period_start, _ in virtual.values()},
+                    template_id__in={template_id for _, _, template_id in virtual.values()},
+                    deleted_at__isnull=True
+                ).values_list(
+                    'tracker_instance__tracker_id', 'tracker_instance__tracking_date',
+                    'template_id', 'task_instance_id'
+                )
+            }
+        
+        for task_id, key in virtual.items():
+            if key in found:
+                resolved[task_id] = found[key]
+        return resolved
+
+    @staticmethod
+    def _materialize_batch(periods: List[Tuple], mark_missed: bool) -> List[TrackerInstance]:
+        """Insert the missing (tracker, mode, period_start, period_end) periods."""
+        tracker_ids = {str(tracker.tracker_id) for tracker, _, _, _ in periods}
+        existing = {
+            (str(tracker_id), tracking_date)
+            for tracker_id, tracking_date in TrackerInstance.objects.filter(
+                tracker_id__in=tracker_ids,
+                tracking_date__in={period_start for _, _, period_start, _ in periods}
+            ).values_list('tracker_id', 'tracking_date')
+        }
         
+        instances = [
+            TrackerInstance(
+                instance_id=str(uuid.uuid4()),
+                tracker=tracker,
+                tracking_date=period_start,
+                period_start=period_start,
+                period_end=period_end,
+                status='active'
+            )
+            for tracker, _, period_start, period_end in periods
+            if (str(tracker.tracker_id), period_start) not in existing
+        ]
+        if not instances:
+            return []
+        modes = {str(tracker.tracker_id): mode for tracker, mode, _, _ in periods}
+        
+        templates = {}
+        for template in TaskTemplate.objects.filter(
+            tracker_id__in={str(instance.tracker_id) for instance in instances},
+            deleted_at__isnull=True
+        ):
+            templates.setdefault(str(template.tracker_id), []).append(template)
+        
+        today = date.today()
         with transaction.atomic():
-            while current <= end_date:
-                if current not in existing_dates:
-                    if tracker.time_mode == 'daily':
-                        instance, _ = InstanceService.create_daily_instance(tracker, current)
-                        if mark_missed and current < date.today():
-                            instance.tasks.update(status='MISSED')
-                        instances.append(instance)
-                    # Add logic for weekly/monthly if needed
-                
-                current += timedelta(days=1)
+            TrackerInstance.objects.bulk_create(instances, ignore_conflicts=True)
+            
+            # Drop periods another writer created since the lookup above
+            inserted = set(
+                TrackerInstance.objects.filter(
+                    instance_id__in=[instance.instance_id for instance in instances]
+                ).values_list('instance_id', flat=True)
+            )
+            instances = [instance for instance in instances if instance.instance_id in inserted]
+            TrackerInstance.history.bulk_history_create(instances)
+            
+            tasks = []
+            for instance in instances:
+                tracker_id = str(instance.tracker_id)
+                status = 'MISSED' if mark_missed and instance.period_end < today else 'TODO'
+                for template in templates.get(tracker_id, ()):
+                    # Daily periods only repeat recurring tasks
+                    if modes[tracker_id] == 'daily' and not template.is_recurring:
+                        continue
+                    tasks.append(TaskInstance(
+                        task_instance_id=str(uuid.uuid4()),
+                        tracker_instance=instance,
+                        template=template,
+                        status=status,
+                        snapshot_description=template.description,
+                        snapshot_points=template.points,
+                        snapshot_weight=template.weight
+                    ))
+            TaskInstance.objects.bulk_create(tasks, batch_size=MATERIALIZE_BATCH_SIZE)
+            
+            # bulk_create bypasses signals
+            RollupService.refresh_instances([instance.instance_id for instance in instances])
+            task_ids_by_user = {instance.tracker.user_id: [] for instance in instances}
+            for task in tasks:
+                task_ids_by_user[task.tracker_instance.tracker.user_id].append(task.task_instance_id)
+            for user_id, task_ids in task_ids_by_user.items():
+                if task_ids:
+                    ChangeService.record(user_id, 'task', task_ids, 'create')
+                else:
+                    ChangeService.bump(user_id)
+            JobQueue.enqueue(
+                SNAPSHOT_JOB_KIND,
+                [tracker_job_key(tracker_id) for tracker_id in {str(i.tracker_id) for i in instances}]
+            )
         
         return instances
 
@@ -277,6 +580,29 @@ def ensure_tracker_instance(tracker_id: str, reference_date: date = None, user=N
 def get_instance_for_date(tracker_id: str, target_date: date, user=None) -> TrackerInstance:
     return ensure_tracker_instance(tracker_id, target_date, user)
 
+def check_all_trackers(reference_date: date = None) -> int:
+    """
+    Make sure every active tracker has an instance for the current period.
+    
+    Run hourly by the scheduler across all users. Does nothing with
+    virtual instances on: periods are then materialized on first write.
+    
+    Returns:
+        Number of instances created
+    """
+    if virtual_instances_enabled():
+        return 0
+    
+    if reference_date is None:
+        reference_date = date.today()
+    
+    trackers = TrackerDefinition.objects.filter(
+        status='active',
+        deleted_at__isnull=True
+    ).iterator(chunk_size=MATERIALIZE_BATCH_SIZE)
+    
+    return len(InstanceService.materialize_range(trackers, reference_date, reference_date))
+
 def get_tasks_for_instance(instance_id: str, user=None):
     qs = TaskInstance.objects.filter(tracker_instance__instance_id=instance_id)
     if user:
@@ -6,17 +6,23 @@ Provides graph data for network visualization in the frontend.
 
 Written from scratch for Version 2.0
 """
-from typing import Dict, List, Optional, Tuple
-from datetime import date, timedelta
-from django.db.models import Count, Q
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+from django.db.models.functions import Substr
 from core.models import (
-    EntityRelation, TrackerDefinition, TaskTemplate, Goal, 
-    GoalTaskMapping, DayNote, TaskInstance, TrackerInstance
+    TrackerDefinition, TaskTemplate, TaskTemplateTag, Goal,
+    GoalTaskMapping, DayNote
 )
+from core.services.relation_graph_service import RelationGraphService, node_key
+import heapq
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Notes are the most numerous node type; only the most recent are drawn
+MAX_GRAPH_NOTES = 100
+
 
 class KnowledgeGraphService:
     """
@@ -51,339 +57,305 @@ class KnowledgeGraphService:
     }
     
     @staticmethod
-    def get_full_graph(user_id: int, include_notes: bool = False) -> Dict:
+    def get_full_graph(
+        user_id: int,
+        include_notes: bool = False,
+        max_nodes: Optional[int] = None,
+        min_degree: int = 0
+    ) -> Dict:
         """
         Get the complete knowledge graph for a user.
         
+        Loads everything in a fixed number of queries (trackers, templates,
+        template tags, goals, goal mappings, notes; relations come from the
+        cached relation index), however many trackers the user has.
+        
         Args:
             user_id: User ID
             include_notes: Whether to include DayNotes (can be large)
+            max_nodes: Keep at most this many nodes, highest degree first
+            min_degree: Drop nodes with fewer edges than this
             
         Returns:
             Dict with nodes and edges for visualization
         """
+        nodes, edges = KnowledgeGraphService._load_full_graph(user_id, include_notes)
+        loaded = len(nodes)
+        
+        if min_degree > 0 or max_nodes is not None:
+            nodes, edges = KnowledgeGraphService._prune(nodes, edges, max_nodes, min_degree)
+        
+        node_types = Counter(node['type'] for node in nodes)
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'stats': {
+                'total_nodes': len(nodes),
+                'total_edges': len(edges),
+                'pruned_nodes': loaded - len(nodes),
+                'node_types': {
+                    'trackers': node_types['tracker'],
+                    'templates': node_types['template'],
+                    'goals': node_types['goal'],
+                    'tags': node_types['tag'],
+                    'notes': node_types['note'],
+                }
+            }
+        }
+    
+    @staticmethod
+    def _load_full_graph(user_id: int, include_notes: bool) -> Tuple[List[Dict], List[Dict]]:
+        """Nodes and edges of a user's graph, one query per entity kind."""
         nodes = []
         edges = []
         node_ids = set()
         
-        # 1. Add all trackers as nodes
+        def add_node(node_id, node_type, label, data):
+            nodes.append({
+                'id': node_id,
+                'type': node_type,
+                'label': label,
+                'data': data,
+                **KnowledgeGraphService.NODE_TYPES[node_type]
+            })
+            node_ids.add(node_id)
+        
+        def add_edge(source, target, relation_type, **extra):
+            edges.append({
+                'source': source,
+                'target': target,
+                'type': relation_type,
+                'color': KnowledgeGraphService.RELATION_COLORS.get(relation_type, '#6B7280'),
+                **extra
+            })
+        
+        # 1. Trackers
         trackers = TrackerDefinition.objects.filter(
             user_id=user_id,
             deleted_at__isnull=True
-        )
+        ).values('tracker_id', 'name', 'time_mode', 'status')
         
         for tracker in trackers:
-            node_id = f"tracker:{tracker.tracker_id}"
-            nodes.append({
-                'id': node_id,
-                'type': 'tracker',
-                'label': tracker.name,
-                'data': {
-                    'tracker_id': str(tracker.tracker_id),
-                    'time_mode': tracker.time_mode,
-                    'status': tracker.status
-                },
-                **KnowledgeGraphService.NODE_TYPES['tracker']
+            add_node(f"tracker:{tracker['tracker_id']}", 'tracker', tracker['name'], {
+                'tracker_id': str(tracker['tracker_id']),
+                'time_mode': tracker['time_mode'],
+                'status': tracker['status']
             })
-            node_ids.add(node_id)
-            
-            # 2. Add templates and connect to tracker
-            templates = TaskTemplate.objects.filter(
-                tracker=tracker,
-                deleted_at__isnull=True
-            ).prefetch_related('task_tags__tag')
-            
-            for template in templates:
-                tmpl_node_id = f"template:{template.template_id}"
-                
-                if tmpl_node_id not in node_ids:
-                    nodes.append({
-                        'id': tmpl_node_id,
-                        'type': 'template',
-                        'label': template.description[:30],
-                        'data': {
-                            'template_id': str(template.template_id),
-                            'category': template.category,
-                            'points': template.points
-                        },
-                        **KnowledgeGraphService.NODE_TYPES['template']
-                    })
-                    node_ids.add(tmpl_node_id)
-                
-                edges.append({
-                    'source': node_id,
-                    'target': tmpl_node_id,
-                    'type': 'has',
-                    'color': KnowledgeGraphService.RELATION_COLORS['has']
+        
+        # 2. Templates, connected to their tracker
+        templates = TaskTemplate.objects.filter(
+            tracker__user_id=user_id,
+            tracker__deleted_at__isnull=True,
+            deleted_at__isnull=True
+        ).values('template_id', 'tracker_id', 'description', 'category', 'points')
+        
+        for template in templates:
+            tmpl_node_id = f"template:{template['template_id']}"
+            add_node(tmpl_node_id, 'template', template['description'][:30], {
+                'template_id': str(template['template_id']),
+                'category': template['category'],
+                'points': template['points']
+            })
+            add_edge(f"tracker:{template['tracker_id']}", tmpl_node_id, 'has')
+        
+        # 3. Tags on those templates
+        template_tags = TaskTemplateTag.objects.filter(
+            template__tracker__user_id=user_id,
+            template__tracker__deleted_at__isnull=True,
+            template__deleted_at__isnull=True
+        ).values('template_id', 'tag_id', 'tag__name', 'tag__color', 'tag__icon')
+        
+        for tag_rel in template_tags:
+            tag_node_id = f"tag:{tag_rel['tag_id']}"
+            if tag_node_id not in node_ids:
+                add_node(tag_node_id, 'tag', tag_rel['tag__name'], {
+                    'tag_id': str(tag_rel['tag_id']),
+                    'color': tag_rel['tag__color'],
+                    'icon': tag_rel['tag__icon']
                 })
-                
-                # Add tags
-                for tag_rel in template.task_tags.all():
-                    tag = tag_rel.tag
-                    tag_node_id = f"tag:{tag.tag_id}"
-                    
-                    if tag_node_id not in node_ids:
-                        nodes.append({
-                            'id': tag_node_id,
-                            'type': 'tag',
-                            'label': tag.name,
-                            'data': {
-                                'tag_id': str(tag.tag_id),
-                                'color': tag.color,
-                                'icon': tag.icon
-                            },
-                            **KnowledgeGraphService.NODE_TYPES['tag']
-                        })
-                        node_ids.add(tag_node_id)
-                    
-                    edges.append({
-                        'source': tmpl_node_id,
-                        'target': tag_node_id,
-                        'type': 'categorized_by',
-                        'color': KnowledgeGraphService.RELATION_COLORS['categorized_by']
-                    })
-        
-        # 3. Add goals and their connections
+            add_edge(f"template:{tag_rel['template_id']}", tag_node_id, 'categorized_by')
+        
+        # 4. Goals, attached to their tracker
         goals = Goal.objects.filter(
             user_id=user_id,
             deleted_at__isnull=True
-        )
+        ).values('goal_id', 'tracker_id', 'title', 'progress', 'status', 'target_value')
         
         for goal in goals:
-            goal_node_id = f"goal:{goal.goal_id}"
-            
-            nodes.append({
-                'id': goal_node_id,
-                'type': 'goal',
-                'label': goal.title[:30],
-                'data': {
-                    'goal_id': str(goal.goal_id),
-                    'progress': goal.progress,
-                    'status': goal.status,
-                    'target_value': goal.target_value
-                },
-                **KnowledgeGraphService.NODE_TYPES['goal']
+            goal_node_id = f"goal:{goal['goal_id']}"
+            add_node(goal_node_id, 'goal', goal['title'][:30], {
+                'goal_id': str(goal['goal_id']),
+                'progress': goal['progress'],
+                'status': goal['status'],
+                'target_value': goal['target_value']
             })
-            node_ids.add(goal_node_id)
-            
-            # Connect goal to tracker if exists
-            if goal.tracker_id:
-                tracker_node_id = f"tracker:{goal.tracker_id}"
-                if tracker_node_id in node_ids:
-                    edges.append({
-                        'source': goal_node_id,
-                        'target': tracker_node_id,
-                        'type': 'attached_to',
-                        'color': KnowledgeGraphService.RELATION_COLORS['attached_to']
-                    })
-            
-            # Connect goal to templates via mappings
-            mappings = GoalTaskMapping.objects.filter(goal=goal)
-            for mapping in mappings:
-                tmpl_node_id = f"template:{mapping.template_id}"
-                if tmpl_node_id in node_ids:
-                    edges.append({
-                        'source': tmpl_node_id,
-                        'target': goal_node_id,
-                        'type': 'contributes_to',
-                        'color': KnowledgeGraphService.RELATION_COLORS['contributes_to'],
-                        'weight': mapping.contribution_weight
-                    })
-        
-        # 4. Add entity relations (dependencies)
-        relations = EntityRelation.objects.filter(
-            user_id=user_id
-        )
-        
-        for rel in relations:
-            source_node_id = f"{rel.from_entity_type}:{rel.from_entity_id}"
-            target_node_id = f"{rel.to_entity_type}:{rel.to_entity_id}"
-            
-            if source_node_id in node_ids and target_node_id in node_ids:
-                edges.append({
-                    'source': source_node_id,
-                    'target': target_node_id,
-                    'type': rel.relation_type,
-                    'color': KnowledgeGraphService.RELATION_COLORS.get(
-                        rel.relation_type, '#6B7280'
-                    )
-                })
+            tracker_node_id = f"tracker:{goal['tracker_id']}"
+            if goal['tracker_id'] and tracker_node_id in node_ids:
+                add_edge(goal_node_id, tracker_node_id, 'attached_to')
+        
+        # 5. Templates contributing to goals
+        mappings = GoalTaskMapping.objects.filter(
+            goal__user_id=user_id,
+            goal__deleted_at__isnull=True
+        ).values('goal_id', 'template_id', 'contribution_weight')
         
-        # 5. Optionally add notes
+        for mapping in mappings:
+            tmpl_node_id = f"template:{mapping['template_id']}"
+            if tmpl_node_id in node_ids:
+                add_edge(
+                    tmpl_node_id, f"goal:{mapping['goal_id']}", 'contributes_to',
+                    weight=mapping['contribution_weight']
+                )
+        
+        # 6. Optionally notes, most recent first
         if include_notes:
             notes = DayNote.objects.filter(
-                tracker__user_id=user_id
-            ).select_related('tracker')[:100]  # Limit for performance
+                tracker__user_id=user_id,
+                deleted_at__isnull=True
+            ).annotate(
+                preview=Substr('content', 1, 50)
+            ).order_by('-date').values(
+                'note_id', 'tracker_id', 'date', 'sentiment_score', 'preview'
+            )[:MAX_GRAPH_NOTES]
             
             for note in notes:
-                note_node_id = f"note:{note.note_id}"
-                
-                nodes.append({
-                    'id': note_node_id,
-                    'type': 'note',
-                    'label': f"Note: {note.date.isoformat()}",
-                    'data': {
-                        'date': note.date.isoformat(),
-                        'sentiment': note.sentiment_score,
-                        'preview': note.content[:50] if note.content else ''
-                    },
-                    **KnowledgeGraphService.NODE_TYPES['note']
+                note_node_id = f"note:{note['note_id']}"
+                add_node(note_node_id, 'note', f"Note: {note['date'].isoformat()}", {
+                    'date': note['date'].isoformat(),
+                    'sentiment': note['sentiment_score'],
+                    'preview': note['preview'] or ''
                 })
-                node_ids.add(note_node_id)
-                
-                tracker_node_id = f"tracker:{note.tracker_id}"
+                tracker_node_id = f"tracker:{note['tracker_id']}"
                 if tracker_node_id in node_ids:
-                    edges.append({
-                        'source': note_node_id,
-                        'target': tracker_node_id,
-                        'type': 'attached_to',
-                        'color': KnowledgeGraphService.RELATION_COLORS['attached_to']
-                    })
+                    add_edge(note_node_id, tracker_node_id, 'attached_to')
         
-        return {
-            'nodes': nodes,
-            'edges': edges,
-            'stats': {
-                'total_nodes': len(nodes),
-                'total_edges': len(edges),
-                'node_types': {
-                    'trackers': sum(1 for n in nodes if n['type'] == 'tracker'),
-                    'templates': sum(1 for n in nodes if n['type'] == 'template'),
-                    'goals': sum(1 for n in nodes if n['type'] == 'goal'),
-                    'tags': sum(1 for n in nodes if n['type'] == 'tag'),
-                    'notes': sum(1 for n in nodes if n['type'] == 'note'),
-                }
-            }
-        }
+        # 7. Entity relations between nodes in the graph
+        for source, target, relation_type in RelationGraphService.get(user_id).edges:
+            if source in node_ids and target in node_ids:
+                add_edge(source, target, relation_type)
+        
+        return nodes, edges
+    
+    @staticmethod
+    def _prune(
+        nodes: List[Dict],
+        edges: List[Dict],
+        max_nodes: Optional[int],
+        min_degree: int
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Drop nodes below `min_degree`, then keep the `max_nodes` best
+        connected; edges survive only if both ends do. Degrees are taken
+        from the unpruned graph and node order is preserved.
+        """
+        degree = Counter()
+        for edge in edges:
+            degree[edge['source']] += 1
+            degree[edge['target']] += 1
+        
+        kept = [node for node in nodes if degree[node['id']] >= min_degree]
+        if max_nodes is not None and len(kept) > max_nodes:
+            best = heapq.nlargest(
+                max(max_nodes, 0), range(len(kept)),
+                key=lambda i: (degree[kept[i]['id']], -i)
+            )
+            kept = [kept[i] for i in sorted(best)]
+        
+        kept_ids = {node['id'] for node in kept}
+        return kept, [
+            edge for edge in edges
+            if edge['source'] in kept_ids and edge['target'] in kept_ids
+        ]
+    
+    @staticmethod
+    def stream_json(graph: Dict, chunk_size: int = 500) -> Iterator[str]:
+        """
+        Serialize a graph as a JSON response body in chunks, so large
+        graphs are never rendered into one string.
+        
+        Yields:
+            Pieces of {"success": true, "stats": ..., "nodes": [...], "edges": [...]}
+        """
+        yield '{"success": true, "stats": ' + json.dumps(graph['stats'])
+        for key in ('nodes', 'edges'):
+            items = graph[key]
+            yield f', "{key}": ['
+            for offset in range(0, len(items), chunk_size):
+                chunk = ', '.join(json.dumps(item) for item in items[offset:offset + chunk_size])
+                yield chunk if offset == 0 else ', ' + chunk
+            yield ']'
+        yield '}'
     
     @staticmethod
     def get_entity_connections(
         entity_type: str, 
         entity_id: str, 
-        depth: int = 2
+        depth: int = 2,
+        user_id: Optional[int] = None
     ) -> Dict:
         """
         Get connections for a specific entity up to N levels deep.
         
+        Served from the owner's in-memory relation index: nodes within
+        `depth` hops in either direction, and the relations between them.
+        
         Args:
             entity_type: Type of entity (tracker, template, goal, tag)
             entity_id: Entity ID
             depth: How many levels of connections to explore
+            user_id: Owner of the relations (looked up when omitted)
             
         Returns:
             Graph data centered on the entity
         """
-        nodes = []
-        edges = []
-        visited = set()
-        
-        def explore(e_type: str, e_id: str, current_depth: int):
-            node_key = f"{e_type}:{e_id}"
-            if node_key in visited or current_depth > depth:
-                return
-            visited.add(node_key)
-            
-            # Get outgoing relations
-            outgoing = EntityRelation.objects.filter(
-                from_entity_type=e_type,
-                from_entity_id=e_id
-            )
-            
-            for rel in outgoing:
-                target_key = f"{rel.to_entity_type}:{rel.to_entity_id}"
-                edges.append({
-                    'source': node_key,
-                    'target': target_key,
-                    'type': rel.relation_type
-                })
-                explore(rel.to_entity_type, rel.to_entity_id, current_depth + 1)
-            
-            # Get incoming relations
-            incoming = EntityRelation.objects.filter(
-                to_entity_type=e_type,
-                to_entity_id=e_id
-            )
-            
-            for rel in incoming:
-                source_key = f"{rel.from_entity_type}:{rel.from_entity_id}"
-                edges.append({
-                    'source': source_key,
-                    'target': node_key,
-                    'type': rel.relation_type
-                })
-                explore(rel.from_entity_type, rel.from_entity_id, current_depth + 1)
-        
-        explore(entity_type, entity_id, 0)
+        center = node_key(entity_type, entity_id)
+        if user_id is None:
+            user_id = RelationGraphService.owner_of(entity_type, entity_id)
+        if user_id is None:
+            distances, edges = {center: 0}, []
+        else:
+            graph = RelationGraphService.get(user_id)
+            distances, edges = graph.neighbourhood(center, max(depth, 0))
         
-        # Build nodes from visited set
-        for node_key in visited:
-            e_type, e_id = node_key.split(':', 1)
+        nodes = []
+        for key in distances:
+            e_type, e_id = key.split(':', 1)
             nodes.append({
-                'id': node_key,
+                'id': key,
                 'type': e_type,
                 'entity_id': e_id
             })
         
-        return {'nodes': nodes, 'edges': edges, 'center': f"{entity_type}:{entity_id}"}
+        return {'nodes': nodes, 'edges': edges, 'center': center}
     
     @staticmethod
     def find_path(
         source_type: str, source_id: str,
         target_type: str, target_id: str,
-        max_depth: int = 5
+        max_depth: int = 5,
+        user_id: Optional[int] = None
     ) -> Optional[List[Dict]]:
         """
         Find the shortest path between two entities.
         
-        Uses BFS to find if two entities are connected.
+        Runs a bidirectional BFS over the owner's in-memory relation index,
+        following relations in either direction.
+        
+        Args:
+            user_id: Owner of the relations (looked up when omitted)
         
         Returns:
             List of edges forming the path, or None if no path exists
         """
-        from collections import deque
-        
-        start = f"{source_type}:{source_id}"
-        end = f"{target_type}:{target_id}"
+        start = node_key(source_type, source_id)
+        end = node_key(target_type, target_id)
         
         if start == end:
             return []
         
-        queue = deque([(start, [])])
-        visited = {start}
+        if user_id is None:
+            user_id = RelationGraphService.owner_of(source_type, source_id)
+        if user_id is None:
+            return None
         
-        while queue:
-            current, path = queue.popleft()
-            c_type, c_id = current.split(':', 1)
-            
-            # Get all relations from current node
-            relations = list(EntityRelation.objects.filter(
-                Q(from_entity_type=c_type, from_entity_id=c_id) |
-                Q(to_entity_type=c_type, to_entity_id=c_id)
-            ))
-            
-            for rel in relations:
-                if rel.from_entity_type == c_type and rel.from_entity_id == c_id:
-                    next_node = f"{rel.to_entity_type}:{rel.to_entity_id}"
-                    direction = 'forward'
-                else:
-                    next_node = f"{rel.from_entity_type}:{rel.from_entity_id}"
-                    direction = 'backward'
-                
-                if next_node in visited:
-                    continue
-                
-                new_path = path + [{
-                    'from': current,
-                    'to': next_node,
-                    'relation': rel.relation_type,
-                    'direction': direction
-                }]
-                
-                if next_node == end:
-                    return new_path
-                
-                if len(new_path) < max_depth:
-                    visited.add(next_node)
-                    queue.append((next_node, new_path))
-        
-        return None
+        return RelationGraphService.get(user_id).shortest_path(start, end, max_depth)
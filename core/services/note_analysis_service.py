@@ -0,0 +1,139 @@
+"""
+Note Analysis Service
+
+Scores day notes and extracts their keywords when they are written, so
+analytics read the stored DayNote.sentiment_score and keywords columns
+instead of running the NLP pipeline per note at read time.
+
+Saves analyze the note before it is written when its content changed
+(core.signals.note_signals). Notes written without signals (imports) are
+analyzed in memory before their bulk insert, and older notes are filled
+in by the backfill_note_analysis command in keyset-paginated batches.
+All of them share the single analyzer from nlp_helpers (the built-in
+lexicon engine, or VADER in NLTK mode).
+
+A null sentiment_score means the note has not been analyzed yet (it
+predates note analysis, or analysis failed when it was saved); the
+backfill picks those notes up.
+"""
+import logging
+from typing import Iterable, List, Optional
+
+from django.db.models import QuerySet
+
+from core.helpers import nlp_helpers
+from core.models import DayNote
+
+logger = logging.getLogger(__name__)
+
+# Keywords stored per note, as [word, count] pairs
+MAX_KEYWORDS = 20
+
+# Notes scored and written per backfill batch
+BACKFILL_BATCH_SIZE = 500
+
+ANALYSIS_FIELDS = ['sentiment_score', 'keywords']
+
+
+def note_content_changed(note: DayNote) -> bool:
+    """Whether a note's content differs from when it was loaded."""
+    return (note.content or '') != (getattr(note, '_loaded_content', '') or '')
+
+
+class NoteAnalysisService:
+    """Compute and persist sentiment scores and keywords for day notes."""
+
+    @staticmethod
+    def needs_analysis(note: DayNote) -> bool:
+        """
+        Whether a note about to be saved should be (re)analyzed.
+
+        New notes keep a score they were created with; loaded notes are
+        reanalyzed when their content was edited.
+        """
+        if note.sentiment_score is None:
+            return True
+        return hasattr(note, '_loaded_content') and note_content_changed(note)
+
+    @staticmethod
+    def analyze_notes(notes: Iterable[DayNote], analyzer=None) -> int:
+        """
+        Set sentiment_score and keywords on notes in place.
+
+        Args:
+            notes: Notes to analyze (not saved)
+            analyzer: Sentiment analyzer; defaults to the shared instance
+
+        Returns:
+            Number of notes analyzed
+        """
+        if analyzer is None:
+            analyzer = nlp_helpers.get_sentiment_analyzer()
+
+        count = 0
+        for note in notes:
+            text = note.content or ''
+            if text.strip():
+                note.sentiment_score = analyzer.polarity_scores(text)['compound']
+                note.keywords = [[word, n] for word, n in nlp_helpers.extract_keywords(text, MAX_KEYWORDS)]
+            else:
+                note.sentiment_score = 0.0
+                note.keywords = []
+            count += 1
+        return count
+
+    @staticmethod
+    def apply(note: DayNote) -> bool:
+        """
+        Analyze a note before it is saved.
+
+        If analysis fails the stored analysis is cleared, since it no
+        longer matches the content, and left to the backfill.
+
+        Returns:
+            True if the note was analyzed
+        """
+        try:
+            return NoteAnalysisService.analyze_notes([note]) == 1
+        except Exception as e:
+            logger.warning(f"Note analysis failed for note {note.pk}: {e}")
+            note.sentiment_score = None
+            note.keywords = []
+            return False
+
+    @staticmethod
+    def backfill(notes: Optional[QuerySet] = None, batch_size: int = BACKFILL_BATCH_SIZE,
+                 rescore: bool = False) -> int:
+        """
+        Analyze stored notes in batches of batch_size.
+
+        Each batch is one keyset-paginated read and one bulk_update. The
+        analysis columns are derived data, so this leaves updated_at and
+        the audit history untouched.
+
+        Args:
+            notes: Notes to consider (defaults to all notes)
+            batch_size: Notes per batch
+            rescore: Re-analyze notes that already have a score
+
+        Returns:
+            Number of notes analyzed
+        """
+        analyzer = nlp_helpers.get_sentiment_analyzer()
+
+        if notes is None:
+            notes = DayNote.objects.all()
+        if not rescore:
+            notes = notes.filter(sentiment_score__isnull=True)
+        notes = notes.only('note_id', 'content', *ANALYSIS_FIELDS).order_by('note_id')
+
+        total = 0
+        last_id = None
+        while True:
+            page = notes.filter(note_id__gt=last_id) if last_id is not None else notes
+            batch: List[DayNote] = list(page[:batch_size])
+            if not batch:
+                return total
+            total += NoteAnalysisService.analyze_notes(batch, analyzer)
+            DayNote.objects.bulk_update(batch, ANALYSIS_FIELDS)
+            last_id = batch[-1].note_id
@@ -133,13 +133,41 @@ class NotificationService:
                 )
         return None
     
+    @staticmethod
+    def mark_read(user_id: int, notification_ids) -> int:
+        """Mark some of a user's notifications as read. Returns count updated."""
+        updated = Notification.objects.filter(
+            user_id=user_id,
+            notification_id__in=notification_ids,
+            is_read=False
+        ).update(is_read=True)
+        if updated:
+            NotificationService._after_bulk_read(user_id)
+        return updated
+    
     @staticmethod
     def mark_all_read(user_id: int) -> int:
         """Mark all user notifications as read. Returns count updated."""
-        return Notification.objects.filter(
+        updated = Notification.objects.filter(
             user_id=user_id,
             is_read=False
         ).update(is_read=True)
+        if updated:
+            NotificationService._after_bulk_read(user_id)
+        return updated
+    
+    @staticmethod
+    def _after_bulk_read(user_id: int) -> None:
+        """
+        queryset.update() skips post_save, so move the user's ETags and
+        patch the dashboard snapshot here.
+        """
+        from core.integrations.job_queue import JobQueue
+        from core.services.change_service import ChangeService
+        from core.services.dashboard_snapshot_service import JOB_KIND, user_job_key
+        
+        ChangeService.bump(user_id)
+        JobQueue.enqueue(JOB_KIND, [user_job_key(user_id, 'notifications_count')])
     
     @staticmethod
     def get_unread_count(user_id: int) -> int:
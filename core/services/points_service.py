@@ -10,6 +10,7 @@ from django.db.models import Sum, Count, Q
 from django.utils import timezone
 import pytz
 
+from core.repositories import base_repository as crud
 from core.models import (
     TrackerDefinition, TaskTemplate, TaskInstance, 
     TrackerInstance, UserPreferences
@@ -52,10 +53,12 @@ class PointsCalculationService:
     
     def _get_user_timezone(self) -> pytz.timezone:
         """Get user's timezone from preferences."""
+        prefs = crud.get_user_preferences(self.user.id)
+        if prefs is None:
+            return pytz.UTC
         try:
-            prefs = UserPreferences.objects.get(user=self.user)
             return pytz.timezone(prefs.timezone)
-        except (UserPreferences.DoesNotExist, pytz.UnknownTimeZoneError):
+        except pytz.UnknownTimeZoneError:
             return pytz.UTC
     
     def _get_today_in_user_tz(self) -> date:
@@ -68,10 +71,7 @@ class PointsCalculationService:
     def tracker(self) -> TrackerDefinition:
         """Lazy load the tracker."""
         if self._tracker is None:
-            self._tracker = TrackerDefinition.objects.get(
-                tracker_id=self.tracker_id,
-                user=self.user
-            )
+            self._tracker = crud.get_user_tracker(self.tracker_id, self.user.id)
         return self._tracker
     
     def get_period_date_range(self, period: str = None) -> Tuple[date, date]:
@@ -336,6 +336,10 @@ def update_task_points(template_id: str, user, points: int) -> Dict:
     template.points = points
     template.save(update_fields=['points'])
     
+    # Daily rollups sum template points, so historical days change too
+    from core.services.rollup_service import RollupService
+    RollupService.rebuild_tracker(str(template.tracker.tracker_id))
+    
     # Recalculate tracker progress
     service = PointsCalculationService(str(template.tracker.tracker_id), user)
     new_progress = service.calculate_current_points()
@@ -0,0 +1,220 @@
+"""
+Relation Graph Service
+
+In-memory adjacency index over a user's EntityRelation rows. The index is
+built in a single query and cached under a per-user generation that
+relation writes bump (core.signals.graph_signals), so neighbourhood
+expansion, shortest paths and cycle checks never touch the database
+once it is warm.
+
+Nodes are "<entity_type>:<entity_id>" keys, matching the node ids used by
+KnowledgeGraphService.
+"""
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from core.helpers.cache_helpers import (
+    bump_generation, get_local_cache_setting, local_cache, versioned_key
+)
+from core.models import EntityRelation
+
+# Entries are versioned by generation, so this only bounds memory use
+GRAPH_CACHE_TTL = 3600
+
+
+def node_key(entity_type: str, entity_id) -> str:
+    return f"{entity_type}:{entity_id}"
+
+
+def relations_tag(user_id: int) -> str:
+    """Invalidation tag for a user's relation index."""
+    return f"relations:{user_id}"
+
+
+class RelationGraph:
+    """
+    Adjacency lists of one user's relations.
+
+    `outgoing[node]` holds (target, relation_type) pairs and
+    `incoming[node]` holds (source, relation_type) pairs. Instances are
+    shared through the process-local cache and must be treated as read-only.
+    """
+
+    def __init__(self, edges: List[Tuple[str, str, str]]):
+        self.edges = edges
+        self.outgoing: Dict[str, List[Tuple[str, str]]] = {}
+        self.incoming: Dict[str, List[Tuple[str, str]]] = {}
+        for source, target, relation_type in edges:
+            self.outgoing.setdefault(source, []).append((target, relation_type))
+            self.incoming.setdefault(target, []).append((source, relation_type))
+
+    def __getstate__(self):
+        # Only the edge list goes through the shared cache
+        return {'edges': self.edges}
+
+    def __setstate__(self, state):
+        self.__init__(state['edges'])
+
+    def neighbours(self, node: str):
+        """Yield (neighbour, relation_type, direction) for both edge directions."""
+        for target, relation_type in self.outgoing.get(node, ()):
+            yield target, relation_type, 'forward'
+        for source, relation_type in self.incoming.get(node, ()):
+            yield source, relation_type, 'backward'
+
+    def neighbourhood(self, center: str, depth: int) -> Tuple[Dict[str, int], List[Dict]]:
+        """
+        Nodes within `depth` hops of `center` (ignoring edge direction).
+
+        Returns:
+            ({node: distance}, edges between those nodes)
+        """
+        distances = {center: 0}
+        frontier = [center]
+        for distance in range(1, depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbour, _, _ in self.neighbours(node):
+                    if neighbour not in distances:
+                        distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        edges = [
+            {'source': node, 'target': target, 'type': relation_type}
+            for node in distances
+            for target, relation_type in self.outgoing.get(node, ())
+            if target in distances
+        ]
+        return distances, edges
+
+    def shortest_path(self, start: str, end: str, max_depth: int) -> Optional[List[Dict]]:
+        """
+        Shortest undirected path of at most `max_depth` edges.
+
+        Bidirectional BFS: the smaller frontier is expanded one full level
+        at a time, and the shortest join found on the first level where the
+        two searches meet is a shortest path.
+
+        Returns:
+            [{'from', 'to', 'relation', 'direction'}] or None
+        """
+        if start == end:
+            return []
+
+        # node -> (previous node, relation_type, direction seen from that side)
+        parents = ({start: None}, {end: None})
+        distances = ({start: 0}, {end: 0})
+        frontiers = [[start], [end]]
+        depths = [0, 0]
+
+        while frontiers[0] and frontiers[1] and depths[0] + depths[1] < max_depth:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            seen, other = parents[side], parents[1 - side]
+            depth = depths[side] + 1
+            next_frontier = []
+            meeting, best = None, None
+            for node in frontiers[side]:
+                for neighbour, relation_type, direction in self.neighbours(node):
+                    if neighbour in seen:
+                        continue
+                    seen[neighbour] = (node, relation_type, direction)
+                    distances[side][neighbour] = depth
+                    next_frontier.append(neighbour)
+                    if neighbour in other:
+                        length = depth + distances[1 - side][neighbour]
+                        if best is None or length < best:
+                            meeting, best = neighbour, length
+            if meeting is not None:
+                return self._join(parents, meeting)
+            frontiers[side] = next_frontier
+            depths[side] = depth
+        return None
+
+    @staticmethod
+    def _join(parents, meeting: str) -> List[Dict]:
+        """Stitch the two half-paths through the meeting node."""
+        forward, backward = parents
+        path = []
+        node = meeting
+        while forward[node] is not None:
+            previous, relation_type, direction = forward[node]
+            path.append({'from': previous, 'to': node, 'relation': relation_type, 'direction': direction})
+            node = previous
+        path.reverse()
+
+        node = meeting
+        flipped = {'forward': 'backward', 'backward': 'forward'}
+        while backward[node] is not None:
+            following, relation_type, direction = backward[node]
+            path.append({'from': node, 'to': following, 'relation': relation_type, 'direction': flipped[direction]})
+            node = following
+        return path
+
+    def reaches(self, start: str, goal: str, relation_type: str) -> bool:
+        """Whether `goal` is reachable from `start` along `relation_type` edges."""
+        visited: Set[str] = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if node == goal:
+                return True
+            for target, edge_type in self.outgoing.get(node, ()):
+                if edge_type == relation_type and target not in visited:
+                    visited.add(target)
+                    stack.append(target)
+        return False
+
+
+class RelationGraphService:
+    """Load and invalidate per-user relation indexes."""
+
+    @staticmethod
+    def get(user_id: int, local: bool = True) -> RelationGraph:
+        """
+        The user's relation index, built in one query on a cache miss.
+
+        Args:
+            user_id: Owner of the relations
+            local: Serve from the per-process tier, which may lag another
+                   process's writes by LOCAL_CACHE['GENERATION_TTL'] seconds;
+                   integrity checks pass False
+        """
+        cache_key = versioned_key(f"relation_graph:{user_id}", [relations_tag(user_id)], local=local)
+
+        graph = local_cache.get(cache_key) if local else None
+        if graph is None:
+            graph = cache.get(cache_key)
+            if graph is None:
+                graph = RelationGraphService.build(user_id)
+                cache.set(cache_key, graph, GRAPH_CACHE_TTL)
+            if local:
+                local_cache.set(cache_key, graph, get_local_cache_setting('TTL'))
+        return graph
+
+    @staticmethod
+    def build(user_id: int) -> RelationGraph:
+        rows = EntityRelation.objects.filter(user_id=user_id).values_list(
+            'from_entity_type', 'from_entity_id',
+            'to_entity_type', 'to_entity_id', 'relation_type'
+        )
+        return RelationGraph([
+            (node_key(from_type, from_id), node_key(to_type, to_id), relation_type)
+            for from_type, from_id, to_type, to_id, relation_type in rows
+        ])
+
+    @staticmethod
+    def invalidate(user_id: int) -> None:
+        bump_generation(relations_tag(user_id))
+
+    @staticmethod
+    def owner_of(entity_type: str, entity_id) -> Optional[int]:
+        """User owning a relation that touches the entity, if any."""
+        return EntityRelation.objects.filter(
+            Q(from_entity_type=entity_type, from_entity_id=entity_id) |
+            Q(to_entity_type=entity_type, to_entity_id=entity_id)
+        ).values_list('user_id', flat=True).first()
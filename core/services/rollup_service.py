@@ -0,0 +1,240 @@
+"""
+Rollup Service
+
+Maintains the DailyTrackerRollup table: one row of completion stats per
+(tracker, date). Rows are recomputed from the day's TaskInstances whenever
+they change, so analytics can read per-day aggregates instead of walking
+every task in a tracker's history.
+
+Single task and day saves queue a 'rollup_refresh' job rather than
+refreshing inline; readers call apply_pending() first so they still see
+their own writes. Bulk paths refresh directly, once per batch.
+"""
+import logging
+from datetime import date
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from core.integrations.job_queue import JobQueue
+from core.models import DailyTrackerRollup, SideEffectJob, TaskInstance, TrackerInstance
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = ['total', 'done', 'missed', 'skipped', 'points_earned', 'points_possible']
+
+# Keeps IN (...) clauses well under backend parameter limits
+REFRESH_BATCH_SIZE = 500
+
+JOB_KIND = 'rollup_refresh'
+
+
+def job_key(tracker_id, instance_id) -> str:
+    """Job key for a deferred refresh of one tracker day."""
+    return f"{tracker_id}:{instance_id}"
+
+
+class RollupService:
+    """Incrementally maintain per-day tracker rollups."""
+
+    @staticmethod
+    def _aggregate_tasks(instance_ids: List[str]) -> Dict[str, Dict]:
+        """Aggregate live tasks per tracker instance in a single GROUP BY query."""
+        rows = TaskInstance.objects.filter(
+            tracker_instance_id__in=instance_ids,
+            deleted_at__isnull=True
+        ).values('tracker_instance_id').annotate(
+            total=Count('task_instance_id'),
+            done=Count('task_instance_id', filter=Q(status='DONE')),
+            missed=Count('task_instance_id', filter=Q(status='MISSED')),
+            skipped=Count('task_instance_id', filter=Q(status='SKIPPED')),
+            points_earned=Sum('template__points', filter=Q(status='DONE')),
+            points_possible=Sum('template__points'),
+        ).order_by()
+
+        return {
+            row['tracker_instance_id']: {
+                field: row[field] or 0 for field in ROLLUP_FIELDS
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def refresh_instances(instance_ids: Iterable[str]) -> int:
+        """
+        Recompute rollup rows for the days covered by the given tracker instances.
+
+        Runs a constant number of queries per batch of REFRESH_BATCH_SIZE
+        instances. Soft-deleted instances have their rows removed.
+
+        Args:
+            instance_ids: TrackerInstance IDs whose day stats changed
+
+        Returns:
+            Number of rollup rows written
+        """
+        instance_ids = list({str(i) for i in instance_ids if i})
+
+        written = 0
+        for start in range(0, len(instance_ids), REFRESH_BATCH_SIZE):
+            written += RollupService._refresh_batch(instance_ids[start:start + REFRESH_BATCH_SIZE])
+        return written
+
+    @staticmethod
+    def queue_refresh(tracker_id, instance_ids: Iterable[str]) -> None:
+        """Defer refreshing the given days of a tracker to the job queue."""
+        if tracker_id:
+            JobQueue.enqueue(JOB_KIND, [job_key(tracker_id, i) for i in instance_ids if i])
+
+    @staticmethod
+    def apply_pending(tracker_ids: Iterable[str]) -> int:
+        """
+        Run the refreshes still queued for these trackers, so a reader
+        sees writes whose job has not finished yet.
+
+        One indexed lookup when nothing is outstanding. Jobs a worker has
+        already claimed are refreshed too; the recompute is idempotent.
+
+        Returns:
+            Number of rollup rows written
+        """
+        prefixes = Q()
+        for tracker_id in {str(t) for t in tracker_ids if t}:
+            prefixes |= Q(key__startswith=job_key(tracker_id, ''))
+        if not prefixes:
+            return 0
+
+        jobs = list(
+            SideEffectJob.objects.filter(
+                prefixes, kind=JOB_KIND, status__in=('pending', 'running')
+            ).values_list('job_id', 'key', 'status')
+        )
+        if not jobs:
+            return 0
+
+        SideEffectJob.objects.filter(
+            job_id__in=[job_id for job_id, _, status in jobs if status == 'pending'],
+            status='pending'
+        ).delete()
+        return RollupService.refresh_instances(key.partition(':')[2] for _, key, _ in jobs)
+
+    @staticmethod
+    def refresh_for_tasks(task_ids: Iterable[str]) -> int:
+        """
+        Refresh rollups for the days touched by a set of task instances.
+
+        Use after queryset ``update()`` calls, which bypass model signals.
+        """
+        task_ids = list(task_ids)
+        if not task_ids:
+            return 0
+
+        instance_ids = TaskInstance.objects.filter(
+            task_instance_id__in=task_ids
+        ).values_list('tracker_instance_id', flat=True).distinct()
+        return RollupService.refresh_instances(instance_ids)
+
+    @staticmethod
+    def _refresh_batch(instance_ids: List[str]) -> int:
+        """Refresh one batch of tracker instances."""
+        instances = list(
+            TrackerInstance.objects.filter(instance_id__in=instance_ids)
+            .values('instance_id', 'tracker_id', 'tracking_date', 'period_start', 'deleted_at')
+        )
+
+        live = [i for i in instances if i['deleted_at'] is None]
+        stale_keys = {
+            (i['tracker_id'], i['period_start'] or i['tracking_date'])
+            for i in instances if i['deleted_at'] is not None
+        }
+
+        stats = RollupService._aggregate_tasks([i['instance_id'] for i in live])
+        empty = {field: 0 for field in ROLLUP_FIELDS}
+
+        desired = {}
+        for inst in live:
+            key = (inst['tracker_id'], inst['period_start'] or inst['tracking_date'])
+            desired[key] = stats.get(inst['instance_id'], empty)
+
+        stale_keys -= set(desired)
+        return RollupService._write(desired, stale_keys)
+
+    @staticmethod
+    def _write(desired: Dict, stale_keys=None) -> int:
+        """Upsert desired rows and drop stale ones using portable bulk operations."""
+        keys = set(desired) | set(stale_keys or ())
+        if not keys:
+            return 0
+
+        tracker_ids = {k[0] for k in keys}
+        dates = {k[1] for k in keys}
+
+        with transaction.atomic():
+            existing = {
+                (r.tracker_id, r.date): r
+                for r in DailyTrackerRollup.objects.filter(
+                    tracker_id__in=tracker_ids, date__in=dates
+                )
+            }
+
+            now = timezone.now()
+            to_create, to_update, to_delete = [], [], []
+            for key, values in desired.items():
+                row = existing.get(key)
+                if row is None:
+                    to_create.append(DailyTrackerRollup(tracker_id=key[0], date=key[1], **values))
+                elif any(getattr(row, f) != values[f] for f in ROLLUP_FIELDS):
+                    for field, value in values.items():
+                        setattr(row, field, value)
+                    row.updated_at = now
+                    to_update.append(row)
+
+            for key in stale_keys or ():
+                if key in existing:
+                    to_delete.append(existing[key].pk)
+
+            if to_create:
+                DailyTrackerRollup.objects.bulk_create(to_create, ignore_conflicts=True)
+            if to_update:
+                DailyTrackerRollup.objects.bulk_update(to_update, ROLLUP_FIELDS + ['updated_at'])
+            if to_delete:
+                DailyTrackerRollup.objects.filter(pk__in=to_delete).delete()
+
+        changed = [(r.tracker_id, r.date, r.total, r.done) for r in to_create + to_update]
+        changed += [(key[0], key[1], 0, 0) for key in stale_keys or () if key in existing]
+        if changed:
+            # Imported lazily: streak state is derived from rollups
+            from core.services.streak_service import StreakService
+            StreakService.on_days_changed(changed)
+
+        return len(to_create) + len(to_update)
+
+    @staticmethod
+    def remove_day(tracker_id: str, day: date) -> None:
+        """Drop the rollup row for a day whose tracker instance was hard-deleted."""
+        deleted, _ = DailyTrackerRollup.objects.filter(tracker_id=tracker_id, date=day).delete()
+        if deleted:
+            from core.services.streak_service import StreakService
+            StreakService.on_days_changed([(tracker_id, day, 0, 0)])
+
+    @staticmethod
+    def rebuild_tracker(tracker_id: str) -> int:
+        """
+        Rebuild every rollup row for a tracker from scratch.
+
+        Used for backfills and after operations that bypass model signals
+        (restores, raw queryset updates).
+        """
+        instance_ids = list(
+            TrackerInstance.objects.filter(tracker_id=tracker_id)
+            .values_list('instance_id', flat=True)
+        )
+
+        with transaction.atomic():
+            DailyTrackerRollup.objects.filter(tracker_id=tracker_id).delete()
+            written = RollupService.refresh_instances(instance_ids)
+
+        logger.info(f"Rebuilt {written} rollup rows for tracker {tracker_id}")
+        return written
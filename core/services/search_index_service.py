@@ -0,0 +1,427 @@
+"""
+Search Index Service
+
+Keeps each user's search index in step with their data and answers
+ranked queries from it.
+
+Trackers, task templates, goals, tags, day notes and task notes become
+index documents (see DOCUMENT_TYPES). Writes queue a 'search_index' job
+per entity (core.signals.search_signals); the job re-renders the entity's
+document, or removes it when the entity is gone. Searches run any jobs
+still queued for the user first, so they see their own writes.
+
+Queries are answered by the configured backend
+(core.integrations.search_backends) in a single index lookup, then
+boosted by how often the user clicked each result before.
+"""
+import logging
+import math
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, QuerySet
+
+from core.helpers.cache_helpers import bump_generation, versioned_key
+from core.integrations.job_queue import JobQueue
+from core.integrations.search_backends import IndexDocument, get_backend, parse_query
+from core.models import (
+    DayNote, Goal, SearchDocument, SearchHistory, SideEffectJob, Tag,
+    TaskInstance, TaskTemplate, TrackerDefinition
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND = 'search_index'
+
+# Results returned per group
+GROUP_LIMITS = {
+    'trackers': 5,
+    'tasks': 10,
+    'goals': 5,
+    'tags': 5,
+    'notes': 5,
+}
+
+# Score multiplier per past click is 1 + CLICK_BOOST * ln(1 + clicks)
+CLICK_BOOST = 0.5
+
+# Stats are versioned by generation, so this only bounds memory use
+STATS_CACHE_TTL = 3600
+
+INDEX_BATCH_SIZE = 500
+
+# Result 'type' -> entity_type, where they differ
+RESULT_ENTITY_TYPES = {'task': 'template'}
+
+
+class DocumentType(NamedTuple):
+    group: str                                  # Key in search results
+    queryset: Callable[[int], QuerySet]         # Indexable rows of a user
+    tracker_field: Optional[str]                # Path to the owning tracker
+    render: Callable                            # row -> (body, payload)
+
+
+def _tracker_document(t):
+    return f"{t.name}\n{t.description or ''}", {
+        'id': str(t.tracker_id),
+        'name': t.name,
+        'type': 'tracker',
+        'description': t.description[:100] if t.description else '',
+        'url': f'/tracker/{t.tracker_id}/',
+        'status': t.status,
+        'task_count': 0,
+    }
+
+
+def _template_document(t):
+    return f"{t.description}\n{t.category or ''}", {
+        'id': str(t.template_id),
+        'name': t.description,
+        'type': 'task',
+        'tracker_name': t.tracker.name,
+        'category': t.category,
+        'url': f'/tracker/{t.tracker_id}/?highlight={t.template_id}',
+    }
+
+
+def _goal_document(g):
+    return f"{g.title}\n{g.description or ''}", {
+        'id': str(g.goal_id),
+        'name': g.title,
+        'type': 'goal',
+        'icon': g.icon,
+        'progress': g.progress,
+        'url': '/goals/',
+    }
+
+
+def _tag_document(t):
+    return t.name, {
+        'id': str(t.tag_id),
+        'name': t.name,
+        'type': 'tag',
+        'color': t.color,
+        'icon': t.icon,
+    }
+
+
+def _note_document(n):
+    return n.content, {
+        'id': str(n.note_id),
+        'name': f"{n.tracker.name} - {n.date.isoformat()}",
+        'type': 'note',
+        'tracker_name': n.tracker.name,
+        'date': n.date.isoformat(),
+        'preview': n.content[:100],
+        'url': f'/tracker/{n.tracker_id}/',
+    }
+
+
+def _task_note_document(t):
+    day = t.tracker_instance
+    tracker = day.tracker
+    period = day.period_start or day.tracking_date
+    return t.notes, {
+        'id': str(t.task_instance_id),
+        'name': t.template.description,
+        'type': 'task_note',
+        'tracker_name': tracker.name,
+        'date': period.isoformat() if period else None,
+        'preview': t.notes[:100],
+        'url': f'/tracker/{tracker.tracker_id}/?highlight={t.template_id}',
+    }
+
+
+DOCUMENT_TYPES: Dict[str, DocumentType] = {
+    'tracker': DocumentType(
+        'trackers',
+        lambda user_id: TrackerDefinition.objects.filter(
+            user_id=user_id, deleted_at__isnull=True
+        ).exclude(status='archived'),
+        'tracker_id',
+        _tracker_document,
+    ),
+    'template': DocumentType(
+        'tasks',
+        lambda user_id: TaskTemplate.objects.filter(
+            tracker__user_id=user_id, tracker__deleted_at__isnull=True, deleted_at__isnull=True
+        ).select_related('tracker'),
+        'tracker_id',
+        _template_document,
+    ),
+    'goal': DocumentType(
+        'goals',
+        lambda user_id: Goal.objects.filter(
+            user_id=user_id, deleted_at__isnull=True
+        ).exclude(status='abandoned'),
+        None,
+        _goal_document,
+    ),
+    'tag': DocumentType(
+        'tags',
+        lambda user_id: Tag.objects.filter(user_id=user_id),
+        None,
+        _tag_document,
+    ),
+    'note': DocumentType(
+        'notes',
+        lambda user_id: DayNote.objects.filter(
+            tracker__user_id=user_id, tracker__deleted_at__isnull=True, deleted_at__isnull=True
+        ).select_related('tracker'),
+        'tracker_id',
+        _note_document,
+    ),
+    'task_note': DocumentType(
+        'notes',
+        lambda user_id: TaskInstance.objects.filter(
+            tracker_instance__tracker__user_id=user_id,
+            tracker_instance__tracker__deleted_at__isnull=True,
+            tracker_instance__deleted_at__isnull=True,
+            deleted_at__isnull=True
+        ).exclude(notes='').select_related('template', 'tracker_instance__tracker'),
+        'tracker_instance__tracker_id',
+        _task_note_document,
+    ),
+}
+
+
+def doc_key(entity_type: str, entity_id) -> str:
+    return f"{entity_type}:{entity_id}"
+
+
+def job_key(user_id: int, entity_type: str, entity_id=None) -> str:
+    """Job key for reindexing one entity, or the user's whole index."""
+    if entity_type == 'user':
+        return f"{user_id}:user"
+    return f"{user_id}:{entity_type}:{entity_id}"
+
+
+def search_tag(user_id: int) -> str:
+    """Invalidation tag for a user's index stats and click counts."""
+    return f"search:{user_id}"
+
+
+def task_notes_changed(task: TaskInstance) -> bool:
+    """Whether a saved task's notes differ from when it was loaded."""
+    return (task.notes or '') != (getattr(task, '_loaded_notes', '') or '')
+
+
+class SearchIndexService:
+    """Maintain and query per-user search indexes."""
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def queue(user_id: Optional[int], entity_type: str, entity_ids: Iterable) -> None:
+        """Defer reindexing entities to the job queue."""
+        if user_id:
+            JobQueue.enqueue(JOB_KIND, [job_key(user_id, entity_type, i) for i in entity_ids if i])
+
+    @staticmethod
+    def reindex(user_id: int, entity_type: str, entity_ids: Iterable) -> int:
+        """Re-render the given entities' documents, dropping any now gone."""
+        entity_ids = [str(i) for i in entity_ids]
+        return SearchIndexService._sync(
+            user_id,
+            [(entity_type, DOCUMENT_TYPES[entity_type].queryset(user_id).filter(pk__in=entity_ids))],
+            Q(doc_key__in=[doc_key(entity_type, i) for i in entity_ids])
+        )
+
+    @staticmethod
+    def reindex_tracker(user_id: int, tracker_id) -> int:
+        """Re-render a tracker and everything indexed under it."""
+        return SearchIndexService._sync(
+            user_id,
+            [
+                (entity_type, spec.queryset(user_id).filter(**{spec.tracker_field: tracker_id}))
+                for entity_type, spec in DOCUMENT_TYPES.items()
+                if spec.tracker_field
+            ],
+            Q(tracker_id=tracker_id)
+        )
+
+    @staticmethod
+    def rebuild_user(user_id: int, force: bool = False) -> int:
+        """
+        Rebuild a user's whole index.
+
+        Args:
+            user_id: Owner of the index
+            force: Drop every document first, so the backend indexes all
+                   of them again (needed after switching backends)
+        """
+        if force:
+            SearchDocument.objects.filter(user_id=user_id).delete()
+        return SearchIndexService._sync(
+            user_id,
+            [(entity_type, spec.queryset(user_id)) for entity_type, spec in DOCUMENT_TYPES.items()],
+            Q()
+        )
+
+    @staticmethod
+    def _sync(user_id: int, sources, scope: Q) -> int:
+        """
+        Write the documents rendered from `sources` and delete every other
+        document of the user inside `scope`.
+
+        Returns:
+            Number of documents written or deleted
+        """
+        backend = get_backend()
+        stale = set(SearchDocument.objects.filter(scope, user_id=user_id).values_list('doc_key', flat=True))
+        changed = 0
+
+        for entity_type, queryset in sources:
+            spec = DOCUMENT_TYPES[entity_type]
+            batch = []
+            for row in queryset.iterator(chunk_size=INDEX_BATCH_SIZE):
+                body, payload = spec.render(row)
+                key = doc_key(entity_type, payload['id'])
+                stale.discard(key)
+                batch.append(IndexDocument(
+                    key, entity_type,
+                    SearchIndexService._tracker_of(row, spec), body, payload
+                ))
+                if len(batch) >= INDEX_BATCH_SIZE:
+                    changed += backend.write(user_id, batch)
+                    batch = []
+            changed += backend.write(user_id, batch)
+
+        changed += backend.delete(user_id, stale)
+        if changed:
+            bump_generation(search_tag(user_id))
+        return changed
+
+    @staticmethod
+    def _tracker_of(row, spec: DocumentType) -> Optional[str]:
+        if spec.tracker_field is None:
+            return None
+        value = row
+        for part in spec.tracker_field.split('__'):
+            value = getattr(value, part)
+        return value
+
+    @staticmethod
+    def run_job(key: str) -> None:
+        """Apply one queued 'search_index' job."""
+        user_id, _, rest = key.partition(':')
+        entity_type, _, entity_id = rest.partition(':')
+        user_id = int(user_id)
+
+        if entity_type == 'user':
+            SearchIndexService.rebuild_user(user_id)
+        elif entity_type == 'tracker':
+            SearchIndexService.reindex_tracker(user_id, entity_id)
+        elif entity_type in DOCUMENT_TYPES:
+            SearchIndexService.reindex(user_id, entity_type, [entity_id])
+
+    @staticmethod
+    def apply_pending(user_id: int) -> int:
+        """
+        Run the index jobs still queued for a user, so a search sees
+        writes whose job has not finished yet.
+
+        One indexed lookup when nothing is outstanding; reindexing is
+        idempotent, so jobs a worker already claimed are run too.
+
+        Returns:
+            Number of jobs run
+        """
+        jobs = list(
+            SideEffectJob.objects.filter(
+                kind=JOB_KIND,
+                key__startswith=f"{user_id}:",
+                status__in=('pending', 'running')
+            ).values_list('job_id', 'key', 'status')
+        )
+        if not jobs:
+            return 0
+
+        SideEffectJob.objects.filter(
+            job_id__in=[job_id for job_id, _, status in jobs if status == 'pending'],
+            status='pending'
+        ).delete()
+
+        keys = [key for _, key, _ in jobs]
+        rebuild = job_key(user_id, 'user')
+        for key in ([rebuild] if rebuild in keys else keys):
+            SearchIndexService.run_job(key)
+        return len(jobs)
+
+    @staticmethod
+    def invalidate_stats(user_id: int) -> None:
+        """Drop cached stats after the user's search history changes."""
+        bump_generation(search_tag(user_id))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def stats(user_id: int) -> Dict:
+        """
+        Corpus size, average document length and click counts per
+        document, cached until the index or the user's history changes.
+        """
+        cache_key = versioned_key(f"search_stats:{user_id}", [search_tag(user_id)])
+        stats = cache.get(cache_key)
+        if stats is not None:
+            return stats
+
+        corpus = SearchDocument.objects.filter(user_id=user_id).aggregate(
+            documents=Count('id'), avg_length=Avg('length')
+        )
+        clicks = SearchHistory.objects.filter(user_id=user_id).exclude(
+            clicked_result_id=''
+        ).values('clicked_result_type', 'clicked_result_id').annotate(
+            clicks=Count('search_id')
+        ).order_by()
+
+        stats = {
+            'documents': corpus['documents'] or 0,
+            'avg_length': float(corpus['avg_length'] or 0),
+            'clicks': {
+                doc_key(
+                    RESULT_ENTITY_TYPES.get(row['clicked_result_type'], row['clicked_result_type']),
+                    row['clicked_result_id']
+                ): row['clicks']
+                for row in clicks
+            },
+        }
+        cache.set(cache_key, stats, STATS_CACHE_TTL)
+        return stats
+
+    @staticmethod
+    def search(user_id: int, query: str, limits: Dict[str, int] = None) -> Dict[str, List[Dict]]:
+        """
+        Ranked results for a typed query, grouped like SearchService.search.
+
+        Every word must match; the last one also matches as a prefix while
+        it is being typed. Scores are BM25 (or the database's own ranking),
+        multiplied up for results the user clicked before.
+
+        Returns:
+            {group: [result payload + 'score']} for every group in GROUP_LIMITS
+        """
+        limits = limits or GROUP_LIMITS
+        results = {group: [] for group in limits}
+
+        terms, prefix = parse_query(query or '')
+        if not terms and not prefix:
+            return results
+
+        SearchIndexService.apply_pending(user_id)
+        stats = SearchIndexService.stats(user_id)
+        hits = []
+        for score, row in get_backend().search(user_id, terms, prefix, stats):
+            clicks = stats['clicks'].get(row['doc_key'], 0)
+            hits.append((score * (1 + CLICK_BOOST * math.log1p(clicks)), row))
+        hits.sort(key=lambda hit: (-hit[0], hit[1]['doc_key']))
+
+        for score, row in hits:
+            group = DOCUMENT_TYPES[row['entity_type']].group
+            if len(results.get(group, ())) < limits.get(group, 0):
+                results[group].append({**row['payload'], 'score': round(score, 4)})
+        return results
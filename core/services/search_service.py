@@ -1,14 +1,16 @@
 """
 Search Service
 
-Handles global search across Trackers, Tasks, and Goals.
+Handles global search across Trackers, Tasks, Goals, Tags and Notes.
 Enhanced for V1.5 with search history, suggestions, and analytics.
 """
 from typing import Dict, List, Optional
 from datetime import date, timedelta
 from django.db.models import Q, Count
 from django.utils import timezone
-from core.models import TrackerDefinition, TaskTemplate, Goal, SearchHistory, Tag
+from core.models import SearchHistory
+from core.services.search_index_service import GROUP_LIMITS, SearchIndexService
+from core.services.suggestion_service import SuggestionService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,13 +26,16 @@ class SearchService:
         """
         Perform global search.
         
+        Trackers, tasks, goals, tags, day notes and task notes are ranked
+        by SearchIndexService, with results the user clicked before first.
+        
         Args:
             user: User object
             query: Search string
             save_history: Whether to save to history
             
         Returns:
-            Dict with results for trackers, tasks, goals.
+            Dict with results for trackers, tasks, goals, tags and notes.
         """
         results = {
             'query': query,
@@ -38,92 +43,21 @@ class SearchService:
             'tasks': [],
             'goals': [],
             'tags': [],
+            'notes': [],
             'suggestions': [],
         }
         
         if not query or len(query) < 2:
-            recent_queries = list(SearchHistory.get_recent_searches(user, limit=5))
-            results['suggestions'] = [{'query': item['query'], 'type': 'recent'} for item in recent_queries]
+            results['suggestions'] = [
+                {'query': entry.text, 'type': 'recent'}
+                for entry in SuggestionService.recent(user.id, limit=5)
+            ]
             return results
 
-        # Search Trackers
-        trackers = TrackerDefinition.objects.filter(
-            user=user,
-            name__icontains=query
-        ).exclude(status='archived')[:5]
-        
-        results['trackers'] = [
-            {
-                'id': str(t.tracker_id),
-                'name': t.name,
-                'type': 'tracker',
-                'description': t.description[:100] if t.description else '',
-                'url': f'/tracker/{t.tracker_id}/',
-                'status': t.status,
-                'task_count': getattr(t, 'task_count', 0) 
-            }
-            for t in trackers
-        ]
-        
-        # Search Task Templates
-        task_templates = TaskTemplate.objects.filter(
-            tracker__user=user,
-            description__icontains=query
-        ).select_related('tracker')[:10]
-        
-        results['tasks'] = [
-            {
-                'id': str(t.template_id),
-                'name': t.description,
-                'type': 'task',
-                'tracker_name': t.tracker.name,
-                'category': t.category,
-                'url': f'/tracker/{t.tracker.tracker_id}/?highlight={t.template_id}'
-            }
-            for t in task_templates
-        ]
-        
-        # Search Goals
-        goals = Goal.objects.filter(
-            user=user,
-            title__icontains=query
-        ).exclude(status='abandoned')[:5]
-        
-        results['goals'] = [
-            {
-                'id': str(g.goal_id),
-                'name': g.title,
-                'type': 'goal',
-                'icon': g.icon,
-                'progress': g.progress,
-                'url': '/goals/'
-            }
-            for g in goals
-        ]
-        
-        # V1.5: Search Tags
-        tags = Tag.objects.filter(
-            user=user,
-            name__icontains=query
-        )[:5]
-        
-        results['tags'] = [
-            {
-                'id': str(t.tag_id),
-                'name': t.name,
-                'type': 'tag',
-                'color': t.color,
-                'icon': t.icon
-            }
-            for t in tags
-        ]
+        # One ranked lookup in the user's search index
+        results.update(SearchIndexService.search(user.id, query))
         
-        total_count = (
-            len(results['trackers']) + 
-            len(results['tasks']) + 
-            len(results['goals']) + 
-            len(results['tags'])
-        )
+        total_count = sum(len(results[group]) for group in GROUP_LIMITS)
         results['total_count'] = total_count
         
         if save_history and total_count > 0:
@@ -145,6 +79,8 @@ class SearchService:
         """
         Get user's recent search queries.
         
+        Served from the user's suggestion index (SuggestionService).
+        
         Args:
             user: User object
             limit: Maximum number of results
@@ -152,20 +88,13 @@ class SearchService:
         Returns:
             List of recent search dicts
         """
-        recent = SearchHistory.objects.filter(
-            user=user
-        ).values('query').annotate(
-            count=Count('search_id'),
-            last_searched=Count('created_at')
-        ).order_by('-last_searched')[:limit]
-        
         return [
             {
-                'query': item['query'],
-                'count': item['count'],
+                'query': entry.text,
+                'count': entry.count,
                 'type': 'recent'
             }
-            for item in recent
+            for entry in SuggestionService.recent(user.id, limit)
         ]
     
     @staticmethod
@@ -173,6 +102,10 @@ class SearchService:
         """
         Get popular search queries across all users or for a specific user.
         
+        Counts only the searches made within the window, so this reads the
+        search history rather than the suggestion index (whose counts are
+        all-time).
+        
         Args:
             user: Optional user to filter by
             days: Number of days to look back
@@ -191,8 +124,7 @@ class SearchService:
             query = query.filter(user=user)
         
         popular = query.values('query').annotate(
-            search_count=Count('search_id'),
-            avg_results=Count('result_count')
+            search_count=Count('search_id')
         ).filter(
             search_count__gte=2  # Must be searched at least twice
         ).order_by('-search_count')[:limit]
@@ -210,7 +142,8 @@ class SearchService:
     def get_search_suggestions(user, partial_query: str, limit: int = 5) -> List[Dict]:
         """
         Get search suggestions based on partial query.
-        Combines recent searches, popular searches, and content matching.
+        Combines past searches, tracker names, task descriptions and tags,
+        answered from the user's cached suggestion index.
         
         Args:
             user: User object
@@ -220,55 +153,14 @@ class SearchService:
         Returns:
             List of suggestion dicts
         """
-        suggestions = []
-        
-        if len(partial_query) < 2:
+        if len(partial_query.strip()) < 2:
             # Return recent searches for short queries
-            recent = SearchHistory.objects.filter(
-                user=user
-            ).values_list('query', flat=True).distinct()[:limit]
-            return [{'query': q, 'type': 'recent'} for q in recent]
-        
-        # 1. Match from user's search history
-        history_matches = SearchHistory.objects.filter(
-            user=user,
-            query__icontains=partial_query
-        ).values_list('query', flat=True).distinct()[:3]
-        
-        for q in history_matches:
-            suggestions.append({'query': q, 'type': 'history'})
-        
-        # 2. Match from tracker names
-        tracker_names = TrackerDefinition.objects.filter(
-            user=user,
-            name__icontains=partial_query,
-            deleted_at__isnull=True
-        ).values_list('name', flat=True)[:2]
-        
-        for name in tracker_names:
-            suggestions.append({'query': name, 'type': 'tracker'})
+            return [
+                {'query': entry.text, 'type': 'recent'}
+                for entry in SuggestionService.recent(user.id, limit)
+            ]
         
-        # 3. Match from task descriptions
-        task_descriptions = TaskTemplate.objects.filter(
-            tracker__user=user,
-            description__icontains=partial_query,
-            deleted_at__isnull=True
-        ).values_list('description', flat=True)[:2]
-        
-        for desc in task_descriptions:
-            # Truncate long descriptions
-            short_desc = desc[:50] if len(desc) > 50 else desc
-            suggestions.append({'query': short_desc, 'type': 'task'})
-        
-        # Deduplicate and limit
-        seen = set()
-        unique_suggestions = []
-        for s in suggestions:
-            if s['query'] not in seen:
-                seen.add(s['query'])
-                unique_suggestions.append(s)
-        
-        return unique_suggestions[:limit]
+        return SuggestionService.suggest(user.id, partial_query, limit)
     
     @staticmethod
     def clear_search_history(user, older_than_days: int = None) -> int:
@@ -289,8 +181,31 @@ class SearchService:
             query = query.filter(created_at__lt=cutoff)
         
         count, _ = query.delete()
+        SearchIndexService.invalidate_stats(user.id)
         return count
     
+    @staticmethod
+    def record_click(user, query: str, result_type: str, result_id: str) -> None:
+        """
+        Record which result a search led to; clicked results rank higher
+        in the user's later searches.
+        
+        Args:
+            user: User object
+            query: The query the result was found with
+            result_type: Result 'type' ('tracker', 'task', 'goal', 'tag', 'note', 'task_note')
+            result_id: Result 'id'
+        """
+        entry = SearchHistory.objects.filter(
+            user=user, query=query, clicked_result_id=''
+        ).first()
+        if entry is None:
+            entry = SearchHistory(user=user, query=query)
+        entry.clicked_result_type = result_type
+        entry.clicked_result_id = result_id
+        entry.save()
+        SearchIndexService.invalidate_stats(user.id)
+    
     @staticmethod
     def get_search_analytics(user) -> Dict:
         """
@@ -1,7 +1,11 @@
-from datetime import date, timedelta
-from typing import NamedTuple
-from django.db.models import Count, Q
-from core.models import TrackerInstance, TaskInstance, UserPreferences, TrackerDefinition
+from datetime import date
+from typing import NamedTuple, Iterable, Optional, Tuple
+from core.models import DailyTrackerRollup, TrackerStreak, TrackerDefinition
+from core.repositories import base_repository as crud
+from core.services.rollup_service import RollupService
+
+DEFAULT_STREAK_THRESHOLD = 80
+
 
 class StreakResult(NamedTuple):
     current_streak: int
@@ -11,7 +15,140 @@ class StreakResult(NamedTuple):
 
 class StreakService:
     """Calculate and manage user streaks."""
-    
+
+    @staticmethod
+    def get_threshold(user_id: int) -> int:
+        """Get the user's streak threshold (% completion needed for a streak day)."""
+        prefs = crud.get_user_preferences(user_id)
+        return (prefs and prefs.streak_threshold) or DEFAULT_STREAK_THRESHOLD
+
+    @staticmethod
+    def _qualifies(total: int, done: int, threshold: int) -> bool:
+        """A day counts towards a streak when its completion meets the threshold."""
+        return total > 0 and (done / total) * 100 >= threshold
+
+    @staticmethod
+    def _compute_runs(
+        tracker_id: str,
+        threshold: int,
+        as_of_date: Optional[date] = None
+    ) -> Tuple[int, int, Optional[date]]:
+        """
+        Walk daily rollups once (single query) and measure qualifying runs.
+
+        Returns:
+            (run length ending at the last qualifying day, longest run, last qualifying day)
+        """
+        rollups = DailyTrackerRollup.objects.filter(tracker_id=tracker_id)
+        if as_of_date:
+            rollups = rollups.filter(date__lte=as_of_date)
+
+        run = 0
+        longest = 0
+        last_date = None
+
+        for day, total, done in rollups.order_by('date').values_list('date', 'total', 'done'):
+            if not StreakService._qualifies(total, done, threshold):
+                continue
+            if last_date is not None and (day - last_date).days == 1:
+                run += 1
+            else:
+                run = 1
+            longest = max(longest, run)
+            last_date = day
+
+        return run, longest, last_date
+
+    @staticmethod
+    def rebuild_state(tracker_id: str, threshold: int = None) -> TrackerStreak:
+        """
+        Recompute and persist a tracker's streak state from its rollups.
+
+        Args:
+            tracker_id: The tracker to rebuild
+            threshold: Threshold to apply (default: tracker owner's preference)
+        """
+        if threshold is None:
+            user_id = TrackerDefinition.objects.filter(
+                tracker_id=tracker_id
+            ).values_list('user_id', flat=True).first()
+            threshold = StreakService.get_threshold(user_id)
+
+        run, longest, last_date = StreakService._compute_runs(tracker_id, threshold)
+
+        state, _ = TrackerStreak.objects.update_or_create(
+            tracker_id=tracker_id,
+            defaults={
+                'current_streak': run,
+                'longest_streak': longest,
+                'last_qualifying_date': last_date,
+                'threshold': threshold,
+            }
+        )
+        return state
+
+    @staticmethod
+    def apply_day(tracker_id: str, day: date, total: int, done: int) -> TrackerStreak:
+        """
+        Fold one day's updated completion into the persisted streak state.
+
+        Extending or restarting the run at the head is O(1). Edits at or
+        before the last qualifying day can shorten past runs, so those fall
+        back to a single-query rebuild.
+        """
+        state = TrackerStreak.objects.filter(tracker_id=tracker_id).first()
+        if state is None:
+            return StreakService.rebuild_state(tracker_id)
+
+        qualifies = StreakService._qualifies(total, done, state.threshold)
+        last = state.last_qualifying_date
+
+        if last is not None and day <= last:
+            if day == last and qualifies:
+                return state
+            return StreakService.rebuild_state(tracker_id, state.threshold)
+
+        if not qualifies:
+            return state
+
+        if last is not None and (day - last).days == 1:
+            state.current_streak += 1
+        else:
+            state.current_streak = 1
+        state.longest_streak = max(state.longest_streak, state.current_streak)
+        state.last_qualifying_date = day
+        state.save(update_fields=['current_streak', 'longest_streak', 'last_qualifying_date', 'updated_at'])
+        return state
+
+    @staticmethod
+    def on_days_changed(changed: Iterable[Tuple[str, date, int, int]]) -> None:
+        """
+        Update streak state after daily rollups change.
+
+        Args:
+            changed: (tracker_id, date, total, done) for each rewritten day
+        """
+        by_tracker = {}
+        for tracker_id, day, total, done in changed:
+            by_tracker.setdefault(tracker_id, []).append((day, total, done))
+
+        for tracker_id, days in by_tracker.items():
+            if len(days) == 1:
+                StreakService.apply_day(tracker_id, *days[0])
+            else:
+                StreakService.rebuild_state(tracker_id)
+
+    @staticmethod
+    def _result(current: int, longest: int, last_date: Optional[date], as_of_date: date) -> StreakResult:
+        """Build a StreakResult; a run is active if it reached today or yesterday."""
+        streak_active = last_date is not None and 0 <= (as_of_date - last_date).days <= 1
+        return StreakResult(
+            current_streak=current if streak_active else 0,
+            longest_streak=longest,
+            streak_active=streak_active,
+            last_completed_date=last_date
+        )
+
     @staticmethod
     def calculate_streak(
         tracker_id: str,
@@ -21,107 +158,65 @@ class StreakService:
     ) -> StreakResult:
         """
         Calculate current and longest streak for a tracker.
-        
+
+        Served from the persisted TrackerStreak state; historical dates or
+        threshold overrides are computed from daily rollups without persisting.
+
         Args:
             tracker_id: The tracker to calculate for
             user_id: User ID for getting preferences
             as_of_date: Calculate as of this date (default: today)
             threshold_percent: Override user's streak threshold
-            
+
         Returns:
             StreakResult with current, longest, and status
         """
-        as_of_date = as_of_date or date.today()
-        
-        # Get user's streak threshold
-        try:
-            prefs = UserPreferences.objects.get(user_id=user_id)
-            threshold = threshold_percent or prefs.streak_threshold
-        except UserPreferences.DoesNotExist:
-            threshold = threshold_percent or 80
-        
-        # Get all instances ordered by date
-        instances = TrackerInstance.objects.filter(
-            tracker__tracker_id=tracker_id,
-            deleted_at__isnull=True,
-            tracking_date__lte=as_of_date
-        ).order_by('-tracking_date')
-        
-        current_streak = 0
-        longest_streak = 0
-        temp_streak = 0
-        last_completed_date = None
-        streak_active = False
-        
-        prev_date = None
-        
-        for instance in instances:
-            # Calculate completion percentage for this instance
-            total_tasks = instance.tasks.filter(deleted_at__isnull=True).count()
-            done_tasks = instance.tasks.filter(status='DONE', deleted_at__isnull=True).count()
-            
-            if total_tasks == 0:
-                continue
-            
-            completion_pct = (done_tasks / total_tasks) * 100
-            meets_threshold = completion_pct >= threshold
-            
-            if meets_threshold:
-                if last_completed_date is None:
-                    last_completed_date = instance.tracking_date
-                
-                # Check continuity
-                if prev_date is None:
-                    temp_streak = 1
-                    # Check if streak is still active (today or yesterday)
-                    days_gap = (as_of_date - instance.tracking_date).days
-                    streak_active = days_gap <= 1
-                elif (prev_date - instance.tracking_date).days == 1:
-                    temp_streak += 1
-                else:
-                    # Streak broken
-                    longest_streak = max(longest_streak, temp_streak)
-                    if current_streak == 0:
-                        current_streak = temp_streak
-                    temp_streak = 1
-                
-                prev_date = instance.tracking_date
-            else:
-                # Missed day - streak broken
-                if temp_streak > 0:
-                    longest_streak = max(longest_streak, temp_streak)
-                    if current_streak == 0:
-                        current_streak = temp_streak
-                temp_streak = 0
-                prev_date = None
-        
-        # Handle final streak
-        longest_streak = max(longest_streak, temp_streak)
-        if current_streak == 0:
-            current_streak = temp_streak
-        
-        return StreakResult(
-            current_streak=current_streak if streak_active else 0,
-            longest_streak=longest_streak,
-            streak_active=streak_active,
-            last_completed_date=last_completed_date
-        )
-    
+        RollupService.apply_pending([tracker_id])
+        today = date.today()
+        as_of_date = as_of_date or today
+        user_threshold = StreakService.get_threshold(user_id)
+        threshold = threshold_percent or user_threshold
+
+        if as_of_date >= today and threshold == user_threshold:
+            state = TrackerStreak.objects.filter(tracker_id=tracker_id).first()
+            if state is None or state.threshold != threshold:
+                state = StreakService.rebuild_state(tracker_id, threshold)
+            if state.last_qualifying_date is None or state.last_qualifying_date <= as_of_date:
+                return StreakService._result(
+                    state.current_streak, state.longest_streak,
+                    state.last_qualifying_date, as_of_date
+                )
+
+        run, longest, last_date = StreakService._compute_runs(tracker_id, threshold, as_of_date)
+        return StreakService._result(run, longest, last_date, as_of_date)
+
     @staticmethod
     def get_all_user_streaks(user_id: int) -> list[dict]:
         """Get streak summary for all user's active trackers."""
-        
+
         trackers = TrackerDefinition.objects.filter(
             user_id=user_id,
             status='active',
             deleted_at__isnull=True
-        )
-        
-        return [
-            {
+        ).select_related('streak_state')
+        if RollupService.apply_pending([t.tracker_id for t in trackers]):
+            trackers = trackers.all()  # Reload the refreshed streak state
+
+        threshold = StreakService.get_threshold(user_id)
+        today = date.today()
+        results = []
+
+        for tracker in trackers:
+            state = getattr(tracker, 'streak_state', None)
+            if state is None or state.threshold != threshold:
+                state = StreakService.rebuild_state(tracker.tracker_id, threshold)
+            results.append({
                 'tracker_id': str(tracker.tracker_id),
                 'tracker_name': tracker.name,
-                **StreakService.calculate_streak(tracker.tracker_id, user_id)._asdict()
-            }
-            for tracker in trackers
-        ]
+                **StreakService._result(
+                    state.current_streak, state.longest_streak,
+                    state.last_qualifying_date, today
+                )._asdict()
+            })
+
+        return results
@@ -0,0 +1,331 @@
+"""
+Suggestion Service
+
+Per-user typeahead index over tracker names, task template descriptions,
+tags and past search queries.
+
+The index is a sorted array of (lowercased phrase, entry) pairs with one
+phrase per word of each entry ("gym workout", "workout"), so a prefix is
+answered by a binary search and a short range scan. It is built lazily in
+a fixed number of queries and cached like the relation index (shared
+cache plus the per-process LRU tier). Writes patch the cached index
+(core.signals.suggestion_signals) rather than invalidating it, so
+typeahead never touches the database once the index is warm.
+
+Past queries are ranked by frequency decayed by the time since they were
+last searched; entities by a fixed weight per type.
+"""
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Dict, List, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from core.helpers.cache_helpers import (
+    bump_generation, get_local_cache_setting, local_cache, versioned_key
+)
+from core.models import SearchHistory, Tag, TaskTemplate, TrackerDefinition
+
+# Entries are versioned by generation, so this only bounds memory use
+SUGGESTION_CACHE_TTL = 3600
+
+# Most distinct past queries kept per user (most recently searched first)
+MAX_HISTORY_QUERIES = 1000
+
+# A past query's weight halves every this many days since its last use
+RECENCY_HALF_LIFE_DAYS = 14
+
+# Weight of entity suggestions, by suggestion type
+ENTITY_WEIGHTS = {
+    'tracker': 1.0,
+    'tag': 0.8,
+    'task': 0.6,
+}
+
+# Multiplier for matches that start at a later word of the phrase
+INNER_WORD_WEIGHT = 0.75
+
+# Suggested task descriptions are truncated to this length
+MAX_SUGGESTION_LENGTH = 50
+
+WORD_START_RE = re.compile(r'\S+')
+
+
+def suggestions_tag(user_id: int) -> str:
+    """Invalidation tag for a user's suggestion index."""
+    return f"suggestions:{user_id}"
+
+
+class Entry(NamedTuple):
+    text: str                       # Suggested query
+    type: str                       # 'history', 'tracker', 'task' or 'tag'
+    tracker_id: Optional[str]       # Owning tracker of task suggestions
+    count: int                      # Times searched (history only)
+    last_used: float                # Timestamp of the last search (history only)
+
+
+def _phrases(text: str) -> List[str]:
+    """Lowercased phrase starting at each word of the text."""
+    lowered = text.lower()
+    return [lowered[match.start():] for match in WORD_START_RE.finditer(lowered)]
+
+
+class SuggestionIndex:
+    """
+    Sorted prefix array over one user's suggestion entries.
+
+    `entries` maps a source key ("tracker:<id>", "query:<text>", ...) to
+    its Entry; `phrases` is the sorted list of (phrase, source key).
+    Cached instances are shared by reference, so writers copy() first.
+    """
+
+    def __init__(self, entries: Dict[str, Entry]):
+        self.entries = entries
+        self.phrases = sorted(
+            (phrase, key)
+            for key, entry in entries.items()
+            for phrase in _phrases(entry.text)
+        )
+
+    def __getstate__(self):
+        # Only the entries go through the shared cache
+        return {'entries': self.entries}
+
+    def __setstate__(self, state):
+        self.__init__(state['entries'])
+
+    def copy(self) -> 'SuggestionIndex':
+        index = SuggestionIndex.__new__(SuggestionIndex)
+        index.entries = dict(self.entries)
+        index.phrases = list(self.phrases)
+        return index
+
+    def put(self, key: str, entry: Entry) -> None:
+        """Add or replace an entry."""
+        old = self.entries.get(key)
+        if old is not None and old.text != entry.text:
+            self.remove(key)
+        if key not in self.entries:
+            for phrase in _phrases(entry.text):
+                insort(self.phrases, (phrase, key))
+        self.entries[key] = entry
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for phrase in _phrases(entry.text):
+            position = bisect_left(self.phrases, (phrase, key))
+            if position < len(self.phrases) and self.phrases[position] == (phrase, key):
+                del self.phrases[position]
+
+    def remove_tracker(self, tracker_id) -> None:
+        """Remove a tracker and its task suggestions."""
+        tracker_id = str(tracker_id)
+        self.remove(f"tracker:{tracker_id}")
+        for key in [key for key, entry in self.entries.items() if entry.tracker_id == tracker_id]:
+            self.remove(key)
+
+    def weight(self, entry: Entry, now: float) -> float:
+        if entry.type != 'history':
+            return ENTITY_WEIGHTS[entry.type]
+        age_days = max(now - entry.last_used, 0) / 86400
+        return (1 + math.log1p(entry.count)) * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+    def suggest(self, prefix: str, limit: int, now: float) -> List[Entry]:
+        """Best entries with a word starting with `prefix`, one per text."""
+        prefix = prefix.lower()
+        scores: Dict[str, float] = {}
+        position = bisect_left(self.phrases, (prefix,))
+        while position < len(self.phrases):
+            phrase, key = self.phrases[position]
+            if not phrase.startswith(prefix):
+                break
+            entry = self.entries[key]
+            score = self.weight(entry, now)
+            if len(phrase) != len(entry.text):
+                score *= INNER_WORD_WEIGHT
+            scores[key] = max(scores.get(key, 0.0), score)
+            position += 1
+
+        best: Dict[str, tuple] = {}
+        for key, score in scores.items():
+            text = self.entries[key].text.lower()
+            if text not in best or score > best[text][0]:
+                best[text] = (score, key)
+        top = heapq.nlargest(limit, best.values(), key=lambda hit: (hit[0], hit[1]))
+        return [self.entries[key] for _, key in top]
+
+    def history(self) -> List[Entry]:
+        return [entry for entry in self.entries.values() if entry.type == 'history']
+
+
+class SuggestionService:
+    """Load, query and patch per-user suggestion indexes."""
+
+    @staticmethod
+    def _cache_key(user_id: int) -> str:
+        return versioned_key(f"suggestions:{user_id}", [suggestions_tag(user_id)], local=True)
+
+    @staticmethod
+    def get(user_id: int) -> SuggestionIndex:
+        """The user's suggestion index, built on a cache miss."""
+        cache_key = SuggestionService._cache_key(user_id)
+        index = local_cache.get(cache_key)
+        if index is None:
+            index = cache.get(cache_key)
+            if index is None:
+                index = SuggestionService.build(user_id)
+                cache.set(cache_key, index, SUGGESTION_CACHE_TTL)
+            local_cache.set(cache_key, index, get_local_cache_setting('TTL'))
+        return index
+
+    @staticmethod
+    def build(user_id: int) -> SuggestionIndex:
+        entries = {}
+        trackers = TrackerDefinition.objects.filter(
+            user_id=user_id, deleted_at__isnull=True
+        ).values_list('tracker_id', 'name')
+        for tracker_id, name in trackers:
+            entries[f"tracker:{tracker_id}"] = SuggestionService.tracker_entry(name)
+
+        templates = TaskTemplate.objects.filter(
+            tracker__user_id=user_id, tracker__deleted_at__isnull=True, deleted_at__isnull=True
+        ).values_list('template_id', 'description', 'tracker_id')
+        for template_id, description, tracker_id in templates:
+            entries[f"task:{template_id}"] = SuggestionService.task_entry(description, tracker_id)
+
+        for tag_id, name in Tag.objects.filter(user_id=user_id).values_list('tag_id', 'name'):
+            entries[f"tag:{tag_id}"] = SuggestionService.tag_entry(name)
+
+        queries = SearchHistory.objects.filter(user_id=user_id).values('query').annotate(
+            count=Count('search_id'), last_used=Max('created_at')
+        ).order_by('-last_used')[:MAX_HISTORY_QUERIES]
+        for row in queries:
+            entries[f"query:{row['query']}"] = Entry(
+                row['query'], 'history', None, row['count'], row['last_used'].timestamp()
+            )
+        return SuggestionIndex(entries)
+
+    @staticmethod
+    def tracker_entry(name: str) -> Entry:
+        return Entry(name, 'tracker', None, 0, 0.0)
+
+    @staticmethod
+    def task_entry(description: str, tracker_id) -> Entry:
+        return Entry(description[:MAX_SUGGESTION_LENGTH], 'task', str(tracker_id), 0, 0.0)
+
+    @staticmethod
+    def tag_entry(name: str) -> Entry:
+        return Entry(name, 'tag', None, 0, 0.0)
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _patch(user_id: int, change) -> None:
+        """
+        Apply `change(index)` to the cached index, if one is cached.
+
+        A cold index is left to be built on the next read, as is one the
+        change cannot patch (`change` returns False). Concurrent
+        patches from different processes may race; the loser's change
+        shows up once the entry expires or the generation is bumped.
+        """
+        cache_key = SuggestionService._cache_key(user_id)
+        # The shared copy is authoritative; this process's may lag it
+        index = cache.get(cache_key)
+        if index is None:
+            index = local_cache.get(cache_key)
+        if index is None:
+            return
+        index = index.copy()
+        if change(index) is False:
+            SuggestionService.invalidate(user_id)
+            return
+        cache.set(cache_key, index, SUGGESTION_CACHE_TTL)
+        local_cache.set(cache_key, index, get_local_cache_setting('TTL'))
+
+    @staticmethod
+    def put(user_id: int, key: str, entry: Entry) -> None:
+        SuggestionService._patch(user_id, lambda index: index.put(key, entry))
+
+    @staticmethod
+    def remove(user_id: int, key: str) -> None:
+        SuggestionService._patch(user_id, lambda index: index.remove(key))
+
+    @staticmethod
+    def put_tracker(user_id: int, tracker_id, name: str, created: bool) -> None:
+        """Add or rename a tracker; a restored one brings back its tasks."""
+        key = f"tracker:{tracker_id}"
+
+        def change(index):
+            if not created and key not in index.entries:
+                return False
+            index.put(key, SuggestionService.tracker_entry(name))
+        SuggestionService._patch(user_id, change)
+
+    @staticmethod
+    def remove_tracker(user_id: int, tracker_id) -> None:
+        SuggestionService._patch(user_id, lambda index: index.remove_tracker(tracker_id))
+
+    @staticmethod
+    def record_query(user_id: int, query: str, searched_at) -> None:
+        """Count one more search for a query."""
+        def change(index):
+            key = f"query:{query}"
+            old = index.entries.get(key)
+            index.put(key, Entry(
+                query, 'history', None,
+                (old.count if old else 0) + 1,
+                max(searched_at.timestamp(), old.last_used if old else 0.0)
+            ))
+        SuggestionService._patch(user_id, change)
+
+    @staticmethod
+    def invalidate(user_id: int) -> None:
+        """Drop the cached index; it is rebuilt on the next read."""
+        bump_generation(suggestions_tag(user_id))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def suggest(user_id: int, prefix: str, limit: int = 5) -> List[Dict]:
+        """Suggestions whose text has a word starting with `prefix`."""
+        index = SuggestionService.get(user_id)
+        return [
+            {'query': entry.text, 'type': entry.type}
+            for entry in index.suggest(prefix.strip(), limit, timezone.now().timestamp())
+        ]
+
+    @staticmethod
+    def recent(user_id: int, limit: int = 10) -> List[Entry]:
+        """Past queries, most recently searched first."""
+        return heapq.nlargest(
+            limit, SuggestionService.get(user_id).history(),
+            key=lambda entry: (entry.last_used, entry.text)
+        )
+
+    @staticmethod
+    def popular(user_id: int, min_count: int = 1, limit: int = 10) -> List[Entry]:
+        """
+        Most searched queries of all time.
+
+        The index keeps one all-time count per query; popularity within a
+        window comes from SearchService.get_popular_searches instead.
+        """
+        return heapq.nlargest(
+            limit,
+            [
+                entry for entry in SuggestionService.get(user_id).history()
+                if entry.count >= min_count
+            ],
+            key=lambda entry: (entry.count, entry.last_used)
+        )
@@ -3,6 +3,12 @@ Sync Service - Bidirectional sync for offline-first mobile apps.
 
 Handles queued actions from offline app and returns server changes.
 Enables seamless offline/online transitions for iOS and web.
+
+Server changes are pulled from the per-user change log by seq cursor
+(pull_changes). New clients bootstrap with a paged full sync that
+snapshots every synced entity, then pull from the cursor it returned.
+Older clients that still send a last_sync timestamp get the same paged
+full sync, since a timestamp cannot resume a partial page.
 """
 from typing import Dict, List, Any, Optional
 from datetime import datetime
@@ -15,8 +21,60 @@ from core.models import (
     TrackerInstance, 
     TaskInstance, 
     TaskTemplate,
-    DayNote
+    DayNote,
+    Goal,
+    Tag
 )
+from core.services.change_service import ChangeService
+from core.services.instance_service import InstanceService
+from core.services.task_service import TaskService
+
+# Offline task actions, applied as one batch per sync request
+TASK_ACTION_TYPES = ('task_toggle', 'task_status', 'task_notes')
+VALID_TASK_STATUSES = {status for status, _ in TaskInstance.STATUS_CHOICES}
+
+# Change log pages
+DEFAULT_PULL_LIMIT = 200
+MAX_PULL_LIMIT = 1000
+
+# Rows per full sync page, across all entity types
+FULL_SYNC_PAGE_SIZE = 500
+
+# entity_type -> (model, fields returned to clients)
+SYNC_ENTITIES = {
+    'tracker': (TrackerDefinition, (
+        'tracker_id', 'name', 'description', 'status', 'time_mode', 'updated_at'
+    )),
+    'template': (TaskTemplate, (
+        'template_id', 'tracker_id', 'description', 'category', 'time_of_day',
+        'weight', 'points', 'include_in_goal', 'is_recurring'
+    )),
+    'task': (TaskInstance, (
+        'task_instance_id', 'status', 'notes', 'completed_at', 'updated_at',
+        'template_id', 'tracker_instance__tracker__tracker_id',
+        'tracker_instance__period_start'
+    )),
+    'day_note': (DayNote, (
+        'note_id', 'tracker_id', 'date', 'content', 'updated_at'
+    )),
+    'goal': (Goal, (
+        'goal_id', 'tracker_id', 'title', 'goal_type', 'status', 'target_value',
+        'current_value', 'progress', 'target_date', 'updated_at'
+    )),
+    'tag': (Tag, (
+        'tag_id', 'name', 'color'
+    )),
+}
+
+# entity_type -> path from the model to its owner, for full syncs
+SYNC_OWNERS = {
+    'tracker': 'user',
+    'template': 'tracker__user',
+    'task': 'tracker_instance__tracker__user',
+    'day_note': 'tracker__user',
+    'goal': 'user',
+    'tag': 'user',
+}
 
 
 class SyncService:
@@ -26,13 +84,13 @@ class SyncService:
     Design:
     - Client sends pending actions from offline queue
     - Server processes actions and returns results
-    - Server sends changes since last sync timestamp
+    - Server sends changes since the client's change log cursor
     - Conflict resolution: Last-write-wins with timestamps
     
     Usage:
         sync_service = SyncService(request.user)
         result = sync_service.process_sync_request({
-            'last_sync': '2025-12-06T10:00:00Z',
+            'cursor': '1042',
             'pending_actions': [...],
             'device_id': 'ios-abc123'
         })
@@ -47,7 +105,9 @@ class SyncService:
         
         Args:
             data: {
-                'last_sync': ISO timestamp (optional),
+                'cursor': Change log cursor from the previous sync (optional),
+                'full_sync_token': Next full sync page (optional),
+                'last_sync': ISO timestamp (optional, legacy clients),
                 'pending_actions': List of offline actions,
                 'device_id': Device identifier
             }
@@ -56,90 +116,283 @@ class SyncService:
             {
                 'action_results': Results for each pending action,
                 'server_changes': Changes since last sync,
+                'cursor': Cursor for the next pull,
                 'new_sync_timestamp': Timestamp for next sync,
-                'sync_status': 'complete' or 'partial'
+                'sync_status': 'complete' or 'partial' (more pages to pull)
             }
+        
+        Without a cursor the server sends a full sync (last_sync is only
+        accepted for older clients). While it is partial, send back
+        server_changes['full_sync_token'] for the next page; once
+        complete, pull from the cursor.
+        
+        Raises:
+            ValueError: If the cursor or full_sync_token is malformed
         """
-        last_sync = data.get('last_sync')
+        cursor = data.get('cursor')
+        full_sync_token = data.get('full_sync_token')
         pending_actions = data.get('pending_actions', [])
         device_id = data.get('device_id', 'unknown')
         
+        # Reject a bad position before any action is applied
+        if cursor is not None:
+            self._parse_cursor(cursor)
+        elif full_sync_token:
+            self._parse_full_sync_token(full_sync_token)
+        
         # Process queued actions
-        action_results = []
-        for action in pending_actions:
-            result = self._process_action(action)
-            action_results.append(result)
+        action_results = self._process_actions(pending_actions)
         
         # Get server changes since last sync
-        changes = self._get_changes_since(last_sync) if last_sync else self._get_full_sync()
+        if cursor is not None:
+            changes = self.pull_changes(cursor)
+            next_cursor = changes['cursor']
+        else:
+            changes = self._get_full_sync(full_sync_token, FULL_SYNC_PAGE_SIZE)
+            next_cursor = changes['cursor']
         
         return {
             'action_results': action_results,
             'server_changes': changes,
+            'cursor': next_cursor,
             'new_sync_timestamp': timezone.now().isoformat(),
-            'sync_status': 'complete',
+            'sync_status': 'partial' if changes.get('has_more') else 'complete',
             'device_id': device_id
         }
     
+    def pull_changes(self, cursor, limit: int = DEFAULT_PULL_LIMIT) -> Dict:
+        """
+        Page through the user's change log after a cursor.
+        
+        Each entity appears once per page with its current state, so cost
+        scales with the number of changes, not table size. Pages are
+        complete: pull again with the returned cursor while has_more is set.
+        
+        Args:
+            cursor: Cursor from a previous pull or sync ('0' for everything)
+            limit: Max log entries consumed per page (capped at MAX_PULL_LIMIT)
+        
+        Returns:
+            {
+                'changes': [{'seq', 'entity_type', 'entity_id', 'op', 'data'}],
+                    op is 'upsert' or 'delete' (data is None for deletes)
+                'cursor': Cursor to resume from,
+                'has_more': More entries after this page,
+                'reset_required': Cursor predates the retained log; do a full sync
+            }
+        """
+        cursor = self._parse_cursor(cursor)
+        limit = max(1, min(int(limit), MAX_PULL_LIMIT))
+        
+        if cursor < ChangeService.pruned_through(self.user.id):
+            return {
+                'changes': [],
+                'cursor': str(cursor),
+                'has_more': False,
+                'reset_required': True,
+            }
+        
+        entries = ChangeService.entries_since(self.user.id, cursor, limit + 1)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        
+        # Later entries for the same entity supersede earlier ones
+        latest = {}
+        for entry in entries:
+            latest[(entry.entity_type, entry.entity_id)] = entry
+        
+        rows = self._load_entities(latest.keys())
+        
+        changes = []
+        for key, entry in sorted(latest.items(), key=lambda item: item[1].seq):
+            row = rows.get(key)
+            deleted = row is None or row.pop('deleted_at', None) is not None
+            changes.append({
+                'seq': entry.seq,
+                'entity_type': entry.entity_type,
+                'entity_id': entry.entity_id,
+                'op': 'delete' if deleted else 'upsert',
+                'data': None if deleted else row,
+            })
+        
+        return {
+            'changes': changes,
+            'cursor': str(entries[-1].seq if entries else cursor),
+            'has_more': has_more,
+            'reset_required': False,
+        }
+    
+    @staticmethod
+    def _parse_cursor(cursor) -> int:
+        """Change log seq from a cursor; ValueError if malformed."""
+        try:
+            return int(cursor)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+    
+    @staticmethod
+    def _parse_full_sync_token(token: str):
+        """(cursor, entity type index, after pk) from a full sync token."""
+        try:
+            cursor, entity_type, after = token.split(':', 2)
+            int(cursor)
+            return cursor, list(SYNC_ENTITIES).index(entity_type), after
+        except (AttributeError, ValueError):
+            raise ValueError(f"Invalid full sync token: {token!r}")
+    
+    def _load_entities(self, keys) -> Dict:
+        """Current rows for (entity_type, entity_id) pairs, one query per type."""
+        ids_by_type = {}
+        for entity_type, entity_id in keys:
+            ids_by_type.setdefault(entity_type, []).append(entity_id)
+        
+        rows = {}
+        for entity_type, ids in ids_by_type.items():
+            if entity_type not in SYNC_ENTITIES:
+                continue
+            model, fields = SYNC_ENTITIES[entity_type]
+            pk_name = model._meta.pk.name
+            extra = ('deleted_at',) if hasattr(model, 'deleted_at') else ()
+            for row in model.objects.filter(**{f'{pk_name}__in': ids}).values(*fields, *extra):
+                rows[(entity_type, str(row[pk_name]))] = row
+        return rows
+    
     def _process_action(self, action: Dict) -> Dict:
+        """Process a single queued action (see _process_actions)."""
+        return self._process_actions([action])[0]
+    
+    def _process_actions(self, actions: List[Dict]) -> List[Dict]:
         """
-        Process a single queued action from the client.
+        Apply queued actions from the client, one result per action in order.
         
         Supported action types:
         - task_toggle: Toggle task status
         - task_status: Set specific status
         - task_notes: Update task notes
         - day_note: Save day note
+        
+        Task actions run as one batch: the referenced tasks are loaded in a
+        single query, actions are applied in memory in client order (so a
+        later action sees the result of an earlier one on the same task),
+        and changed tasks are written with one bulk_update. Side effects
+        run once per affected tracker instead of once per action.
+        """
+        results = [None] * len(actions)
+        task_slots = []
+        note_slots = []
+        
+        for index, action in enumerate(actions):
+            action_type = action.get('type')
+            if action_type in TASK_ACTION_TYPES:
+                task_slots.append(index)
+            elif action_type == 'day_note':
+                note_slots.append(index)
+            else:
+                results[index] = {
+                    'id': action.get('id', 'unknown'),
+                    'success': False,
+                    'error': f'Unknown action type: {action_type}',
+                    'retry': False
+                }
+        
+        if task_slots:
+            self._apply_task_actions(actions, task_slots, results)
+        if note_slots:
+            self._apply_day_notes(actions, note_slots, results)
+        
+        return results
+    
+    def _apply_task_actions(self, actions: List[Dict], slots: List[int], results: List) -> None:
         """
-        action_type = action.get('type')
-        action_id = action.get('id', 'unknown')
-        client_timestamp = action.get('timestamp')
+        Apply the task actions at `slots` and write them in one transaction.
         
+        Unknown tasks, conflicts and invalid statuses fail only their own
+        action. If the write fails, every task action in the batch fails
+        with retry set.
+        """
         try:
             with transaction.atomic():
-                if action_type == 'task_toggle':
-                    return self._action_task_toggle(action_id, action)
-                
-                elif action_type == 'task_status':
-                    return self._action_task_status(action_id, action)
-                
-                elif action_type == 'task_notes':
-                    return self._action_task_notes(action_id, action)
-                
-                elif action_type == 'day_note':
-                    return self._action_day_note(action_id, action)
+                tasks = self._load_tasks(actions[index].get('task_id') for index in slots)
+                changed = {}
                 
-                else:
-                    return {
-                        'id': action_id,
-                        'success': False,
-                        'error': f'Unknown action type: {action_type}',
-                        'retry': False
-                    }
+                for index in slots:
+                    action = actions[index]
+                    action_id = action.get('id', 'unknown')
+                    task = tasks.get(str(action.get('task_id')))
+                    if task is None:
+                        results[index] = {
+                            'id': action_id,
+                            'success': False,
+                            'error': 'Task not found',
+                            'retry': False
+                        }
+                        continue
+                    
+                    apply = getattr(self, f"_apply_{action['type']}")
+                    results[index] = {'id': action_id, **apply(action, task)}
+                    if results[index]['success']:
+                        changed[task.pk] = task
                 
+                server_timestamp = TaskService.bulk_save_tasks(
+                    list(changed.values()),
+                    change_reason='offline sync',
+                    history_user=self.user
+                ).isoformat()
         except Exception as e:
-            return {
-                'id': action_id,
-                'success': False,
-                'error': str(e),
-                'retry': True
-            }
+            for index in slots:
+                results[index] = {
+                    'id': actions[index].get('id', 'unknown'),
+                    'success': False,
+                    'error': str(e),
+                    'retry': True
+                }
+            return
+        
+        for index in slots:
+            if results[index]['success']:
+                results[index]['server_timestamp'] = server_timestamp
+    
+    def _load_tasks(self, task_ids) -> Dict[str, TaskInstance]:
+        """
+        The user's tasks by the IDs given, locked for the batch, in one
+        query. Virtual task IDs are materialized first.
+        """
+        resolved = InstanceService.resolve_task_ids(
+            {str(task_id) for task_id in task_ids if task_id}, self.user
+        )
+        tasks = {
+            str(task.task_instance_id): task
+            for task in TaskInstance.objects.filter(
+                task_instance_id__in=set(resolved.values()),
+                tracker_instance__tracker__user=self.user
+            ).select_related('tracker_instance__tracker').select_for_update(of=('self',))
+        }
+        return {task_id: tasks[real_id] for task_id, real_id in resolved.items() if real_id in tasks}
     
     def _action_task_toggle(self, action_id: str, action: Dict) -> Dict:
         """Toggle task status"""
-        task_id = action.get('task_id')
+        return self._process_action({**action, 'id': action_id, 'type': 'task_toggle'})
+    
+    def _action_task_status(self, action_id: str, action: Dict) -> Dict:
+        """Set specific task status"""
+        return self._process_action({**action, 'id': action_id, 'type': 'task_status'})
+    
+    def _action_task_notes(self, action_id: str, action: Dict) -> Dict:
+        """Update task notes"""
+        return self._process_action({**action, 'id': action_id, 'type': 'task_notes'})
+    
+    def _action_day_note(self, action_id: str, action: Dict) -> Dict:
+        """Save day note"""
+        return self._process_action({**action, 'id': action_id, 'type': 'day_note'})
+    
+    def _apply_task_toggle(self, action: Dict, task: TaskInstance) -> Dict:
+        """Toggle a loaded task's status in memory."""
         expected_old = action.get('old_status')
         new_status = action.get('new_status')
         
-        task = TaskInstance.objects.get(
-            task_instance_id=task_id,
-            tracker_instance__tracker__user=self.user
-        )
-        
         # Conflict check: If server status differs from expected old status
         if expected_old and task.status != expected_old:
             return {
-                'id': action_id,
                 'success': False,
                 'conflict': True,
                 'server_status': task.status,
@@ -151,215 +404,175 @@ class SyncService:
         # Auto-toggle if new_status not provided
         if not new_status:
             new_status = 'DONE' if task.status == 'TODO' else 'TODO'
-            
+        elif new_status not in VALID_TASK_STATUSES:
+            return self._invalid_status(new_status)
+        
         task.status = new_status
-        task.completed_at = timezone.now() if new_status == 'DONE' else None
-        task.save()
         
         return {
-            'id': action_id,
             'success': True,
-            'task_id': task_id,
-            'new_status': new_status,
-            'server_timestamp': task.updated_at.isoformat()
+            'task_id': action.get('task_id'),
+            'new_status': new_status
         }
     
-    def _action_task_status(self, action_id: str, action: Dict) -> Dict:
-        """Set specific task status"""
-        task_id = action.get('task_id')
+    def _apply_task_status(self, action: Dict, task: TaskInstance) -> Dict:
+        """Set a loaded task's status (and optionally notes) in memory."""
         status = action.get('status')
-        notes = action.get('notes', '')
-        
-        task = TaskInstance.objects.get(
-            task_instance_id=task_id,
-            tracker_instance__tracker__user=self.user
-        )
+        if status not in VALID_TASK_STATUSES:
+            return self._invalid_status(status)
         
         task.status = status
-        task.notes = notes or task.notes
-        task.completed_at = timezone.now() if status == 'DONE' else None
-        task.save()
+        task.notes = action.get('notes') or task.notes
         
         return {
-            'id': action_id,
             'success': True,
-            'task_id': task_id,
-            'server_timestamp': task.updated_at.isoformat()
+            'task_id': action.get('task_id')
         }
     
-    def _action_task_notes(self, action_id: str, action: Dict) -> Dict:
-        """Update task notes"""
-        task_id = action.get('task_id')
-        notes = action.get('notes', '')
-        
-        task = TaskInstance.objects.get(
-            task_instance_id=task_id,
-            tracker_instance__tracker__user=self.user
-        )
-        
-        task.notes = notes
-        task.save()
+    def _apply_task_notes(self, action: Dict, task: TaskInstance) -> Dict:
+        """Replace a loaded task's notes in memory."""
+        task.notes = action.get('notes', '')
         
         return {
-            'id': action_id,
             'success': True,
-            'task_id': task_id,
-            'server_timestamp': task.updated_at.isoformat()
+            'task_id': action.get('task_id')
         }
-
-    def _action_day_note(self, action_id: str, action: Dict) -> Dict:
-        """Save day note"""
-        from core.models import DayNote, TrackerDefinition
-        
-        tracker_id = action.get('tracker_id')
-        note_date_str = action.get('date')
-        content = action.get('content', '')
-        
-        tracker = TrackerDefinition.objects.get(
-            tracker_id=tracker_id,
-            user=self.user
-        )
-        
-        note_date = datetime.fromisoformat(note_date_str).date()
-        
-        note, created = DayNote.objects.update_or_create(
-            tracker=tracker,
-            date=note_date,
-            defaults={'content': content}
-        )
-        
+    
+    @staticmethod
+    def _invalid_status(status) -> Dict:
         return {
-            'id': action_id,
-            'success': True,
-            'note_id': str(note.pk),
-            'created': created
+            'success': False,
+            'error': f'Invalid status: {status}',
+            'retry': False
         }
     
-    def _get_changes_since(self, last_sync: str) -> Dict:
+    def _apply_day_notes(self, actions: List[Dict], slots: List[int], results: List) -> None:
         """
-        Get all changes since last sync timestamp.
-        Returns lightweight data for efficient sync.
+        Save the day notes at `slots`.
+        
+        Notes for the same tracker and date coalesce to the last one
+        queued, so each note is written once.
         """
-        try:
-            last_sync_dt = datetime.fromisoformat(last_sync.replace('Z', '+00:00'))
-        except ValueError:
-            # Fallback: try without timezone
-            last_sync_dt = datetime.fromisoformat(last_sync)
-        
-        # Get updated trackers (not deleted)
-        updated_trackers = TrackerDefinition.objects.filter(
-            user=self.user,
-            updated_at__gt=last_sync_dt,
-            deleted_at__isnull=True
-        ).values(
-            'tracker_id', 'name', 'status', 'time_mode', 'updated_at'
-        )[:50]
-        
-        # Get deleted trackers
-        deleted_trackers = TrackerDefinition.objects.filter(
-            user=self.user,
-            deleted_at__gt=last_sync_dt
-        ).values('tracker_id', 'deleted_at')
-        
-        # Get updated tasks (not deleted)
-        updated_tasks = TaskInstance.objects.filter(
-            tracker_instance__tracker__user=self.user,
-            updated_at__gt=last_sync_dt,
-            deleted_at__isnull=True
-        ).select_related(
-            'template', 'tracker_instance__tracker'
-        ).values(
-            'task_instance_id', 
-            'status', 
-            'notes',
-            'completed_at',
-            'updated_at',
-            'tracker_instance__tracker__tracker_id'
-        )[:100]
-        
-        # Get deleted tasks
-        deleted_tasks = TaskInstance.objects.filter(
-            tracker_instance__tracker__user=self.user,
-            deleted_at__gt=last_sync_dt
-        ).values('task_instance_id', 'deleted_at')
-        
-        # Get updated day notes
-        updated_notes = DayNote.objects.filter(
-            tracker__user=self.user,
-            updated_at__gt=last_sync_dt,
-            deleted_at__isnull=True
-        ).values(
-            'date', 'content', 'updated_at'
-        )[:30]
+        tracker_ids = set(
+            str(t) for t in TrackerDefinition.objects.filter(
+                user=self.user,
+                tracker_id__in=[str(actions[index].get('tracker_id')) for index in slots]
+            ).values_list('tracker_id', flat=True)
+        )
         
-        return {
-            'trackers': {
-                'updated': list(updated_trackers),
-                'deleted': list(deleted_trackers)
-            },
-            'tasks': {
-                'updated': list(updated_tasks),
-                'deleted': list(deleted_tasks)
-            },
-            'day_notes': {
-                'updated': list(updated_notes)
-            },
-            'has_more': False
-        }
+        latest = {}  # (tracker_id, date) -> slots, last write last
+        for index in slots:
+            action = actions[index]
+            action_id = action.get('id', 'unknown')
+            tracker_id = str(action.get('tracker_id'))
+            if tracker_id not in tracker_ids:
+                results[index] = {
+                    'id': action_id,
+                    'success': False,
+                    'error': 'Tracker not found',
+                    'retry': False
+                }
+                continue
+            try:
+                note_date = datetime.fromisoformat(action.get('date')).date()
+            except (TypeError, ValueError):
+                results[index] = {
+                    'id': action_id,
+                    'success': False,
+                    'error': f"Invalid date: {action.get('date')}",
+                    'retry': False
+                }
+                continue
+            latest.setdefault((tracker_id, note_date), []).append(index)
+        
+        for (tracker_id, note_date), note_slots in latest.items():
+            try:
+                with transaction.atomic():
+                    note, created = DayNote.objects.update_or_create(
+                        tracker_id=tracker_id,
+                        date=note_date,
+                        defaults={'content': actions[note_slots[-1]].get('content', '')}
+                    )
+                outcome = {'success': True, 'note_id': str(note.pk), 'created': created}
+            except Exception as e:
+                outcome = {'success': False, 'error': str(e), 'retry': True}
+            for index in note_slots:
+                results[index] = {'id': actions[index].get('id', 'unknown'), **outcome}
+    
+    def _live_rows(self, entity_type: str):
+        """The user's rows of a synced entity type that are not deleted."""
+        model, _ = SYNC_ENTITIES[entity_type]
+        rows = model.objects.filter(**{SYNC_OWNERS[entity_type]: self.user})
+        if hasattr(model, 'deleted_at'):
+            rows = rows.filter(deleted_at__isnull=True)
+        if entity_type == 'task':
+            rows = rows.filter(tracker_instance__deleted_at__isnull=True)
+        return rows
     
-    def _get_full_sync(self) -> Dict:
+    def _get_full_sync(self, token: Optional[str] = None, limit: int = FULL_SYNC_PAGE_SIZE) -> Dict:
         """
-        Get full data for initial sync (no last_sync timestamp).
-        Returns minimal data to bootstrap the client.
+        One page of a full sync: every live row of every synced entity,
+        in SYNC_ENTITIES order and then by primary key.
+        
+        The first page reads the change log cursor before any rows, so
+        writes made while the client pages through are pulled again
+        afterwards. Later pages carry that cursor in their token.
+        
+        Args:
+            token: full_sync_token from the previous page (None to start)
+            limit: Max rows in this page, across entity types
+        
+        Returns:
+            {
+                '<entity_type>s': {'updated': [rows], 'deleted': []} per entity type,
+                'is_full_sync': True,
+                'has_more': More pages follow,
+                'full_sync_token': Token for the next page (None on the last),
+                'cursor': Cursor to pull from once the full sync is complete
+            }
+        
+        Raises:
+            ValueError: If the token is malformed
         """
-        # Get all active trackers (exclude deleted)
-        trackers = TrackerDefinition.objects.filter(
-            user=self.user,
-            deleted_at__isnull=True
-        ).exclude(
-            status='archived'
-        ).values(
-            'tracker_id', 'name', 'description', 'status', 'time_mode', 'updated_at'
-        )
+        entity_types = list(SYNC_ENTITIES)
+        if token:
+            cursor, start, after = self._parse_full_sync_token(token)
+        else:
+            cursor, start, after = str(ChangeService.current(self.user.id)), 0, ''
         
-        # Get recent tasks (last 14 days, exclude deleted)
-        from datetime import date, timedelta
-        cutoff = date.today() - timedelta(days=14)
-        
-        tasks = TaskInstance.objects.filter(
-            tracker_instance__tracker__user=self.user,
-            tracker_instance__period_start__gte=cutoff,
-            deleted_at__isnull=True
-        ).select_related(
-            'template', 'tracker_instance__tracker'
-        ).values(
-            'task_instance_id',
-            'status',
-            'notes',
-            'completed_at',
-            'updated_at',
-            'tracker_instance__tracker__tracker_id',
-            'template__description',
-            'template__category',
-            'template__time_of_day',
-            'template__weight'
-        )[:500]
+        result = {f'{entity_type}s': {'updated': [], 'deleted': []} for entity_type in entity_types}
+        remaining = max(1, limit)
+        next_token = None
         
-        return {
-            'trackers': {
-                'updated': list(trackers),
-                'deleted': []
-            },
-            'tasks': {
-                'updated': list(tasks),
-                'deleted': []
-            },
-            'day_notes': {
-                'updated': []
-            },
+        for index in range(start, len(entity_types)):
+            entity_type = entity_types[index]
+            if remaining == 0:
+                next_token = f"{cursor}:{entity_type}:"
+                break
+            
+            model, fields = SYNC_ENTITIES[entity_type]
+            pk_name = model._meta.pk.name
+            rows = self._live_rows(entity_type)
+            if after:
+                rows = rows.filter(**{f'{pk_name}__gt': after})
+            rows = list(rows.order_by(pk_name).values(*fields)[:remaining + 1])
+            after = ''
+            
+            if len(rows) > remaining:
+                rows = rows[:remaining]
+                next_token = f"{cursor}:{entity_type}:{rows[-1][pk_name]}"
+            result[f'{entity_type}s']['updated'] = rows
+            remaining -= len(rows)
+            if next_token:
+                break
+        
+        result.update({
             'is_full_sync': True,
-            'has_more': False
-        }
+            'has_more': next_token is not None,
+            'full_sync_token': next_token,
+            'cursor': cursor,
+        })
+        return result
 
 
 # Convenience function for API use
@@ -6,25 +6,38 @@ Provides clean interface for task operations with proper validation and error ha
 """
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from django.utils import timezone
 from django.db import transaction
+from simple_history.utils import bulk_update_with_history
 
 from core.repositories import base_repository as crud
-from core.models import TaskInstance, TrackerDefinition, TaskTemplate, TrackerInstance
+from core.models import TaskInstance, TrackerDefinition, TaskTemplate, TrackerInstance, GoalTaskMapping
 from core.helpers.cache_helpers import invalidate_tracker_cache
+from core.integrations.job_queue import JobQueue
 from core.serializers import (
     TaskTemplateSerializer, 
     TaskStatusUpdateSerializer,
     BulkStatusUpdateSerializer
 )
-from core.services.instance_service import ensure_tracker_instance
+from core.services.instance_service import InstanceService, ensure_tracker_instance
+from core.services.rollup_service import RollupService
+from core.services.search_index_service import SearchIndexService, task_notes_changed
+from core.services.change_service import ChangeService
+from core.services.goal_service import ACTIVE_GOAL_STATUSES
+from core.services.dashboard_snapshot_service import JOB_KIND as SNAPSHOT_JOB_KIND, tracker_job_key
 
 from core.exceptions import (
     TaskNotFoundError, TemplateNotFoundError, InvalidStatusError, 
     ValidationError as AppValidationError
 )
 
+# Fields written by TaskService.bulk_save_tasks
+BULK_SAVE_FIELDS = (
+    'status', 'notes', 'completed_at', 'first_completed_at', 'updated_at', 'last_status_change'
+)
+BULK_SAVE_BATCH_SIZE = 500
+
 
 class TaskService:
     """
@@ -72,7 +85,8 @@ class TaskService:
         
         return crud.model_to_dict(template)
     
-    def update_task_status(self, task_id: str, status: str, notes: Optional[str] = None) -> Dict:
+    def update_task_status(self, task_id: str, status: str, notes: Optional[str] = None,
+                           user=None) -> Dict:
         """
         Update task status with proper completion tracking.
         
@@ -80,6 +94,7 @@ class TaskService:
             task_id: Task instance ID
             status: New status (TODO, IN_PROGRESS, DONE, MISSED, BLOCKED)
             notes: Optional notes
+            user: When given, tasks owned by anyone else are not found
             
         Returns:
             Updated task dict
@@ -105,42 +120,49 @@ class TaskService:
         status = validated['status']
         notes = validated.get('notes')
         
-        # Fetch task
-        task = crud.db.fetch_by_id('TaskInstances', 'task_instance_id', task_id)
-        if not task:
+        return self._save_status(self._load_task(task_id, user), status, notes)
+    
+    def _load_task(self, task_id: str, user=None) -> TaskInstance:
+        """
+        Fetch a task with its day and template in one query, materializing
+        virtual tasks (only user's, when given).
+        """
+        resolved = InstanceService.resolve_task_ids([task_id], user).get(str(task_id))
+        tasks = TaskInstance.objects.select_related(
+            'tracker_instance', 'template'
+        ).filter(task_instance_id=resolved)
+        if user is not None:
+            tasks = tasks.filter(tracker_instance__tracker__user=user)
+        task = tasks.first()
+        if task is None:
             raise TaskNotFoundError(task_id)
-        
-        # Get tracker ID for cache invalidation
-        tracker_instance = crud.db.fetch_by_id('TrackerInstances', 'instance_id', task['tracker_instance_id'])
-        tracker_id = tracker_instance['tracker_id'] if tracker_instance else None
-        
-        # Update with proper completion tracking
-        updates = {'status': status}
-        
-        if notes is not None:
-            updates['notes'] = notes
-        
+        return task
+    
+    def _save_status(self, task: TaskInstance, status: str, notes: Optional[str] = None) -> Dict:
+        """Apply a validated status (and notes) with completion tracking."""
         # Handle completion timestamp
-        if status == 'DONE' and task.get('status') != 'DONE':
-            updates['completed_at'] = timezone.now()
+        if status == 'DONE' and task.status != 'DONE':
+            task.completed_at = timezone.now()
         elif status != 'DONE':
-            updates['completed_at'] = None
+            task.completed_at = None
         
-        # Apply updates
-        updated_task = crud.update_task_instance(task_id, updates)
+        task.status = status
+        if notes is not None:
+            task.notes = notes
+        task.save()
         
         # Invalidate cache
-        if tracker_id:
-            invalidate_tracker_cache(tracker_id)
+        invalidate_tracker_cache(task.tracker_instance.tracker_id)
         
-        return crud.model_to_dict(updated_task)
+        return crud.model_to_dict(task)
     
-    def toggle_task_status(self, task_id: str) -> Dict:
+    def toggle_task_status(self, task_id: str, user=None) -> Dict:
         """
         Cycle through task statuses: TODO → IN_PROGRESS → DONE → TODO.
         
         Args:
             task_id: Task instance ID
+            user: When given, tasks owned by anyone else are not found
             
         Returns:
             Updated task dict with new status
@@ -148,12 +170,10 @@ class TaskService:
         Raises:
             TaskNotFoundError: If task not found
         """
-        task = crud.db.fetch_by_id('TaskInstances', 'task_instance_id', task_id)
-        if not task:
-            raise TaskNotFoundError(task_id)
+        task = self._load_task(task_id, user)
         
         # Cycle status: TODO → DONE → TODO (simplified for faster UX)
-        current_status = task.get('status', 'TODO')
+        current_status = task.status or 'TODO'
         status_cycle = {
             'TODO': 'DONE',
             'IN_PROGRESS': 'DONE',
@@ -163,23 +183,27 @@ class TaskService:
         }
         new_status = status_cycle.get(current_status, 'TODO')
         
-        return self.update_task_status(task_id, new_status)
+        return self._save_status(task, new_status)
     
     @transaction.atomic
-    def bulk_update_tasks(self, task_ids: List[str], status: str) -> Dict:
+    def bulk_update_tasks(self, task_ids: List[str], status: str, user=None) -> Dict:
         """
         Update multiple tasks at once within a transaction.
         All updates succeed or all fail - ensures data integrity.
         
+        Set-based: one query loads the tasks, bulk_save_tasks writes them,
+        however many IDs are given.
+        
         Args:
             task_ids: List of task instance IDs
             status: Status to apply to all tasks
+            user: When given, tasks owned by anyone else count as failed
             
         Returns:
             {
                 'updated': int,
                 'failed': int,
-                'tracker_ids': set of affected tracker IDs
+                'tracker_ids': list of affected tracker IDs
             }
         """
         # Validate using serializer
@@ -190,48 +214,113 @@ class TaskService:
             errors = serializer.errors
             first_error = next(iter(errors.items()))
             raise AppValidationError(first_error[0], str(first_error[1][0]))
-
-        updated_count = 0
-        failed_count = 0
-        tracker_ids = set()
         
-        try:
-            for task_id in task_ids:
-                try:
-                    task = self.update_task_status(task_id, status)
-                    updated_count += 1
-                    
-                    # Track affected trackers for cache invalidation
-                    task_obj = crud.db.fetch_by_id('TaskInstances', 'task_instance_id', task_id)
-                    if task_obj:
-                        tracker_instance = crud.db.fetch_by_id(
-                            'TrackerInstances', 
-                            'instance_id', 
-                            task_obj['tracker_instance_id']
-                        )
-                        if tracker_instance:
-                            tracker_ids.add(tracker_instance['tracker_id'])
-                except Exception as e:
-                    failed_count += 1
-                    import logging
-                    logging.error(f"Failed to update task {task_id}: {e}")
-                    # Continue with other tasks instead of failing entirely
-            
-            # Bulk cache invalidation after all updates
-            for tracker_id in tracker_ids:
-                invalidate_tracker_cache(tracker_id)
+        task_ids = list(dict.fromkeys(str(task_id) for task_id in task_ids))
+        
+        tasks = TaskInstance.objects.filter(
+            task_instance_id__in=set(InstanceService.resolve_task_ids(task_ids, user).values())
+        ).select_related('tracker_instance__tracker')
+        if user is not None:
+            tasks = tasks.filter(tracker_instance__tracker__user=user)
+        tasks = list(tasks)
+        
+        for task in tasks:
+            task.status = status
+        TaskService.bulk_save_tasks(tasks, change_reason='bulk status update', history_user=user)
+        
+        return {
+            'updated': len(tasks),
+            'failed': len(task_ids) - len(tasks),
+            'tracker_ids': list({task.tracker_instance.tracker_id for task in tasks})
+        }
+    
+    @staticmethod
+    def bulk_save_tasks(tasks: List[TaskInstance], change_reason: str, history_user=None) -> datetime:
+        """
+        Write status and notes changes made in memory to loaded tasks.
+        
+        Completion times follow update_task_status: completed_at is stamped
+        when a task becomes DONE and cleared otherwise, first_completed_at
+        is set once. Audit history is written in bulk and side effects run
+        once per affected tracker (see emit_bulk_side_effects).
+        
+        Args:
+            tasks: Tasks loaded with tracker_instance__tracker
+            change_reason: Recorded on the history rows
+            history_user: Recorded on the history rows
             
-            return {
-                'updated': updated_count,
-                'failed': failed_count,
-                'tracker_ids': list(tracker_ids)
-            }
-        except Exception as e:
-            # Transaction will auto-rollback on exception
-            import logging
-            logging.error(f"Bulk update transaction failed: {e}")
-            raise
+        Returns:
+            The timestamp written to updated_at
+        """
+        now = timezone.now()
+        if not tasks:
+            return now
+        
+        by_owner = {}
+        for task in tasks:
+            was_done = getattr(task, '_loaded_status', None) == 'DONE'
+            if task.status == 'DONE':
+                task.completed_at = task.completed_at if was_done and task.completed_at else now
+                task.first_completed_at = task.first_completed_at or now
+            else:
+                task.completed_at = None
+            task.updated_at = now
+            task.last_status_change = now
+            
+            completed, owned = by_owner.setdefault(task.tracker_instance.tracker.user_id, (set(), []))
+            owned.append(task)
+            if task.status == 'DONE' and not was_done:
+                completed.add(task.tracker_instance.tracker_id)
+            task._loaded_status = task.status
+        
+        # bulk_update bypasses post_save, so history rows are written here
+        bulk_update_with_history(
+            tasks,
+            TaskInstance,
+            BULK_SAVE_FIELDS,
+            batch_size=BULK_SAVE_BATCH_SIZE,
+            default_user=history_user,
+            default_change_reason=change_reason
+        )
+        for user_id, (completed, owned) in by_owner.items():
+            TaskService.emit_bulk_side_effects(user_id, owned, completed)
+        
+        return now
 
+    @transaction.atomic
+    def bulk_delete_tasks(self, task_ids: List[str], user) -> int:
+        """
+        Soft delete several of a user's tasks at once.
+        
+        One query loads them and one UPDATE deletes them; side effects run
+        once per tracker (see emit_bulk_side_effects).
+        
+        Args:
+            task_ids: Task instance IDs (others' and already deleted tasks are skipped)
+            user: Owner of the tasks
+            
+        Returns:
+            Number of tasks deleted
+        """
+        tasks = list(
+            TaskInstance.objects.filter(
+                task_instance_id__in=set(InstanceService.resolve_task_ids(task_ids, user).values()),
+                tracker_instance__tracker__user=user,
+                deleted_at__isnull=True
+            ).select_related('tracker_instance')
+            .only('task_instance_id', 'template_id', 'tracker_instance__tracker_id')
+        )
+        if not tasks:
+            return 0
+        
+        now = timezone.now()
+        TaskInstance.objects.filter(
+            task_instance_id__in=[task.task_instance_id for task in tasks]
+        ).update(deleted_at=now, updated_at=now)
+        TaskService.emit_bulk_side_effects(user.id, tasks, op='delete')
+        
+        return len(tasks)
+    
     def bulk_update_by_filter(self, user, status: str, filters: Dict) -> int:
         """
         Bulk update tasks based on criteria.
@@ -270,14 +359,65 @@ class TaskService:
         elif status in ['TODO', 'IN_PROGRESS']:
              updates['completed_at'] = None
              
-        updated_count = TaskInstance.objects.filter(**query_filter).update(**updates)
-        
-        # Invalidate caches (Optimized: invalidate all if bulk, or specific if single tracker)
-        if filters.get('tracker_id'):
-            invalidate_tracker_cache(filters['tracker_id'])
+        affected = list(
+            TaskInstance.objects.filter(**query_filter)
+            .select_related('tracker_instance')
+            .only('task_instance_id', 'status', 'template_id', 'tracker_instance__tracker_id')
+        )
+        updated_count = TaskInstance.objects.filter(
+            task_instance_id__in=[task.task_instance_id for task in affected]
+        ).update(**updates)
+        
+        # Queryset updates bypass signals
+        completed = {
+            task.tracker_instance.tracker_id for task in affected
+            if status == 'DONE' and task.status != 'DONE'
+        }
+        TaskService.emit_bulk_side_effects(user.id, affected, completed)
         
         return updated_count
     
+    @staticmethod
+    def emit_bulk_side_effects(user_id: int, tasks: List[TaskInstance],
+                               completed_tracker_ids: Iterable[str] = (),
+                               op: str = 'update') -> None:
+        """
+        Run the post_save side effects of tasks written without signals
+        (queryset update(), bulk_update): once per day, goal and tracker
+        instead of once per task.
+        
+        Args:
+            user_id: Owner of the tasks
+            tasks: The written tasks, with tracker_instance loaded
+            completed_tracker_ids: Trackers where a task just became DONE
+            op: Change log operation ('update', or 'delete' for soft deletes)
+        """
+        if not tasks:
+            return
+        
+        tracker_ids = {str(task.tracker_instance.tracker_id) for task in tasks}
+        template_ids = {task.template_id for task in tasks if task.template_id}
+        
+        RollupService.refresh_instances({task.tracker_instance_id for task in tasks})
+        ChangeService.record(user_id, 'task', [task.task_instance_id for task in tasks], op)
+        
+        JobQueue.enqueue('goal_progress', GoalTaskMapping.objects.filter(
+            template_id__in=template_ids,
+            goal__status__in=ACTIVE_GOAL_STATUSES,
+            goal__deleted_at__isnull=True
+        ).values_list('goal_id', flat=True).distinct())
+        JobQueue.enqueue('streak_milestone', completed_tracker_ids)
+        JobQueue.enqueue(SNAPSHOT_JOB_KIND, [tracker_job_key(t) for t in tracker_ids])
+        SearchIndexService.queue(user_id, 'task_note', [
+            task.task_instance_id for task in tasks
+            if (op == 'delete' and task.notes) or task_notes_changed(task)
+        ])
+        for task in tasks:
+            task._loaded_notes = task.notes
+        
+        for tracker_id in tracker_ids:
+            invalidate_tracker_cache(tracker_id, user_id)
+    
     
     @transaction.atomic
     def mark_overdue_as_missed(self, tracker_id: str, cutoff_date) -> int:
@@ -589,7 +729,7 @@ class TaskService:
         """
         try:
             task = TaskInstance.objects.select_related('tracker_instance__tracker').get(
-                task_instance_id=task_id,
+                task_instance_id=InstanceService.resolve_task_ids([task_id], user).get(str(task_id)),
                 tracker_instance__tracker__user=user
             )
         except TaskInstance.DoesNotExist:
@@ -629,7 +769,7 @@ class TaskService:
         """
         try:
             task = TaskInstance.objects.select_related('tracker_instance__tracker').get(
-                task_instance_id=task_id,
+                task_instance_id=InstanceService.resolve_task_ids([task_id], user).get(str(task_id)),
                 tracker_instance__tracker__user=user
             )
         except TaskInstance.DoesNotExist:
@@ -10,6 +10,8 @@ import uuid
 
 from core.models import TrackerDefinition, TaskTemplate, TrackerInstance, TaskInstance
 from core.helpers.cache_helpers import invalidate_tracker_cache
+from core.services.rollup_service import RollupService
+from core.services.change_service import ChangeService
 from core.exceptions import TrackerNotFoundError, ValidationError as AppValidationError
 from core.serializers import TrackerCreateSerializer
 
@@ -111,7 +113,7 @@ class TrackerService:
             tracker.status = data['status']
             
         tracker.save()
-        invalidate_tracker_cache(tracker_id)
+        invalidate_tracker_cache(tracker_id, tracker.user_id)
         
         return {
             'id': str(tracker.tracker_id),
@@ -142,7 +144,7 @@ class TrackerService:
         # Also update status to archived for consistency
         tracker.status = 'archived'
         tracker.save()
-        invalidate_tracker_cache(tracker_id)
+        invalidate_tracker_cache(tracker_id, tracker.user_id)
         
         return {'tracker_id': tracker_id, 'name': name}
 
@@ -217,14 +219,16 @@ class TrackerService:
                 tracker=tracker,
                 tracking_date__gt=date.today()
             )
-            future_instances.update(status='legacy')
+            if future_instances.update(status='legacy'):
+                # Queryset updates bypass the change-sequence signal
+                ChangeService.bump(tracker.user_id)
             
             # Store mode change in metadata for history (if supported) or just change it
             old_mode = tracker.time_mode
             tracker.time_mode = new_mode
             tracker.save()
             
-            invalidate_tracker_cache(str(tracker.tracker_id))
+            invalidate_tracker_cache(str(tracker.tracker_id), tracker.user_id)
             
             return {
                 'success': True,
@@ -263,9 +267,16 @@ class TrackerService:
         # Also restore children (cascading restore logic if needed)
         # Assuming simple restore for now, or we define restore logic on models
         TrackerInstance.objects.filter(tracker=tracker).update(deleted_at=None)
-        TaskInstance.objects.filter(tracker_instance__tracker=tracker).update(deleted_at=None)
+        restored_tasks = list(
+            TaskInstance.objects.filter(
+                tracker_instance__tracker=tracker, deleted_at__isnull=False
+            ).values_list('task_instance_id', flat=True)
+        )
+        TaskInstance.objects.filter(task_instance_id__in=restored_tasks).update(deleted_at=None)
+        RollupService.rebuild_tracker(tracker_id)
+        ChangeService.record(tracker.user_id, 'task', restored_tasks, 'update')
         
-        invalidate_tracker_cache(tracker_id)
+        invalidate_tracker_cache(tracker_id, tracker.user_id)
         
         return {'success': True, 'renamed': conflict, 'new_name': tracker.name}
 
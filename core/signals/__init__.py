@@ -5,9 +5,25 @@ This package contains signal handlers for automatic updates:
 - Goal progress updates on task status changes
 - Streak milestone notifications
 - Cache invalidation triggers
+- Daily rollup maintenance for analytics
+- Dashboard snapshot patches
+- Per-user change sequence (ETags)
+- Relation index invalidation for the knowledge graph
+- Search index maintenance
+- Typeahead suggestion index patches
+- Day note sentiment and keyword analysis
 """
 
 # Import signals so they register when Django loads
+# Rollups (and the streak state derived from them) must refresh before
+# task_signals handlers read streaks, so register them first.
+from . import rollup_signals  # noqa
 from . import task_signals  # noqa
+from . import dashboard_signals  # noqa
+from . import change_signals  # noqa
+from . import graph_signals  # noqa
+from . import search_signals  # noqa
+from . import suggestion_signals  # noqa
+from . import note_signals  # noqa
 
 default_app_config = 'core.signals'
@@ -0,0 +1,62 @@
+"""
+Change Signals - Bump the owner's change sequence on every write
+
+Covers every model holding user data; synced entities also get a change
+log entry. Cascaded deletes are skipped: the row that started the
+cascade bumps the same sequence once, and clients drop its children.
+"""
+from django.db.models.signals import post_save, post_delete
+from core.models import (
+    TrackerDefinition, TaskTemplate, TrackerInstance, TaskInstance, DayNote,
+    Tag, TaskTemplateTag, Goal, GoalTaskMapping, EntityRelation,
+    UserPreferences, Notification, ShareLink
+)
+from core.services.change_service import ChangeService
+from core.signals.helpers import is_cascade_delete
+import logging
+
+logger = logging.getLogger(__name__)
+
+# SearchHistory is deliberately left out: recording a search is not a
+# change to the user's data and would defeat conditional GETs.
+USER_OWNED_MODELS = (
+    TrackerDefinition, TaskTemplate, TrackerInstance, TaskInstance, DayNote,
+    Tag, TaskTemplateTag, Goal, GoalTaskMapping, EntityRelation,
+    UserPreferences, Notification, ShareLink,
+)
+
+
+# Models pulled by sync clients, and their entity_type in the change log
+SYNC_ENTITY_TYPES = {
+    TrackerDefinition: 'tracker',
+    TaskTemplate: 'template',
+    TaskInstance: 'task',
+    DayNote: 'day_note',
+    Goal: 'goal',
+    Tag: 'tag',
+}
+
+
+def bump_change_sequence(sender, instance, signal, created=False, **kwargs):
+    """Advance the owner's change sequence, logging synced entities."""
+    if is_cascade_delete(sender, kwargs.get('origin')):
+        return  # The originating delete bumps the same sequence
+    try:
+        user_id = ChangeService.owner_id(instance)
+        entity_type = SYNC_ENTITY_TYPES.get(sender)
+        if entity_type is None:
+            ChangeService.bump(user_id)
+            return
+
+        if signal is post_delete or getattr(instance, 'deleted_at', None):
+            op = 'delete'
+        else:
+            op = 'create' if created else 'update'
+        ChangeService.record(user_id, entity_type, [instance.pk], op)
+    except Exception as e:
+        logger.error(f"Error bumping change sequence for {sender.__name__} {instance.pk}: {e}")
+
+
+for model in USER_OWNED_MODELS:
+    post_save.connect(bump_change_sequence, sender=model, dispatch_uid=f'change_seq_save_{model.__name__}')
+    post_delete.connect(bump_change_sequence, sender=model, dispatch_uid=f'change_seq_delete_{model.__name__}')
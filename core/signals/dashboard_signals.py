@@ -0,0 +1,84 @@
+"""
+Dashboard Signals - Keep DashboardSnapshot current after writes
+
+Each write queues a coalesced 'dashboard_snapshot' job naming the tracker
+or section it affects; the job patches the owner's snapshot after commit.
+Reads apply jobs that are still queued, so no write goes unseen.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import (
+    TaskInstance, TaskTemplate, TrackerInstance, TrackerDefinition, Goal, DayNote, Notification
+)
+from core.integrations.job_queue import JobQueue, register
+from core.signals.helpers import is_cascade_delete, task_tracker_id
+from core.services.dashboard_snapshot_service import (
+    DashboardSnapshotService, JOB_KIND, tracker_job_key, user_job_key
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=TaskInstance)
+@receiver(post_delete, sender=TaskInstance)
+def queue_snapshot_on_task_change(sender, instance, **kwargs):
+    """Patch the tracker's day in its owner's snapshot."""
+    if is_cascade_delete(sender, kwargs.get('origin')):
+        return  # Cascading from a deleted day or tracker; its own handler queues
+    try:
+        JobQueue.enqueue(JOB_KIND, [tracker_job_key(task_tracker_id(instance))])
+    except Exception as e:
+        logger.error(f"Error queueing dashboard snapshot for task {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=TrackerInstance)
+@receiver(post_delete, sender=TrackerInstance)
+@receiver(post_save, sender=DayNote)
+@receiver(post_save, sender=TaskTemplate)
+def queue_snapshot_on_day_change(sender, instance, **kwargs):
+    """A tracker's day was created, removed or annotated, or a task edited."""
+    try:
+        JobQueue.enqueue(JOB_KIND, [tracker_job_key(instance.tracker_id)])
+    except Exception as e:
+        logger.error(f"Error queueing dashboard snapshot for {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=TrackerDefinition)
+@receiver(post_delete, sender=TrackerDefinition)
+def queue_snapshot_on_tracker_change(sender, instance, **kwargs):
+    """Trackers are keyed by owner so new and deleted ones are picked up too."""
+    if not instance.user_id:
+        return
+    try:
+        JobQueue.enqueue(JOB_KIND, [user_job_key(instance.user_id, tracker_job_key(instance.tracker_id))])
+    except Exception as e:
+        logger.error(f"Error queueing dashboard snapshot for tracker {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def queue_snapshot_on_goal_change(sender, instance, **kwargs):
+    try:
+        JobQueue.enqueue(JOB_KIND, [user_job_key(instance.user_id, 'goals_progress')])
+    except Exception as e:
+        logger.error(f"Error queueing dashboard snapshot for goal {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def queue_snapshot_on_notification_change(sender, instance, **kwargs):
+    try:
+        JobQueue.enqueue(JOB_KIND, [user_job_key(instance.user_id, 'notifications_count')])
+    except Exception as e:
+        logger.error(f"Error queueing dashboard snapshot for notification {instance.pk}: {e}")
+
+
+# ============================================================================
+# QUEUED HANDLERS
+# ============================================================================
+
+@register(JOB_KIND)
+def run_dashboard_snapshot_patch(key, payload):
+    """Patch the affected user's snapshot."""
+    DashboardSnapshotService.apply_job_keys([key])
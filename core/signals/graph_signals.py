@@ -0,0 +1,23 @@
+"""
+Graph Signals - Invalidate relation indexes on relation writes
+
+RelationGraphService caches each user's adjacency index under a
+generation; any EntityRelation save or delete bumps its owner's.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import EntityRelation
+from core.services.relation_graph_service import RelationGraphService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=EntityRelation)
+@receiver(post_delete, sender=EntityRelation)
+def invalidate_relation_graph(sender, instance, **kwargs):
+    """Drop the owner's cached relation index."""
+    try:
+        RelationGraphService.invalidate(instance.user_id)
+    except Exception as e:
+        logger.error(f"Error invalidating relation graph for user {instance.user_id}: {e}")
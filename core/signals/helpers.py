@@ -0,0 +1,52 @@
+"""
+Shared helpers for signal handlers.
+"""
+from typing import Optional
+
+from django.db.models import QuerySet
+
+from core.helpers.cache_helpers import LocalLRUCache
+from core.models import TrackerInstance
+
+# A day never moves to another tracker, so instance -> tracker is cached long
+TRACKER_LOOKUP_TTL = 3600
+_tracker_cache = LocalLRUCache(max_entries=4096)
+
+
+def is_cascade_delete(sender, origin) -> bool:
+    """
+    True when a post_delete for `sender` was caused by deleting something else.
+
+    `origin` is the instance or queryset whose delete() started the
+    collection; for direct and queryset deletes of `sender` it is of the
+    sender's own model.
+    """
+    if origin is None:
+        return False
+    if isinstance(origin, QuerySet):
+        return origin.model is not sender
+    return not isinstance(origin, sender)
+
+
+def task_tracker_id(task) -> Optional[str]:
+    """
+    The tracker a TaskInstance belongs to, without loading its day.
+
+    Uses the day when it is already loaded, otherwise one cached
+    per-process lookup by `tracker_instance_id`.
+    """
+    day = task._state.fields_cache.get('tracker_instance')
+    if day is not None:
+        return day.tracker_id
+    if not task.tracker_instance_id:
+        return None
+
+    key = str(task.tracker_instance_id)
+    tracker_id = _tracker_cache.get(key)
+    if tracker_id is None:
+        tracker_id = TrackerInstance.objects.filter(
+            instance_id=task.tracker_instance_id
+        ).values_list('tracker_id', flat=True).first()
+        if tracker_id is not None:
+            _tracker_cache.set(key, tracker_id, TRACKER_LOOKUP_TTL)
+    return tracker_id
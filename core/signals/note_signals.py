@@ -0,0 +1,51 @@
+"""
+Note Signals - Analyze day notes as they are written
+
+A DayNote whose content changed (or that was never analyzed) gets its
+sentiment_score and keywords computed before the row is saved, so the
+analysis is written with the note itself (see NoteAnalysisService).
+Saves limited by update_fields (update_or_create writes only its defaults)
+that change the content get the analysis written right after the save.
+"""
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+from core.models import DayNote
+from core.services.note_analysis_service import ANALYSIS_FIELDS, NoteAnalysisService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=DayNote)
+def analyze_day_note(sender, instance, update_fields=None, **kwargs):
+    """Score a note and extract its keywords when its content changes."""
+    instance._pending_analysis = False
+    if kwargs.get('raw'):
+        return
+    if update_fields is not None and 'content' not in update_fields:
+        # Content is not written by this save
+        return
+    try:
+        if NoteAnalysisService.needs_analysis(instance):
+            NoteAnalysisService.apply(instance)
+            # Not written by a save limited to other fields
+            instance._pending_analysis = (
+                update_fields is not None and not set(ANALYSIS_FIELDS) <= set(update_fields)
+            )
+        instance._loaded_content = instance.content
+    except Exception as e:
+        logger.error(f"Error analyzing note {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=DayNote)
+def write_pending_note_analysis(sender, instance, **kwargs):
+    """Store an analysis the save itself did not write."""
+    if not getattr(instance, '_pending_analysis', False):
+        return
+    instance._pending_analysis = False
+    try:
+        DayNote.objects.filter(pk=instance.pk).update(
+            **{field: getattr(instance, field) for field in ANALYSIS_FIELDS}
+        )
+    except Exception as e:
+        logger.error(f"Error storing analysis for note {instance.pk}: {e}")
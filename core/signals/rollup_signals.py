@@ -0,0 +1,61 @@
+"""
+Rollup Signals - Keep DailyTrackerRollup in sync with task writes
+
+Every TaskInstance or TrackerInstance save/delete queues a refresh of the
+rollup row for the affected day (and with it the tracker's streak state),
+run after commit by the side-effect job queue. Code paths that bypass
+signals (queryset ``update()``, ``bulk_create``) call RollupService directly.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import TaskInstance, TrackerInstance
+from core.integrations.job_queue import register
+from core.services.rollup_service import JOB_KIND, RollupService
+from core.signals.helpers import is_cascade_delete, task_tracker_id
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=TaskInstance)
+@receiver(post_delete, sender=TaskInstance)
+def refresh_rollup_on_task_change(sender, instance, **kwargs):
+    """Queue a recompute of the day's rollup when one of its tasks changes."""
+    if is_cascade_delete(sender, kwargs.get('origin')):
+        # Cascading from a deleted day or tracker; its own handler cleans up
+        return
+    try:
+        RollupService.queue_refresh(task_tracker_id(instance), [instance.tracker_instance_id])
+    except Exception as e:
+        logger.error(f"Error queueing rollup refresh for task {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=TrackerInstance)
+def refresh_rollup_on_instance_change(sender, instance, **kwargs):
+    """Create, update or drop (when soft-deleted) the day's rollup row."""
+    try:
+        RollupService.queue_refresh(instance.tracker_id, [instance.instance_id])
+    except Exception as e:
+        logger.error(f"Error queueing rollup refresh for instance {instance.pk}: {e}")
+
+
+@receiver(post_delete, sender=TrackerInstance)
+def remove_rollup_on_instance_delete(sender, instance, **kwargs):
+    """Drop the day's rollup row when its instance is hard-deleted."""
+    try:
+        RollupService.remove_day(
+            instance.tracker_id,
+            instance.period_start or instance.tracking_date
+        )
+    except Exception as e:
+        logger.error(f"Error removing rollup for instance {instance.pk}: {e}")
+
+
+# ============================================================================
+# QUEUED HANDLERS
+# ============================================================================
+
+@register(JOB_KIND)
+def run_rollup_refresh(key, payload):
+    """Recompute one day's rollup (and the tracker's streak state)."""
+    RollupService.refresh_instances([key.partition(':')[2]])
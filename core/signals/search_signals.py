@@ -0,0 +1,70 @@
+"""
+Search Signals - Keep the search index in step with entity writes
+
+Saves and deletes of indexed models queue a 'search_index' job for the
+entity; the job re-renders or removes its document after commit. Task
+instances only queue when their notes change, so status toggles stay
+free. Bulk paths that bypass signals queue through TaskService.
+"""
+from django.db.models.signals import post_save, post_delete
+from core.models import TrackerDefinition, TaskTemplate, Goal, Tag, DayNote, TaskInstance
+from core.integrations.job_queue import register
+from core.services.change_service import ChangeService
+from core.services.search_index_service import JOB_KIND, SearchIndexService, task_notes_changed
+from core.signals.helpers import is_cascade_delete
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEXED_MODELS = {
+    TrackerDefinition: 'tracker',
+    TaskTemplate: 'template',
+    Goal: 'goal',
+    Tag: 'tag',
+    DayNote: 'note',
+}
+
+
+def queue_search_index(sender, instance, signal, **kwargs):
+    """Queue a reindex of the written entity."""
+    # Documents of deleted users and trackers go with them (FK cascade)
+    if is_cascade_delete(sender, kwargs.get('origin')):
+        return
+    try:
+        SearchIndexService.queue(ChangeService.owner_id(instance), INDEXED_MODELS[sender], [instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing search index update for {sender.__name__} {instance.pk}: {e}")
+
+
+def queue_task_note_index(sender, instance, signal, **kwargs):
+    """Queue a reindex of a task's notes when they change or the task goes away."""
+    if 'notes' in instance.get_deferred_fields():
+        return  # Never loaded, so not changed here
+    try:
+        if signal is post_delete or instance.deleted_at:
+            needed = bool(instance.notes)
+        else:
+            needed = task_notes_changed(instance)
+        instance._loaded_notes = instance.notes
+        if needed:
+            SearchIndexService.queue(ChangeService.owner_id(instance), 'task_note', [instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing search index update for task {instance.pk}: {e}")
+
+
+for model in INDEXED_MODELS:
+    post_save.connect(queue_search_index, sender=model, dispatch_uid=f'search_index_save_{model.__name__}')
+    post_delete.connect(queue_search_index, sender=model, dispatch_uid=f'search_index_delete_{model.__name__}')
+
+post_save.connect(queue_task_note_index, sender=TaskInstance, dispatch_uid='search_index_save_TaskInstance')
+post_delete.connect(queue_task_note_index, sender=TaskInstance, dispatch_uid='search_index_delete_TaskInstance')
+
+
+# ============================================================================
+# QUEUED HANDLERS
+# ============================================================================
+
+@register(JOB_KIND)
+def run_search_index(key, payload):
+    """Re-render or remove one entity's search document."""
+    SearchIndexService.run_job(key)
@@ -0,0 +1,96 @@
+"""
+Suggestion Signals - Patch cached suggestion indexes on writes
+
+SuggestionService keeps each user's typeahead index in cache; tracker,
+template, tag and search history writes add, replace or remove their
+entries in place. Changes that cannot be patched cheaply (restoring a
+tracker, deleting history) drop the index so it is rebuilt on next use.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.models import TrackerDefinition, TaskTemplate, Tag, SearchHistory
+from core.services.change_service import ChangeService
+from core.services.suggestion_service import SuggestionService
+from core.signals.helpers import is_cascade_delete
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=TrackerDefinition)
+def patch_tracker_suggestion(sender, instance, created, **kwargs):
+    """Add, rename or remove a tracker's suggestion."""
+    try:
+        if instance.deleted_at:
+            SuggestionService.remove_tracker(instance.user_id, instance.tracker_id)
+        else:
+            SuggestionService.put_tracker(instance.user_id, instance.tracker_id, instance.name, created)
+    except Exception as e:
+        logger.error(f"Error updating suggestions for tracker {instance.tracker_id}: {e}")
+
+
+@receiver(post_save, sender=TaskTemplate)
+def patch_task_suggestion(sender, instance, **kwargs):
+    """Add, rename or remove a task template's suggestion."""
+    try:
+        user_id = ChangeService.owner_id(instance)
+        key = f"task:{instance.template_id}"
+        if instance.deleted_at:
+            SuggestionService.remove(user_id, key)
+        else:
+            SuggestionService.put(
+                user_id, key, SuggestionService.task_entry(instance.description, instance.tracker_id)
+            )
+    except Exception as e:
+        logger.error(f"Error updating suggestions for template {instance.template_id}: {e}")
+
+
+@receiver(post_save, sender=Tag)
+def patch_tag_suggestion(sender, instance, **kwargs):
+    """Add or rename a tag's suggestion."""
+    try:
+        SuggestionService.put(instance.user_id, f"tag:{instance.tag_id}", SuggestionService.tag_entry(instance.name))
+    except Exception as e:
+        logger.error(f"Error updating suggestions for tag {instance.tag_id}: {e}")
+
+
+@receiver(post_delete, sender=TrackerDefinition)
+@receiver(post_delete, sender=TaskTemplate)
+@receiver(post_delete, sender=Tag)
+def remove_suggestion(sender, instance, origin=None, **kwargs):
+    """Remove a deleted entity's suggestion (a tracker's covers its tasks)."""
+    # Children of a deleted tracker or user go with it
+    if is_cascade_delete(sender, origin):
+        return
+    try:
+        user_id = ChangeService.owner_id(instance)
+        if sender is TrackerDefinition:
+            SuggestionService.remove_tracker(user_id, instance.tracker_id)
+        elif sender is TaskTemplate:
+            SuggestionService.remove(user_id, f"task:{instance.template_id}")
+        else:
+            SuggestionService.remove(user_id, f"tag:{instance.tag_id}")
+    except Exception as e:
+        logger.error(f"Error removing suggestion for {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=SearchHistory)
+def record_query_suggestion(sender, instance, created, **kwargs):
+    """Count a new search toward its query's suggestion."""
+    if not created:
+        return  # Click recording on an existing search
+    try:
+        SuggestionService.record_query(instance.user_id, instance.query, instance.created_at)
+    except Exception as e:
+        logger.error(f"Error recording query suggestion for user {instance.user_id}: {e}")
+
+
+@receiver(post_delete, sender=SearchHistory)
+def invalidate_query_suggestions(sender, instance, origin=None, **kwargs):
+    """Drop the owner's index; counts are rebuilt from what history remains."""
+    if is_cascade_delete(sender, origin):
+        return
+    try:
+        SuggestionService.invalidate(instance.user_id)
+    except Exception as e:
+        logger.error(f"Error invalidating suggestions for user {instance.user_id}: {e}")
@@ -6,15 +6,20 @@ This module handles:
 2. Streak notifications when milestones are reached
 3. Progress milestone notifications
 
+The save path only enqueues work; goal recounts and streak checks run in
+the side-effect job queue after the transaction commits, coalesced per
+goal and per tracker.
+
 Written from scratch as per finalePhase.md Section 6.7
 """
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.utils import timezone
-from core.models import TaskInstance, GoalTaskMapping
-from core.services.goal_service import GoalService
+from core.models import TaskInstance, GoalTaskMapping, Goal, TrackerDefinition
+from core.services.goal_service import GoalService, ACTIVE_GOAL_STATUSES
 from core.services.streak_service import StreakService
 from core.services.notification_service import NotificationService
+from core.integrations.job_queue import JobQueue, register
+from core.signals.helpers import task_tracker_id
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,40 +28,24 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=TaskInstance)
 def update_goals_on_task_change(sender, instance, created, **kwargs):
     """
-    Incrementally update linked goals when task status changes.
-    
-    This is triggered after every TaskInstance save, ensuring goals
-    are always up-to-date without manual recalculation.
-    
-    Performance Note: For very high volume, consider using async task queue.
+    Queue a progress update for every goal linked to this task's template.
+
+    One lookup plus one INSERT regardless of how many goals are linked;
+    pending jobs for the same goal are coalesced.
     """
     try:
         # Only process if the task has a template (avoid orphaned tasks)
         if not instance.template_id:
             return
-        
-        # Find all goals linked to this task's template
-        mappings = GoalTaskMapping.objects.filter(
-            template_id=instance.template_id
-        ).select_related('goal')
-        
-        for mapping in mappings:
-            goal = mapping.goal
-            if goal.status in ('active', 'paused'):
-                # Update goal progress
-                result = GoalService.update_goal_progress(goal)
-                
-                # Check for progress milestones
-                if result and 'progress' in result:
-                    try:
-                        NotificationService.send_goal_progress_update(
-                            user_id=goal.user_id,
-                            goal_title=goal.title,
-                            progress=result['progress']
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to send goal progress notification: {e}")
-                        
+
+        goal_ids = GoalTaskMapping.objects.filter(
+            template_id=instance.template_id,
+            goal__status__in=ACTIVE_GOAL_STATUSES,
+            goal__deleted_at__isnull=True
+        ).values_list('goal_id', flat=True)
+
+        JobQueue.enqueue('goal_progress', goal_ids)
+
     except Exception as e:
         logger.error(f"Error updating goals on task change: {e}")
 
@@ -64,72 +53,93 @@ def update_goals_on_task_change(sender, instance, created, **kwargs):
 @receiver(post_save, sender=TaskInstance)
 def check_streak_milestones(sender, instance, created, **kwargs):
     """
-    Check for streak milestones when a task is completed.
-    
+    Queue a streak milestone check when a task is completed.
+
     Only triggers when status changes to DONE to avoid duplicate checks.
     """
     try:
-        if instance.status != 'DONE':
-            return
-        
-        # Get tracker info through the instance chain
-        tracker_instance = instance.tracker_instance
-        if not tracker_instance:
+        if instance.status != 'DONE' or getattr(instance, '_loaded_status', None) == 'DONE':
             return
-        
-        tracker = tracker_instance.tracker
-        if not tracker:
-            return
-        
-        user_id = tracker.user_id
-        
-        # Calculate current streak
-        streak_result = StreakService.calculate_streak(
-            tracker_id=str(tracker.tracker_id),
-            user_id=user_id
-        )
-        
-        if streak_result.streak_active and streak_result.current_streak > 0:
-            # Send streak milestone notification if applicable
-            NotificationService.send_streak_alert(
-                user_id=user_id,
-                tracker_name=tracker.name,
-                streak_count=streak_result.current_streak
-            )
-            
-    except Exception as e:
-        logger.error(f"Error checking streak milestones: {e}")
 
+        tracker_id = task_tracker_id(instance)
+        if not tracker_id:
+            return
 
-# Pre-save signal to track status changes
-_status_cache = {}
+        JobQueue.enqueue('streak_milestone', [tracker_id])
 
-@receiver(pre_save, sender=TaskInstance)
-def cache_old_status(sender, instance, **kwargs):
-    """Cache old status before save for comparison."""
-    if instance.pk:
-        try:
-            old_instance = TaskInstance.objects.get(pk=instance.pk)
-            _status_cache[instance.pk] = old_instance.status
-        except TaskInstance.DoesNotExist:
-            pass
+    except Exception as e:
+        logger.error(f"Error checking streak milestones: {e}")
 
 
 @receiver(post_save, sender=TaskInstance)
 def handle_status_transition(sender, instance, created, **kwargs):
     """
     Handle specific status transitions.
-    
+
     - TODO -> DONE: First completion
     - DONE -> TODO: Uncompleted
     - * -> MISSED: Mark as missed
+
+    The previous status comes from TaskInstance.from_db, so no extra
+    SELECT is needed before each save.
     """
+    old_status = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+
     if created:
         return  # New instances don't have transitions
-    
-    old_status = _status_cache.pop(instance.pk, None)
+
     if old_status is None or old_status == instance.status:
         return
-    
+
     # Log significant transitions for analytics
     logger.debug(f"Task {instance.pk} transitioned: {old_status} -> {instance.status}")
+
+
+# ============================================================================
+# QUEUED HANDLERS
+# ============================================================================
+
+@register('goal_progress')
+def run_goal_progress(goal_id, payload):
+    """Recalculate a goal's progress and send milestone notifications."""
+    goal = Goal.objects.filter(
+        goal_id=goal_id,
+        status__in=ACTIVE_GOAL_STATUSES,
+        deleted_at__isnull=True
+    ).first()
+    if goal is None:
+        return
+
+    result = GoalService.update_goal_progress(goal)
+
+    # Check for progress milestones
+    if result and 'progress' in result:
+        try:
+            NotificationService.send_goal_progress_update(
+                user_id=goal.user_id,
+                goal_title=goal.title,
+                progress=result['progress']
+            )
+        except Exception as e:
+            logger.warning(f"Failed to send goal progress notification: {e}")
+
+
+@register('streak_milestone')
+def run_streak_milestone(tracker_id, payload):
+    """Send a streak milestone notification if the tracker just reached one."""
+    tracker = TrackerDefinition.objects.filter(tracker_id=tracker_id).first()
+    if tracker is None:
+        return
+
+    streak_result = StreakService.calculate_streak(
+        tracker_id=str(tracker.tracker_id),
+        user_id=tracker.user_id
+    )
+
+    if streak_result.streak_active and streak_result.current_streak > 0:
+        NotificationService.send_streak_alert(
+            user_id=tracker.user_id,
+            tracker_name=tracker.name,
+            streak_count=streak_result.current_streak
+        )
@@ -10,6 +10,12 @@ from rest_framework.test import APIClient
 from datetime import date, timedelta
 
 
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Keep uploaded files (avatars, exports) out of the project's media/."""
+    settings.MEDIA_ROOT = str(tmp_path / 'media')
+
+
 @pytest.fixture
 def api_client():
     """Returns an API client instance."""
@@ -76,3 +82,32 @@ def yesterday():
 def last_week():
     """Returns the date one week ago."""
     return date.today() - timedelta(days=7)
+
+
+@pytest.fixture(autouse=True)
+def eager_side_effects(settings):
+    """Run queued side effects inline after commit instead of in worker threads."""
+    settings.SIDE_EFFECT_QUEUE = {**settings.SIDE_EFFECT_QUEUE, 'EAGER': True}
+
+
+@pytest.fixture(autouse=True)
+def eager_export_jobs(settings):
+    """Run background exports inline after commit instead of in worker threads."""
+    settings.EXPORT_JOBS = {**settings.EXPORT_JOBS, 'EAGER': True}
+
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    """Keep the per-process LRU tier from leaking results between tests."""
+    from core.helpers.cache_helpers import local_cache
+    local_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_cache():
+    """
+    Keep per-user cached indexes from leaking between tests; user ids are
+    reused once a test's rows are rolled back.
+    """
+    from django.core.cache import cache
+    cache.clear()
@@ -0,0 +1,127 @@
+"""
+Tests for the streaming full-account export (core.exports.account_exporter)
+and the month export aggregation.
+"""
+import csv
+import io
+import json
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.exports.account_exporter import (
+    EXPORT_ENTITIES, keyset_rows, stream_account_export, stream_csv, stream_jsonl
+)
+from core.models import EntityRelation, TaskTemplate
+from core.services.export_service import ExportService
+from core.tests.base import BaseAPITestCase
+from core.tests.factories import DayNoteFactory, GoalFactory, TagFactory, TrackerFactory
+
+
+class AccountExportTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tracker = self.create_tracker(name='Habits')
+        self.template = self.create_template(self.tracker, description='Read')
+        instance = self.create_instance(self.tracker, date(2024, 3, 1))
+        self.create_task_instance(instance, self.template, status='DONE', notes='chapter 3')
+        DayNoteFactory.create(self.tracker, target_date=date(2024, 3, 1), content='Good day')
+        GoalFactory.create(self.user, title='Read more')
+        TagFactory.create(self.user, name='books')
+        EntityRelation.objects.create(
+            user=self.user, from_entity_type='template', from_entity_id=self.template.template_id,
+            to_entity_type='template', to_entity_id='x', relation_type='related_to'
+        )
+
+    def _jsonl(self, **kwargs):
+        return [json.loads(line) for line in ''.join(stream_jsonl(self.user, **kwargs)).splitlines()]
+
+    def test_jsonl_covers_every_entity(self):
+        records = self._jsonl()
+
+        self.assertEqual(records[0]['type'], 'export')
+        types = {record['type'] for record in records[1:]}
+        for name in ('trackers', 'templates', 'instances', 'tasks', 'notes', 'goals', 'tags', 'relations'):
+            self.assertIn(name, types)
+        task = next(record for record in records if record['type'] == 'tasks')
+        self.assertEqual((task['status'], task['notes']), ('DONE', 'chapter 3'))
+
+    def test_keyset_pages(self):
+        for i in range(4):
+            self.create_template(self.tracker, description=f'Extra {i}')
+        queryset = TaskTemplate.objects.filter(tracker=self.tracker)
+
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(keyset_rows(queryset, 'template_id', ('description',), chunk_size=2))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(len(ctx), 3)
+        self.assertEqual(
+            rows,
+            list(queryset.order_by('template_id').values_list('description'))
+        )
+
+    def test_csv_sections(self):
+        sections = ''.join(stream_csv(self.user)).split('\r\n\r\n')
+
+        self.assertEqual(len(sections), len(EXPORT_ENTITIES))
+        trackers = list(csv.reader(io.StringIO(sections[0])))
+        self.assertEqual(trackers[0][:3], ['type', 'tracker_id', 'name'])
+        self.assertEqual(trackers[1][:3], ['trackers', self.tracker.tracker_id, 'Habits'])
+
+    def test_xlsx_sheets(self):
+        from openpyxl import load_workbook
+
+        chunks, content_type, extension = stream_account_export(self.user, 'xlsx')
+        workbook = load_workbook(io.BytesIO(b''.join(chunks)), read_only=True)
+
+        self.assertEqual(workbook.sheetnames, [entity.name for entity in EXPORT_ENTITIES])
+        rows = list(workbook['notes'].iter_rows(values_only=True))
+        self.assertEqual(rows[1][3], 'Good day')
+
+    def test_other_users_are_excluded(self):
+        other = get_user_model().objects.create_user(username='other-exporter', password='x')
+        TrackerFactory.create(other, name='Not mine')
+
+        names = [r['name'] for r in self._jsonl() if r['type'] == 'trackers']
+        self.assertEqual(names, ['Habits'])
+
+
+class AccountExportEndpointTests(BaseAPITestCase):
+
+    def test_streams_requested_format(self):
+        self.create_tracker(name='Habits')
+
+        response = self.client.get('/api/v1/data/export/?format=jsonl')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[1])['name'], 'Habits')
+
+    def test_rejects_unknown_format(self):
+        response = self.client.get('/api/v1/data/export/?format=yaml')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class MonthExportTests(BaseAPITestCase):
+
+    def test_month_data_is_one_grouped_query(self):
+        tracker = self.create_tracker()
+        template = self.create_template(tracker)
+        first = self.create_instance(tracker, date(2024, 3, 1))
+        second = self.create_instance(tracker, date(2024, 3, 2))
+        for instance, status in ((first, 'DONE'), (second, 'TODO'), (second, 'DONE')):
+            self.create_task_instance(instance, template, status=status)
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = ExportService(self.user)._get_month_data(date(2024, 3, 1), date(2024, 3, 31))
+
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual(data['summary'], {'total_tasks': 3, 'completed_tasks': 2, 'completion_rate': 66.7})
+        self.assertEqual(data['daily_data'][1]['completion_rate'], 50.0)
+        self.assertEqual(len(data['daily_data']), 31)
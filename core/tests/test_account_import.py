@@ -0,0 +1,175 @@
+"""
+Tests for the streaming account import (core.exports.account_importer)
+and the data import endpoint.
+"""
+import json
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.exports.account_exporter import stream_jsonl
+from core.exports.account_importer import import_account, read_json
+from core.models import (
+    DayNote, EntityRelation, Tag, TaskInstance, TaskTemplate, TaskTemplateTag,
+    TrackerDefinition, TrackerInstance
+)
+from core.tests.base import BaseAPITestCase
+from core.tests.factories import DayNoteFactory, TagFactory
+
+
+def _upload(name, text):
+    return SimpleUploadedFile(name, text.encode('utf-8'))
+
+
+def _lines(*records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+class AccountImportTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tracker = self.create_tracker(name='Habits')
+        self.template = self.create_template(self.tracker, description='Read')
+        for day in range(1, 4):
+            instance = self.create_instance(self.tracker, date(2024, 3, day))
+            self.create_task_instance(instance, self.template, status='DONE', notes=f'chapter {day}')
+        DayNoteFactory.create(self.tracker, target_date=date(2024, 3, 1), content='Good day')
+        tag = TagFactory.create(self.user, name='books')
+        TaskTemplateTag.objects.create(template=self.template, tag=tag)
+        EntityRelation.objects.create(
+            user=self.user, from_entity_type='template', from_entity_id=self.template.template_id,
+            to_entity_type='tracker', to_entity_id=self.tracker.tracker_id, relation_type='related_to'
+        )
+        self.other = get_user_model().objects.create_user(username='importer', password='x')
+
+    def test_round_trip_into_another_account(self):
+        export = ''.join(stream_jsonl(self.user))
+
+        report = import_account(self.other, _upload('export.jsonl', export), batch_size=2)
+
+        self.assertEqual(report['rejected'], {})
+        self.assertEqual(report['imported']['tasks'], 3)
+        tracker = TrackerDefinition.objects.get(user=self.other)
+        self.assertNotEqual(tracker.tracker_id, self.tracker.tracker_id)
+        tasks = TaskInstance.objects.filter(tracker_instance__tracker=tracker)
+        self.assertEqual(
+            sorted(tasks.values_list('notes', flat=True)), ['chapter 1', 'chapter 2', 'chapter 3']
+        )
+        self.assertEqual(set(tasks.values_list('template__tracker', flat=True)), {tracker.tracker_id})
+        self.assertEqual(DayNote.objects.get(tracker=tracker).content, 'Good day')
+        self.assertTrue(TaskTemplateTag.objects.filter(tag__user=self.other).exists())
+        relation = EntityRelation.objects.get(user=self.other)
+        self.assertEqual(relation.to_entity_id, tracker.tracker_id)
+        # Audit history is written with the batch
+        self.assertEqual(TaskInstance.history.filter(tracker_instance__tracker=tracker).count(), 3)
+
+    def test_batches_use_a_fixed_number_of_queries(self):
+        small = ''.join(stream_jsonl(self.user))
+        for day in range(4, 31):
+            instance = self.create_instance(self.tracker, date(2024, 3, day))
+            self.create_task_instance(instance, self.template, notes=f'chapter {day}')
+        large = ''.join(stream_jsonl(self.user))
+        third = get_user_model().objects.create_user(username='importer-2', password='x')
+
+        with CaptureQueriesContext(connection) as few:
+            import_account(self.other, _upload('a.jsonl', small))
+        with CaptureQueriesContext(connection) as many:
+            import_account(third, _upload('b.jsonl', large))
+
+        self.assertEqual(TaskInstance.objects.filter(tracker_instance__tracker__user=third).count(), 30)
+        self.assertLessEqual(len(many), len(few) + 2)
+
+    def test_dry_run_writes_nothing(self):
+        export = ''.join(stream_jsonl(self.user))
+
+        report = import_account(self.other, _upload('export.jsonl', export), dry_run=True)
+
+        self.assertTrue(report['dry_run'])
+        self.assertEqual(report['imported']['trackers'], 1)
+        self.assertFalse(TrackerDefinition.objects.filter(user=self.other).exists())
+
+    def test_invalid_records_are_reported_per_batch(self):
+        text = _lines(
+            {'type': 'trackers', 'tracker_id': 't1', 'name': 'Fine'},
+            {'type': 'trackers', 'tracker_id': 't2', 'name': ''},
+            {'type': 'instances', 'tracker_id': 't1', 'tracking_date': '2024-03-01'},
+            {'type': 'instances', 'tracker_id': 't1', 'tracking_date': '2024-03-01'},
+            {'type': 'templates', 'tracker_id': 't2', 'description': 'Orphan'},
+            {'type': 'widgets'},
+        ) + 'not json\n'
+
+        report = import_account(self.other, _upload('bad.jsonl', text))
+
+        self.assertEqual(report['imported'], {'trackers': 1, 'instances': 1})
+        self.assertEqual(report['rejected'], {'trackers': 1, 'templates': 1, 'instances': 1, 'unreadable': 2})
+        errors = {batch['entity']: batch['errors'] for batch in report['batches']}
+        self.assertEqual(errors['trackers'][0]['record'], 'line 2')
+        self.assertIn('name', errors['trackers'][0]['errors'])
+        self.assertIn('tracker_id', errors['templates'][0]['errors'])
+        self.assertEqual([e['record'] for e in report['errors']], ['line 6', 'line 7'])
+        self.assertEqual(TrackerInstance.objects.filter(tracker__user=self.other).count(), 1)
+
+    def test_existing_tags_are_reused(self):
+        TagFactory.create(self.other, name='books')
+
+        import_account(self.other, _upload('export.jsonl', ''.join(stream_jsonl(self.user))))
+
+        self.assertEqual(Tag.objects.filter(user=self.other).count(), 1)
+        self.assertEqual(TaskTemplateTag.objects.get(tag__user=self.other).tag.name, 'books')
+
+    def test_json_array_is_read_incrementally(self):
+        document = json.dumps({'version': '1.0', 'trackers': [
+            {'name': f'Tracker {i}', 'tasks': [{'description': 'x' * 40}]} for i in range(20)
+        ], 'extra': 12345})
+
+        items = list(read_json(document.encode()[i:i + 7] for i in range(0, len(document), 7)))
+
+        self.assertEqual(len(items), 20)
+        self.assertEqual(items[3], ('trackers[3]', {'name': 'Tracker 3', 'tasks': [{'description': 'x' * 40}]}))
+
+
+class DataImportEndpointTests(BaseAPITestCase):
+
+    def test_legacy_json_import(self):
+        document = json.dumps({'trackers': [
+            {'name': 'Morning', 'tasks': [{'description': 'Stretch'}, {'description': 'Water'}]}
+        ]})
+
+        response = self.client.post('/api/v1/data/import/', {'file': _upload('backup.json', document)})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['imported_trackers'], data['imported_tasks']), (1, 2))
+        self.assertEqual(TaskTemplate.objects.filter(tracker__name='Morning').count(), 2)
+
+    def test_dry_run_and_bad_files(self):
+        document = json.dumps({'trackers': [{'name': 'Morning'}]})
+
+        response = self.client.post('/api/v1/data/import/?dry_run=true', {'file': _upload('b.json', document)})
+        self.assertEqual(response.json()['report']['imported'], {'trackers': 1})
+        self.assertFalse(TrackerDefinition.objects.filter(name='Morning').exists())
+
+        for name, text in (('a.json', '{"trackers": [{'), ('a.json', '{"other": []}'), ('a.txt', '')):
+            response = self.client.post('/api/v1/data/import/', {'file': _upload(name, text)})
+            self.assertEqual(response.status_code, 400, name + text)
+
+    def test_file_broken_partway_reports_what_was_written(self):
+        trackers = ', '.join(json.dumps({'name': f'Tracker {i}'}) for i in range(3))
+        document = '{"trackers": [' + trackers + ', {"name": "Trunc'
+
+        report = import_account(self.user, _upload('b.json', document), 'json', batch_size=2)
+
+        self.assertEqual(report['file_error'], 'Invalid JSON file')
+        self.assertEqual(report['imported'], {'trackers': 3})
+        self.assertEqual(len(report['batches']), 2)
+        self.assertEqual(TrackerDefinition.objects.filter(name__startswith='Tracker ').count(), 3)
+
+        response = self.client.post('/api/v1/data/import/', {'file': _upload('c.json', document)})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Invalid JSON file')
+        self.assertEqual(response.json()['report']['imported'], {'trackers': 3})
@@ -173,6 +173,18 @@ class TestBaseRepository(TestCase):
         assert grid['tracker'] is not None
         assert '2023-01-01' in grid['instances_map']
 
+    def test_get_grid_columns(self):
+        TaskInstanceFactory.create(self.instance, self.template, status='DONE', notes='ok')
+        InstanceFactory.create(tracker=self.tracker, target_date=date(2023, 2, 1))  # Out of range
+        
+        with self.assertNumQueries(3):
+            columns = base_repository.get_grid_columns('test-id', date(2023, 1, 1), date(2023, 1, 31))
+        
+        assert columns['tracker']['name'] == 'Test Tracker'
+        assert [t['template_id'] for t in columns['templates']] == ['temp-1']
+        assert [cell[:3] for cell in columns['cells']] == [('temp-1', date(2023, 1, 1), 'DONE')]
+        assert base_repository.get_grid_columns('missing', date(2023, 1, 1), date(2023, 1, 2))['tracker'] is None
+
     def test_model_to_dict_utils(self):
         # Already tested implicitly via Shim tests, but specifically:
         d = base_repository.model_to_dict(self.tracker)
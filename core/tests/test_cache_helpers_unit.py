@@ -16,6 +16,10 @@ from core.helpers.cache_helpers import (
     make_cache_key,
     cache_result,
     invalidate_tracker_cache,
+    bump_generation,
+    get_generations,
+    tracker_tag,
+    tracker_tags,
     invalidate_dashboard_cache,
     invalidate_all_caches,
     cache_tracker_stats,
@@ -25,6 +29,7 @@ from core.helpers.cache_helpers import (
     get_user_content_hash,
     check_etag,
     CACHE_TIMEOUTS,
+    LocalLRUCache,
 )
 
 
@@ -142,13 +147,41 @@ class TestCacheResultDecorator:
 class TestInvalidateTrackerCache:
     """Tests for invalidate_tracker_cache function."""
     
-    def test_deletes_tracker_cache_keys(self):
-        """Should delete cache keys for tracker."""
+    def test_bumps_tracker_and_user_generations(self):
+        """Should bump the tracker's and its owner's generation counters."""
         with patch('core.helpers.cache_helpers.cache') as mock_cache:
-            invalidate_tracker_cache('tracker123')
+            invalidate_tracker_cache('tracker123', user_id=7)
             
-            # Should call delete for tracker-related keys
-            assert mock_cache.delete.called or mock_cache.delete_many.called
+            bumped = [c.args[0] for c in mock_cache.incr.call_args_list]
+            assert bumped == ['gen:tracker:tracker123', 'gen:user:7']
+    
+    def test_invalidates_entries_for_any_arguments(self):
+        """Entries cached with extra args (dates, windows) are dropped too."""
+        calls = []
+        
+        @cache_result(timeout=300, key_prefix='gen_test', tags=tracker_tags)
+        def metric(tracker_id, window=7):
+            calls.append(window)
+            return {'window': window}
+        
+        metric('gen-tracker', window=30)
+        metric('gen-tracker', window=30)
+        assert calls == [30]
+        
+        invalidate_tracker_cache('gen-tracker', user_id=1)
+        metric('gen-tracker', window=30)
+        assert calls == [30, 30]
+    
+    def test_evicted_generation_does_not_resurrect_entries(self):
+        """A lost counter restarts at a fresh value, not an old one."""
+        from django.core.cache import cache
+        
+        tag = tracker_tag('evicted')
+        before = get_generations([tag])[0]
+        cache.delete('gen:' + tag)
+        bump_generation(tag)
+        
+        assert get_generations([tag])[0] != before
     
     def test_handles_nonexistent_keys(self):
         """Should handle nonexistent keys gracefully."""
@@ -355,6 +388,91 @@ class TestGetUserContentHash:
         
         # May or may not differ depending on implementation
 
+    @pytest.mark.django_db
+    def test_changes_on_writes_to_any_user_entity(self, django_assert_num_queries):
+        """Notes, goals, tags and deletions all move the ETag."""
+        from django.contrib.auth import get_user_model
+        from core.tests.factories import (
+            TrackerFactory, TemplateFactory, InstanceFactory, TaskInstanceFactory,
+            DayNoteFactory, GoalFactory, TagFactory
+        )
+        
+        user = get_user_model().objects.create_user(username='seq_user', password='pass123')
+        tracker = TrackerFactory.create(user)
+        task = TaskInstanceFactory.create(InstanceFactory.create(tracker), TemplateFactory.create(tracker))
+        
+        seen = {get_user_content_hash(user)}
+        for write in (
+            lambda: DayNoteFactory.create(tracker),
+            lambda: GoalFactory.create(user),
+            lambda: TagFactory.create(user),
+            lambda: task.delete(),
+        ):
+            write()
+            with django_assert_num_queries(1):
+                etag = get_user_content_hash(user)
+            assert etag not in seen
+            seen.add(etag)
+    
+    @pytest.mark.django_db
+    def test_cascaded_deletes_bump_once(self):
+        """Deleting a tracker bumps its owner once, not once per child row."""
+        from django.contrib.auth import get_user_model
+        from core.services.change_service import ChangeService
+        from core.tests.factories import create_tracker_with_tasks
+        
+        user = get_user_model().objects.create_user(username='seq_cascade', password='pass123')
+        tracker, _ = create_tracker_with_tasks(user, task_count=3)
+        before = ChangeService.current(user.id)
+        
+        tracker.delete()
+        
+        assert ChangeService.current(user.id) == before + 1
+    
+    @pytest.mark.django_db
+    def test_queryset_writes_move_the_etag(self, client):
+        """Data clear and time-mode changes bypass signals but still bump."""
+        from datetime import date, timedelta
+        from django.contrib.auth import get_user_model
+        from core.models import ChangeLogEntry
+        from core.services.tracker_service import TrackerService
+        from core.tests.factories import create_tracker_with_tasks, InstanceFactory
+        
+        user = get_user_model().objects.create_user(username='seq_bulk', password='pass123')
+        tracker, _ = create_tracker_with_tasks(user, task_count=2)
+        InstanceFactory.create(tracker, date.today() + timedelta(days=2))
+        
+        etag = get_user_content_hash(user)
+        TrackerService().change_time_mode(tracker, 'weekly')
+        assert get_user_content_hash(user) != etag
+        
+        etag = get_user_content_hash(user)
+        client.force_login(user)
+        client.post('/api/v1/data/clear/', {}, content_type='application/json')
+        assert get_user_content_hash(user) != etag
+        assert ChangeLogEntry.objects.filter(user=user, entity_type='tracker', op='delete').exists()
+    
+    @pytest.mark.django_db
+    def test_marking_notifications_read_moves_the_etag(self, client):
+        """Notifications marked read with a queryset update still bump."""
+        from django.contrib.auth import get_user_model
+        from core.models import Notification
+        from core.services.notification_service import NotificationService
+        
+        user = get_user_model().objects.create_user(username='seq_notify', password='pass123')
+        first = Notification.objects.create(user=user, title='One')
+        Notification.objects.create(user=user, title='Two')
+        
+        etag = get_user_content_hash(user)
+        NotificationService.mark_read(user.id, [first.notification_id])
+        assert get_user_content_hash(user) != etag
+        
+        etag = get_user_content_hash(user)
+        client.force_login(user)
+        client.post('/api/v1/notifications/', {'action': 'mark_all_read'}, content_type='application/json')
+        assert get_user_content_hash(user) != etag
+        assert not Notification.objects.filter(user=user, is_read=False).exists()
+
 
 # ============================================================================
 # Tests for check_etag decorator
@@ -484,3 +602,60 @@ class TestCacheHelpersEdgeCases:
                 assert result is not None
             except (TypeError, Exception):
                 pass  # Expected if can't serialize
+
+
+# ============================================================================
+# Tests for the in-process LRU tier
+# ============================================================================
+
+class TestLocalLRUCache:
+    """Tests for LocalLRUCache and cache_result(local=True)."""
+    
+    def test_evicts_least_recently_used(self):
+        """Should evict the oldest untouched entry past max_entries."""
+        lru = LocalLRUCache(max_entries=2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        
+        assert lru.get('b') is None
+        assert lru.get('a') == 1
+        assert lru.stats()['evictions'] == 1
+    
+    def test_expires_after_ttl(self):
+        """Entries past their TTL are misses."""
+        lru = LocalLRUCache(max_entries=4)
+        with patch('core.helpers.cache_helpers.time.monotonic', return_value=100.0):
+            lru.set('a', 1, 5)
+        with patch('core.helpers.cache_helpers.time.monotonic', return_value=106.0):
+            assert lru.get('a') is None
+        
+        stats = lru.stats()
+        assert (stats['hits'], stats['misses'], stats['size']) == (0, 1, 0)
+    
+    def test_local_hit_skips_shared_cache(self):
+        """Repeated reads are served without touching the shared cache."""
+        @cache_result(timeout=300, key_prefix='local_hit', tags=tracker_tags, local=True)
+        def metric(tracker_id):
+            return {'value': 1}
+        
+        metric('lru-tracker')
+        with patch('core.helpers.cache_helpers.cache') as mock_cache:
+            assert metric('lru-tracker') == {'value': 1}
+            mock_cache.get.assert_not_called()
+            mock_cache.get_many.assert_not_called()
+    
+    def test_local_tier_respects_generation_bump(self):
+        """Bumping a tracker's generation drops its local entries too."""
+        calls = []
+        
+        @cache_result(timeout=300, key_prefix='local_gen', tags=tracker_tags, local=True)
+        def metric(tracker_id):
+            calls.append(tracker_id)
+            return {'value': len(calls)}
+        
+        metric('lru-gen')
+        invalidate_tracker_cache('lru-gen', user_id=1)
+        
+        assert metric('lru-gen') == {'value': 2}
@@ -318,3 +318,11 @@ class SyncTests(BaseAPITestCase):
         
         # Should return 200 or accept the sync request
         self.assertIn(response.status_code, [200, 201])
+    
+    def test_DASH_029_sync_rejects_bad_cursor(self):
+        """DASH-029: A malformed cursor or full sync token is a 400, not a 500."""
+        for data in ({'cursor': 'nope'}, {'full_sync_token': 'bad'}):
+            response = self.post('/api/v1/sync/', data)
+            
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['sync_status'], 'failed')
@@ -0,0 +1,149 @@
+"""
+Tests for the precomputed dashboard snapshot (DashboardSnapshotService).
+"""
+from datetime import date, timedelta
+
+from core.integrations.job_queue import JobQueue
+from django.utils import timezone
+
+from core.models import DashboardSnapshot, SideEffectJob, UserPreferences
+from core.services.dashboard_service import DashboardService
+from core.services.dashboard_snapshot_service import DashboardSnapshotService
+from core.tests.base import BaseAPITestCase
+from core.tests.factories import (
+    TrackerFactory, TemplateFactory, InstanceFactory, TaskInstanceFactory, GoalFactory
+)
+
+
+class DashboardSnapshotTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        UserPreferences.objects.create(user=self.user, timezone='UTC')
+        self.tracker = TrackerFactory.create(self.user)
+        instance = InstanceFactory.create(self.tracker, date.today())
+        self.tasks = [
+            TaskInstanceFactory.create(instance, TemplateFactory.create(self.tracker, points=2))
+            for _ in range(2)
+        ]
+
+    def test_snapshot_matches_live_dashboard(self):
+        snapshot = DashboardSnapshotService.get_dashboard(self.user)
+        live = DashboardService(self.user).get_full_dashboard()
+
+        for section in ('trackers', 'today_stats', 'goals_progress', 'streaks', 'quick_actions'):
+            self.assertEqual(snapshot[section], live[section], section)
+
+    def test_unchanged_snapshot_reads_without_aggregation(self):
+        DashboardSnapshotService.get(self.user)
+
+        # Preferences, snapshot row, pending-patch lookup
+        with self.assertNumQueries(3):
+            DashboardSnapshotService.get(self.user)
+
+    def test_task_write_patches_tracker_and_bumps_version(self):
+        version = DashboardSnapshotService.get(self.user).version
+
+        self.tasks[0].status = 'DONE'
+        self.tasks[0].save()
+        snapshot = DashboardSnapshotService.get(self.user)
+
+        self.assertEqual(snapshot.version, version + 1)
+        self.assertEqual(snapshot.data['trackers'][0]['completed_tasks'], 1)
+        self.assertEqual(snapshot.data['today_stats']['earned_points'], 2)
+        self.assertFalse(SideEffectJob.objects.filter(kind='dashboard_snapshot').exists())
+
+    def test_worker_applies_queued_patches(self):
+        DashboardSnapshotService.get(self.user)
+        other = TrackerFactory.create(self.user, name='Second')
+        GoalFactory.create(self.user)
+
+        JobQueue.drain()
+        data = DashboardSnapshot.objects.get(user=self.user).data
+
+        self.assertEqual([t['name'] for t in data['trackers']][0], 'Second')
+        self.assertIn(other.tracker_id, data['known_trackers'])
+        self.assertEqual(len(data['goals_progress']), 1)
+
+    def test_deleted_tracker_drops_out(self):
+        DashboardSnapshotService.get(self.user)
+
+        self.tracker.soft_delete()
+        data = DashboardSnapshotService.get(self.user).data
+
+        self.assertEqual(data['trackers'], [])
+
+    def test_previous_day_snapshot_is_rebuilt(self):
+        snapshot = DashboardSnapshotService.get(self.user)
+        DashboardSnapshot.objects.filter(user=self.user).update(
+            snapshot_date=date.today() - timedelta(days=1)
+        )
+
+        rebuilt = DashboardSnapshotService.get(self.user)
+
+        self.assertEqual(rebuilt.snapshot_date, date.today())
+        self.assertGreater(rebuilt.version, snapshot.version)
+
+    def test_endpoints_use_snapshot_version_as_etag(self):
+        response = self.client.get('/api/v1/dashboard/today/')
+        etag = response['ETag']
+        self.assertEqual(response.json()['total_tasks'], 2)
+
+        response = self.client.get('/api/v1/dashboard/goals/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.tasks[1].status = 'DONE'
+        self.tasks[1].save()
+        response = self.client.get('/api/v1/dashboard/today/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['completed'], 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_job_claimed_by_worker_still_applied_on_read(self):
+        DashboardSnapshotService.get(self.user)
+
+        self.tasks[0].status = 'DONE'
+        self.tasks[0].save()
+        # A worker claimed the patch but has not written it yet
+        SideEffectJob.objects.filter(kind='dashboard_snapshot').update(
+            status='running', dedupe_key=None, updated_at=timezone.now()
+        )
+
+        data = DashboardSnapshotService.get(self.user).data
+        self.assertEqual(data['trackers'][0]['completed_tasks'], 1)
+
+    def test_bulk_delete_patches_snapshot(self):
+        version = DashboardSnapshotService.get(self.user).version
+
+        response = self.client.post(
+            '/api/v1/tasks/bulk/',
+            {'action': 'delete', 'task_ids': [self.tasks[0].pk]},
+            format='json'
+        )
+        snapshot = DashboardSnapshotService.get(self.user)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(snapshot.version, version)
+        self.assertEqual(snapshot.data['today_stats']['total_tasks'], 1)
+
+    def test_data_clear_patches_snapshot(self):
+        DashboardSnapshotService.get(self.user)
+
+        self.client.post('/api/v1/data/clear/', {}, format='json')
+        data = DashboardSnapshotService.get(self.user).data
+
+        self.assertEqual(data['trackers'], [])
+        self.assertEqual(data['today_stats']['total_tasks'], 0)
+
+    def test_marking_notifications_read_patches_snapshot(self):
+        from core.models import Notification
+        from core.services.notification_service import NotificationService
+        first = Notification.objects.create(user=self.user, title='One')
+        Notification.objects.create(user=self.user, title='Two')
+        self.assertEqual(DashboardSnapshotService.get(self.user).data['notifications_count'], 2)
+
+        NotificationService.mark_read(self.user.id, [first.notification_id])
+        self.assertEqual(DashboardSnapshotService.get(self.user).data['notifications_count'], 1)
+
+        NotificationService.mark_all_read(self.user.id)
+        self.assertEqual(DashboardSnapshotService.get(self.user).data['notifications_count'], 0)
@@ -0,0 +1,205 @@
+"""
+Tests for background export jobs (ExportJobService), their chunked
+artifacts and the export job endpoints.
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.utils import timezone
+
+from core.exports import account_exporter
+from core.exports.account_exporter import stream_jsonl
+from core.integrations.artifact_storage import get_storage
+from core.models import ExportJob
+from core.services.export_job_service import ExportJobService
+from core.tests.base import BaseAPITestCase
+from core.tests.factories import DayNoteFactory
+
+
+def _records(text):
+    """JSON Lines records, minus the export timestamp."""
+    records = [json.loads(line) for line in text.splitlines()]
+    records[0].pop('exported_at')
+    return records
+
+
+class ExportJobTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tracker = self.create_tracker(name='Habits')
+        for day in range(1, 6):
+            instance = self.create_instance(self.tracker, date(2024, 3, day))
+            for i in range(3):
+                template = self.create_template(self.tracker, description=f'Task {day}-{i}')
+                self.create_task_instance(instance, template, status='DONE' if i else 'TODO')
+            DayNoteFactory.create(self.tracker, target_date=date(2024, 3, day), content=f'Day {day}')
+
+    def _artifact(self, job):
+        job.refresh_from_db()
+        return b''.join(ExportJobService.read(job, 0, job.bytes_written - 1)).decode()
+
+    def _queue(self, kind='account', format='jsonl', params=None):
+        # Left queued: TestCase drops on-commit callbacks unless captured
+        return str(ExportJobService.create(self.user, kind, format, params).job_id)
+
+    @override_settings(EXPORT_JOBS={'EAGER': True, 'CHUNK_BYTES': 512})
+    def test_job_runs_after_commit_in_chunks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = ExportJobService.create(self.user, 'account', 'jsonl')
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertGreater(job.chunks_committed, 3)
+        self.assertEqual(job.rows_written, job.rows_total)
+        self.assertEqual(_records(self._artifact(job)), _records(''.join(stream_jsonl(self.user))))
+
+    @override_settings(EXPORT_JOBS={'CHUNK_BYTES': 300})
+    def test_interrupted_job_resumes_after_last_committed_chunk(self):
+        job_id = self._queue(format='csv')
+        real_pieces = account_exporter.account_pieces
+
+        def crash_midway(*args, **kwargs):
+            for index, piece in enumerate(real_pieces(*args, **kwargs)):
+                if index == 25:
+                    raise SystemExit  # Worker killed
+                yield piece
+
+        with mock.patch.object(account_exporter, 'account_pieces', crash_midway):
+            with self.assertRaises(SystemExit):
+                ExportJobService.run(job_id)
+
+        job = ExportJob.objects.get(job_id=job_id)
+        self.assertEqual(job.status, 'running')
+        committed = job.chunks_committed
+        self.assertGreater(committed, 0)
+        # A part stored after the last progress update is discarded on resume
+        get_storage().write_part(job_id, committed, b'orphaned part')
+
+        self.assertEqual(ExportJobService.requeue_stale(older_than=timedelta(0)), 1)
+        self.assertTrue(ExportJobService.run(job_id))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('completed', 2))
+        self.assertEqual(self._artifact(job), ''.join(account_exporter.stream_csv(self.user)))
+
+    def test_lost_claim_stops_the_old_worker(self):
+        job_id = self._queue()
+        real_pieces = account_exporter.account_pieces
+
+        def taken_over(*args, **kwargs):
+            for index, piece in enumerate(real_pieces(*args, **kwargs)):
+                if index == 5:
+                    ExportJob.objects.filter(job_id=job_id).update(claim_token=uuid.uuid4())
+                yield piece
+
+        with override_settings(EXPORT_JOBS={'CHUNK_BYTES': 200}), \
+                mock.patch.object(account_exporter, 'account_pieces', taken_over):
+            self.assertFalse(ExportJobService.run(job_id))
+
+        job = ExportJob.objects.get(job_id=job_id)
+        self.assertEqual(job.status, 'running')
+        self.assertFalse(ExportJobService.run(job_id))  # Not queued: nothing to claim
+
+    def test_tracker_export_matches_direct_download(self):
+        job_id = self._queue('tracker', 'json', {'tracker_id': self.tracker.tracker_id, 'start': '2024-03-02'})
+
+        with override_settings(EXPORT_JOBS={'CHUNK_BYTES': 100}):
+            ExportJobService.run(job_id)
+
+        job = ExportJob.objects.get(job_id=job_id)
+        direct = self.get(f'/api/v1/tracker/{self.tracker.tracker_id}/export/?format=json&start=2024-03-02').json()
+        self.assertEqual(json.loads(self._artifact(job)), direct)
+        self.assertEqual(job.rows_written, 12)
+        self.assertEqual(job.filename, 'Habits_export.json')
+
+    def test_non_resumable_export_starts_over(self):
+        job_id = self._queue('month', 'csv', {'year': 2024, 'month': 3})
+        ExportJob.objects.filter(job_id=job_id).update(chunks_committed=2, bytes_written=99)
+        get_storage().write_part(job_id, 0, b'stale')
+
+        ExportJobService.run(job_id)
+
+        job = ExportJob.objects.get(job_id=job_id)
+        self.assertEqual(job.chunks_committed, 1)
+        rows = list(csv.reader(io.StringIO(self._artifact(job))))
+        self.assertEqual(rows[1][:1] + rows[1][2:], ['2024-03-01', '3', '2', '66.7'])
+
+    def test_prune_removes_expired_artifacts(self):
+        job_id = self._queue()
+        ExportJobService.run(job_id)
+        ExportJob.objects.filter(job_id=job_id).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(ExportJobService.prune_expired(), 1)
+        self.assertFalse(ExportJob.objects.exists())
+        self.assertEqual(list(get_storage().read_range(job_id, 0, 0, 10)), [])
+
+
+class ExportJobEndpointTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_tracker(name='Habits')
+
+    @override_settings(EXPORT_JOBS={'EAGER': True, 'CHUNK_BYTES': 64})
+    def _start(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post('/api/v1/exports/', {'kind': 'account', 'format': 'jsonl'})
+        self.assertEqual(response.status_code, 202)
+        return response.json()['job']['job_id']
+
+    def test_status_and_full_download(self):
+        job_id = self._start()
+
+        job = self.get(f'/api/v1/exports/{job_id}/').json()['job']
+        self.assertEqual((job['status'], job['progress']), ('completed', 100.0))
+
+        response = self.client.get(job['download_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(len(body), job['bytes_written'])
+        self.assertEqual(json.loads(body.splitlines()[1])['name'], 'Habits')
+
+    def test_range_requests(self):
+        job_id = self._start()
+        url = f'/api/v1/exports/{job_id}/download/'
+        full = b''.join(self.client.get(url).streaming_content)
+
+        # Spans several 64-byte parts
+        response = self.client.get(url, HTTP_RANGE='bytes=50-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 50-199/{len(full)}')
+        self.assertEqual(b''.join(response.streaming_content), full[50:200])
+
+        self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-10').streaming_content), full[-10:])
+        self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=100-').streaming_content), full[100:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f'bytes={len(full)}-').status_code, 416)
+
+    def test_unfinished_and_foreign_jobs(self):
+        from django.contrib.auth import get_user_model
+
+        job = ExportJobService.create(self.user, 'account', 'csv')
+        self.assertEqual(self.client.get(f'/api/v1/exports/{job.job_id}/download/').status_code, 409)
+
+        other = get_user_model().objects.create_user(username='other-exports', password='x')
+        foreign = ExportJobService.create(other, 'account', 'csv')
+        self.assertEqual(self.client.get(f'/api/v1/exports/{foreign.job_id}/').status_code, 404)
+
+    def test_rejects_unknown_format(self):
+        response = self.post('/api/v1/exports/', {'kind': 'tracker', 'format': 'xlsx', 'tracker_id': 'x'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_background_tracker_export(self):
+        tracker = self.create_tracker(name='Reading')
+
+        response = self.client.get(f'/api/v1/tracker/{tracker.tracker_id}/export/?background=true')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['job']['kind'], 'tracker')
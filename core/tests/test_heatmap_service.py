@@ -0,0 +1,110 @@
+"""
+Tests for the rollup-backed completion heatmap (HeatmapService).
+"""
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.services.heatmap_service import HeatmapService, activity_level
+from core.services.task_service import TaskService
+from core.tests.base import BaseAPITestCase
+from core.tests.factories import (
+    TrackerFactory, TemplateFactory, InstanceFactory, TaskInstanceFactory
+)
+
+
+class HeatmapServiceTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = date.today()
+        self.trackers = [TrackerFactory.create(self.user) for _ in range(2)]
+        self.tasks = []
+        for tracker in self.trackers:
+            template = TemplateFactory.create(tracker)
+            for offset, status in ((0, 'DONE'), (1, 'TODO')):
+                instance = InstanceFactory.create(tracker, self.today - timedelta(days=offset))
+                self.tasks.append(TaskInstanceFactory.create(instance, template, status=status))
+
+    def _heatmap(self, **kwargs):
+        start, end = HeatmapService.window(**kwargs)
+        return HeatmapService.get(self.user.id, start, end)
+
+    def test_window_starts_on_sunday(self):
+        start, end = HeatmapService.window(weeks=12, today=date(2025, 12, 10))
+
+        self.assertEqual(end, date(2025, 12, 10))
+        self.assertEqual(start.weekday(), 6)
+        self.assertEqual((end - start).days, 12 * 7 + 3)
+        with self.assertRaises(ValueError):
+            HeatmapService.window(start=date(2025, 1, 2), end=date(2025, 1, 1))
+
+    def test_days_sum_trackers(self):
+        days = {d['date']: d for d in self._heatmap(weeks=1)['days']}
+
+        today = days[self.today.isoformat()]
+        self.assertEqual((today['count'], today['total'], today['level']), (2, 2, 4))
+        self.assertEqual(days[(self.today - timedelta(days=1)).isoformat()]['count'], 0)
+
+    def test_one_tracker(self):
+        start, end = HeatmapService.window(weeks=1)
+        heatmap = HeatmapService.get(self.user.id, start, end, self.trackers[0].tracker_id)
+
+        self.assertEqual(heatmap['days'][-1]['total'], 1)
+
+    def test_weeks_are_padded(self):
+        weeks = self._heatmap(weeks=4)['weeks']
+
+        self.assertTrue(all(len(week) == 7 for week in weeks))
+        cells = [cell for week in weeks for cell in week if cell['date']]
+        self.assertEqual(cells[-1]['date'], self.today.isoformat())
+
+    def test_query_count_does_not_grow_with_window(self):
+        def count(**kwargs):
+            start, end = HeatmapService.window(**kwargs)
+            with CaptureQueriesContext(connection) as ctx:
+                HeatmapService.daily_counts(self.user.id, start, end)
+            return len(ctx)
+
+        count(weeks=1)  # Flush the rollup refreshes queued by setUp
+        self.assertEqual(count(weeks=1), count(start=self.today - timedelta(days=3 * 365)))
+
+    def test_writes_move_the_etag(self):
+        before = self._heatmap(weeks=1)
+
+        TaskService().toggle_task_status(self.tasks[1].task_instance_id)
+        after = self._heatmap(weeks=1)
+
+        self.assertNotEqual(before['etag'], after['etag'])
+        self.assertEqual(after['days'][-1]['count'], 2)
+        self.assertEqual(after['days'][-2]['count'], 1)
+
+    def test_activity_levels(self):
+        self.assertEqual(
+            [activity_level(done, 10) for done in (0, 1, 5, 7, 9)],
+            [0, 1, 2, 3, 4]
+        )
+        self.assertEqual(activity_level(0, 0), 0)
+
+
+class HeatmapEndpointTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        tracker = self.create_tracker()
+        instance = self.create_instance(tracker, date.today())
+        self.create_task_instance(instance, self.create_template(tracker), status='DONE')
+
+    def test_conditional_get(self):
+        response = self.get('/api/v1/heatmap/?weeks=12')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['heatmap'][-1]['level'], 4)
+
+        again = self.get('/api/v1/heatmap/?weeks=12', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_invalid_window(self):
+        response = self.get('/api/v1/heatmap/?start=2025-02-01&end=2025-01-01')
+
+        self.assertEqual(response.status_code, 400)
@@ -356,6 +356,175 @@ class TestFillMissingInstances:
         assert tasks.exists()
 
 
+# ============================================================================
+# Tests for materialize_range
+# ============================================================================
+
+class TestMaterializeRange:
+    """Tests for InstanceService.materialize_range."""
+    
+    @pytest.mark.django_db
+    def test_weekly_and_monthly_periods(self, weekly_tracker, monthly_tracker):
+        """Each tracker gets one instance per period overlapping the range."""
+        from core.tests.factories import TemplateFactory
+        TemplateFactory.create(weekly_tracker)
+        
+        created = InstanceService.materialize_range(
+            [weekly_tracker, monthly_tracker], date(2025, 12, 3), date(2026, 1, 10)
+        )
+        
+        weekly = sorted(i.period_start for i in created if i.tracker_id == weekly_tracker.tracker_id)
+        monthly = sorted(i.period_start for i in created if i.tracker_id == monthly_tracker.tracker_id)
+        assert weekly == [date(2025, 12, 1) + timedelta(weeks=n) for n in range(6)]
+        assert monthly == [date(2025, 12, 1), date(2026, 1, 1)]
+        assert TaskInstance.objects.filter(tracker_instance__tracker=weekly_tracker).count() == 6
+    
+    @pytest.mark.django_db
+    def test_weekly_periods_follow_week_start(self, user, weekly_tracker):
+        """Weeks start on the owner's preferred day."""
+        from core.models import UserPreferences
+        UserPreferences.objects.create(user=user, week_start=6)
+        
+        created = InstanceService.materialize_range(
+            [weekly_tracker], date(2025, 12, 3), date(2025, 12, 3)
+        )
+        
+        assert [(i.period_start, i.period_end) for i in created] == [
+            (date(2025, 11, 30), date(2025, 12, 6))
+        ]
+    
+    @pytest.mark.django_db
+    def test_mark_missed_only_for_past_periods(self, tracker_with_templates):
+        """Tasks are created MISSED for past days and TODO from today."""
+        tracker, templates = tracker_with_templates
+        today = date.today()
+        
+        InstanceService.materialize_range(
+            [tracker], today - timedelta(days=2), today, mark_missed=True
+        )
+        
+        statuses = dict(
+            TaskInstance.objects.filter(
+                tracker_instance__tracker=tracker
+            ).values_list('tracker_instance__tracking_date', 'status').distinct()
+        )
+        assert statuses == {
+            today - timedelta(days=2): 'MISSED',
+            today - timedelta(days=1): 'MISSED',
+            today: 'TODO',
+        }
+    
+    @pytest.mark.django_db
+    def test_query_count_does_not_grow_with_range(self, tracker_with_templates):
+        """A 90-day backfill costs about the same queries as a 3-day one."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        tracker, _ = tracker_with_templates
+        
+        def run(start, days):
+            with CaptureQueriesContext(connection) as ctx:
+                InstanceService.materialize_range(
+                    [tracker], start, start + timedelta(days=days - 1)
+                )
+            return len(ctx.captured_queries)
+        
+        run(date(2024, 1, 1), 1)  # Warm up per-user rows and caches
+        short = run(date(2025, 1, 1), 3)
+        # Only the chunking of large bulk INSERTs adds queries
+        assert run(date(2025, 3, 1), 90) <= short + 10
+    
+    @pytest.mark.django_db
+    def test_check_all_trackers(self, settings, daily_tracker, weekly_tracker):
+        """The hourly sweep creates the current period of every active tracker once."""
+        from core.services.instance_service import check_all_trackers
+        settings.VIRTUAL_INSTANCES = False
+        
+        assert check_all_trackers() == 2
+        assert check_all_trackers() == 0
+        assert TrackerInstance.objects.filter(tracker=daily_tracker, tracking_date=date.today()).exists()
+
+
+# ============================================================================
+# Tests for virtual instances
+# ============================================================================
+
+class TestVirtualInstances:
+    """Tests for periods served without rows until their first write."""
+    
+    @pytest.fixture(autouse=True)
+    def virtual(self, settings):
+        settings.VIRTUAL_INSTANCES = True
+    
+    @pytest.mark.django_db
+    def test_sweep_skips_generation(self, daily_tracker):
+        """The hourly sweep leaves untouched periods virtual."""
+        from core.services.instance_service import check_all_trackers
+        
+        assert check_all_trackers() == 0
+        assert not TrackerInstance.objects.exists()
+    
+    @pytest.mark.django_db
+    def test_virtual_periods_follow_templates(self, tracker_with_templates, weekly_tracker):
+        """Virtual tasks mirror what materialize_range would create, without writing."""
+        from core.tests.factories import TemplateFactory
+        tracker, templates = tracker_with_templates
+        TemplateFactory.create(tracker, description='One-off', is_recurring=False)
+        TemplateFactory.create(weekly_tracker)
+        
+        periods = InstanceService.virtual_periods([tracker, weekly_tracker], date(2025, 12, 10))
+        
+        instance, tasks = periods[tracker.tracker_id]
+        assert instance.period_start == instance.period_end == date(2025, 12, 10)
+        assert sorted(t.template_id for t in tasks) == sorted(t.template_id for t in templates)
+        assert all(t.status == 'TODO' for t in tasks)
+        weekly_instance, weekly_tasks = periods[weekly_tracker.tracker_id]
+        assert (weekly_instance.period_start, weekly_instance.period_end) == (date(2025, 12, 8), date(2025, 12, 14))
+        assert len(weekly_tasks) == 1
+        assert not TrackerInstance.objects.exists()
+    
+    @pytest.mark.django_db
+    def test_first_write_materializes_period(self, tracker_with_templates):
+        """Toggling a virtual task creates the period and updates its task."""
+        from core.services.task_service import TaskService
+        tracker, templates = tracker_with_templates
+        _, tasks = InstanceService.virtual_periods([tracker], date.today())[tracker.tracker_id]
+        
+        result = TaskService().toggle_task_status(tasks[0].task_instance_id)
+        
+        task = TaskInstance.objects.get(task_instance_id=result['task_instance_id'])
+        assert task.status == 'DONE'
+        assert task.template_id == tasks[0].template_id
+        assert TaskInstance.objects.filter(tracker_instance=task.tracker_instance).count() == 3
+        # A stale virtual ID resolves to the same row
+        assert InstanceService.resolve_task_ids([tasks[0].task_instance_id]) == {
+            tasks[0].task_instance_id: task.task_instance_id
+        }
+    
+    @pytest.mark.django_db
+    def test_resolve_checks_owner(self, user, tracker_with_templates):
+        """Virtual IDs of someone else's tracker are not materialized."""
+        from django.contrib.auth import get_user_model
+        tracker, _ = tracker_with_templates
+        other = get_user_model().objects.create_user(username='virtual_other', password='pass123')
+        _, tasks = InstanceService.virtual_periods([tracker], date.today())[tracker.tracker_id]
+        
+        assert InstanceService.resolve_task_ids([tasks[0].task_instance_id], other) == {}
+        assert not TrackerInstance.objects.exists()
+    
+    @pytest.mark.django_db
+    def test_dashboard_shows_virtual_tasks(self, user, tracker_with_templates):
+        """The dashboard lists virtual tasks for trackers with no instance today."""
+        from core.services.dashboard_service import DashboardService
+        from core.services.instance_service import parse_virtual_task_id
+        tracker, _ = tracker_with_templates
+        
+        summary = DashboardService(user, date.today()).get_trackers_summary()
+        
+        assert summary[0]['total_tasks'] == 3
+        assert all(parse_virtual_task_id(t['task_id'])[0] == tracker.tracker_id for t in summary[0]['tasks'])
+        assert not TrackerInstance.objects.exists()
+
+
 # ============================================================================
 # Tests for compatibility functions
 # ============================================================================
@@ -0,0 +1,157 @@
+"""
+Tests for the side-effect job queue and the TaskInstance signals that feed it.
+"""
+import uuid
+from datetime import date, timedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.integrations import job_queue
+from core.integrations.job_queue import JobQueue
+from core.models import GoalTaskMapping, SideEffectJob, TaskInstance
+from core.tests.factories import (
+    UserFactory, TrackerFactory, TemplateFactory, InstanceFactory, TaskInstanceFactory, GoalFactory
+)
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.tracker = TrackerFactory.create(self.user)
+        self.template = TemplateFactory.create(self.tracker)
+        self.instance = InstanceFactory.create(self.tracker, date.today())
+        self.goal = GoalFactory.create(self.user, self.tracker, target_value=None)
+        GoalTaskMapping.objects.create(goal=self.goal, template=self.template)
+
+    def _link_goals(self, count):
+        for _ in range(count):
+            goal = GoalFactory.create(self.user, self.tracker)
+            GoalTaskMapping.objects.create(goal=goal, template=self.template)
+
+    def test_repeated_task_saves_coalesce_per_goal(self):
+        task = TaskInstanceFactory.create(self.instance, self.template)
+        task.status = 'DONE'
+        task.save()
+        task.status = 'TODO'
+        task.save()
+
+        jobs = SideEffectJob.objects.filter(kind='goal_progress')
+        self.assertEqual(jobs.count(), 1)
+        self.assertEqual(jobs.get().key, str(self.goal.goal_id))
+
+    def test_drain_runs_goal_progress_after_commit(self):
+        with override_settings(SIDE_EFFECT_QUEUE={'EAGER': True}):
+            with self.captureOnCommitCallbacks(execute=True):
+                TaskInstanceFactory.create(self.instance, self.template, status='DONE')
+
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.progress, 100)
+        self.assertFalse(SideEffectJob.objects.exists())
+
+    def test_streak_check_queued_only_on_transition_to_done(self):
+        task = TaskInstanceFactory.create(self.instance, self.template, status='DONE')
+        SideEffectJob.objects.all().delete()
+
+        task = TaskInstance.objects.get(pk=task.pk)
+        task.notes = 'edited'
+        task.save()
+
+        self.assertFalse(SideEffectJob.objects.filter(kind='streak_milestone').exists())
+
+    def test_save_queries_independent_of_linked_goals(self):
+        task = TaskInstanceFactory.create(self.instance, self.template)
+        task = TaskInstance.objects.select_related('tracker_instance').get(pk=task.pk)
+
+        def count_save_queries(status):
+            task.status = status
+            with CaptureQueriesContext(connection) as ctx:
+                task.save()
+            return len(ctx.captured_queries)
+
+        few = count_save_queries('DONE')
+        count_save_queries('TODO')
+        self._link_goals(10)
+        SideEffectJob.objects.all().delete()
+        many = count_save_queries('DONE')
+
+        self.assertEqual(few, many)
+        self.assertEqual(SideEffectJob.objects.filter(kind='goal_progress').count(), 11)
+
+    def test_failed_job_retries_then_marked_failed(self):
+        calls = []
+
+        @job_queue.register('test_failing')
+        def failing(key, payload):
+            calls.append(key)
+            raise RuntimeError('boom')
+
+        JobQueue.enqueue('test_failing', ['x'])
+        with override_settings(SIDE_EFFECT_QUEUE={'MAX_ATTEMPTS': 2, 'RETRY_BACKOFF': 0}):
+            JobQueue.drain()
+            JobQueue.drain()
+            JobQueue.drain()
+
+        job = SideEffectJob.objects.get(kind='test_failing')
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIn('boom', job.last_error)
+
+    def test_failed_job_backs_off_before_retry(self):
+        calls = []
+
+        @job_queue.register('test_backoff')
+        def failing(key, payload):
+            calls.append(key)
+            raise RuntimeError('boom')
+
+        JobQueue.enqueue('test_backoff', ['x'])
+        JobQueue.drain()
+        JobQueue.drain()
+
+        job = SideEffectJob.objects.get(kind='test_backoff')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(job.status, 'pending')
+        self.assertGreater(job.available_at, job.updated_at)
+
+        SideEffectJob.objects.filter(pk=job.pk).update(available_at=job.updated_at)
+        JobQueue.drain()
+        self.assertEqual(len(calls), 2)
+
+    def test_stale_batch_requeued_and_lost_worker_cannot_complete(self):
+        JobQueue.enqueue('test_stale', ['x'])
+        token = uuid.uuid4()
+        JobQueue._claim(10, token)
+        SideEffectJob.objects.filter(kind='test_stale').update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(JobQueue.requeue_stale(), 1)
+        job = SideEffectJob.objects.get(kind='test_stale')
+        self.assertEqual((job.status, job.claim_token), ('pending', None))
+
+        # The original worker finishing late leaves the requeued job alone
+        SideEffectJob.objects.filter(job_id=job.job_id, claim_token=token).delete()
+        self.assertTrue(SideEffectJob.objects.filter(kind='test_stale').exists())
+
+    def test_stale_job_out_of_attempts_marked_failed(self):
+        JobQueue.enqueue('test_stale', ['y'])
+        with override_settings(SIDE_EFFECT_QUEUE={'MAX_ATTEMPTS': 1}):
+            JobQueue._claim(10, uuid.uuid4())
+            SideEffectJob.objects.filter(kind='test_stale').update(
+                updated_at=timezone.now() - timedelta(hours=1)
+            )
+            self.assertEqual(JobQueue.requeue_stale(), 0)
+
+        self.assertEqual(SideEffectJob.objects.get(kind='test_stale').status, 'failed')
+
+    def test_stats_reports_depth_and_lag(self):
+        SideEffectJob.objects.all().delete()
+        JobQueue.enqueue('goal_progress', ['a', 'b', 'a'])
+
+        stats = JobQueue.stats()
+        self.assertEqual(stats['depth'], 2)
+        self.assertEqual(stats['failed'], 0)
+        self.assertGreaterEqual(stats['lag_seconds'], 0)
@@ -10,10 +10,16 @@ These tests cover:
 - Entity connections
 - Path finding
 """
+import json
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from core.models import EntityRelation, GoalTaskMapping, TaskTemplateTag
+from core.services.knowledge_graph_service import KnowledgeGraphService
 from core.tests.base import BaseAPITestCase
 from core.tests.factories import (
-    TrackerFactory, TemplateFactory, GoalFactory, TagFactory
+    TrackerFactory, TemplateFactory, GoalFactory, TagFactory, DayNoteFactory
 )
 
 
@@ -86,6 +92,87 @@ class KnowledgeGraphTests(BaseAPITestCase):
         self.assertEqual(response.status_code, 200)
 
 
+class FullGraphBuilderTests(BaseAPITestCase):
+    """Tests for KnowledgeGraphService.get_full_graph."""
+    
+    def _add_tracker(self, tag, goal):
+        tracker = TrackerFactory.create(self.user)
+        templates = [TemplateFactory.create(tracker) for _ in range(2)]
+        TaskTemplateTag.objects.create(template=templates[0], tag=tag)
+        GoalTaskMapping.objects.create(goal=goal, template=templates[1])
+        DayNoteFactory.create(tracker)
+        return tracker, templates
+    
+    def _query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            KnowledgeGraphService.get_full_graph(self.user.id, include_notes=True)
+        return len(ctx)
+    
+    def setUp(self):
+        super().setUp()
+        self.tag = TagFactory.create(self.user)
+        self.goal = GoalFactory.create(self.user)
+        self.tracker, self.templates = self._add_tracker(self.tag, self.goal)
+        EntityRelation.objects.create(
+            user=self.user,
+            from_entity_type='template', from_entity_id=self.templates[0].template_id,
+            to_entity_type='template', to_entity_id=self.templates[1].template_id,
+            relation_type='depends_on'
+        )
+    
+    def test_queries_do_not_grow_with_trackers(self):
+        self._query_count()  # Warm the cached relation index
+        before = self._query_count()
+        for _ in range(4):
+            self._add_tracker(self.tag, self.goal)
+        
+        self.assertEqual(self._query_count(), before)
+    
+    def test_graph_contents(self):
+        graph = KnowledgeGraphService.get_full_graph(self.user.id, include_notes=True)
+        
+        self.assertEqual(
+            graph['stats']['node_types'],
+            {'trackers': 1, 'templates': 2, 'goals': 1, 'tags': 1, 'notes': 1}
+        )
+        self.assertEqual(
+            sorted(edge['type'] for edge in graph['edges']),
+            ['attached_to', 'categorized_by', 'contributes_to', 'depends_on', 'has', 'has']
+        )
+    
+    def test_min_degree_pruning(self):
+        graph = KnowledgeGraphService.get_full_graph(self.user.id, min_degree=2)
+        
+        ids = {node['id'] for node in graph['nodes']}
+        self.assertEqual(ids, {
+            f"tracker:{self.tracker.tracker_id}",
+            *(f"template:{t.template_id}" for t in self.templates)
+        })
+        self.assertEqual(graph['stats']['pruned_nodes'], 2)
+        self.assertTrue(all(e['source'] in ids and e['target'] in ids for e in graph['edges']))
+    
+    def test_max_nodes_keeps_best_connected(self):
+        graph = KnowledgeGraphService.get_full_graph(self.user.id, max_nodes=2)
+        
+        self.assertEqual(
+            [node['type'] for node in graph['nodes']],
+            ['template', 'template']
+        )
+        self.assertEqual([edge['type'] for edge in graph['edges']], ['depends_on'])
+    
+    def test_streamed_response_matches(self):
+        response = self.get('/api/v1/v2/knowledge-graph/?stream=true&include_notes=true')
+        streamed = json.loads(b''.join(response.streaming_content))
+        
+        plain = self.get('/api/v1/v2/knowledge-graph/?include_notes=true').json()
+        self.assertEqual(streamed, plain)
+    
+    def test_invalid_pruning_params(self):
+        response = self.get('/api/v1/v2/knowledge-graph/?max_nodes=lots')
+        
+        self.assertEqual(response.status_code, 400)
+
+
 class EntityConnectionsTests(BaseAPITestCase):
     """Tests for /api/v1/v2/graph/{type}/{id}/ endpoint."""
     
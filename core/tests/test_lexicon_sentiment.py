@@ -0,0 +1,76 @@
+"""
+Tests for the built-in sentiment and keyword engine
+(core.helpers.lexicon_sentiment).
+"""
+import time
+
+from core.helpers import lexicon_sentiment, nlp_helpers
+from core.helpers.lexicon_sentiment import LexiconAnalyzer
+
+
+def compound(text):
+    return LexiconAnalyzer().polarity_scores(text)['compound']
+
+
+class TestLexiconSentiment:
+
+    def test_scores_have_vader_shape(self):
+        scores = LexiconAnalyzer().polarity_scores("Good workout, but tired")
+
+        assert set(scores) == {'compound', 'pos', 'neu', 'neg'}
+        assert abs(scores['pos'] + scores['neu'] + scores['neg'] - 1.0) < 0.01
+        assert -1.0 <= scores['compound'] <= 1.0
+
+    def test_polarity(self):
+        assert compound("Felt happy and productive") > 0.5
+        assert compound("Exhausted and stressed, terrible sleep") < -0.5
+        assert LexiconAnalyzer().polarity_scores("Walked to the store") == {
+            'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0
+        }
+        assert LexiconAnalyzer().polarity_scores("...") == lexicon_sentiment.NEUTRAL
+
+    def test_negation(self):
+        assert compound("not good") < 0
+        assert compound("didn't feel tired") > 0
+        assert compound("I wasn’t happy") < 0
+
+    def test_boosters_and_emphasis(self):
+        assert compound("very good") > compound("good") > compound("slightly good")
+        assert compound("good!!") > compound("good")
+        assert compound("I feel GREAT today") > compound("I feel great today")
+        assert compound("kind of okay") == compound("okay")
+
+    def test_but_shifts_weight_to_second_clause(self):
+        assert compound("The run was great but I am tired") < compound("The run was great and I am tired")
+        assert compound("I was tired but the run was great") > 0
+
+    def test_inflections_match_their_stem(self):
+        assert lexicon_sentiment.valence('hoping') == lexicon_sentiment.valence('hope')
+        assert lexicon_sentiment.valence('worries') == lexicon_sentiment.valence('worry')
+        assert lexicon_sentiment.valence('struggles') == lexicon_sentiment.valence('struggle')
+        assert lexicon_sentiment.valence('table') == 0.0
+
+    def test_keywords_skip_stopwords(self):
+        text = "Morning run was great. The run felt easy and the morning air was fresh."
+
+        assert nlp_helpers.extract_keywords(text, top_n=2) == [('morning', 2), ('run', 2)]
+
+    def test_comprehensive_analysis_runs_without_nltk(self):
+        result = nlp_helpers.analyze_text_comprehensive("Slept 8 hours. I feel rested and calm!")
+
+        assert result['sentiment']['compound'] > 0
+        assert ('slept', 1) in result['keywords']
+        assert result['sleep']['hours'] == 8.0
+
+    def test_scores_thousands_of_notes_per_second(self):
+        analyzer = nlp_helpers.get_sentiment_analyzer()
+        notes = [
+            f"Day {i}: slept 7 hours, felt energized and productive but a bit stressed at work."
+            for i in range(2000)
+        ]
+
+        start = time.perf_counter()
+        for note in notes:
+            analyzer.polarity_scores(note)
+
+        assert time.perf_counter() - start < 2.0
@@ -10,11 +10,15 @@ class TestNLPHelpersUnit:
         with patch.dict('sys.modules', {'nltk': Mock(), 'nltk.corpus': Mock(), 'nltk.sentiment.vader': Mock()}) as mocked_modules:
             yield mocked_modules
 
+    @pytest.fixture
+    def nltk_mode(self, settings):
+        settings.NLP_ENGINE = 'nltk'
+
     def test_preprocess_text(self):
         assert nlp_helpers.preprocess_text("  HeLLo  ") == "hello"
         assert nlp_helpers.preprocess_text("") == ""
 
-    def test_tokenize(self, mock_nltk):
+    def test_tokenize(self, mock_nltk, nltk_mode):
         # We need to patch nlp_helpers._ensure_nltk to avoid real download
         with patch('core.helpers.nlp_helpers._ensure_nltk') as mock_ensure:
             with patch('nltk.word_tokenize') as mock_tokenize:
@@ -23,7 +27,7 @@ class TestNLPHelpersUnit:
                 assert tokens == ['hello', 'world']
                 mock_ensure.assert_called()
 
-    def test_remove_stopwords(self, mock_nltk):
+    def test_remove_stopwords(self, mock_nltk, nltk_mode):
         with patch('core.helpers.nlp_helpers._ensure_nltk'):
             # Stopwords is NLTK corpus
             mock_stopwords = Mock()
@@ -45,11 +49,12 @@ class TestNLPHelpersUnit:
                 assert 'of' not in filtered # Length 2
                 assert 'is' not in filtered
 
-    def test_compute_sentiment(self):
+    def test_compute_sentiment(self, nltk_mode):
         with patch('django.core.cache.cache') as mock_cache:
             mock_cache.get.return_value = None
             
-            with patch('core.helpers.nlp_helpers._ensure_nltk'):
+            with patch('core.helpers.nlp_helpers._ensure_nltk'), \
+                    patch.object(nlp_helpers, '_sentiment_analyzer', None):
                 with patch('nltk.sentiment.vader.SentimentIntensityAnalyzer') as MockSIA:
                     sia_instance = MockSIA.return_value
                     sia_instance.polarity_scores.return_value = {
@@ -60,19 +65,47 @@ class TestNLPHelpersUnit:
                     assert res['compound'] == 0.8
                     mock_cache.set.assert_called()
 
-    def test_compute_sentiment_cached(self):
-        with patch('django.core.cache.cache') as mock_cache:
+    def test_sentiment_analyzer_is_shared(self, mock_nltk, nltk_mode):
+        with patch('core.helpers.nlp_helpers._ensure_nltk'), \
+                patch.object(nlp_helpers, '_sentiment_analyzer', None):
+            MockSIA = mock_nltk['nltk.sentiment.vader'].SentimentIntensityAnalyzer
+            MockSIA.return_value.polarity_scores.return_value = {
+                'compound': 0.4, 'pos': 0.5, 'neu': 0.5, 'neg': 0.0
+            }
+
+            nlp_helpers.compute_sentiment("First note")
+            nlp_helpers.compute_sentiment("Second note")
+
+            assert MockSIA.call_count == 1
+            assert nlp_helpers.get_sentiment_analyzer() is MockSIA.return_value
+
+    def test_compute_sentiment_cached(self, nltk_mode):
+        with patch('django.core.cache.cache') as mock_cache, \
+                patch('core.helpers.nlp_helpers._ensure_nltk'):
             mock_cache.get.return_value = {'compound': 0.5}
             res = nlp_helpers.compute_sentiment("Cached")
             assert res['compound'] == 0.5
 
-    def test_compute_sentiment_fallback(self):
-        # Force exception
+    def test_compute_sentiment_fallback(self, nltk_mode):
+        # Force exception: NLTK mode falls back to the built-in engine
         with patch('django.core.cache.cache') as mock_cache:
             mock_cache.get.return_value = None
             with patch('core.helpers.nlp_helpers._ensure_nltk', side_effect=Exception("NLTK error")):
                 res = nlp_helpers.compute_sentiment("Fail")
-                assert res['neu'] == 1.0
+                assert res['compound'] < 0
+                assert nlp_helpers.get_sentiment_analyzer() is nlp_helpers._lexicon_analyzer
+                mock_cache.get.assert_not_called()
+
+    def test_builtin_engine_by_default(self):
+        with patch('django.core.cache.cache') as mock_cache, \
+                patch('core.helpers.nlp_helpers._ensure_nltk') as mock_ensure:
+            res = nlp_helpers.compute_sentiment("What a great, productive day!")
+            assert res['compound'] > 0.5
+            assert set(res) == {'compound', 'pos', 'neu', 'neg'}
+            assert nlp_helpers.tokenize("Didn't sleep well.") == ["didn't", 'sleep', 'well']
+            assert nlp_helpers.remove_stopwords(['the', 'gym', 'was', 'busy']) == ['gym', 'busy']
+            mock_ensure.assert_not_called()
+            mock_cache.get.assert_not_called()
 
     def test_extract_keywords(self):
         with patch('core.helpers.nlp_helpers.tokenize') as mock_tok:
@@ -0,0 +1,145 @@
+"""
+Tests for day note analysis (NoteAnalysisService), its save hook, the
+backfill command and the analytics that read the stored columns.
+"""
+import json
+from collections import Counter
+from datetime import date
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core import analytics
+from core.models import DayNote
+from core.services.note_analysis_service import NoteAnalysisService
+from core.tests.base import BaseAPITestCase
+from core.tests.factories import DayNoteFactory
+
+
+class FakeAnalyzer:
+    """Scores +0.5 per 'good' and -0.5 per 'bad'."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def polarity_scores(self, text):
+        self.calls += 1
+        words = text.lower().split()
+        return {'compound': 0.5 * (words.count('good') - words.count('bad'))}
+
+
+def fake_keywords(text, top_n=10):
+    return Counter(w for w in text.lower().split() if len(w) > 3).most_common(top_n)
+
+
+class NoteAnalysisTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tracker = self.create_tracker(name='Journal')
+        self.analyzer = FakeAnalyzer()
+        patches = [
+            mock.patch('core.helpers.nlp_helpers.get_sentiment_analyzer', return_value=self.analyzer),
+            mock.patch('core.helpers.nlp_helpers.extract_keywords', side_effect=fake_keywords),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _unavailable(self):
+        return mock.patch(
+            'core.helpers.nlp_helpers.get_sentiment_analyzer', side_effect=LookupError('vader_lexicon')
+        )
+
+    def test_note_is_analyzed_when_written(self):
+        note = DayNoteFactory.create(self.tracker, target_date=date(2024, 3, 1), content='good walk good food')
+
+        note.refresh_from_db()
+        self.assertEqual(note.sentiment_score, 1.0)
+        self.assertEqual(note.keywords, [['good', 2], ['walk', 1], ['food', 1]])
+
+    def test_only_content_edits_are_reanalyzed(self):
+        DayNoteFactory.create(self.tracker, target_date=date(2024, 3, 1), content='good day')
+        note = DayNote.objects.get(tracker=self.tracker)
+        calls = self.analyzer.calls
+
+        note.save()
+        self.assertEqual(self.analyzer.calls, calls)
+
+        note.content = 'bad day'
+        note.save()
+        note.refresh_from_db()
+        self.assertEqual(self.analyzer.calls, calls + 1)
+        self.assertEqual(note.sentiment_score, -0.5)
+
+    def test_unanalyzed_notes_are_backfilled_in_batches(self):
+        with self._unavailable():
+            for day in range(1, 8):
+                DayNoteFactory.create(self.tracker, target_date=date(2024, 3, day), content=f'good day {day}')
+        self.assertEqual(DayNote.objects.filter(sentiment_score__isnull=True).count(), 7)
+
+        with CaptureQueriesContext(connection) as queries:
+            count = NoteAnalysisService.backfill(batch_size=3)
+
+        self.assertEqual(count, 7)
+        self.assertFalse(DayNote.objects.filter(sentiment_score__isnull=True).exists())
+        # One read and one bulk update per batch, plus the final empty read
+        self.assertEqual(len(queries), 3 * 2 + 1)
+        self.assertEqual(NoteAnalysisService.backfill(), 0)
+
+    def test_backfill_command(self):
+        with self._unavailable():
+            DayNoteFactory.create(self.tracker, target_date=date(2024, 3, 1), content='good')
+
+        call_command('backfill_note_analysis', '--user', str(self.user.id))
+
+        self.assertEqual(DayNote.objects.get(tracker=self.tracker).sentiment_score, 0.5)
+
+    def test_analytics_read_stored_analysis(self):
+        DayNoteFactory.create(self.tracker, target_date=date(2024, 3, 1), content='good sleep')
+        DayNoteFactory.create(self.tracker, target_date=date(2024, 3, 2), content='bad sleep bad')
+
+        with mock.patch('core.helpers.nlp_helpers.compute_sentiment') as compute:
+            sentiment = analytics.analyze_notes_sentiment(self.tracker.tracker_id)
+            keywords = analytics.extract_keywords_from_notes(self.tracker.tracker_id, top_n=2)
+
+        compute.assert_not_called()
+        self.assertEqual(sentiment['average_mood'], -0.25)
+        self.assertEqual(
+            sorted(sentiment['daily_mood'], key=lambda d: d['date']),
+            [{'date': '2024-03-01', 'compound': 0.5}, {'date': '2024-03-02', 'compound': -1.0}]
+        )
+        self.assertEqual(keywords['keywords'], [('sleep', 2), ('good', 1)])
+
+    def test_imported_notes_are_analyzed(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from core.exports.account_importer import import_account
+
+        lines = [
+            {'type': 'trackers', 'tracker_id': 't1', 'name': 'Imported'},
+            {'type': 'notes', 'tracker_id': 't1', 'date': '2024-03-01', 'content': 'good run'},
+            {'type': 'notes', 'tracker_id': 't1', 'date': '2024-03-02', 'content': 'kept',
+             'sentiment_score': -0.2, 'keywords': [['kept', 1]]},
+        ]
+        upload = SimpleUploadedFile('notes.jsonl', ''.join(json.dumps(line) + '\n' for line in lines).encode())
+
+        import_account(self.user, upload)
+
+        notes = DayNote.objects.filter(tracker__name='Imported').order_by('date')
+        self.assertEqual([n.sentiment_score for n in notes], [0.5, -0.2])
+        self.assertEqual(notes[0].keywords, [['good', 1]])
+
+    def test_edit_through_note_api_is_reanalyzed(self):
+        self.post('/api/v1/notes/2024-03-01/', {'tracker_id': self.tracker.tracker_id, 'note': 'good good day'})
+        self.assertEqual(DayNote.objects.get(tracker=self.tracker).sentiment_score, 1.0)
+
+        # update_or_create saves only the changed defaults
+        response = self.post('/api/v1/notes/2024-03-01/', {'tracker_id': self.tracker.tracker_id, 'note': 'bad week'})
+
+        self.assertEqual(response.status_code, 200)
+        note = DayNote.objects.get(tracker=self.tracker)
+        self.assertEqual(note.content, 'bad week')
+        self.assertEqual(note.sentiment_score, -0.5)
+        self.assertEqual(note.keywords, [['week', 1]])
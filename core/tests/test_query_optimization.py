@@ -1,5 +1,6 @@
 
 import pytest
+from datetime import date
 from django.test import TestCase
 from django.urls import reverse
 from django.db import connection, reset_queries
@@ -116,6 +117,59 @@ class TestQueryOptimization(TestCase):
         
         pass
 
+    def test_dashboard_summary_query_count_is_flat(self):
+        """
+        DashboardService reads today's instances and tasks once, so the
+        query count must not grow with the number of trackers.
+        """
+        from core.services.dashboard_service import DashboardService
+
+        def add_trackers(n):
+            for _ in range(n):
+                t = TrackerFactory.create(self.user)
+                inst = InstanceFactory.create(t)
+                for points in (1, 3):
+                    TaskInstanceFactory.create(inst, TemplateFactory.create(t, points=points), status='DONE')
+
+        def count_queries():
+            service = DashboardService(self.user, date.today())
+            with CaptureQueriesContext(connection) as ctx:
+                summaries = service.get_trackers_summary()
+                stats = service.get_today_stats()
+            return len(ctx), summaries, stats
+
+        add_trackers(2)
+        count_2, _, _ = count_queries()
+        add_trackers(8)
+        count_10, summaries, stats = count_queries()
+
+        self.assertEqual(count_10, count_2)
+        self.assertEqual(count_10, 3)
+        self.assertEqual(len(summaries), 10)
+        self.assertEqual(summaries[0]['current_points'], 4)
+        self.assertEqual(stats['total_tasks'], 20)
+        self.assertEqual(stats['earned_points'], 40)
+
+    def test_task_toggle_defers_rollup_and_streak_work(self):
+        """
+        Toggling a task writes the row, its history, queued jobs and the
+        change log; rollup and streak refreshes run in the job queue.
+        """
+        from core.models import SideEffectJob
+
+        t = TrackerFactory.create(self.user)
+        inst = InstanceFactory.create(t)
+        task = TaskInstanceFactory.create(inst, TemplateFactory.create(t))
+        self.client.post(f'/api/v1/task/{task.pk}/toggle/')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(f'/api/v1/task/{task.pk}/toggle/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(ctx), 16)
+        self.assertFalse(any('daily_tracker_rollups' in q['sql'] for q in ctx.captured_queries))
+        self.assertTrue(SideEffectJob.objects.filter(kind='rollup_refresh').exists())
+
     def test_efficient_pagination(self):
         # Create 50 items
         pass
@@ -0,0 +1,124 @@
+"""
+Tests for the in-memory relation index behind the knowledge graph
+(RelationGraphService) and the services that read it.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import EntityRelation
+from core.services.entity_relation_service import EntityRelationService
+from core.services.knowledge_graph_service import KnowledgeGraphService
+from core.services.relation_graph_service import RelationGraph, RelationGraphService
+from core.tests.base import BaseAPITestCase
+
+
+class RelationGraphTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        # a -> b -> c -> d (depends_on), plus e related_to a
+        for source, target in (('a', 'b'), ('b', 'c'), ('c', 'd')):
+            self._relate(source, target)
+        self._relate('e', 'a', 'related_to')
+
+    def _relate(self, source, target, relation_type='depends_on', user=None):
+        return EntityRelation.objects.create(
+            user=user or self.user,
+            from_entity_type='template', from_entity_id=source,
+            to_entity_type='template', to_entity_id=target,
+            relation_type=relation_type
+        )
+
+    def test_index_is_built_once(self):
+        RelationGraphService.get(self.user.id)
+
+        with CaptureQueriesContext(connection) as ctx:
+            KnowledgeGraphService.get_entity_connections('template', 'a', 3, user_id=self.user.id)
+            KnowledgeGraphService.find_path('template', 'e', 'template', 'd', user_id=self.user.id)
+            EntityRelationService._would_create_cycle('template', 'd', 'template', 'a', self.user.id)
+        self.assertEqual(len(ctx), 0)
+
+    def test_relation_writes_invalidate(self):
+        self.assertIsNone(
+            KnowledgeGraphService.find_path('template', 'a', 'template', 'x', user_id=self.user.id)
+        )
+
+        relation = self._relate('d', 'x')
+        self.assertEqual(
+            len(KnowledgeGraphService.find_path('template', 'a', 'template', 'x', user_id=self.user.id)),
+            4
+        )
+
+        relation.delete()
+        self.assertIsNone(
+            KnowledgeGraphService.find_path('template', 'a', 'template', 'x', user_id=self.user.id)
+        )
+
+    def test_connections_within_depth(self):
+        graph = KnowledgeGraphService.get_entity_connections('template', 'b', 1, user_id=self.user.id)
+
+        self.assertEqual(
+            sorted(node['id'] for node in graph['nodes']),
+            ['template:a', 'template:b', 'template:c']
+        )
+        self.assertEqual(len(graph['edges']), 2)
+        self.assertEqual(graph['center'], 'template:b')
+
+    def test_connections_resolve_owner(self):
+        graph = KnowledgeGraphService.get_entity_connections('template', 'a', 2)
+
+        self.assertEqual(len(graph['nodes']), 4)
+
+    def test_shortest_path_directions(self):
+        path = KnowledgeGraphService.find_path('template', 'c', 'template', 'e', user_id=self.user.id)
+
+        self.assertEqual(
+            [(step['from'], step['to'], step['direction']) for step in path],
+            [
+                ('template:c', 'template:b', 'backward'),
+                ('template:b', 'template:a', 'backward'),
+                ('template:a', 'template:e', 'backward'),
+            ]
+        )
+        self.assertEqual(path[-1]['relation'], 'related_to')
+
+    def test_shortest_path_respects_max_depth(self):
+        self.assertIsNone(
+            KnowledgeGraphService.find_path('template', 'e', 'template', 'd', max_depth=3, user_id=self.user.id)
+        )
+        self.assertEqual(
+            len(KnowledgeGraphService.find_path('template', 'e', 'template', 'd', max_depth=4, user_id=self.user.id)),
+            4
+        )
+
+    def test_shortest_path_prefers_shortcut(self):
+        graph = RelationGraph([
+            ('s', 'x1', 'r'), ('x1', 'x2', 'r'), ('x2', 't', 'r'),
+            ('s', 'y', 'r'), ('y', 't', 'r'),
+        ])
+
+        self.assertEqual([step['to'] for step in graph.shortest_path('s', 't', 5)], ['y', 't'])
+
+    def test_cycle_detection(self):
+        self.assertIsNone(EntityRelationService.create_relation(
+            'template', 'd', 'template', 'a', 'depends_on', self.user.id
+        ))
+        self.assertIsNotNone(EntityRelationService.create_relation(
+            'template', 'a', 'template', 'd', 'depends_on', self.user.id
+        ))
+        # related_to edges do not count toward depends_on cycles
+        self.assertIsNotNone(EntityRelationService.create_relation(
+            'template', 'a', 'template', 'e', 'depends_on', self.user.id
+        ))
+
+    def test_indexes_are_per_user(self):
+        other = get_user_model().objects.create_user(username='graph-other', password='x')
+        self._relate('d', 'a', user=other)
+
+        self.assertFalse(
+            EntityRelationService._would_create_cycle('template', 'x', 'template', 'a', other.id)
+        )
+        self.assertIsNone(
+            KnowledgeGraphService.find_path('template', 'a', 'template', 'd', max_depth=1, user_id=self.user.id)
+        )
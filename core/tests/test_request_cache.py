@@ -0,0 +1,68 @@
+"""
+Tests for request-scoped memoization (core/utils/request_cache.py).
+"""
+from django.test import TestCase, RequestFactory
+from django.http import HttpResponse
+
+from core.models import UserPreferences
+from core.repositories import base_repository as crud
+from core.services.dashboard_service import DashboardService
+from core.services.points_service import PointsCalculationService
+from core.services.streak_service import StreakService
+from core.tests.factories import UserFactory, TrackerFactory
+from core.utils.request_cache import (
+    RequestCacheMiddleware, get_request_cache, request_memoize, request_scope
+)
+
+
+class RequestCacheTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.tracker = TrackerFactory.create(self.user)
+        UserPreferences.objects.create(user=self.user, timezone='UTC', streak_threshold=60)
+
+    def test_memoizes_within_scope_only(self):
+        calls = []
+
+        @request_memoize
+        def lookup(key, window=None):
+            calls.append(key)
+            return key
+
+        with request_scope():
+            lookup('a')
+            lookup('a', None)
+            lookup(key='a')
+        lookup('a')
+
+        self.assertEqual(calls, ['a', 'a'])
+
+    def test_services_share_preferences_and_tracker_rows(self):
+        with request_scope():
+            with self.assertNumQueries(2):
+                DashboardService(self.user)
+                service = PointsCalculationService(self.tracker.tracker_id, self.user)
+                service.tracker
+                StreakService.get_threshold(self.user.id)
+                crud.get_user_tracker(self.tracker.tracker_id, self.user.id)
+
+    def test_write_inside_scope_drops_memoized_rows(self):
+        with request_scope():
+            self.assertEqual(StreakService.get_threshold(self.user.id), 60)
+            UserPreferences.objects.filter(user=self.user).first().save()
+            UserPreferences.objects.filter(user=self.user).update(streak_threshold=90)
+            self.assertEqual(get_request_cache(), {})
+            self.assertEqual(StreakService.get_threshold(self.user.id), 90)
+
+    def test_middleware_opens_and_closes_scope(self):
+        seen = {}
+
+        def view(request):
+            seen['store'] = get_request_cache()
+            return HttpResponse('ok')
+
+        RequestCacheMiddleware(view)(RequestFactory().get('/'))
+
+        self.assertEqual(seen['store'], {})
+        self.assertIsNone(get_request_cache())
@@ -0,0 +1,132 @@
+"""
+Tests for RollupService and the DailyTrackerRollup table.
+"""
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase
+
+from core import analytics
+from core.models import DailyTrackerRollup, TaskInstance
+from core.services.rollup_service import RollupService
+from core.services.task_service import TaskService
+from core.tests.factories import (
+    UserFactory, TrackerFactory, TemplateFactory, InstanceFactory, TaskInstanceFactory
+)
+
+
+class RollupServiceTests(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.tracker = TrackerFactory.create(self.user)
+        self.t1 = TemplateFactory.create(self.tracker, points=3)
+        self.t2 = TemplateFactory.create(self.tracker, points=2)
+        self.day = date.today() - timedelta(days=1)
+        self.instance = InstanceFactory.create(self.tracker, self.day)
+
+    def _rollup(self):
+        RollupService.apply_pending([self.tracker.tracker_id])
+        return DailyTrackerRollup.objects.get(tracker=self.tracker, date=self.day)
+
+    def test_task_save_maintains_rollup(self):
+        TaskInstanceFactory.create(self.instance, self.t1, status='DONE')
+        task = TaskInstanceFactory.create(self.instance, self.t2, status='TODO')
+
+        rollup = self._rollup()
+        self.assertEqual((rollup.total, rollup.done), (2, 1))
+        self.assertEqual((rollup.points_earned, rollup.points_possible), (3, 5))
+
+        task.status = 'MISSED'
+        task.save()
+        rollup = self._rollup()
+        self.assertEqual((rollup.done, rollup.missed), (1, 1))
+
+    def test_soft_deleted_tasks_and_instances_excluded(self):
+        task = TaskInstanceFactory.create(self.instance, self.t1, status='DONE')
+        task.soft_delete()
+        self.assertEqual(self._rollup().total, 0)
+
+        self.instance.soft_delete()
+        RollupService.apply_pending([self.tracker.tracker_id])
+        self.assertFalse(DailyTrackerRollup.objects.filter(tracker=self.tracker).exists())
+
+    def test_hard_delete_removes_row(self):
+        TaskInstanceFactory.create(self.instance, self.t1, status='DONE')
+        self.instance.delete()
+        self.assertFalse(DailyTrackerRollup.objects.filter(tracker=self.tracker).exists())
+
+    def test_queryset_delete_refreshes_rollup(self):
+        TaskInstanceFactory.create(self.instance, self.t1, status='DONE')
+        TaskInstanceFactory.create(self.instance, self.t2)
+
+        TaskInstance.objects.filter(template=self.t1).delete()
+        rollup = self._rollup()
+        self.assertEqual((rollup.total, rollup.done), (1, 0))
+
+    def test_bulk_update_by_filter_refreshes_rollup(self):
+        TaskInstanceFactory.create(self.instance, self.t1)
+        TaskInstanceFactory.create(self.instance, self.t2)
+
+        updated = TaskService().bulk_update_by_filter(
+            self.user, 'DONE', {'tracker_id': self.tracker.tracker_id}
+        )
+        self.assertEqual(updated, 2)
+        self.assertEqual(self._rollup().done, 2)
+
+    def _count_refresh_queries(self, days):
+        instances = [
+            InstanceFactory.create(self.tracker, self.day - timedelta(days=i)) for i in days
+        ]
+        for inst in instances:
+            TaskInstanceFactory.create(inst, self.t1, status='DONE')
+        RollupService.apply_pending([self.tracker.tracker_id])
+        TaskInstance.objects.filter(tracker_instance__in=instances).update(status='TODO')
+
+        with CaptureQueriesContext(connection) as ctx:
+            RollupService.refresh_instances([i.instance_id for i in instances])
+        return len(ctx.captured_queries)
+
+    def test_refresh_instances_constant_queries(self):
+        small = self._count_refresh_queries(range(1, 3))
+        large = self._count_refresh_queries(range(10, 40))
+
+        self.assertEqual(small, large)
+        self.assertEqual(
+            sum(DailyTrackerRollup.objects.filter(tracker=self.tracker).values_list('done', flat=True)), 0
+        )
+
+    def test_rebuild_command(self):
+        TaskInstanceFactory.create(self.instance, self.t1, status='DONE')
+        DailyTrackerRollup.objects.all().delete()
+
+        call_command('rebuild_rollups', tracker=self.tracker.tracker_id, stdout=None)
+        self.assertEqual(self._rollup().done, 1)
+
+    def test_migration_backfill_matches_service(self):
+        from importlib import import_module
+        from django.apps import apps
+        backfill = import_module('core.migrations.0002_daily_tracker_rollup').backfill_rollups
+
+        TaskInstanceFactory.create(self.instance, self.t1, status='DONE')
+        InstanceFactory.create(self.tracker, self.day - timedelta(days=1))  # No tasks
+        RollupService.apply_pending([self.tracker.tracker_id])
+        expected = list(DailyTrackerRollup.objects.order_by('date').values('date', 'total', 'done', 'points_possible'))
+
+        DailyTrackerRollup.objects.all().delete()
+        backfill(apps, None)
+
+        self.assertEqual(
+            list(DailyTrackerRollup.objects.order_by('date').values('date', 'total', 'done', 'points_possible')),
+            expected
+        )
+        self.assertEqual(len(expected), 2)
+
+    def test_analytics_read_rollups(self):
+        TaskInstanceFactory.create(self.instance, self.t1, status='DONE')
+        TaskInstanceFactory.create(self.instance, self.t2, status='TODO')
+
+        result = analytics.compute_completion_rate(self.tracker.tracker_id)
+        self.assertEqual(result['value'], 50.0)
+        self.assertEqual(result['daily_rates'][0]['date'], self.day)
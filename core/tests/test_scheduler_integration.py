@@ -113,5 +113,5 @@ class TestSchedulerIntegration:
             
             start_scheduler()
             
-            assert scheduler_instance.add_job.call_count == 3
+            assert scheduler_instance.add_job.call_count == 5
             scheduler_instance.start.assert_called()
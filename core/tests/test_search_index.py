@@ -0,0 +1,133 @@
+"""
+Tests for the ranked search index (SearchIndexService and its backends).
+"""
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.integrations.search_backends import parse_query
+from core.models import SearchDocument, SideEffectJob
+from core.services.search_index_service import SearchIndexService
+from core.services.search_service import SearchService
+from core.services.task_service import TaskService
+from core.tests.base import BaseAPITestCase
+from core.tests.factories import DayNoteFactory, GoalFactory, TagFactory
+
+
+class SearchIndexTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tracker = self.create_tracker(name='Gym Workout')
+        self.template = self.create_template(self.tracker, description='Push-ups')
+        instance = self.create_instance(self.tracker)
+        self.task = self.create_task_instance(instance, self.template, notes='swim faster tomorrow')
+        DayNoteFactory.create(self.tracker, content='Felt great after the swim')
+
+    def _search(self, query):
+        return SearchIndexService.search(self.user.id, query)
+
+    def _names(self, query, group):
+        return [result['name'] for result in self._search(query)[group]]
+
+    def test_parse_query(self):
+        self.assertEqual(parse_query('Gym wor'), (['gym'], 'wor'))
+        self.assertEqual(parse_query('gym '), (['gym'], None))
+        self.assertEqual(parse_query('a'), (['a'], None))
+
+    def test_covers_notes_and_task_notes(self):
+        notes = self._search('swim')['notes']
+
+        self.assertEqual(sorted(note['type'] for note in notes), ['note', 'task_note'])
+
+    def test_prefix_and_all_words_match(self):
+        self.assertEqual(self._names('work', 'trackers'), ['Gym Workout'])
+        self.assertEqual(self._names('gym wor', 'trackers'), ['Gym Workout'])
+        self.assertEqual(self._names('gym xyz', 'trackers'), [])
+        self.assertEqual(self._names('pus', 'tasks'), ['Push-ups'])
+
+    def test_bm25_ranking(self):
+        self.create_template(self.tracker, description='read the paper and several other long things')
+        self.create_template(self.tracker, description='read read read')
+
+        self.assertEqual(
+            self._names('read ', 'tasks'),
+            ['read read read', 'read the paper and several other long things']
+        )
+
+    def test_clicks_boost_results(self):
+        first = GoalFactory.create(self.user, title='Run a marathon')
+        second = GoalFactory.create(self.user, title='Run a marathon')
+        ranked = [goal['id'] for goal in self._search('marathon')['goals']]
+        loser = str(second.goal_id) if ranked[0] == str(first.goal_id) else str(first.goal_id)
+
+        SearchService.record_click(self.user, 'marathon', 'goal', loser)
+
+        self.assertEqual(self._search('marathon')['goals'][0]['id'], loser)
+
+    def test_writes_update_the_index(self):
+        self.tracker.name = 'Swimming Pool'
+        self.tracker.save()
+        self.assertEqual(self._names('gym', 'trackers'), [])
+        self.assertEqual(self._search('pool')['tasks'], [])
+        self.assertEqual(self._search('push')['tasks'][0]['tracker_name'], 'Swimming Pool')
+
+        TaskService().update_task_details(self.task.task_instance_id, self.user, {'notes': ''})
+        self.assertEqual([n['type'] for n in self._search('swim')['notes']], ['note'])
+
+        self.tracker.soft_delete()
+        self.assertEqual(self._search('push')['tasks'], [])
+        self.assertEqual(self._search('swim')['notes'], [])
+
+    def test_status_changes_do_not_reindex(self):
+        self._search('gym')
+        TaskService().toggle_task_status(self.task.task_instance_id)
+
+        self.assertFalse(SideEffectJob.objects.filter(kind='search_index', status='pending').exists())
+
+    def test_query_is_one_index_lookup(self):
+        TagFactory.create(self.user, name='gymnastics')
+        self._search('gym')  # Apply pending writes and warm the stats
+
+        with CaptureQueriesContext(connection) as ctx:
+            results = self._search('gym')
+        # The pending-jobs check, then the postings lookup
+        self.assertEqual(len(ctx), 2)
+        self.assertEqual(len(results['trackers']) + len(results['tags']), 2)
+
+    def test_indexes_are_per_user(self):
+        other = get_user_model().objects.create_user(username='search-other', password='x')
+        TagFactory.create(other, name='gym')
+
+        self.assertEqual(self._search('gym')['tags'], [])
+        self.assertEqual(len(SearchIndexService.search(other.id, 'gym')['tags']), 1)
+
+    def test_rebuild_command(self):
+        self._search('gym')
+        SearchDocument.objects.filter(user=self.user).delete()
+
+        call_command('rebuild_search_index', user=self.user.id, stdout=open('/dev/null', 'w'))
+
+        self.assertEqual(self._names('gym', 'trackers'), ['Gym Workout'])
+
+
+class SearchEndpointTests(BaseAPITestCase):
+
+    def test_search_includes_notes(self):
+        tracker = self.create_tracker(name='Journal')
+        DayNoteFactory.create(tracker, content='Long walk by the river')
+
+        data = self.get('/api/v1/search/?q=river').json()
+
+        self.assertEqual(data['total_count'], 1)
+        self.assertEqual(data['notes'][0]['type'], 'note')
+
+    def test_record_click(self):
+        response = self.post('/api/v1/search/click/', {
+            'query': 'river', 'result_type': 'note', 'result_id': 'abc'
+        })
+        self.assertEqual(response.status_code, 200)
+
+        response = self.post('/api/v1/search/click/', {'query': 'river'})
+        self.assertEqual(response.status_code, 400)
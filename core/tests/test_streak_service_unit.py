@@ -0,0 +1,104 @@
+from django.core.management import call_command
+from django.test import TestCase
+from datetime import date, timedelta
+from core.models import TrackerStreak, UserPreferences
+from core.services.rollup_service import RollupService
+from core.services.streak_service import StreakService
+from core.tests.factories import UserFactory, TrackerFactory, TemplateFactory, InstanceFactory, TaskInstanceFactory
+
+
+class TestStreakServiceUnit(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory.create(username="streak_user")
+        self.tracker = TrackerFactory.create(user=self.user)
+        self.template = TemplateFactory.create(tracker=self.tracker)
+        self.today = date.today()
+
+    def _day(self, offset, status='DONE'):
+        instance = InstanceFactory.create(tracker=self.tracker, target_date=self.today - timedelta(days=offset))
+        return TaskInstanceFactory.create(instance=instance, template=self.template, status=status)
+
+    def _state(self):
+        RollupService.apply_pending([self.tracker.tracker_id])
+        return TrackerStreak.objects.get(tracker=self.tracker)
+
+    def test_consecutive_days_extend_state_incrementally(self):
+        for offset in (3, 2, 1, 0):
+            self._day(offset)
+
+        state = self._state()
+        assert state.current_streak == 4
+        assert state.longest_streak == 4
+        assert state.last_qualifying_date == self.today
+
+        result = StreakService.calculate_streak(self.tracker.tracker_id, self.user.id)
+        assert result.current_streak == 4
+        assert result.streak_active
+
+    def test_gap_restarts_run_but_keeps_longest(self):
+        for offset in (6, 5, 4):
+            self._day(offset)
+        self._day(1)
+
+        result = StreakService.calculate_streak(self.tracker.tracker_id, self.user.id)
+        assert result.current_streak == 1
+        assert result.longest_streak == 3
+
+    def test_uncompleting_last_day_rebuilds(self):
+        self._day(1)
+        task = self._day(0)
+        assert self._state().current_streak == 2
+
+        task.status = 'TODO'
+        task.save()
+
+        state = self._state()
+        assert state.current_streak == 1
+        assert state.last_qualifying_date == self.today - timedelta(days=1)
+
+    def test_threshold_change_rebuilds_state(self):
+        other = TemplateFactory.create(tracker=self.tracker)
+        task = self._day(0)
+        TaskInstanceFactory.create(instance=task.tracker_instance, template=other, status='TODO')
+
+        # 50% completion does not meet the default 80% threshold
+        assert StreakService.calculate_streak(self.tracker.tracker_id, self.user.id).current_streak == 0
+
+        UserPreferences.objects.create(user=self.user, streak_threshold=50)
+        result = StreakService.calculate_streak(self.tracker.tracker_id, self.user.id)
+        assert result.current_streak == 1
+        assert self._state().threshold == 50
+
+    def test_threshold_override_is_not_persisted(self):
+        self._day(0)
+        StreakService.calculate_streak(self.tracker.tracker_id, self.user.id, threshold_percent=100)
+        assert self._state().threshold == 80
+
+    def test_historical_as_of_date(self):
+        for offset in (5, 4, 3):
+            self._day(offset)
+
+        result = StreakService.calculate_streak(
+            self.tracker.tracker_id, self.user.id, as_of_date=self.today - timedelta(days=3)
+        )
+        assert result.current_streak == 3
+        assert result.streak_active
+
+    def test_calculate_streak_query_count_is_constant(self):
+        for offset in range(30):
+            self._day(offset)
+        self._state()
+
+        # pending-refresh lookup + preferences + persisted state
+        with self.assertNumQueries(3):
+            result = StreakService.calculate_streak(self.tracker.tracker_id, self.user.id)
+        assert result.current_streak == 30
+
+    def test_rebuild_command(self):
+        self._day(1)
+        self._day(0)
+        TrackerStreak.objects.all().delete()
+
+        call_command('rebuild_streaks', user=self.user.id, stdout=None)
+        assert self._state().current_streak == 2
@@ -0,0 +1,142 @@
+"""
+Tests for the typeahead suggestion index (SuggestionService) and the
+search history endpoints it serves.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import SearchHistory
+from core.services.search_service import SearchService
+from core.services.suggestion_service import Entry, SuggestionIndex, SuggestionService
+from core.tests.base import BaseAPITestCase
+from core.tests.factories import TagFactory
+
+
+class SuggestionIndexTests(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.tracker = self.create_tracker(name='Gym Workout')
+        self.template = self.create_template(self.tracker, description='Gym stretches')
+        TagFactory.create(self.user, name='gymnastics')
+
+    def _suggest(self, prefix, limit=5):
+        return [(s['query'], s['type']) for s in SuggestionService.suggest(self.user.id, prefix, limit)]
+
+    def _search(self, query):
+        SearchHistory.objects.create(user=self.user, query=query, result_count=1)
+
+    def test_prefix_matches_any_word(self):
+        self.assertEqual(
+            self._suggest('gym'),
+            [('Gym Workout', 'tracker'), ('gymnastics', 'tag'), ('Gym stretches', 'task')]
+        )
+        self.assertEqual(self._suggest('WORK'), [('Gym Workout', 'tracker')])
+        self.assertEqual(self._suggest('gym s'), [('Gym stretches', 'task')])
+        self.assertEqual(self._suggest('xyz'), [])
+
+    def test_typeahead_does_not_query(self):
+        SuggestionService.get(self.user.id)
+
+        with CaptureQueriesContext(connection) as ctx:
+            for prefix in ('gy', 'gym', 'gym w', 'wor'):
+                SuggestionService.suggest(self.user.id, prefix)
+        self.assertEqual(len(ctx), 0)
+
+    def test_writes_patch_the_cached_index(self):
+        SuggestionService.get(self.user.id)
+
+        self.tracker.name = 'Swimming'
+        self.tracker.save()
+        self.template.soft_delete()
+        self._search('gym plan')
+        self._search('gym plan')
+
+        with CaptureQueriesContext(connection) as ctx:
+            suggestions = self._suggest('gym')
+        self.assertEqual(len(ctx), 0)
+        self.assertEqual(suggestions, [('gym plan', 'history'), ('gymnastics', 'tag')])
+        self.assertEqual(self._suggest('swim'), [('Swimming', 'tracker')])
+
+    def test_tracker_delete_and_restore(self):
+        SuggestionService.get(self.user.id)
+
+        self.tracker.soft_delete()
+        self.assertEqual(self._suggest('gym'), [('gymnastics', 'tag')])
+
+        self.tracker.restore()
+        self.assertEqual(len(self._suggest('gym')), 3)
+
+    def test_recent_and_frequent_queries_rank_first(self):
+        for query in ('old favourite', 'old favourite', 'old favourite', 'old news'):
+            self._search(query)
+        SearchHistory.objects.filter(query='old favourite').update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+        SuggestionService.invalidate(self.user.id)
+
+        self.assertEqual([q for q, _ in self._suggest('old')], ['old news', 'old favourite'])
+
+        self._search('old favourite')
+        self.assertEqual([q for q, _ in self._suggest('old')], ['old favourite', 'old news'])
+
+    def test_recent_and_popular_searches(self):
+        for query in ('run', 'swim', 'swim', 'bike'):
+            self._search(query)
+
+        self.assertEqual([s['query'] for s in SearchService.get_recent_searches(self.user, 2)][0], 'bike')
+        self.assertEqual(
+            SearchService.get_popular_searches(self.user),
+            [{'query': 'swim', 'popularity': 2, 'type': 'popular'}]
+        )
+
+        SearchService.clear_search_history(self.user)
+        self.assertEqual(SearchService.get_recent_searches(self.user), [])
+
+    def test_popular_searches_count_only_the_window(self):
+        for query in ('swim', 'swim', 'swim', 'run', 'run'):
+            self._search(query)
+        # Two of the swims are older than the window
+        old = SearchHistory.objects.filter(user=self.user, query='swim')[:2]
+        SearchHistory.objects.filter(pk__in=[h.pk for h in old]).update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+
+        self.assertEqual(
+            SearchService.get_popular_searches(self.user, days=30),
+            [{'query': 'run', 'popularity': 2, 'type': 'popular'}]
+        )
+        self.assertEqual(
+            [(s['query'], s['popularity']) for s in SearchService.get_popular_searches(self.user, days=90)],
+            [('swim', 3), ('run', 2)]
+        )
+
+    def test_pickled_index_round_trips(self):
+        import pickle
+
+        index = SuggestionIndex({'tag:1': Entry('Morning run', 'tag', None, 0, 0.0)})
+        restored = pickle.loads(pickle.dumps(index))
+
+        self.assertEqual(restored.phrases, [('morning run', 'tag:1'), ('run', 'tag:1')])
+
+
+class SuggestionEndpointTests(BaseAPITestCase):
+
+    def test_suggestions_endpoint(self):
+        self.create_tracker(name='Reading')
+
+        data = self.get('/api/v1/search/suggestions/?q=rea').json()
+
+        self.assertEqual(data['suggestions'], [{'query': 'Reading', 'type': 'tracker'}])
+
+    def test_history_endpoint(self):
+        self.get('/api/v1/search/?q=nothing-matches')
+        self.create_tracker(name='Reading')
+        self.get('/api/v1/search/?q=reading')
+
+        data = self.get('/api/v1/search/history/').json()
+
+        self.assertEqual([s['query'] for s in data['searches']], ['reading'])
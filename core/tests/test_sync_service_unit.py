@@ -234,6 +234,126 @@ class TestProcessAction:
         assert result.get('success') is False or 'error' in result
 
 
+# ============================================================================
+# Tests for _process_actions (batched application)
+# ============================================================================
+
+class TestProcessActionsBatch:
+    """Tests for SyncService._process_actions."""
+    
+    @pytest.fixture
+    def tasks(self, instance, tracker):
+        from core.tests.factories import TemplateFactory, TaskInstanceFactory
+        return [
+            TaskInstanceFactory.create(instance, TemplateFactory.create(tracker))
+            for _ in range(5)
+        ]
+    
+    @pytest.mark.django_db
+    def test_results_follow_action_order(self, sync_service, tasks):
+        """Each action gets its own result, in the order sent."""
+        actions = [
+            {'id': 'a1', 'type': 'task_status', 'task_id': str(tasks[0].task_instance_id), 'status': 'DONE'},
+            {'id': 'a2', 'type': 'bogus'},
+            {'id': 'a3', 'type': 'task_toggle', 'task_id': 'missing'},
+            {'id': 'a4', 'type': 'task_notes', 'task_id': str(tasks[1].task_instance_id), 'notes': 'x'},
+        ]
+        
+        results = sync_service._process_actions(actions)
+        
+        assert [r['id'] for r in results] == ['a1', 'a2', 'a3', 'a4']
+        assert [r['success'] for r in results] == [True, False, False, True]
+        assert results[2]['retry'] is False
+    
+    @pytest.mark.django_db
+    def test_query_count_does_not_grow_with_actions(self, sync_service, tasks):
+        """Task actions are loaded and written in batches, not one by one."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        def run(batch):
+            actions = [
+                {'id': str(i), 'type': 'task_status', 'task_id': str(task.task_instance_id), 'status': status}
+                for i, task in enumerate(batch)
+                for status in ('DONE', 'IN_PROGRESS')
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                sync_service._process_actions(actions)
+            return len(ctx.captured_queries)
+        
+        run(tasks[4:])  # Warm up per-user rows and caches
+        assert run(tasks[:1]) == run(tasks[1:4])
+    
+    @pytest.mark.django_db
+    def test_toggles_apply_in_sequence(self, sync_service, task):
+        """Later actions see earlier ones, including conflict checks."""
+        task_id = str(task.task_instance_id)
+        actions = [
+            {'id': 't1', 'type': 'task_toggle', 'task_id': task_id},
+            {'id': 't2', 'type': 'task_toggle', 'task_id': task_id, 'old_status': 'TODO'},
+            {'id': 't3', 'type': 'task_toggle', 'task_id': task_id, 'old_status': 'DONE', 'new_status': 'SKIPPED'},
+        ]
+        
+        results = sync_service._process_actions(actions)
+        
+        assert results[0]['new_status'] == 'DONE'
+        assert results[1]['conflict'] is True
+        assert results[1]['server_status'] == 'DONE'
+        assert results[2]['success'] is True
+        task.refresh_from_db()
+        assert task.status == 'SKIPPED'
+        assert task.completed_at is None
+    
+    @pytest.mark.django_db
+    def test_completion_writes_history_and_side_effects(self, sync_service, user, tasks):
+        """Completed tasks keep audit history; side effects run per tracker."""
+        from core.models import SideEffectJob
+        from core.services.change_service import ChangeService
+        cursor = ChangeService.current(user.id)
+        SideEffectJob.objects.all().delete()
+        
+        sync_service._process_actions([
+            {'id': str(i), 'type': 'task_status', 'task_id': str(task.task_instance_id), 'status': 'DONE'}
+            for i, task in enumerate(tasks)
+        ])
+        
+        for task in tasks:
+            task.refresh_from_db()
+            assert task.completed_at is not None
+            assert task.history.first().status == 'DONE'
+        jobs = SideEffectJob.objects.filter(kind='streak_milestone')
+        assert jobs.count() <= 1  # Coalesced per tracker (may already be drained)
+        changes = sync_service.pull_changes(cursor)['changes']
+        assert len(changes) == len(tasks)
+    
+    @pytest.mark.django_db
+    def test_invalid_status_fails_only_that_action(self, sync_service, tasks):
+        """Validation failures do not abort the rest of the batch."""
+        results = sync_service._process_actions([
+            {'id': 'bad', 'type': 'task_status', 'task_id': str(tasks[0].task_instance_id), 'status': 'NOPE'},
+            {'id': 'ok', 'type': 'task_status', 'task_id': str(tasks[1].task_instance_id), 'status': 'DONE'},
+        ])
+        
+        assert results[0]['success'] is False
+        assert results[1]['success'] is True
+        tasks[0].refresh_from_db()
+        assert tasks[0].status == 'TODO'
+    
+    @pytest.mark.django_db
+    def test_day_notes_coalesce(self, sync_service, tracker):
+        """Several notes for one day are saved once, last write wins."""
+        from datetime import date
+        today = date.today().isoformat()
+        
+        results = sync_service._process_actions([
+            {'id': 'n1', 'type': 'day_note', 'tracker_id': str(tracker.tracker_id), 'date': today, 'content': 'first'},
+            {'id': 'n2', 'type': 'day_note', 'tracker_id': str(tracker.tracker_id), 'date': today, 'content': 'second'},
+        ])
+        
+        assert results[0]['note_id'] == results[1]['note_id']
+        assert DayNote.objects.get(tracker=tracker, date=date.today()).content == 'second'
+
+
 # ============================================================================
 # Tests for _action_task_toggle
 # ============================================================================
@@ -372,48 +492,47 @@ class TestActionDayNote:
 
 
 # ============================================================================
-# Tests for _get_changes_since
+# Tests for legacy last_sync clients
 # ============================================================================
 
-class TestGetChangesSince:
-    """Tests for SyncService._get_changes_since."""
+class TestLegacyLastSync:
+    """last_sync requests are answered with the paged full sync."""
     
     @pytest.mark.django_db
-    def test_returns_changes_structure(self, sync_service, tracker):
-        """Should return structured changes."""
-        last_sync = (timezone.now() - timedelta(hours=1)).isoformat()
-        
-        changes = sync_service._get_changes_since(last_sync)
-        
-        assert 'trackers' in changes or 'tasks' in changes or isinstance(changes, dict)
-    
-    @pytest.mark.django_db
-    def test_includes_new_trackers(self, sync_service, user):
-        """Should include newly created trackers."""
+    def test_last_sync_pages_through_every_row(self, sync_service, user, tracker, task):
+        """No row is cut off: paging with the token returns all of them."""
+        from core.services import sync_service as module
+        from core.services.change_service import ChangeService
         from core.tests.factories import TrackerFactory
-        
+        extra = [TrackerFactory.create(user, name=f'Tracker {i}') for i in range(3)]
         last_sync = (timezone.now() - timedelta(hours=1)).isoformat()
         
-        # Create new tracker after last_sync
-        new_tracker = TrackerFactory.create(user, name='New Tracker')
-        
-        changes = sync_service._get_changes_since(last_sync)
-        
-        # Should include the new tracker
-        assert changes is not None
+        with patch.object(module, 'FULL_SYNC_PAGE_SIZE', 2):
+            pages = [sync_service.process_sync_request({'last_sync': last_sync})]
+            while pages[-1]['sync_status'] == 'partial':
+                pages.append(sync_service.process_sync_request({
+                    'last_sync': last_sync,
+                    'full_sync_token': pages[-1]['server_changes']['full_sync_token'],
+                }))
+        
+        tracker_ids = [row['tracker_id'] for page in pages for row in page['server_changes']['trackers']['updated']]
+        task_ids = [row['task_instance_id'] for page in pages for row in page['server_changes']['tasks']['updated']]
+        assert sorted(tracker_ids) == sorted([tracker.tracker_id] + [t.tracker_id for t in extra])
+        assert task_ids == [task.task_instance_id]
+        assert pages[0]['server_changes']['is_full_sync'] is True
+        assert all(page['cursor'] == str(ChangeService.current(user.id)) for page in pages)
     
     @pytest.mark.django_db
-    def test_includes_updated_tasks(self, sync_service, task, user):
-        """Should include updated tasks."""
-        last_sync = (timezone.now() - timedelta(hours=1)).isoformat()
+    def test_bad_position_is_rejected_before_actions(self, sync_service, task):
+        """A malformed cursor or token fails without applying the actions."""
+        action = {'id': 'a1', 'type': 'task_status', 'task_id': str(task.task_instance_id), 'status': 'DONE'}
         
-        # Update task after last_sync
-        task.status = 'DONE'
-        task.save()
-        
-        changes = sync_service._get_changes_since(last_sync)
+        for data in ({'cursor': 'nope'}, {'full_sync_token': '12:nope:'}):
+            with pytest.raises(ValueError):
+                sync_service.process_sync_request({**data, 'pending_actions': [action]})
         
-        assert changes is not None
+        task.refresh_from_db()
+        assert task.status == 'TODO'
 
 
 # ============================================================================
@@ -450,6 +569,202 @@ class TestGetFullSync:
         if 'trackers' in data and 'updated' in data['trackers']:
             tracker_ids = [t.get('tracker_id') for t in data['trackers']['updated']]
             assert str(other_tracker.tracker_id) not in tracker_ids
+    
+    @pytest.mark.django_db
+    def test_pages_cover_every_entity(self, sync_service, user, tracker, task):
+        """Paging until has_more is unset returns every live row once."""
+        from core.tests.factories import DayNoteFactory, GoalFactory, TagFactory, InstanceFactory, TaskInstanceFactory
+        old_instance = InstanceFactory.create(tracker, timezone.now().date() - timedelta(days=60))
+        old_task = TaskInstanceFactory.create(old_instance, task.template, notes='kept')
+        DayNoteFactory.create(tracker)
+        GoalFactory.create(user, tracker)
+        TagFactory.create(user)
+        
+        pages = [sync_service._get_full_sync(limit=2)]
+        while pages[-1]['has_more']:
+            pages.append(sync_service._get_full_sync(pages[-1]['full_sync_token'], limit=2))
+        
+        def ids(key, field):
+            return [row[field] for page in pages for row in page[key]['updated']]
+        
+        assert len(pages) == 4
+        assert all(page['cursor'] == pages[0]['cursor'] for page in pages)
+        assert pages[-1]['full_sync_token'] is None
+        assert sorted(ids('tasks', 'task_instance_id')) == sorted([task.task_instance_id, old_task.task_instance_id])
+        assert ids('trackers', 'tracker_id') == [tracker.tracker_id]
+        assert ids('templates', 'template_id') == [task.template_id]
+        assert len(ids('day_notes', 'note_id')) == len(ids('goals', 'goal_id')) == len(ids('tags', 'tag_id')) == 1
+        assert 'kept' in ids('tasks', 'notes')
+    
+    @pytest.mark.django_db
+    def test_skips_deleted_rows(self, sync_service, task):
+        """Soft-deleted tasks are not part of the snapshot."""
+        task.soft_delete()
+        
+        assert sync_service._get_full_sync()['tasks']['updated'] == []
+    
+    @pytest.mark.django_db
+    def test_invalid_token(self, sync_service):
+        """Malformed page tokens are rejected."""
+        with pytest.raises(ValueError):
+            sync_service._get_full_sync('12:nope:')
+    
+    @pytest.mark.django_db
+    def test_sync_request_pages_full_sync(self, sync_service, user, task):
+        """process_sync_request hands back a token until the snapshot is complete."""
+        from core.services import sync_service as module
+        from core.services.change_service import ChangeService
+        
+        with patch.object(module, 'FULL_SYNC_PAGE_SIZE', 1):
+            first = sync_service.process_sync_request({})
+            second = sync_service.process_sync_request({
+                'full_sync_token': first['server_changes']['full_sync_token']
+            })
+        
+        assert first['sync_status'] == 'partial'
+        assert second['server_changes']['templates']['updated'][0]['template_id'] == task.template_id
+        assert first['cursor'] == second['cursor'] == str(ChangeService.current(user.id))
+
+
+# ============================================================================
+# Tests for pull_changes (change log cursor)
+# ============================================================================
+
+class TestPullChanges:
+    """Tests for SyncService.pull_changes."""
+    
+    @pytest.mark.django_db
+    def test_returns_latest_state_once_per_entity(self, sync_service, user, task):
+        """Several writes to one task come back as one upsert."""
+        from core.services.change_service import ChangeService
+        cursor = ChangeService.current(user.id)
+        
+        task.status = 'IN_PROGRESS'
+        task.save()
+        task.status = 'DONE'
+        task.save()
+        
+        result = sync_service.pull_changes(cursor)
+        
+        tasks = [c for c in result['changes'] if c['entity_type'] == 'task']
+        assert len(tasks) == 1
+        assert tasks[0]['op'] == 'upsert'
+        assert tasks[0]['data']['status'] == 'DONE'
+        assert result['has_more'] is False
+        assert int(result['cursor']) == ChangeService.current(user.id)
+    
+    @pytest.mark.django_db
+    def test_pages_by_limit(self, sync_service, user, tracker):
+        """has_more is set until the cursor reaches the end of the log."""
+        from core.services.change_service import ChangeService
+        from core.tests.factories import TemplateFactory
+        cursor = ChangeService.current(user.id)
+        for _ in range(3):
+            TemplateFactory.create(tracker)
+        
+        first = sync_service.pull_changes(cursor, limit=2)
+        second = sync_service.pull_changes(first['cursor'], limit=2)
+        
+        assert first['has_more'] is True
+        assert second['has_more'] is False
+        ids = [c['entity_id'] for c in first['changes'] + second['changes']]
+        assert len(ids) == len(set(ids)) == 3
+    
+    @pytest.mark.django_db
+    def test_soft_deleted_entity_is_a_delete(self, sync_service, user, tracker):
+        """Soft-deleted rows are reported as deletes without data."""
+        from core.services.change_service import ChangeService
+        cursor = ChangeService.current(user.id)
+        
+        tracker.soft_delete()
+        
+        result = sync_service.pull_changes(cursor)
+        
+        change = next(c for c in result['changes'] if c['entity_type'] == 'tracker')
+        assert change['op'] == 'delete'
+        assert change['data'] is None
+    
+    @pytest.mark.django_db
+    def test_bulk_update_is_logged(self, sync_service, user, task):
+        """Queryset updates that bypass signals still reach the log."""
+        from core.services.change_service import ChangeService
+        from core.services.task_service import TaskService
+        cursor = ChangeService.current(user.id)
+        
+        TaskService().bulk_update_by_filter(user, 'SKIPPED', {})
+        
+        result = sync_service.pull_changes(cursor)
+        
+        assert [(c['entity_id'], c['data']['status']) for c in result['changes']] == [
+            (str(task.task_instance_id), 'SKIPPED')
+        ]
+    
+    @pytest.mark.django_db
+    def test_bulk_delete_is_logged(self, sync_service, user, task):
+        """Bulk deletes reach the log as deletes."""
+        from core.services.change_service import ChangeService
+        from core.services.task_service import TaskService
+        cursor = ChangeService.current(user.id)
+        
+        TaskService().bulk_delete_tasks([task.task_instance_id], user)
+        
+        result = sync_service.pull_changes(cursor)
+        
+        assert [(c['entity_id'], c['op']) for c in result['changes']] == [
+            (str(task.task_instance_id), 'delete')
+        ]
+    
+    @pytest.mark.django_db
+    def test_migration_marks_existing_history_pruned(self, sync_service, user, task):
+        """Cursors from before the log existed get reset_required."""
+        from importlib import import_module
+        from django.apps import apps
+        from core.models import UserChangeSequence
+        seed = import_module('core.migrations.0007_change_log').seed_pruned_through
+        UserChangeSequence.objects.filter(user=user).update(pruned_through=0)
+        
+        seed(apps, None)
+        
+        assert sync_service.pull_changes(0)['reset_required'] is True
+        
+        task.status = 'DONE'
+        task.save()
+        sequence = UserChangeSequence.objects.get(user=user)
+        assert sync_service.pull_changes(sequence.pruned_through)['reset_required'] is False
+    
+    @pytest.mark.django_db
+    def test_pruned_cursor_requires_reset(self, sync_service, user, task):
+        """A cursor older than the retained log asks for a full sync."""
+        from core.models import ChangeLogEntry
+        from core.services.change_service import ChangeService
+        ChangeLogEntry.objects.filter(user=user).update(
+            created_at=timezone.now() - timedelta(days=100)
+        )
+        
+        assert ChangeService.prune(timedelta(days=90)) > 0
+        
+        assert sync_service.pull_changes(0)['reset_required'] is True
+        assert sync_service.pull_changes(ChangeService.current(user.id))['reset_required'] is False
+    
+    @pytest.mark.django_db
+    def test_sync_request_with_cursor(self, sync_service, user, task):
+        """process_sync_request pulls from the log when given a cursor."""
+        from core.services.change_service import ChangeService
+        cursor = ChangeService.current(user.id)
+        task.status = 'DONE'
+        task.save()
+        
+        result = sync_service.process_sync_request({'cursor': str(cursor)})
+        
+        assert result['sync_status'] == 'complete'
+        assert result['cursor'] == str(ChangeService.current(user.id))
+        assert result['server_changes']['changes'][0]['entity_id'] == str(task.task_instance_id)
+    
+    @pytest.mark.django_db
+    def test_invalid_cursor(self, sync_service):
+        """Non-numeric cursors are rejected."""
+        with pytest.raises(ValueError):
+            sync_service.pull_changes('not-a-cursor')
 
 
 # ============================================================================
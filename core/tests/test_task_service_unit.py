@@ -234,6 +234,30 @@ class TestToggleTaskStatus:
         
         assert result is not None
         assert 'status' in result or isinstance(result, dict)
+    
+    @pytest.mark.django_db
+    def test_toggle_ignores_other_users_tasks(self, task_service, user):
+        """Someone else's task, real or virtual, is not found or materialized."""
+        from django.contrib.auth import get_user_model
+        from core.services.instance_service import InstanceService
+        from core.tests.factories import TrackerFactory, TemplateFactory, InstanceFactory, TaskInstanceFactory
+        other = get_user_model().objects.create_user(username='other', password='x')
+        other_tracker = TrackerFactory.create(other)
+        template = TemplateFactory.create(other_tracker)
+        _, virtual = InstanceService.virtual_periods([other_tracker], date.today())[other_tracker.tracker_id]
+        foreign = TaskInstanceFactory.create(
+            InstanceFactory.create(other_tracker, date.today() - timedelta(days=1)), template
+        )
+        
+        for task_id in (virtual[0].task_instance_id, str(foreign.task_instance_id)):
+            with pytest.raises(TaskNotFoundError):
+                task_service.toggle_task_status(task_id, user=user)
+            with pytest.raises(TaskNotFoundError):
+                task_service.update_task_status(task_id, 'DONE', user=user)
+        
+        assert TrackerInstance.objects.filter(tracker=other_tracker).count() == 1
+        foreign.refresh_from_db()
+        assert foreign.status == 'TODO'
 
 
 # ============================================================================
@@ -292,6 +316,67 @@ class TestBulkUpdateTasks:
         )
         
         assert 'tracker_ids' in result
+    
+    @pytest.mark.django_db
+    def test_bulk_update_skips_other_users_tasks(self, task_service, user, task):
+        """Tasks owned by someone else are counted as failed and left alone."""
+        from django.contrib.auth import get_user_model
+        from core.tests.factories import TrackerFactory, TemplateFactory, InstanceFactory, TaskInstanceFactory
+        other = get_user_model().objects.create_user(username='other', password='x')
+        other_tracker = TrackerFactory.create(other)
+        foreign = TaskInstanceFactory.create(
+            InstanceFactory.create(other_tracker), TemplateFactory.create(other_tracker)
+        )
+        
+        result = task_service.bulk_update_tasks(
+            [str(task.task_instance_id), str(foreign.task_instance_id)], 'DONE', user=user
+        )
+        
+        assert result['updated'] == 1
+        assert result['failed'] == 1
+        assert result['tracker_ids'] == [task.tracker_instance.tracker_id]
+        foreign.refresh_from_db()
+        assert foreign.status == 'TODO'
+    
+    @pytest.mark.django_db
+    def test_bulk_update_completion_timestamps(self, task_service, instance, template):
+        """completed_at follows the status; first_completed_at is set once."""
+        from core.tests.factories import TaskInstanceFactory
+        task = TaskInstanceFactory.create(instance, template)
+        
+        task_service.bulk_update_tasks([str(task.task_instance_id)], 'DONE')
+        task.refresh_from_db()
+        first_completed = task.first_completed_at
+        assert task.completed_at is not None
+        assert first_completed is not None
+        
+        task_service.bulk_update_tasks([str(task.task_instance_id)], 'TODO')
+        task_service.bulk_update_tasks([str(task.task_instance_id)], 'DONE')
+        task.refresh_from_db()
+        assert task.first_completed_at == first_completed
+        assert task.completed_at >= first_completed
+        assert task.history.count() == 4  # Created + three bulk updates
+    
+    @pytest.mark.django_db
+    def test_bulk_update_query_count_is_flat(self, task_service, user, instance, tracker):
+        """Query count does not grow with the number of tasks."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.tests.factories import TemplateFactory, TaskInstanceFactory
+        tasks = [
+            TaskInstanceFactory.create(instance, TemplateFactory.create(tracker))
+            for _ in range(6)
+        ]
+        
+        def run(batch):
+            with CaptureQueriesContext(connection) as ctx:
+                task_service.bulk_update_tasks(
+                    [str(t.task_instance_id) for t in batch], 'IN_PROGRESS', user=user
+                )
+            return len(ctx.captured_queries)
+        
+        run(tasks[5:])  # Warm up per-user rows and caches
+        assert run(tasks[:1]) == run(tasks[1:5])
 
 
 # ============================================================================
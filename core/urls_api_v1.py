@@ -94,6 +94,9 @@ urlpatterns = [
     path('analytics/data/', views_api.api_analytics_data, name='analytics_data'),
     path('analytics/forecast/', views_api.api_analytics_forecast, name='analytics_forecast'),
     path('export/month/', views_api.api_export_month, name='export_month'),
+    path('exports/', views_api.api_export_jobs, name='export_jobs'),
+    path('exports/<str:job_id>/', views_api.api_export_job_status, name='export_job_status'),
+    path('exports/<str:job_id>/download/', views_api.api_export_job_download, name='export_job_download'),
     
     # =========================================================================
     # UX OPTIMIZATION
@@ -102,6 +105,7 @@ urlpatterns = [
     path('tasks/infinite/', views_api.api_tasks_infinite, name='tasks_infinite'),
     path('suggestions/', views_api.api_smart_suggestions, name='suggestions'),
     path('sync/', views_api.api_sync, name='sync'),
+    path('sync/changes/', views_api.api_sync_changes, name='sync_changes'),
     
     # =========================================================================
     # POINTS & GOALS - Task Points and Tracker Goal Management
@@ -161,6 +165,7 @@ urlpatterns = [
     path('search/suggestions/', views_api.api_search_suggestions, name='search_suggestions'),
     path('search/history/', views_api.api_search_history, name='search_history'),
     path('search/history/clear/', views_api.api_clear_search_history, name='search_history_clear'),
+    path('search/click/', views_api.api_search_click, name='search_click'),
     
     # =========================================================================
     # V1.5 MULTI-TRACKER ANALYTICS
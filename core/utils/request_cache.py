@@ -0,0 +1,125 @@
+"""
+Request-scoped memoization.
+
+A unit-of-work cache that lives for exactly one request (or one
+`request_scope()` block), so services building on the same rows -
+UserPreferences, the tracker, a tracker's instances - load them once:
+- RequestCacheMiddleware opens a scope around every request
+- @request_memoize opts a lookup in; outside a scope it calls straight through
+- Any model save/delete inside the scope drops memoized results
+
+Memoized values are shared between callers, so treat them as read-only.
+"""
+import inspect
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# Thread-local storage for the active scope
+_request_cache = threading.local()
+
+_MISSING = object()
+
+
+def get_request_cache():
+    """The active scope's store, or None outside a request scope."""
+    return getattr(_request_cache, 'store', None)
+
+
+def clear_request_cache():
+    """Drop everything memoized in the active scope."""
+    store = get_request_cache()
+    if store is not None:
+        store.clear()
+
+
+@contextmanager
+def request_scope():
+    """
+    Open a memoization scope (nested scopes share the outer one).
+
+    Usage:
+        with request_scope():
+            DashboardService(user).get_full_dashboard()
+    """
+    if get_request_cache() is not None:
+        yield
+        return
+
+    _request_cache.store = {}
+    try:
+        yield
+    finally:
+        del _request_cache.store
+
+
+def request_memoize(func):
+    """
+    Memoize a lookup for the lifetime of the active request scope.
+
+    Arguments are normalised against the signature, so f(x) and
+    f(x, None) share an entry when None is the default. They must be
+    hashable; calls with unhashable arguments, or made outside a scope,
+    are not memoized.
+
+    Usage:
+        @request_memoize
+        def get_user_preferences(user_id):
+            ...
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        store = get_request_cache()
+        if store is None:
+            return func(*args, **kwargs)
+
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, tuple(bound.arguments.items()))
+            result = store.get(key, _MISSING)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        if result is _MISSING:
+            result = func(*args, **kwargs)
+            store[key] = result
+        return result
+
+    return wrapper
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def clear_request_cache_on_write(sender, **kwargs):
+    """Writes inside a scope may change memoized rows; start afresh."""
+    clear_request_cache()
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class RequestCacheMiddleware:
+    """
+    Django middleware giving each request its own memoization scope.
+
+    Add to MIDDLEWARE in settings.py (after RequestIDMiddleware):
+        'core.utils.request_cache.RequestCacheMiddleware',
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_scope():
+            return self.get_response(request)
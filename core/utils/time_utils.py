@@ -9,7 +9,7 @@ Created: 2025-12-03
 """
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
-from typing import Tuple, Optional
+from typing import Iterator, Tuple, Optional
 
 
 def get_period_dates(time_mode: str, reference_date: Optional[date] = None) -> Tuple[date, date]:
@@ -80,6 +80,38 @@ def get_week_boundaries(target_date: date, week_start: int = 0) -> Tuple[date, d
     return period_start, period_end
 
 
+def iter_periods(time_mode: str, start_date: date, end_date: date,
+                 week_start: int = 0) -> Iterator[Tuple[date, date]]:
+    """
+    Yield every period of a time mode that overlaps a date range.
+    
+    Args:
+        time_mode (str): One of 'daily', 'weekly', 'monthly'
+        start_date (date): First day of the range
+        end_date (date): Last day of the range (inclusive)
+        week_start (int): First day of weekly periods, 0=Monday, 6=Sunday
+    
+    Yields:
+        Tuple[date, date]: (period_start, period_end), oldest first
+    
+    Example:
+        >>> list(iter_periods('weekly', date(2025, 12, 3), date(2025, 12, 9)))
+        [(date(2025, 12, 1), date(2025, 12, 7)), (date(2025, 12, 8), date(2025, 12, 14))]
+    """
+    if time_mode == 'weekly':
+        period_start, period_end = get_week_boundaries(start_date, week_start)
+    else:
+        period_start, period_end = get_period_dates(time_mode, start_date)
+    
+    while period_start <= end_date:
+        yield period_start, period_end
+        period_start = get_next_period_start(time_mode, period_end)
+        if time_mode == 'weekly':
+            period_end = period_start + timedelta(days=6)
+        else:
+            period_end = get_period_dates(time_mode, period_start)[1]
+
+
 def get_next_period_start(time_mode: str, current_end_date: date) -> date:
     """
     Calculate the start date of the next period.
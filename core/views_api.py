@@ -11,7 +11,7 @@ from django.views.decorators.csrf import csrf_exempt
 # from django.contrib.auth.decorators import login_required  <-- Replaced with custom decorator
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.template.loader import render_to_string
 from django.utils import timezone
 from functools import wraps
@@ -25,10 +25,13 @@ from .services.goal_service import GoalService
 from .services.streak_service import StreakService
 from .services.notification_service import NotificationService
 from .services.analytics_service import AnalyticsService
+from .services.rollup_service import RollupService
 from .utils.response_helpers import UXResponse
 from .utils.constants import HAPTIC_FEEDBACK, UI_COLORS
 from .utils.error_handlers import handle_service_errors
 from .helpers.cache_helpers import check_etag
+from .services.dashboard_snapshot_service import DashboardSnapshotService, snapshot_etag
+from .services.heatmap_service import HeatmapService, heatmap_etag, request_window
 
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError, AuthenticationFailed
@@ -101,7 +104,7 @@ search_service = SearchService()
 def api_task_toggle(request, task_id):
     """Toggle task status with UX-optimized response including celebration feedback"""
     # Use Service
-    result = task_service.toggle_task_status(task_id)
+    result = task_service.toggle_task_status(task_id, user=request.user)
     task_id = result['task_instance_id']
     new_status = result['status']
     
@@ -208,7 +211,7 @@ def api_task_status(request, task_id):
     notes = data.get('notes')
     
     # Service Call
-    updated_task = task_service.update_task_status(task_id, status, notes)
+    updated_task = task_service.update_task_status(task_id, status, notes, user=request.user)
     
     # Haptic mapping logic for Feedback (Keep in view)
     haptic_map = {
@@ -225,7 +228,7 @@ def api_task_status(request, task_id):
     return UXResponse.success(
         message=UXResponse.get_completion_message(status_val),
         data={
-            'task_id': task_id,
+            'task_id': updated_task.get('task_instance_id', task_id) if isinstance(updated_task, dict) else task_id,
             'new_status': status_val,
             'notes': notes
         },
@@ -258,7 +261,7 @@ def api_tasks_bulk(request):
     }
     
     if action in status_map:
-        result = task_service.bulk_update_tasks(task_ids, status_map[action])
+        result = task_service.bulk_update_tasks(task_ids, status_map[action], user=request.user)
         return UXResponse.success(
             message=f"{result['updated']} tasks updated",
             data={
@@ -267,12 +270,7 @@ def api_tasks_bulk(request):
             }
         )
     elif action == 'delete':
-        # Implement bulk delete in service if needed, for now loop? 
-        # Or simplified bulk delete. task_service.delete_task_instance is single.
-        # I'll stick to legacy ORM for bulk delete as it wasn't added to service yet, 
-        # OR I should have added it. For now, let's leave legacy for DELETE only or implement loop.
-        # Efficient way:
-        TaskInstance.objects.filter(task_instance_id__in=task_ids, tracker_instance__tracker__user=request.user).update(deleted_at=timezone.now())
+        task_service.bulk_delete_tasks(task_ids, request.user)
         return UXResponse.success(message='Tasks deleted')
     else:
         return UXResponse.error('Unknown action', error_code='INVALID_ACTION')
@@ -585,8 +583,9 @@ def api_template_activate(request):
                     )
             
             # Instantiate for today immediately to generate tasks
-            from core.services.instance_service import ensure_tracker_instance
-            ensure_tracker_instance(str(tracker.tracker_id), timezone.now().date(), request.user)
+            from core.services.instance_service import ensure_tracker_instance, virtual_instances_enabled
+            if not virtual_instances_enabled():
+                ensure_tracker_instance(str(tracker.tracker_id), timezone.now().date(), request.user)
         
         return UXResponse.success(
             message=f'Created "{template_config["name"]}" tracker',
@@ -816,11 +815,19 @@ def api_export(request, tracker_id):
     start_date = request.GET.get('start')
     end_date = request.GET.get('end')
     
+    if _wants_background(request.GET):
+        from .services.export_job_service import ExportJobService
+        job = ExportJobService.create(
+            request.user, 'tracker', 'csv' if format_type == 'csv' else 'json',
+            {'tracker_id': tracker.tracker_id, 'start': start_date, 'end': end_date}
+        )
+        return JsonResponse({'success': True, 'job': ExportJobService.to_dict(job)}, status=202)
+    
     # Get task instances for this tracker
     task_instances = TaskInstance.objects.filter(
         tracker_instance__tracker=tracker,
         deleted_at__isnull=True
-    ).select_related('tracker_instance', 'template').order_by('tracker_instance__tracking_date')
+    ).select_related('tracker_instance', 'template').order_by('tracker_instance__tracking_date', 'task_instance_id')
     
     if start_date:
         task_instances = task_instances.filter(tracker_instance__tracking_date__gte=start_date)
@@ -864,6 +871,125 @@ def api_export(request, tracker_id):
     })
 
 
+def _wants_background(data) -> bool:
+    """Whether an export request asked to run as a background job."""
+    return str(data.get('background', '')).lower() in ('1', 'true', 'yes')
+
+
+def _parse_range(header: str, size: int):
+    """
+    Parse a single-range `Range: bytes=...` header.
+    
+    Returns:
+        (start, end) inclusive, None for no usable range (serve it all),
+        or False when the range cannot be satisfied
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                return False
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+@require_auth
+@require_POST
+@handle_service_errors
+def api_export_jobs(request):
+    """
+    Start a background export.
+    
+    POST /api/v1/exports/
+    
+    Body:
+        {"kind": "account", "format": "jsonl"|"csv"|"xlsx"}
+        {"kind": "tracker", "format": "csv"|"json", "tracker_id": "...", "start": "...", "end": "..."}
+        {"kind": "month", "format": "json"|"csv"|"xlsx", "year": 2024, "month": 12, "tracker_id": "..."}
+    
+    Returns 202 with the job; poll /api/v1/exports/<job_id>/ for progress.
+    """
+    from .services.export_job_service import ExportJobService
+    
+    data = json.loads(request.body) if request.body else {}
+    kind = data.get('kind', 'account')
+    params = {key: data.get(key) for key in ('tracker_id', 'start', 'end', 'year', 'month')}
+    job = ExportJobService.create(request.user, kind, data.get('format', 'jsonl'), params)
+    
+    return JsonResponse({'success': True, 'job': ExportJobService.to_dict(job)}, status=202)
+
+
+@require_auth
+@require_GET
+@handle_service_errors
+def api_export_job_status(request, job_id):
+    """
+    Status and progress of a background export.
+    
+    GET /api/v1/exports/<job_id>/
+    """
+    from .models import ExportJob
+    from .services.export_job_service import ExportJobService
+    
+    job = get_object_or_404(ExportJob, job_id=job_id, user=request.user)
+    return JsonResponse({'success': True, 'job': ExportJobService.to_dict(job)})
+
+
+@require_auth
+@require_GET
+@handle_service_errors
+def api_export_job_download(request, job_id):
+    """
+    Download a finished background export.
+    
+    GET /api/v1/exports/<job_id>/download/
+    
+    Supports a single `Range: bytes=start-end` (or `start-`, `-suffix`)
+    so interrupted downloads can resume; answers 206 with Content-Range,
+    or 416 for a range past the end of the file.
+    """
+    from django.http import HttpResponse, StreamingHttpResponse
+    from .models import ExportJob
+    from .services.export_job_service import ExportJobService
+    
+    job = get_object_or_404(ExportJob, job_id=job_id, user=request.user)
+    if job.status != 'completed':
+        return JsonResponse({
+            'success': False,
+            'error': f'Export is {job.status}',
+            'job': ExportJobService.to_dict(job)
+        }, status=409)
+    
+    size = job.bytes_written
+    byte_range = _parse_range(request.META.get('HTTP_RANGE', ''), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    
+    start, end = byte_range or (0, size - 1)
+    response = StreamingHttpResponse(
+        ExportJobService.read(job, start, end),
+        content_type=job.content_type,
+        status=206 if byte_range else 200
+    )
+    response['Content-Length'] = str(max(end - start + 1, 0))
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'attachment; filename="{job.filename}"'
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
 # ============================================================================
 # SHARE ENDPOINT
 # ============================================================================
@@ -1107,122 +1233,36 @@ def api_chart_data(request):
 
 @require_auth
 @require_GET
+@check_etag(etag_func=heatmap_etag)
 def api_heatmap_data(request):
     """
     Get heatmap data for completion visualization.
     
     GET /api/heatmap/?tracker_id=xxx&weeks=12
+    GET /api/heatmap/?start=2024-01-01&end=2025-12-31
+    GET /api/heatmap/?year=2025 (the default window is the current year)
     
-    Returns: Grid of completion levels (0-4) for GitHub-style heatmap
+    Returns:
+        'heatmap': tracked days with completion levels (0-4),
+        'weeks': Sunday-first 7-day columns for a GitHub-style grid
     """
-    from django.core.cache import cache
-    
     try:
-        tracker_id = request.GET.get('tracker_id')
-        weeks = int(request.GET.get('weeks', 12))
-        
-        # Create cache key based on user, tracker, and weeks
-        cache_key = f"heatmap:{request.user.id}:{tracker_id or 'all'}:{weeks}:{date.today().isoformat()}"
-        
-        # Try to get cached data
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return JsonResponse(cached_data)
-        
-        today = date.today()
-        
-        # Build grid: 7 rows (days) x N columns (weeks)
-        heatmap_data = []
-        
-        # Start from Sunday
-        days_since_sunday = (today.weekday() + 1) % 7
-        start_date = today - timedelta(days=(weeks * 7) + days_since_sunday)
-        
-        # Import TaskInstance for task-based completion
-        from .models import TaskInstance
-        
-        # Fetch all task instances in the date range at once (optimized query)
-        base_query = TaskInstance.objects.filter(
-            tracker_instance__tracker__user=request.user,
-            tracker_instance__period_start__gte=start_date,
-            tracker_instance__period_end__lte=today
-        ).select_related('tracker_instance')
-        
-        if tracker_id:
-            base_query = base_query.filter(tracker_instance__tracker__tracker_id=tracker_id)
-        
-        # Aggregate by date for performance
-        from django.db.models import Count, Q
-        from django.db.models.functions import TruncDate
-        
-        # Get daily aggregates
-        daily_stats = base_query.annotate(
-            tracking_day=TruncDate('tracker_instance__period_start')
-        ).values('tracking_day').annotate(
-            total=Count('task_instance_id'),
-            done=Count('task_instance_id', filter=Q(status='DONE'))
-        ).order_by('tracking_day')
-        
-        # Convert to dict for fast lookup
-        stats_by_date = {
-            item['tracking_day']: {'total': item['total'], 'done': item['done']}
-            for item in daily_stats
-        }
-        
-        current_date = start_date
-        for week in range(weeks + 1):
-            week_data = []
-            for day in range(7):
-                if current_date > today:
-                    week_data.append({'date': None, 'level': 0, 'count': 0})
-                else:
-                    stats = stats_by_date.get(current_date, {'total': 0, 'done': 0})
-                    done = stats['done']
-                    total = stats['total']
-                    rate = (done / total * 100) if total else 0
-                    
-                    # Determine level (0-4) for GitHub-style heatmap
-                    if total == 0:
-                        level = 0
-                    elif rate == 0:
-                        level = 0
-                    elif rate < 25:
-                        level = 1
-                    elif rate < 50:
-                        level = 2
-                    elif rate < 75:
-                        level = 3
-                    else:
-                        level = 4
-                    
-                    week_data.append({
-                        'date': current_date.isoformat(),
-                        'level': level,
-                        'count': done,
-                        'total': total,
-                        'rate': int(rate)
-                    })
-                
-                current_date += timedelta(days=1)
-            
-            heatmap_data.append(week_data)
-        
-        response_data = {
-            'success': True,
-            'heatmap': heatmap_data,
-            'weeks': weeks
-        }
-        
-        # Cache for 5 minutes
-        cache.set(cache_key, response_data, 300)
-        
-        return JsonResponse(response_data)
-        
-    except Exception as e:
+        start, end, tracker_id = request_window(request.GET)
+    except ValueError as e:
         return JsonResponse({
             'success': False,
             'error': str(e)
         }, status=400)
+    
+    heatmap = HeatmapService.get(request.user.id, start, end, tracker_id)
+    
+    return JsonResponse({
+        'success': True,
+        'heatmap': heatmap['days'],
+        'weeks': heatmap['weeks'],
+        'start': heatmap['start'],
+        'end': heatmap['end'],
+    })
 
 
 # ============================================================================
@@ -1548,15 +1588,11 @@ def api_notifications(request):
             action = data.get('action')
             
             if action == 'mark_read':
-                notification_ids = data.get('ids', [])
-                Notification.objects.filter(
-                    user=request.user,
-                    notification_id__in=notification_ids
-                ).update(is_read=True)
+                NotificationService.mark_read(request.user.id, data.get('ids', []))
                 return JsonResponse({'success': True, 'message': 'Marked as read'})
             
             elif action == 'mark_all_read':
-                Notification.objects.filter(user=request.user).update(is_read=True)
+                NotificationService.mark_all_read(request.user.id)
                 return JsonResponse({'success': True, 'message': 'All marked as read'})
                 
         except Exception as e:
@@ -1849,7 +1885,10 @@ def api_sync(request):
     
     Request body:
         {
-            'last_sync': ISO timestamp (optional, null for full sync),
+            'cursor': Change log cursor (optional),
+            'last_sync': ISO timestamp (optional, legacy clients; they
+                         get a full sync),
+            'full_sync_token': Next full sync page (optional),
             'pending_actions': [...],  # Queued offline actions
             'device_id': string        # Device identifier
         }
@@ -1858,6 +1897,7 @@ def api_sync(request):
         {
             'action_results': [...],   # Result per action
             'server_changes': {...},   # Changes since last sync
+            'cursor': Cursor for the next pull,
             'new_sync_timestamp': ISO timestamp,
             'sync_status': 'complete' or 'partial'
         }
@@ -1877,6 +1917,13 @@ def api_sync(request):
             'error': 'Invalid JSON in request body',
             'retry_after': 0
         }, status=400)
+    except ValueError as e:
+        # Malformed cursor or full_sync_token
+        return JsonResponse({
+            'sync_status': 'failed',
+            'error': str(e),
+            'retry_after': 0
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'sync_status': 'failed',
@@ -1885,6 +1932,37 @@ def api_sync(request):
         }, status=500)
 
 
+@require_auth
+@require_GET
+def api_sync_changes(request):
+    """
+    Page through server changes after a sync cursor.
+    
+    Query params:
+        cursor: Cursor from the previous sync or pull (default '0')
+        limit: Max changes per page (default 200, max 1000)
+    
+    Response:
+        {
+            'changes': [...],          # Latest state per changed entity
+            'cursor': string,          # Pass back to get the next page
+            'has_more': bool,
+            'reset_required': bool     # Cursor expired; do a full sync
+        }
+    """
+    from core.services.sync_service import SyncService, DEFAULT_PULL_LIMIT
+    
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PULL_LIMIT))
+        result = SyncService(request.user).pull_changes(
+            request.GET.get('cursor', '0'), limit
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({'success': True, **result})
+
+
 # ============================================================================
 # HEALTH CHECK ENDPOINT (Load Balancer Integration)
 # ============================================================================
@@ -1942,6 +2020,17 @@ def api_health(request):
     except Exception:
         health_status['checks']['cache'] = {'status': 'unavailable'}
     
+    # In-process cache tier counters (per worker)
+    from core.helpers.cache_helpers import local_cache
+    health_status['checks']['local_cache'] = {'status': 'ok', **local_cache.stats()}
+    
+    # Side-effect queue depth and lag (informational, never fails the check)
+    try:
+        from core.integrations.job_queue import JobQueue
+        health_status['checks']['side_effect_queue'] = {'status': 'ok', **JobQueue.stats()}
+    except Exception:
+        health_status['checks']['side_effect_queue'] = {'status': 'unavailable'}
+    
     status_code = 200 if health_status['status'] == 'healthy' else 503
     return JsonResponse(health_status, status=status_code)
 
@@ -2169,136 +2258,29 @@ def api_user_avatar(request):
             }, status=500)
 
 
-@require_auth
-@require_http_methods(['GET', 'POST'])
-def api_data_export(request):
-    """
-    Export user data in JSON or CSV format.
-    
-    POST /api/v1/data/export/
-    Body: {"format": "json"|"csv"}
-    
-    Returns JSON with download_url or direct file data.
-    """
-    try:
-        data = json.loads(request.body)
-        export_format = data.get('format', 'json').lower()
-        
-        if export_format not in ['json', 'csv']:
-            return JsonResponse({
-                'success': False,
-                'error': 'Invalid format. Use "json" or "csv".'
-            }, status=400)
-        
-        # Gather user data
-        user_data = {
-            'export_date': timezone.now().isoformat(),
-            'user': {
-                'username': request.user.username,
-                'email': request.user.email,
-                'first_name': request.user.first_name,
-                'last_name': request.user.last_name,
-            },
-            'trackers': [],
-            'preferences': {}
-        }
-        
-        # Get all trackers
-        trackers = TrackerDefinition.objects.filter(user=request.user, deleted_at__isnull=True)
-        for tracker in trackers:
-            tracker_data = {
-                'tracker_id': tracker.tracker_id,
-                'name': tracker.name,
-                'description': tracker.description,
-                'time_mode': tracker.time_mode,
-                'status': tracker.status,
-                'created_at': tracker.created_at.isoformat(),
-                'tasks': []
-            }
-            
-            # Get task templates
-            templates = TaskTemplate.objects.filter(tracker=tracker, deleted_at__isnull=True)
-            for template in templates:
-                tracker_data['tasks'].append({
-                    'template_id': template.template_id,
-                    'description': template.description,
-                    'category': template.category,
-                    'weight': template.weight,
-                    'time_of_day': template.time_of_day,
-                })
-            
-            user_data['trackers'].append(tracker_data)
-        
-        # Get preferences
-        from .models import UserPreferences
-        try:
-            prefs = UserPreferences.objects.get(user=request.user)
-            user_data['preferences'] = {
-                'theme': prefs.theme,
-                'timezone': prefs.timezone,
-                'date_format': prefs.date_format,
-                'week_start': prefs.week_start,
-                'default_view': prefs.default_view,
-                'compact_mode': prefs.compact_mode,
-                'animations': prefs.animations,
-            }
-        except UserPreferences.DoesNotExist:
-            pass
-        
-        if export_format == 'json':
-            # Return JSON data directly for download
-            response = JsonResponse(user_data, json_dumps_params={'indent': 2})
-            response['Content-Disposition'] = f'attachment; filename="tracker_export_{timezone.now().strftime("%Y%m%d")}.json"'
-            return response
-        
-        else:  # CSV format
-            import csv
-            from io import StringIO
-            
-            output = StringIO()
-            writer = csv.writer(output)
-            
-            # Write trackers and tasks
-            writer.writerow(['Type', 'Tracker Name', 'Task Description', 'Category', 'Time Mode', 'Status'])
-            for tracker in user_data['trackers']:
-                for task in tracker['tasks']:
-                    writer.writerow([
-                        'Task',
-                        tracker['name'],
-                        task['description'],
-                        task['category'],
-                        tracker['time_mode'],
-                        tracker['status']
-                    ])
-            
-            from django.http import HttpResponse
-            response = HttpResponse(output.getvalue(), content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="tracker_export_{timezone.now().strftime("%Y%m%d")}.csv"'
-            return response
-            
-    except json.JSONDecodeError:
-        return JsonResponse({
-            'success': False,
-            'error': 'Invalid JSON in request body'
-        }, status=400)
-    except Exception as e:
-        return JsonResponse({
-            'success': False,
-            'error': str(e)
-        }, status=500)
-
-
 @require_auth
 @require_POST
 def api_data_import(request):
     """
-    Import user data from JSON file.
+    Import user data from an export file.
     
     POST /api/v1/data/import/
-    Body: multipart/form-data with 'file' field containing JSON export
+    Body: multipart/form-data with a 'file' field holding either
+          - a .jsonl full-account export (GET /api/v1/data/export/?format=jsonl)
+          - a legacy .json export ({"trackers": [{..., "tasks": [...]}]})
     
-    Returns count of imported trackers and tasks.
+    Query/form params:
+        dry_run: 'true' to validate and report without writing anything
+    
+    The file is read incrementally and written in batches with new IDs;
+    invalid records are reported per batch and skipped.
+    
+    Returns counts of imported trackers and tasks plus the batch report.
+    A file that cannot be read to the end is a 400 that still carries the
+    report of the batches written before the error.
     """
+    from .exports.account_importer import import_account
+    
     try:
         if 'file' not in request.FILES:
             return JsonResponse({
@@ -2309,59 +2291,43 @@ def api_data_import(request):
         import_file = request.FILES['file']
         
         # Validate file type
-        if not import_file.name.endswith('.json'):
+        name = import_file.name.lower()
+        if name.endswith('.jsonl') or name.endswith('.ndjson'):
+            import_format = 'jsonl'
+        elif name.endswith('.json'):
+            import_format = 'json'
+        else:
             return JsonResponse({
                 'success': False,
-                'error': 'Only JSON files are supported'
+                'error': 'Only JSON and JSON Lines files are supported'
             }, status=400)
         
-        # Parse JSON
-        try:
-            import_data = json.loads(import_file.read().decode('utf-8'))
-        except json.JSONDecodeError:
-            return JsonResponse({
-                'success': False,
-                'error': 'Invalid JSON file'
-            }, status=400)
+        dry_run = str(request.POST.get('dry_run', request.GET.get('dry_run', ''))).lower() in ('1', 'true', 'yes')
+        
+        report = import_account(request.user, import_file, import_format, dry_run=dry_run)
+        
+        imported_trackers = report['imported'].get('trackers', 0)
+        imported_tasks = report['imported'].get('templates', 0)
         
-        # Validate structure
-        if 'trackers' not in import_data:
+        if report['file_error']:
+            # Unreadable file; the report lists what was written before it broke
             return JsonResponse({
                 'success': False,
-                'error': 'Invalid export format: missing trackers data'
+                'error': report['file_error'],
+                'imported_trackers': imported_trackers,
+                'imported_tasks': imported_tasks,
+                'report': report
             }, status=400)
         
-        # Import trackers and tasks
-        imported_trackers = 0
-        imported_tasks = 0
-        
-        for tracker_data in import_data['trackers']:
-            # Create tracker (with new UUID to avoid conflicts)
-            tracker = TrackerDefinition.objects.create(
-                user=request.user,
-                name=tracker_data['name'],
-                description=tracker_data.get('description', ''),
-                time_mode=tracker_data.get('time_mode', 'daily'),
-                status='active'  # Import as active
-            )
-            imported_trackers += 1
-            
-            # Create task templates
-            for task_data in tracker_data.get('tasks', []):
-                TaskTemplate.objects.create(
-                    tracker=tracker,
-                    description=task_data['description'],
-                    category=task_data.get('category', ''),
-                    weight=task_data.get('weight', 1),
-                    time_of_day=task_data.get('time_of_day', 'anytime')
-                )
-                imported_tasks += 1
-        
         return JsonResponse({
             'success': True,
-            'message': f'Imported {imported_trackers} trackers with {imported_tasks} tasks',
+            'message': (
+                f'{"Validated" if dry_run else "Imported"} {imported_trackers} trackers '
+                f'with {imported_tasks} tasks'
+            ),
             'imported_trackers': imported_trackers,
-            'imported_tasks': imported_tasks
+            'imported_tasks': imported_tasks,
+            'report': report
         })
         
     except Exception as e:
@@ -2620,6 +2586,13 @@ def api_export_month(request):
                 'error': 'Format must be json, csv, or xlsx'
             }, status=400)
         
+        if _wants_background(data):
+            from core.services.export_job_service import ExportJobService
+            job = ExportJobService.create(
+                request.user, 'month', format, {'year': year, 'month': month, 'tracker_id': tracker_id}
+            )
+            return JsonResponse({'success': True, 'job': ExportJobService.to_dict(job)}, status=202)
+        
         # Initialize service and export
         service = ExportService(user=request.user)
         response = service.export_month(year, month, format, tracker_id)
@@ -3088,6 +3061,7 @@ def api_task_points_breakdown(request, tracker_id):
 
 @require_auth
 @require_GET
+@check_etag(etag_func=snapshot_etag)
 def api_dashboard(request):
     """
     Get complete dashboard data in one call.
@@ -3106,6 +3080,9 @@ def api_dashboard(request):
     - Recent activity
     - Unread notifications count
     - Quick action suggestions
+    
+    Today's dashboard is served from the user's precomputed snapshot;
+    other dates are computed live.
     """
     from core.services.dashboard_service import DashboardService
     from datetime import datetime
@@ -3123,8 +3100,10 @@ def api_dashboard(request):
                     'error': 'Invalid date format. Use YYYY-MM-DD'
                 }, status=400)
         
-        service = DashboardService(request.user, target_date)
-        dashboard_data = service.get_full_dashboard()
+        if target_date is None:
+            dashboard_data = DashboardSnapshotService.get_dashboard(request.user)
+        else:
+            dashboard_data = DashboardService(request.user, target_date).get_full_dashboard()
         
         return JsonResponse({
             'success': True,
@@ -3139,6 +3118,7 @@ def api_dashboard(request):
 
 @require_auth
 @require_GET
+@check_etag(etag_func=snapshot_etag)
 def api_dashboard_trackers(request):
     """
     Get all trackers with their tasks for today (or specified date).
@@ -3169,12 +3149,16 @@ def api_dashboard_trackers(request):
                     'error': 'Invalid date format. Use YYYY-MM-DD'
                 }, status=400)
         
-        service = DashboardService(request.user, target_date)
-        trackers = service.get_trackers_summary()
+        if target_date is None:
+            snapshot = DashboardSnapshotService.get(request.user).data
+            date_iso, trackers = snapshot['date'], snapshot['trackers']
+        else:
+            service = DashboardService(request.user, target_date)
+            date_iso, trackers = service.target_date.isoformat(), service.get_trackers_summary()
         
         return JsonResponse({
             'success': True,
-            'date': service.target_date.isoformat(),
+            'date': date_iso,
             'trackers': trackers,
             'count': len(trackers)
         })
@@ -3187,6 +3171,7 @@ def api_dashboard_trackers(request):
 
 @require_auth
 @require_GET
+@check_etag(etag_func=snapshot_etag)
 def api_dashboard_today(request):
     """
     Get today's aggregated stats only.
@@ -3199,11 +3184,8 @@ def api_dashboard_today(request):
     - Completion rate
     - Points earned vs total possible
     """
-    from core.services.dashboard_service import DashboardService
-    
     try:
-        service = DashboardService(request.user)
-        stats = service.get_today_stats()
+        stats = DashboardSnapshotService.get(request.user).data['today_stats']
         
         return JsonResponse({
             'success': True,
@@ -3218,6 +3200,7 @@ def api_dashboard_today(request):
 
 @require_auth
 @require_GET
+@check_etag(etag_func=snapshot_etag)
 def api_dashboard_week(request):
     """
     Get week overview with day-by-day breakdown.
@@ -3229,11 +3212,8 @@ def api_dashboard_week(request):
     - Day-by-day stats
     - Week totals
     """
-    from core.services.dashboard_service import DashboardService
-    
     try:
-        service = DashboardService(request.user)
-        week_data = service.get_week_overview()
+        week_data = DashboardSnapshotService.get(request.user).data['week']
         
         return JsonResponse({
             'success': True,
@@ -3248,6 +3228,7 @@ def api_dashboard_week(request):
 
 @require_auth
 @require_GET
+@check_etag(etag_func=snapshot_etag)
 def api_dashboard_goals(request):
     """
     Get active goals summary for dashboard.
@@ -3256,11 +3237,8 @@ def api_dashboard_goals(request):
     
     Returns list of active goals with progress info.
     """
-    from core.services.dashboard_service import DashboardService
-    
     try:
-        service = DashboardService(request.user)
-        goals = service.get_goals_progress()
+        goals = DashboardSnapshotService.get(request.user).data['goals_progress']
         
         return JsonResponse({
             'success': True,
@@ -3597,14 +3575,6 @@ def api_chart_data(request):
     # Simplified wrapper
     return api_analytics_data(request)
 
-@require_auth
-@require_GET
-@handle_service_errors
-def api_heatmap_data(request):
-    """Get heatmap data."""
-    data = AnalyticsService.get_heatmap_data(request.user.id)
-    return JsonResponse({'success': True, 'heatmap': data})
-
 @require_auth
 @require_GET
 @handle_service_errors
@@ -4157,6 +4127,37 @@ def api_clear_search_history(request):
     return UXResponse.success(f"Deleted {count} search history entries")
 
 
+@require_auth
+@require_POST
+@handle_service_errors
+def api_search_click(request):
+    """
+    Record the result a search led to, so it ranks higher next time.
+    
+    POST /api/v1/search/click/
+    
+    Body:
+        {"query": "gym", "result_type": "tracker", "result_id": "<id>"}
+    """
+    try:
+        data = json.loads(request.body) if request.body else {}
+    except json.JSONDecodeError:
+        data = {}
+    
+    query = (data.get('query') or '').strip()[:200]
+    result_type = (data.get('result_type') or '')[:50]
+    result_id = (data.get('result_id') or '')[:36]
+    if not (query and result_type and result_id):
+        return JsonResponse({
+            'success': False,
+            'error': 'query, result_type and result_id are required'
+        }, status=400)
+    
+    SearchService.record_click(request.user, query, result_type, result_id)
+    
+    return JsonResponse({'success': True})
+
+
 # =============================================================================
 # V1.5 MULTI-TRACKER ANALYTICS
 # =============================================================================
@@ -4413,13 +4414,29 @@ def api_knowledge_graph(request):
     
     Query params:
         include_notes: Include DayNotes in graph (default false)
+        max_nodes: Keep only the N best-connected nodes
+        min_degree: Drop nodes with fewer edges than this (default 0)
+        stream: Stream the response body in chunks (default false)
     """
+    from django.http import StreamingHttpResponse
     from core.services.knowledge_graph_service import KnowledgeGraphService
     
     include_notes = request.GET.get('include_notes', 'false').lower() == 'true'
+    try:
+        max_nodes = int(request.GET['max_nodes']) if request.GET.get('max_nodes') else None
+        min_degree = int(request.GET.get('min_degree', 0))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'max_nodes and min_degree must be integers'}, status=400)
     
-    graph = KnowledgeGraphService.get_full_graph(request.user.id, include_notes)
+    graph = KnowledgeGraphService.get_full_graph(
+        request.user.id, include_notes, max_nodes=max_nodes, min_degree=min_degree
+    )
     
+    if request.GET.get('stream', 'false').lower() == 'true':
+        return StreamingHttpResponse(
+            KnowledgeGraphService.stream_json(graph),
+            content_type='application/json'
+        )
     return JsonResponse({'success': True, **graph})
 
 
@@ -4439,7 +4456,9 @@ def api_entity_connections(request, entity_type, entity_id):
     
     depth = int(request.GET.get('depth', 2))
     
-    graph = KnowledgeGraphService.get_entity_connections(entity_type, entity_id, depth)
+    graph = KnowledgeGraphService.get_entity_connections(
+        entity_type, entity_id, depth, user_id=request.user.id
+    )
     
     return JsonResponse({'success': True, **graph})
 
@@ -4470,7 +4489,9 @@ def api_find_path(request):
             'error': 'All parameters required: source_type, source_id, target_type, target_id'
         }, status=400)
     
-    path = KnowledgeGraphService.find_path(source_type, source_id, target_type, target_id)
+    path = KnowledgeGraphService.find_path(
+        source_type, source_id, target_type, target_id, user_id=request.user.id
+    )
     
     return JsonResponse({
         'success': True,
@@ -4868,11 +4889,32 @@ def api_create_collaboration_invite(request, tracker_id):
 @require_GET
 def api_data_export(request):
     """
-    Export all user data as JSON.
+    Export all user data.
     
     GET /api/v1/data/export/
+    
+    Query params:
+        format: 'json' (default) for a JSON summary of trackers, instances
+                and tasks, or 'jsonl', 'csv' or 'xlsx' to stream every
+                entity of the account as a file download
     """
     from datetime import date
+    from django.http import StreamingHttpResponse
+    from .exports.account_exporter import EXPORT_FORMATS, stream_account_export
+    
+    export_format = request.GET.get('format', 'json').lower()
+    if export_format in EXPORT_FORMATS:
+        chunks, content_type, extension = stream_account_export(request.user, export_format)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="tracker_export_{timezone.now().strftime("%Y%m%d")}.{extension}"'
+        )
+        return response
+    if export_format != 'json':
+        return JsonResponse({
+            'success': False,
+            'error': 'Invalid format. Use "json", "jsonl", "csv" or "xlsx".'
+        }, status=400)
     
     # Collect all user data
     trackers = list(TrackerDefinition.objects.filter(
@@ -4918,12 +4960,27 @@ def api_data_clear(request):
     POST /api/v1/data/clear/
     """
     from django.utils import timezone
+    from .integrations.job_queue import JobQueue
+    from .services.change_service import ChangeService
+    from .services.dashboard_snapshot_service import JOB_KIND, tracker_job_key, user_job_key
     now = timezone.now()
+    user = request.user
+    
+    trackers = TrackerDefinition.objects.filter(user=user, deleted_at__isnull=True)
+    tasks = TaskInstance.objects.filter(tracker_instance__tracker__user=user, deleted_at__isnull=True)
+    tracker_ids = list(trackers.values_list('tracker_id', flat=True))
+    task_ids = list(tasks.values_list('task_instance_id', flat=True))
     
     # Soft delete all user data
-    TrackerDefinition.objects.filter(user=request.user).update(deleted_at=now)
-    TrackerInstance.objects.filter(tracker__user=request.user).update(deleted_at=now)
-    TaskInstance.objects.filter(tracker_instance__tracker__user=request.user).update(deleted_at=now)
+    with transaction.atomic():
+        trackers.update(deleted_at=now)
+        TrackerInstance.objects.filter(tracker__user=user, deleted_at__isnull=True).update(deleted_at=now)
+        tasks.update(deleted_at=now)
+        
+        # Queryset updates bypass signals
+        ChangeService.record(user.id, 'tracker', tracker_ids, 'delete')
+        ChangeService.record(user.id, 'task', task_ids, 'delete')
+        JobQueue.enqueue(JOB_KIND, [user_job_key(user.id, tracker_job_key(t)) for t in tracker_ids])
     
     return JsonResponse({
         'success': True,
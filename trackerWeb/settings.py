@@ -77,6 +77,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'core.utils.logging_utils.RequestIDMiddleware',  # Request ID for structured logging
+    'core.utils.request_cache.RequestCacheMiddleware',  # Per-request memoization of shared lookups
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add whitenoise for static files
     'corsheaders.middleware.CorsMiddleware',  # CORS - Must be before CommonMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -312,6 +313,68 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # =============================================================================
 APP_VERSION = '1.0.0'
 
+# =============================================================================
+# IN-PROCESS CACHE TIER (core.helpers.cache_helpers.local_cache)
+# Per-worker LRU in front of the shared cache for hot analytics results
+# =============================================================================
+LOCAL_CACHE = {
+    'MAX_ENTRIES': config('LOCAL_CACHE_MAX_ENTRIES', default=512, cast=int),
+    'TTL': 30,
+    'GENERATION_TTL': 1,
+}
+
+# =============================================================================
+# SIDE-EFFECT JOB QUEUE (core.integrations.job_queue)
+# Goal progress and streak checks run after commit instead of in the request
+# =============================================================================
+SIDE_EFFECT_QUEUE = {
+    'WORKERS': config('SIDE_EFFECT_WORKERS', default=2, cast=int),
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 5,
+    'HEARTBEAT': 30,
+    'STALE_AFTER': 300,
+    'EAGER': False,
+}
+
+# =============================================================================
+# VIRTUAL INSTANCES (core.services.instance_service)
+# Untouched periods are synthesized from templates on read and only written
+# on their first task change, instead of being generated hourly
+# =============================================================================
+VIRTUAL_INSTANCES = config('VIRTUAL_INSTANCES', default=True, cast=bool)
+
+# =============================================================================
+# SEARCH INDEX (core.integrations.search_backends)
+# 'local' (portable inverted index) or 'fulltext' (MySQL FULLTEXT); run
+# `manage.py rebuild_search_index` after switching
+# =============================================================================
+SEARCH_INDEX = {
+    'BACKEND': config('SEARCH_BACKEND', default='local'),
+}
+
+# =============================================================================
+# EXPORT JOBS (core.services.export_job_service)
+# Large exports run in a worker pool and are written in chunks to artifact
+# storage; interrupted jobs resume after their last committed chunk
+# =============================================================================
+EXPORT_JOBS = {
+    'WORKERS': config('EXPORT_WORKERS', default=2, cast=int),
+    'CHUNK_BYTES': 1024 * 1024,
+    'STORAGE_DIR': config('EXPORT_STORAGE_DIR', default=None),
+    'HEARTBEAT': 30,
+    'STALE_AFTER': 120,
+    'TTL_HOURS': 24,
+    'EAGER': False,
+}
+
+# =============================================================================
+# NLP ENGINE (core.helpers.nlp_helpers)
+# 'lexicon' (built-in, no downloads) or 'nltk' (VADER accuracy mode; needs
+# nltk installed and falls back to the built-in engine without it)
+# =============================================================================
+NLP_ENGINE = config('NLP_ENGINE', default='lexicon')
+
 # =============================================================================
 # FEATURE FLAGS (for safe rollouts)
 # Configure flags for gradual feature releases